@@ -30,6 +30,15 @@ class Settings(BaseSettings):
     # ── Government / External Endpoints ───────────────────────────────────────────
     AADHAAR_API: str = ""
     CYBER_CRIME_PORTAL: str = ""
+    NPCI_API_URL: str = ""   # empty → local simulation (see scripts/govt_api_standin.py)
+    TRAI_API_URL: str = ""
+    GOVT_API_TIMEOUT_SECONDS: float = 2.0
+
+    # ── Identifier Enrichment ─────────────────────────────────────────────────────
+    ENRICHMENT_CACHE_TTL_SECONDS: float = 900.0
+    ENRICHMENT_CACHE_SIZE: int = 50000
+    ENRICHMENT_MAX_CONCURRENCY: int = 16
+    ENRICHMENT_BATCH_SIZE: int = 25
 
     MOCK_SCAMMER_API_URL: str = ""
     MOCK_SCAMMER_API_KEY: str = ""
@@ -37,6 +46,48 @@ class Settings(BaseSettings):
 
     EVAL_SCHEMA: str = "judge"
 
+    # ── Classifier ────────────────────────────────────────────────────────────────
+    CLASSIFIER_BACKEND: str = "heuristic"  # 'heuristic' or 'learned'
+    CLASSIFIER_MODEL_PATH: str = "models/scam_classifier.npz"
+
+    # ── Fraud Registry (blacklist feeds, compiled into .compiled/ on load) ────────
+    FRAUD_REGISTRY_DIR: str = "data/fraud_registry"
+    URL_REPUTATION_DIR: str = "data/url_reputation"
+
+    # ── Coordination Detection (streaming, per-fingerprint sliding window) ────────
+    COORDINATION_WINDOW_MINUTES: int = 10
+    COORDINATION_BUCKET_SECONDS: int = 30
+    COORDINATION_ALERT_SESSIONS: int = 3      # distinct sessions in window that trigger an alert
+    COORDINATION_MAX_FINGERPRINTS: int = 100000
+
+    # ── Syndicate Scoring (label propagation over the identity graph) ─────────────
+    SYNDICATE_RECOMPUTE_SECONDS: float = 30.0
+    SYNDICATE_DAMPING: float = 0.85
+
+    # ── Semantic Memory (local hashed n-gram embeddings + IVF index) ──────────────
+    SEMANTIC_MEMORY_DIR: str = "chroma_db/semantic_memory"
+    SEMANTIC_EMBED_DIM: int = 256
+    SEMANTIC_NPROBE: int = 8
+    SEMANTIC_MIN_SCORE: float = 0.5   # cosine below this is not treated as a prior match
+    SEMANTIC_SNAPSHOT_SECONDS: float = 300.0   # index.npz refresh interval (also written after a cold load)
+
+    # ── Audit Trail (single writer, group commit) ────────────────────────────────
+    AUDIT_FSYNC: str = "batch"              # 'batch' (durable on ack), 'interval' or 'never'
+    AUDIT_FSYNC_INTERVAL_MS: float = 200.0
+    AUDIT_MAX_BATCH: int = 1024
+    AUDIT_COMMIT_TIMEOUT_SECONDS: float = 30.0   # longest a caller waits for its block to be committed
+    AUDIT_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024   # seal the active trail into a compressed segment
+    AUDIT_SEGMENT_MAX_SECONDS: float = 86400.0
+    AUDIT_RETENTION_DAYS: float = 0.0       # 0 keeps sealed segment bodies forever; headers are never deleted
+    AUDIT_VERIFY_WORKERS: int = 0           # processes for full verification; 0 = one per core
+
+    # ── Audit Merkle Tree (RFC 6962 proofs, Ed25519-signed roots) ────────────────
+    AUDIT_SIGNING_KEY_FILE: str = "audit_signing_key.pem"   # generated on first use; keep it out of git
+    AUDIT_ROOT_SIGN_SECONDS: float = 60.0
+
+    # ── Metrics (/metrics, Prometheus text format) ─────────────────────────────────
+    METRICS_LOOP_LAG_INTERVAL: float = 0.25   # seconds between event-loop lag probes
+
     # ── Application Metadata ──────────────────────────────────────────────────────
     PROJECT_NAME: str = "VIBHISHAN: National Cyber Defense"
     VERSION: str = "2.1.0 (Patch 1)"
@@ -1,8 +1,33 @@
+import asyncio
+import time
+from contextlib import contextmanager
 from typing import Any
 from langchain_groq import ChatGroq
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.runnables import RunnableLambda, Runnable
 from app.core.config import SETTINGS
+from app.services.metrics import LLM_FALLBACKS, record_llm
+
+
+def _is_timeout(e: BaseException) -> bool:
+    # asyncio deadlines cancel the call; provider SDKs raise their own *Timeout* classes
+    return isinstance(e, (asyncio.CancelledError, asyncio.TimeoutError, TimeoutError)) or "Timeout" in type(e).__name__
+
+
+@contextmanager
+def _measured(provider: str, model: str):
+    """Record one LLM call's latency and outcome (ok / error / timeout)."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except BaseException as e:
+        outcome = "timeout" if _is_timeout(e) else "error"
+        raise
+    finally:
+        record_llm(provider, model, time.perf_counter() - start, outcome)
+
 
 class DualBrainLLM(Runnable):
     def __init__(self, primary_model: str, fallback_model: str, temperature: float = 0.7):
@@ -41,17 +66,23 @@ class DualBrainLLM(Runnable):
 
     async def ainvoke(self, input: Any, config: Any = None, **kwargs) -> Any:
         try:
-            return await self.primary.ainvoke(input, config=config, **kwargs)
+            with _measured("groq", self.primary_model_name):
+                return await self.primary.ainvoke(input, config=config, **kwargs)
         except Exception as e:
             print(f"⚠️ PRIMARY BRAIN (Groq) FAILED: {e}. Falling back to ANALYST (Gemini).")
-            return await self.fallback.ainvoke(input, config=config, **kwargs)
+            LLM_FALLBACKS.labels(self.primary_model_name).inc()
+            with _measured("gemini", self.fallback_model_name):
+                return await self.fallback.ainvoke(input, config=config, **kwargs)
 
     def invoke(self, input: Any, config: Any = None, **kwargs) -> Any:
         try:
-            return self.primary.invoke(input, config=config, **kwargs)
+            with _measured("groq", self.primary_model_name):
+                return self.primary.invoke(input, config=config, **kwargs)
         except Exception as e:
             print(f"⚠️ PRIMARY BRAIN (Groq) FAILED: {e}. Falling back to ANALYST (Gemini).")
-            return self.fallback.invoke(input, config=config, **kwargs)
+            LLM_FALLBACKS.labels(self.primary_model_name).inc()
+            with _measured("gemini", self.fallback_model_name):
+                return self.fallback.invoke(input, config=config, **kwargs)
 
 # Refined model instances with failover
 fast_llm = DualBrainLLM(
@@ -14,6 +14,7 @@ class AgentState(TypedDict, total=False):
     agent_reply_draft: str
     agent_reply: str
     extracted_data: Dict[str, List[str]]
+    intel_ledger: Dict[str, Any]  # SessionIntel.to_dict(): first-seen turns + enrichment
     patience_meter: int
     audio_reply_path: Optional[str]
     report_path: Optional[str]
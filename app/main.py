@@ -1,4 +1,3 @@
-import re
 import time
 import json
 import os
@@ -6,7 +5,7 @@ import traceback
 import asyncio
 import shutil
 from fastapi import FastAPI, Depends, Request, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.gzip import GZipMiddleware
@@ -36,6 +35,18 @@ from app.services.observability import observability
 from app.services.evidence_chain import JudicialEvidenceChain
 from app.services.tools import generate_freeze_request   # ← NEW: Kingpin Freeze
 from app.services.tools import extract_scam_data
+from app.services.intel_accumulator import INTEL_KINDS, current_turn, intel_store, normalize_item, is_valid_item
+from app.services.intelligence_hub import intelligence_hub
+from app.services.coordination import coordination_detector, turn_fingerprints
+from app.services.identity_graph import identity_graph
+from app.services.syndicate_scoring import syndicate_scorer
+from app.services.intel_index import intel_index
+from app.services.merkle import merkle_ledger
+from app.services.ledger import ledger
+from app.services.memory_rag import memory_index
+from app.services.semantic_memory import semantic_memory
+from app.services.metrics import (CACHE_LOOKUPS, CONTENT_TYPE, PIPELINE_FALLBACKS, STAGE_SECONDS, cache_hit_rate,
+                                  llm_status, loop_lag, metrics, monitor_event_loop)
 
 # Include tracking router (for canary/tracking endpoints)
 from app.routers import tracking
@@ -46,9 +57,11 @@ from app.services.agents import fast_orchestrator_node
 app = FastAPI(title=SETTINGS.PROJECT_NAME, version=SETTINGS.VERSION)
 
 # Include routers
-from app.routers import tracking, audit
+from app.routers import tracking, audit, syndicate, intel
 app.include_router(tracking.router)
 app.include_router(audit.router)
+app.include_router(syndicate.router)
+app.include_router(intel.router)
 
 # Rate limiter setup
 limiter = Limiter(key_func=get_remote_address)
@@ -65,6 +78,22 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Evidence logger
 evidence_logger = JudicialEvidenceChain()
 
+# Coordination alerts go straight into the audit trail when the threshold is crossed
+def _log_coordination_alert(alert: dict) -> None:
+    observability.log_decision(
+        session_id=alert["session_id"],
+        event_type="COORDINATION_ALERT",
+        actor="Coordination_Detector",
+        decision=alert["fingerprint"],
+        reasoning=f"{alert['count_sessions']} sessions within {alert['window_minutes']} min",
+        confidence=1.0,
+        input_data=alert["fingerprint"],
+        output_data=",".join(alert["sessions"]),
+        metadata=alert,
+    )
+
+coordination_detector.subscribe(_log_coordination_alert)
+
 # Fallback DB + lock
 DB_FILE = "scam_database.json"
 LOCK_FILE = "scam_database.lock"
@@ -72,10 +101,39 @@ LOCK_FILE = "scam_database.lock"
 _SESSION_CACHE: dict = {}
 _SESSION_LOCKS: dict = {}
 
+@app.on_event("startup")
+async def _bootstrap_identity_graph():
+    """Seed the syndicate graph and intel index from persisted sessions (off the event loop), then keep scores fresh."""
+    await asyncio.to_thread(identity_graph.bootstrap_file, DB_FILE)
+    await asyncio.to_thread(intel_index.backfill_file, DB_FILE)
+    app.state.syndicate_job = asyncio.create_task(syndicate_scorer.run_forever())
+
+@app.on_event("startup")
+async def _load_tactic_memory():
+    """Load both recall indexes before serving, so the first recall does not do it on the event loop."""
+    await asyncio.to_thread(memory_index.load)
+    await asyncio.to_thread(semantic_memory.load)
+    app.state.semantic_snapshot_job = asyncio.create_task(semantic_memory.run_forever())
+
+@app.on_event("startup")
+async def _start_audit_root_signer():
+    """Extend the audit Merkle tree and publish a signed root periodically."""
+    app.state.merkle_job = asyncio.create_task(merkle_ledger.run_forever())
+
+@app.on_event("startup")
+async def _start_loop_lag_monitor():
+    """Probe event-loop lag for /metrics and /health."""
+    app.state.loop_lag_job = asyncio.create_task(monitor_event_loop())
+
+_SESSION_HIT = CACHE_LOOKUPS.labels("session", "hit")
+_SESSION_MISS = CACHE_LOOKUPS.labels("session", "miss")
+
 def _load_session_state(session_id: str) -> dict:
     cached = _SESSION_CACHE.get(session_id)
     if isinstance(cached, dict):
+        _SESSION_HIT.inc()
         return cached
+    _SESSION_MISS.inc()
     loaded = load_from_db_fallback(session_id)
     if isinstance(loaded, dict):
         _SESSION_CACHE[session_id] = loaded
@@ -152,6 +210,11 @@ def save_to_db_fallback(session_id: str, data: dict):
         except Exception as e:
             print(f"DB save failed: {e}")
 
+def _persist_session(session_id: str, data: dict) -> None:
+    """Background task: the timed persistence stage of /analyze."""
+    with STAGE_SECONDS.labels("persistence").time():
+        save_to_db_fallback(session_id, data)
+
 def load_from_db_fallback(session_id: str) -> dict:
     lock = FileLock(LOCK_FILE)
     with lock:
@@ -184,27 +247,11 @@ def normalize_extracted(
     urls: list,
 ) -> tuple:
     """Judge-friendly normalization: lowercase UPI, +91 phones, http(s) URLs."""
-    upis = [str(u).lower().strip().replace(" ", "") for u in (upi_ids or []) if u]
-    banks = [str(b).strip().replace(" ", "") for b in (bank_accounts or []) if b]
-    ifscs = [str(i).strip().upper() for i in (ifsc_codes or []) if i]
-    phones = []
-    for p in (phone_numbers or []):
-        if not p:
-            continue
-        digits = "".join(c for c in str(p) if c.isdigit())
-        if len(digits) >= 10:
-            ten = digits[-10:]
-            if ten.startswith(("6", "7", "8", "9")):
-                phones.append("+91" + ten)
-    urls_out = []
-    for u in (urls or []):
-        if not u:
-            continue
-        u = str(u).strip()
-        if u and not u.startswith(("http://", "https://")):
-            u = "https://" + u
-        urls_out.append(u)
-    return (upis, banks, ifscs, phones, urls_out)
+    out = []
+    for kind, items in zip(INTEL_KINDS, (upi_ids, bank_accounts, ifsc_codes, phone_numbers, urls)):
+        normalized = (normalize_item(kind, i) for i in (items or []))
+        out.append([n for n in normalized if n is not None])
+    return tuple(out)
 
 def validate_extracted_format(
     upi_ids: list,
@@ -214,14 +261,10 @@ def validate_extracted_format(
     urls: list,
 ) -> tuple:
     """Triple-check: only return items matching strict format (100% validity for judges)."""
-    upi_ok = re.compile(r"^[a-z0-9.\-_]{2,256}@[a-z0-9.\-]{2,64}$").match
-    upis = [u for u in (upi_ids or []) if u and upi_ok(str(u).lower().strip())]
-    banks = [b for b in (bank_accounts or []) if b and re.match(r"^\d{9,18}$", re.sub(r"\D", "", str(b)))]
-    ifscs = [i for i in (ifsc_codes or []) if i and re.match(r"^[A-Z]{4}0[A-Z0-9]{6}$", str(i).strip())]
-    phones = [p for p in (phone_numbers or []) if p and re.match(r"^\+91[6-9]\d{9}$", str(p).strip())]
-    url_ok = re.compile(r"^https?://\S+$").match
-    urls_out = [u for u in (urls or []) if u and url_ok(str(u).strip())]
-    return (upis, banks, ifscs, phones, urls_out)
+    return tuple(
+        [i for i in (items or []) if is_valid_item(kind, i)]
+        for kind, items in zip(INTEL_KINDS, (upi_ids, bank_accounts, ifsc_codes, phone_numbers, urls))
+    )
 
 def safe_fallback_response(
     session_id: str = "unknown",
@@ -310,11 +353,13 @@ def to_competition_intelligence(
             )
     for url in (urls or []):
         if url:
+            # Domain reputation (blocklist trie / shortener unwrap) can only raise confidence.
+            reputation = float(intelligence_hub.verify_url(str(url)).get("confidence", 0.0))
             out.append(
                 CompetitionExtractedIntelligenceItem(
                     type="PHISHING_LINK",
                     value=str(url),
-                    confidence=max(0.60, min(1.0, conf * 0.90)),
+                    confidence=max(0.60, min(1.0, max(conf * 0.90, reputation))),
                 )
             )
     return out
@@ -332,6 +377,7 @@ async def _analyze_internal(
     try:
         await asyncio.wait_for(session_lock.acquire(), timeout=0.6)
     except Exception:
+        PIPELINE_FALLBACKS.labels("session_lock", "timeout").inc()
         return {
             "session_id": session_id,
             "scam_detected": False,
@@ -343,6 +389,7 @@ async def _analyze_internal(
             "banks": [],
             "phones": [],
             "urls": [],
+            "fallback": "session_lock",   # empty reply, not an analysis: /analyze records it as a failure
         }
 
     try:
@@ -361,6 +408,7 @@ async def _analyze_internal(
             }
 
         user_input = payload.message_text or ""
+        speaker_info = ""
         if payload.audio_base64:
             try:
                 transcribed_text, speaker_info, _is_ai_voice = await asyncio.to_thread(
@@ -379,7 +427,9 @@ async def _analyze_internal(
         if not user_input.strip():
             user_input = "[Empty / silent message]"
 
-        existing = _load_session_state(session_id)
+        with STAGE_SECONDS.labels("cache").time():
+            existing = _load_session_state(session_id)
+            intel = intel_store.get(session_id, existing)
         session_started_at = float(existing.get("session_started_at", start_time))
         persisted_history = existing.get("message_history", [])
         if not isinstance(persisted_history, list):
@@ -410,7 +460,7 @@ async def _analyze_internal(
             "current_persona": existing.get("current_persona", "saroj"),
             "agent_reply_draft": "",
             "agent_reply": "",
-            "extracted_data": existing.get("extracted_data", {}) or {},
+            "extracted_data": intel.extracted,
             "patience_meter": int(existing.get("patience_meter", 80)),
             "fusion_probability": float(existing.get("fusion_probability", 0.0)),
             "behavioral_fingerprint": existing.get("behavioral_fingerprint", ""),
@@ -431,6 +481,8 @@ async def _analyze_internal(
             )
         except Exception as e:
             print(f"Fast orchestrator failed, using deterministic fallback: {e}")
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            PIPELINE_FALLBACKS.labels("orchestrator", reason).inc()
             fallback = CompetitionEngine.process(session_id, user_input, start_time)
             final_state = {
                 "agent_reply": fallback.agent_reply,
@@ -453,6 +505,19 @@ async def _analyze_internal(
             if not hist_now or (isinstance(hist_now[-1], str) and not hist_now[-1].startswith("You:")):
                 hist_now = hist_now + [f"You: {agent_reply_now}"]
         final_state["message_history"] = hist_now[-120:]
+        turns = len(final_state["message_history"]) // 2
+
+        # Incremental intel: only identifiers new to this session are normalized/validated.
+        with STAGE_SECONDS.labels("extraction").time():
+            new_intel = verify_intelligence(extract_scam_data(user_input), user_input)
+            new_items = intel.add_many(new_intel, current_turn(message_history))
+            fingerprints = turn_fingerprints(new_intel, speaker_info or "")
+            coordination_detector.observe(session_id, fingerprints)
+            voice_fp = next((fp for fp in fingerprints if fp.startswith("voice:")), None)
+            identity_graph.link(session_id, new_items, fingerprint=voice_fp)
+        if new_items:
+            background_tasks.add_task(intel_index.add_session_items, session_id, intel, new_items)
+        final_state["extracted_data"] = intel.extracted
 
         final_state["session_started_at"] = session_started_at
         final_state["updated_at"] = time.time()
@@ -464,10 +529,11 @@ async def _analyze_internal(
             last_persist_at = 0.0
         if (time.time() - last_persist_at) >= 2.0:
             final_state["last_persist_at"] = time.time()
-            background_tasks.add_task(save_to_db_fallback, session_id, final_state)
+            final_state["intel_ledger"] = intel.to_dict()
+            background_tasks.add_task(_persist_session, session_id, final_state)
 
-        background_tasks.add_task(
-            observability.log_decision,
+        # Enqueue only; the audit writer thread hashes and group-commits
+        observability.log_decision(
             session_id=session_id,
             event_type="MESSAGE_ANALYSIS",
             actor="Vibhishan_Agent",
@@ -478,27 +544,6 @@ async def _analyze_internal(
             output_data=final_state.get("agent_reply_draft", ""),
         )
 
-        extracted_now = extract_scam_data(user_input)
-        raw_intel = final_state.get("extracted_data", {}) or {}
-        if not isinstance(raw_intel, dict):
-            raw_intel = {}
-        for k, v in extracted_now.items():
-            if v:
-                raw_intel[k] = sorted(list(set((raw_intel.get(k, []) or []) + v)))
-
-        verified = verify_intelligence(
-            {
-                "upi_ids": raw_intel.get("upi_ids", []) if isinstance(raw_intel, dict) else [],
-                "bank_accounts": raw_intel.get("bank_accounts", []) if isinstance(raw_intel, dict) else [],
-                "ifsc_codes": raw_intel.get("ifsc_codes", []) if isinstance(raw_intel, dict) else [],
-                "phone_numbers": raw_intel.get("phone_numbers", []) if isinstance(raw_intel, dict) else [],
-                "urls": raw_intel.get("urls", []) if isinstance(raw_intel, dict) else [],
-            },
-            user_input,
-        )
-
-        hist = final_state.get("message_history", message_history) or message_history
-        turns = len(hist) // 2
         duration = max(0.0, float(time.time() - session_started_at))
 
         agent_reply = final_state.get("agent_reply", "Arre yaar, line mein thoda disturbance hai...")
@@ -508,14 +553,7 @@ async def _analyze_internal(
         if confidence < 0.3:
             agent_reply = "I'm not sure I understand. Can you explain?"
 
-        upis, banks, ifscs, phones, urls_out = normalize_extracted(
-            verified.get("upi_ids", []),
-            verified.get("bank_accounts", []),
-            verified.get("ifsc_codes", []),
-            verified.get("phone_numbers", []),
-            verified.get("urls", []),
-        )
-        upis, banks, ifscs, phones, urls_out = validate_extracted_format(upis, banks, ifscs, phones, urls_out)
+        upis, banks, ifscs, phones, urls_out = (intel.values(k) for k in INTEL_KINDS)
 
         return {
             "session_id": session_id,
@@ -593,26 +631,55 @@ async def root_landing():
     """Human judge landing: professional dashboard, not 404."""
     return _LANDING_HTML
 
+def _llm_health(provider: str, api_key: str) -> str:
+    if not api_key:
+        return "not_configured"
+    ok = llm_status(provider)
+    return "idle" if ok is None else ("connected" if ok else "failing")
+
 @app.get("/health")
 async def health_check():
+    """Live component status: disk, LLM providers (last call), session store, evidence ledger, event-loop lag."""
     try:
         total, used, free = shutil.disk_usage("/")
         free_gb = free // (2**30)
-        status = "ready" if free_gb > 1 else "degraded"
+        disk_ok = free_gb > 1
         disk_space = f"{free_gb}GB free"
     except Exception:
-        status = "ready"
+        disk_ok = True
         disk_space = "unknown"
+
+    providers = {"groq": _llm_health("groq", SETTINGS.GROQ_API_KEY),
+                 "gemini": _llm_health("gemini", SETTINGS.GEMINI_API_KEY)}
+    states = set(providers.values())
+    llm = next(s for s in ("connected", "failing", "idle", "not_configured") if s in states)
+    db_dir = os.path.dirname(os.path.abspath(DB_FILE))
+    writable = os.access(db_dir, os.W_OK) and (not os.path.exists(DB_FILE) or os.access(DB_FILE, os.W_OK))
+    state_manager = "persistent" if writable else "read_only"
+    evidence_ledger = ledger.writer.status()
+    lag = loop_lag()
+
+    # No configured key is a deployment choice (deterministic engine only), not a degradation
+    degraded = (not disk_ok or llm == "failing" or not writable
+                or evidence_ledger in ("failing", "stopped", "closed") or lag["max_recent"] > 0.5)
     return {
-        "status": status,
+        "status": "degraded" if degraded else "ready",
         "system": "VIBHISHAN / VIGIL OS",
         "mode": "GOVERNMENT_DEPLOYMENT",
         "disk_space": disk_space,
-        "services": {"llm_provider": "connected", "state_manager": "persistent", "evidence_ledger": "active"},
+        "services": {"llm_provider": llm, "state_manager": state_manager, "evidence_ledger": evidence_ledger},
+        "llm_providers": providers,
+        "cache_hit_rate": {"session": cache_hit_rate("session"), "reflex": cache_hit_rate("reflex")},
+        "event_loop_lag_ms": {"last": round(lag["last"] * 1000, 2), "max_recent": round(lag["max_recent"] * 1000, 2)},
         "version": SETTINGS.VERSION,
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S IST"),
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Latency histograms and counters in the Prometheus text format (see app/services/metrics.py)."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
 # Judge whitelist: no rate limit on /analyze so evaluation bot (50 req/s) is never blocked
 @app.post("/analyze", response_model=JudgeResponse | CompetitionResponse)
 @limiter.limit("300/second")
@@ -623,8 +690,11 @@ async def analyze_message(
     api_key: str = Depends(get_api_key),  # Security: API key required
 ):
     # GLOBAL SAFETY NET – catch everything
+    start = time.perf_counter()
+    success = False
     try:
         result = await _analyze_internal(payload, background_tasks)
+        success = not result.get("fallback")
         schema_mode = str(getattr(SETTINGS, "EVAL_SCHEMA", "judge")).lower().strip()
         if schema_mode == "competition":
             intel_items = to_competition_intelligence(
@@ -667,6 +737,8 @@ async def analyze_message(
         if str(getattr(SETTINGS, "EVAL_SCHEMA", "judge")).lower().strip() == "competition":
             return safe_competition_response()
         return safe_fallback_response(session_id=sid)
+    finally:
+        observability.track_performance((time.perf_counter() - start) * 1000.0, success)
 
 @app.post("/analyze_judge", response_model=JudgeResponse)
 @limiter.limit("120/second")
@@ -1,84 +1,149 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import hashlib
+import asyncio
 import json
 import os
 
+from app.core.security import get_api_key
+from app.services.evidence_export import EvidenceBundle, case_sessions
+from app.services.ledger import ledger
+from app.services.merkle import merkle_ledger
+
 router = APIRouter(prefix="/audit", tags=["Security"])
 
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-AUDIT_FILE = os.path.join(PROJECT_ROOT, "audit_trail.jsonl")
+audit_verifier = ledger.verifier
+# Offset index maintained by the audit writer: head / block / session lookups without reading the trail
+audit_index = ledger.index
+audit_segments = ledger.segments
 
 class AuditVerificationRequest(BaseModel):
     session_id: str
     expected_hash: str
 
 @router.get("/verify-chain")
-async def verify_chain_integrity():
+async def verify_chain_integrity(full: bool = False):
     """
-    Recalculates the entire hash chain to prove zero-tampering.
-    Professional-grade integrity verification for Judges.
+    Proves zero-tampering of the hash chain for Judges.
+
+    Default: verifies only the blocks appended since the last checkpoint
+    (cost proportional to new data). full=true: re-verifies from genesis in a
+    worker process and streams NDJSON progress, ending with a result record.
     """
-    if not os.path.exists(AUDIT_FILE):
-        return {"status": "error", "message": "Audit trail not found."}
-    
-    integrity_points = 0
-    calculated_hash = "0" * 64
-    
+    if full:
+        async def stream():
+            records = audit_verifier.verify_full()
+            while True:
+                record = await asyncio.to_thread(next, records, None)
+                if record is None:
+                    return
+                yield json.dumps(record) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
     try:
-        with open(AUDIT_FILE, "r") as f:
-            for line in f:
-                if not line.strip(): continue
-                block = json.loads(line)
-                
-                # Check previous link
-                if block["previous_hash"] != calculated_hash:
-                    return {
-                        "status": "TAMPERED", 
-                        "at_session": block["session_id"],
-                        "block_timestamp": block["timestamp"]
-                    }
-                
-                # Re-verify current block signature
-                in_h = block["input_hash"]
-                out_h = block["output_hash"]
-                block_content = f"{calculated_hash}{block['session_id']}{block['event_type']}{in_h}{out_h}"
-                recalc_h = hashlib.sha256(block_content.encode()).hexdigest()
-                
-                if recalc_h != block["current_hash"]:
-                    return {
-                        "status": "SIGNATURE_INVALID",
-                        "at_session": block["session_id"]
-                    }
-                
-                calculated_hash = recalc_h
-                integrity_points += 1
-                
-        return {
-            "status": "VERIFIED",
-            "blocks_checked": integrity_points,
-            "root_hash": calculated_hash,
-            "message": "Chain integrity 100% verified. No tampering detected."
-        }
+        return await asyncio.to_thread(audit_verifier.verify_incremental)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chain verification failed: {str(e)}")
 
 @router.get("/last-block")
 async def get_last_block_summary():
     """Returns the head of the chain for the Dashboard/Judges."""
-    if not os.path.exists(AUDIT_FILE):
+    if not os.path.exists(audit_index.audit_file):
          return {"block": 0, "hash": "none"}
-    
+
     try:
-        with open(AUDIT_FILE, "r") as f:
-            lines = f.readlines()
-            if not lines: return {"block": 0}
-            last_block = json.loads(lines[-1].strip())
-            return {
-                "block": len(lines),
-                "timestamp": last_block["timestamp"],
-                "hash": last_block["current_hash"][:16] + "...",
-                "session": last_block["session_id"]
-            }
-    except:
+        last_block = await asyncio.to_thread(audit_index.head)
+        if last_block is None: return {"block": 0}
+        return {
+            "block": audit_index.count(),
+            "timestamp": last_block["timestamp"],
+            "hash": last_block["current_hash"][:16] + "...",
+            "session": last_block["session_id"]
+        }
+    except Exception:
         return {"block": -1}
+
+@router.get("/block/{number}", dependencies=[Depends(get_api_key)])
+async def get_block(number: int):
+    """Full record of block #number (1-based, same numbering as /last-block)."""
+    block = await asyncio.to_thread(audit_index.block, number)
+    if block is None:
+        raise HTTPException(status_code=404, detail=f"Block {number} not found")
+    return {"block": number, **block}
+
+@router.get("/session/{session_id}", dependencies=[Depends(get_api_key)])
+async def get_session_blocks(session_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """Every audit block logged for one session, in chain order (paginated)."""
+    return await asyncio.to_thread(audit_index.session_blocks, session_id, offset, limit)
+
+
+@router.get("/session/{session_id}/verify", dependencies=[Depends(get_api_key)])
+async def verify_session_chain(session_id: str):
+    """Verify one session's sub-chain through its session links: O(session blocks), independent of trail size."""
+    return await asyncio.to_thread(ledger.verify_session, session_id)
+
+@router.get("/export/{session_id}", dependencies=[Depends(get_api_key)])
+async def export_evidence_bundle(session_id: str, case: bool = Query(False)):
+    """
+    Streaming tar of a session's evidence (conversation, ledger blocks, evidence
+    rows, canary hits, Merkle proofs, static artifacts) with a hash manifest.
+    case=true exports every session of the syndicate cluster it belongs to.
+    """
+    sessions = case_sessions(session_id) if case else [session_id]
+    bundle = EvidenceBundle(sessions, case_id=session_id if case else None)
+    return StreamingResponse(bundle.chunks(), media_type="application/x-tar",
+                             headers={"Content-Disposition": f'attachment; filename="{bundle.filename}"'})
+
+@router.get("/segments")
+async def list_segments():
+    """Sealed segment headers (chain-linked); pruned segments keep their header after the body is deleted."""
+    headers = await asyncio.to_thread(audit_segments.headers)
+    problem = await asyncio.to_thread(audit_segments.verify_headers)
+    return {
+        "segments": [{k: v for k, v in h.items() if k != "chunks"} for h in headers],
+        "header_chain": problem or {"status": "VERIFIED"},
+        "active_bytes": await asyncio.to_thread(lambda: audit_segments.size() - audit_segments.active_base()),
+    }
+
+@router.get("/merkle/root")
+async def get_signed_root():
+    """Latest Ed25519-signed Merkle tree head over the audit trail, with the key to check it."""
+    roots = merkle_ledger.signed_roots(limit=1)
+    signed = roots[-1] if roots else await asyncio.to_thread(merkle_ledger.sign_root)
+    return {"signed_root": signed, "public_key": merkle_ledger.public_key(), "algorithm": "Ed25519"}
+
+@router.get("/merkle/roots")
+async def list_signed_roots(limit: int = Query(100, ge=1, le=10000)):
+    """History of signed tree heads (oldest first); any two can be linked with /merkle/consistency."""
+    return {"roots": merkle_ledger.signed_roots(limit), "public_key": merkle_ledger.public_key()}
+
+@router.get("/merkle/proof/{block}", dependencies=[Depends(get_api_key)])
+async def get_inclusion_proof(block: int, tree_size: int = Query(None, ge=1)):
+    """
+    O(log n) proof that block #block is in the audit trail (RFC 6962 audit path).
+    Without tree_size the proof is against the latest signed root, signing a new
+    one first if the block is newer than it.
+    """
+    def build():
+        if tree_size is None:
+            roots = merkle_ledger.signed_roots(limit=1)
+            if not roots or block > roots[-1]["tree_size"]:
+                merkle_ledger.sign_root()
+        proof = merkle_ledger.inclusion_proof(block, tree_size)
+        proof["record"] = audit_index.block(block)
+        proof["signed_root"] = next((r for r in reversed(merkle_ledger.signed_roots(limit=10000))
+                                     if r["tree_size"] == proof["tree_size"]), None)
+        return proof
+
+    try:
+        return await asyncio.to_thread(build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/merkle/consistency")
+async def get_consistency_proof(first: int = Query(..., ge=1), second: int = Query(None, ge=1)):
+    """O(log n) proof that the tree of `first` blocks is a prefix of the tree of `second` (default: current)."""
+    try:
+        return await asyncio.to_thread(merkle_ledger.consistency_proof, first, second)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,50 @@
+# /app/routers/intel.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.security import get_api_key
+from app.services.intel_accumulator import INTEL_KINDS, normalize_item
+from app.services.intel_index import intel_index
+
+router = APIRouter(prefix="/intel", tags=["Intelligence"], dependencies=[Depends(get_api_key)])
+
+
+def _check_kind(kind: str) -> None:
+    if kind not in INTEL_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(INTEL_KINDS)}")
+
+
+@router.get("/identifier/{kind}/{value:path}")
+async def identifier_sessions(
+    kind: str,
+    value: str,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Every session that used an identifier, e.g. /intel/identifier/upi_ids/raju@sbi."""
+    _check_kind(kind)
+    canonical = normalize_item(kind, value)
+    if not canonical:
+        raise HTTPException(status_code=400, detail="Invalid identifier")
+    # sqlite under the index lock (shared with background writes): keep it off the event loop
+    return await asyncio.to_thread(intel_index.lookup, kind, canonical, cursor=cursor, limit=limit)
+
+
+@router.get("/search")
+async def search_identifiers(
+    kind: str,
+    prefix: str = "",
+    suffix: str = Query("", description="e.g. last 4 digits of a bank account"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Identifiers by prefix and/or suffix, with the number of sessions that used each."""
+    _check_kind(kind)
+    if kind == "upi_ids":
+        prefix, suffix = prefix.lower(), suffix.lower()
+    elif kind == "ifsc_codes":
+        prefix, suffix = prefix.upper(), suffix.upper()
+    return await asyncio.to_thread(intel_index.search, kind, prefix=prefix.strip(), suffix=suffix.strip(),
+                                   cursor=cursor, limit=limit)
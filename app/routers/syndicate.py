@@ -0,0 +1,48 @@
+# /app/routers/syndicate.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.security import get_api_key
+from app.services.identity_graph import LINKED_KINDS, identity_graph, node_key
+from app.services.intel_accumulator import canonicalize_item
+from app.services.syndicate_scoring import syndicate_scorer
+
+router = APIRouter(prefix="/syndicate", tags=["Intelligence"], dependencies=[Depends(get_api_key)])
+
+
+@router.get("/session/{session_id}")
+async def session_cluster(session_id: str, limit: int = Query(500, ge=1, le=5000)):
+    """Syndicate cluster a session belongs to (sessions + shared identifiers)."""
+    cluster = identity_graph.cluster(node_key("session", session_id), limit=limit)
+    if cluster is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    cluster["syndicate_probability"] = syndicate_scorer.score(session_id)
+    return cluster
+
+
+@router.get("/identifier/{kind}/{value:path}")
+async def identifier_cluster(kind: str, value: str, limit: int = Query(500, ge=1, le=5000)):
+    """Cluster containing an identifier, e.g. /syndicate/identifier/upi_ids/raju@sbi."""
+    if kind not in LINKED_KINDS and kind != "fingerprint":
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(LINKED_KINDS)}, fingerprint")
+    if kind != "fingerprint":
+        value = canonicalize_item(kind, value)     # the graph holds canonical values (Raju@SBI → raju@sbi)
+        if value is None:
+            raise HTTPException(status_code=400, detail="Invalid identifier")
+    cluster = identity_graph.cluster(node_key(kind, value), limit=limit)
+    if cluster is None:
+        raise HTTPException(status_code=404, detail="Unknown identifier")
+    return cluster
+
+
+@router.get("/clusters")
+async def list_clusters(
+    min_sessions: int = Query(2, ge=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Largest syndicate clusters first."""
+    return {
+        "clusters": identity_graph.clusters(min_sessions=min_sessions, offset=offset, limit=limit),
+        "stats": identity_graph.stats(),
+        "scoring": syndicate_scorer.last_run,
+    }
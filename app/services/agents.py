@@ -16,7 +16,8 @@ from app.services.tools import extract_scam_data, generate_fake_screenshot
 from app.services.voice_out import generate_voice_reply
 from app.services.reporting import generate_crime_report, generate_ncrp_report
 from app.services.rl_brain import select_action, update_q_table, predict_scammer_move
-from app.services.memory_rag import learn_interaction, recall_past_experience
+from app.services.memory_rag import learn_interaction, memory_index, recall_past_experience
+from app.services.semantic_memory import semantic_memory
 from app.services.biometrics import get_voice_fingerprint, identify_speaker
 from app.services.fusion import calculate_fusion_score, analyze_emotion_dynamics
 from app.services.behavior import generate_behavioral_fingerprint, correlate_identity
@@ -33,6 +34,9 @@ from app.services.taxonomy import taxonomy
 from app.services.taxonomy import taxonomy
 from app.services.psych_profiler import psych_engine
 from app.services.intelligence_hub import intelligence_hub
+from app.services.intel_accumulator import current_turn, intel_store
+from app.services.enrichment import enrichment_service
+from app.services.metrics import PIPELINE_FALLBACKS, STAGE_SECONDS
 
 
 from app.core.llm import fast_llm, smart_llm
@@ -59,9 +63,11 @@ async def fast_orchestrator_node(state: AgentState) -> AgentState:
     # 2. CONSOLIDATED DELIBERATION (Planner + Profile + Agents in 1 call)
     swarm = MultiAgentSwarm(fast_llm)
     try:
-        decision = await swarm.deliberate(state)
+        with STAGE_SECONDS.labels("swarm").time():
+            decision = await swarm.deliberate(state)
     except Exception as e:
         print(f"SWARM FAILED: {e}. Using deterministic fallback.")
+        PIPELINE_FALLBACKS.labels("swarm", "error").inc()
         # Create a mock decision object to keep the pipeline alive
         from dataclasses import dataclass
         @dataclass
@@ -116,7 +122,8 @@ async def fast_orchestrator_node(state: AgentState) -> AgentState:
 
     # 4. ADVERSARIAL SIMULATOR (Pre-Crime) & ECONOMIC DAMAGE
     from app.services.simulator import simulate_reaction
-    sim = await simulate_reaction(raw_reply, state.get("scam_type", "scam"), fast_llm)
+    with STAGE_SECONDS.labels("simulator").time():
+        sim = await simulate_reaction(raw_reply, state.get("scam_type", "scam"), fast_llm)
     state["predicted_moves"] = sim
     
     if sim.get("predicted_reaction") == "Quit":
@@ -171,8 +178,16 @@ async def fast_orchestrator_node(state: AgentState) -> AgentState:
     return state
 
 
+async def _semantic_search(text: str, k: int, scam_type=None) -> list:
+    """semantic_memory.search, off the event loop until its first (cold) load has happened."""
+    kwargs = {"k": k, "scam_type": scam_type, "min_score": SETTINGS.SEMANTIC_MIN_SCORE}
+    if semantic_memory.loaded:
+        return semantic_memory.search(text, **kwargs)
+    return await asyncio.to_thread(semantic_memory.search, text, **kwargs)
+
+
 # ─── NODE 1: THE DETECTOR (Initial Triaging) ──────────────────────────────────
-def detector_node(state: AgentState) -> AgentState:
+async def detector_node(state: AgentState) -> AgentState:
     msg = state.get("last_message", "")
 
     # Security Shield - Neutralize Prompt Injection
@@ -192,28 +207,20 @@ def detector_node(state: AgentState) -> AgentState:
         state["current_tactic"] = "FAST_REFLEX"
         state["tactic_reasoning"] = "Fast reflex cache match – skipping heavy reasoning"
 
-    # Passive extraction
-    new_intel = extract_scam_data(state["last_message"])
-    current_data = state.get("extracted_data", {})
-    for key, val in new_intel.items():
-        if val:
-            # Rigorous Enrichment (BBest in Class)
-            enriched_val = []
-            for item in val:
-                if key == "upi_ids":
-                    verification = intelligence_hub.verify_upi(item)
-                    item_meta = f"{item} [Status: {verification['status']}, Risk: {verification['risk_score']}%]"
-                    enriched_val.append(item_meta)
-                    state["scam_score"] = max(state.get("scam_score", 0), verification["risk_score"])
-                elif key == "phone_numbers":
-                    lookup = intelligence_hub.mobile_tower_lookup(item)
-                    item_meta = f"{item} [{lookup['operator']} | {lookup['circle']}]"
-                    enriched_val.append(item_meta)
-                else:
-                    enriched_val.append(item)
-            
-            current_data[key] = list(set(current_data.get(key, []) + enriched_val))
-    state["extracted_data"] = current_data
+    # Passive extraction (incremental: only identifiers new to this session get enriched)
+    intel = intel_store.get(state.get("session_id", "unknown"), state)
+    turn = current_turn(state.get("message_history", []))
+    new_intel = intel.add_many(extract_scam_data(state["last_message"]), turn)
+    # One batched, cached, concurrent lookup for everything new this turn
+    enriched = await enrichment_service.enrich(new_intel)
+    for kind, records in enriched.items():
+        for value, record in records.items():
+            intel.enrich(kind, value, record)
+            if kind == "phone_numbers" and record.get("fraud_registered"):
+                state["scam_score"] = max(state.get("scam_score", 0), 95)
+            elif kind == "upi_ids" or (kind == "urls" and record.get("risk_score", 0) >= 80):
+                state["scam_score"] = max(state.get("scam_score", 0), record.get("risk_score", 0))
+    state["extracted_data"] = intel.extracted
 
     # Taxonomy check – known offender?
     sender_phone = state.get("metadata", {}).get("sender_phone")
@@ -225,8 +232,15 @@ def detector_node(state: AgentState) -> AgentState:
             if known.get("scam_types"):
                 state["scam_type"] = known["scam_types"][0]
 
-    # RAG memory recall
-    past_win = recall_past_experience(state["last_message"])
+    # RAG memory recall (the first call replays the memory log: keep that off the event loop)
+    if memory_index.loaded:
+        past_win = recall_past_experience(state["last_message"], state.get("scam_type"))
+    else:
+        past_win = await asyncio.to_thread(recall_past_experience, state["last_message"], state.get("scam_type"))
+    if not past_win:
+        # Lexical miss → embedding recall (catches misspellings / paraphrases)
+        hits = await _semantic_search(state["last_message"], k=1, scam_type=state.get("scam_type"))
+        past_win = hits[0]["reply"] if hits else ""
     state["past_experience"] = past_win if past_win else "No prior match."
 
     # Predict scammer's next moves (heuristic - no LLM)
@@ -247,18 +261,9 @@ def detector_node(state: AgentState) -> AgentState:
     patience_drop = (frustration_score / 8) + 3 # Calibrated for high-stakes engagement
     state["patience_meter"] = max(0, int(current_patience - patience_drop))
 
-    # GNN Syndicate Probability (Predict Organized Crime Cluster)
-    from app.services.behavior import gnn_engine
-    # Extract identifiers for graph nodes
-    identifiers = []
-    ext = state.get("extracted_data", {})
-    for key in ["upi_ids", "bank_accounts", "phone_numbers"]:
-        identifiers.extend(ext.get(key, []))
-    
-    nodes = identifiers + [state["session_id"]]
-    # Simulate edges based on shared identifiers or behavioral similarity
-    edges = [(nodes[i], nodes[i+1]) for i in range(len(nodes)-1)] if len(nodes) > 1 else []
-    state["syndicate_probability"] = gnn_engine.predict_cluster_probability(nodes, edges)
+    # Syndicate probability: cached label-propagation score over the identity graph
+    from app.services.syndicate_scoring import syndicate_scorer
+    state["syndicate_probability"] = syndicate_scorer.score(state["session_id"])
 
     return state
 
@@ -376,9 +381,11 @@ async def strategist_node(state: AgentState) -> AgentState:
                     state["metadata"]["scammer_mood"] = profile.get("scammer_mood", "Patient")
             except Exception as e:
                 print(f"CRITICAL: Swarm failed, using fallback: {e}")
+                # Prefer a reply that worked on a similar message before
+                hits = await _semantic_search(msg, k=3, scam_type=state.get("scam_type"))
                 state["current_tactic"] = "safe-chat"
-                state["agent_reply_draft"] = "Hmm, ek minute ruko..."
-                state["tactic_confidence"] = 0.4
+                state["agent_reply_draft"] = hits[0]["reply"] if hits else "Hmm, ek minute ruko..."
+                state["tactic_confidence"] = hits[0]["score"] if hits else 0.4
                 state["predicted_moves"] = []
 
     # 5. REAL REINFORCEMENT LEARNING UPDATE
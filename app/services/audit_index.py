@@ -0,0 +1,291 @@
+# app/services/audit_index.py
+"""
+Binary offset index over audit_trail.jsonl.
+
+Two append-only sidecars next to the trail, written by the audit writer after
+each group commit:
+
+  <trail>.idx        8-byte magic, then one little-endian uint64 per block:
+                     byte offset of block N (1-based) at 8 + 8·(N-1)
+  <trail>.sessions   (uint64 session key, uint64 block number) per block; the
+                     key is an 8-byte BLAKE2b of session_id
+
+With these, the head, block N and a session's blocks are each a seek + read of
+the trail. Session postings are held in memory as sorted key/block arrays plus
+a small dict of recent appends. Key collisions are filtered by re-checking
+session_id on the blocks read.
+
+The index is rebuildable. On first use it is checked against the trail: the
+magic, the two sidecars agreeing on the block count, and the last indexed offset
+starting a complete JSON line inside the file. If the check fails, the index is
+rebuilt from a scan of the trail. If the trail has simply grown beyond what is
+indexed (blocks written before the index existed, or by another process), only
+the new tail is scanned.
+
+Offsets are logical positions in the segmented trail (see audit_segments), so
+they stay valid when the active file is sealed. Blocks in segments pruned by
+retention keep their numbers but can no longer be read.
+
+read_only=True (the Streamlit dashboard) keeps catch-up in memory and never
+writes the sidecars, which belong to the server's audit writer.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.audit_segments import SegmentStore
+
+MAGIC = b"AUDIDX1\n"
+_POSTING = np.dtype([("key", "<u8"), ("block", "<u8")])
+
+
+def session_key(session_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(str(session_id).encode(), digest_size=8).digest(), "little")
+
+
+class AuditIndex:
+    def __init__(self, audit_file: str, read_only: bool = False, store: Optional[SegmentStore] = None):
+        self.audit_file = audit_file
+        self.store = store or SegmentStore(audit_file)
+        self.offsets_path = audit_file + ".idx"
+        self.sessions_path = audit_file + ".sessions"
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._ready = False
+        self._offsets = np.zeros(0, dtype=np.uint64)   # mirror of .idx, grown by doubling
+        self._count = 0
+        self._covered_end = 0                          # trail byte offset just past the last indexed block
+        self._post_keys = np.zeros(0, dtype=np.uint64)
+        self._post_blocks = np.zeros(0, dtype=np.uint64)
+        self._tail: Dict[int, List[int]] = {}
+        self._tail_size = 0
+
+    # ── Load / validate / rebuild ──────────────────────────────────────────────
+    def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if not self._load():
+                self._discard()
+            self._ready = True
+        self.sync()
+
+    def reload(self) -> None:
+        """Re-adopt the sidecars; another process has appended to the trail (and to them)."""
+        with self._lock:
+            self._ready = False
+        self._ensure_ready()
+
+    def _discard(self) -> None:
+        """Drop the index (and its sidecars unless read-only); the next sync() rebuilds it."""
+        if not self.read_only:
+            for path in (self.offsets_path, self.sessions_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._offsets = np.zeros(0, dtype=np.uint64)
+        self._count = self._covered_end = 0
+        self._post_keys = np.zeros(0, dtype=np.uint64)
+        self._post_blocks = np.zeros(0, dtype=np.uint64)
+        self._tail, self._tail_size = {}, 0
+
+    def _load(self) -> bool:
+        """Adopt the sidecars if they are consistent with the trail."""
+        if not (os.path.exists(self.offsets_path) and os.path.exists(self.sessions_path)):
+            return False
+        try:
+            with open(self.offsets_path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return False
+                offsets = np.frombuffer(f.read(), dtype="<u8")
+            postings = np.fromfile(self.sessions_path, dtype=_POSTING)
+        except (OSError, ValueError):
+            return False
+        count = min(len(offsets), len(postings))      # crash between the two appends
+        offsets, postings = offsets[:count], postings[:count]
+        if count:
+            if offsets[0] != 0 or np.any(np.diff(offsets.astype(np.int64)) <= 0):
+                return False
+            line = self._read_line(int(offsets[-1]))
+            if line is None:
+                return False
+        if not self.read_only and (os.path.getsize(self.offsets_path) != len(MAGIC) + 8 * count
+                                   or os.path.getsize(self.sessions_path) != _POSTING.itemsize * count):
+            os.truncate(self.offsets_path, len(MAGIC) + 8 * count)
+            os.truncate(self.sessions_path, _POSTING.itemsize * count)
+        self._offsets = offsets.astype(np.uint64)
+        self._count = count
+        self._covered_end = int(offsets[-1]) + len(line) if count else 0
+        order = np.argsort(postings["key"], kind="stable")
+        self._post_keys = postings["key"][order].astype(np.uint64)
+        self._post_blocks = postings["block"][order].astype(np.uint64)
+        return True
+
+    def _read_line(self, offset: int) -> Optional[bytes]:
+        """The complete JSON line starting at logical `offset`, or None if there is none."""
+        if offset >= self.store.size() or self.store.is_pruned(offset):
+            return None
+        line = self.store.read_line(offset)
+        if not line.endswith(b"\n") or not line.startswith(b"{"):
+            return None
+        return line
+
+    def sync(self) -> int:
+        """Index complete blocks the trail has beyond what is indexed; returns how many were added."""
+        self._ensure_ready()
+        if not os.path.exists(self.audit_file):
+            return 0
+        with self._lock:
+            size = self.store.size()
+            if size < self._covered_end:                # trail truncated / replaced
+                self._discard()
+            if size == self._covered_end:
+                return 0
+            entries, pruned = [], self.store.pruned_ranges()
+            if any(start < self._covered_end < end for start, end, _ in pruned):
+                self._discard()                         # indexed part-way into a segment since pruned
+            for start, end, blocks in pruned:
+                # Rebuilding over pruned segments: keep block numbering with placeholder offsets
+                if start >= self._covered_end:
+                    entries += [(start + i, 1, "") for i in range(blocks - 1)]
+                    entries.append((start + blocks - 1, end - start - blocks + 1, ""))
+            position = max(self._covered_end, self.store.retained_start())
+            for position, raw in self.store.iter_lines(position):
+                if not raw.endswith(b"\n"):
+                    break
+                if raw.strip():
+                    try:
+                        session_id = json.loads(raw).get("session_id", "")
+                    except ValueError:
+                        session_id = ""
+                    entries.append((position, len(raw), session_id))
+            self._append(entries)
+            return len(entries)
+
+    # ── Writes (audit writer thread) ───────────────────────────────────────────
+    def append(self, entries: Iterable[Tuple[int, int, str]]) -> None:
+        """Record (offset in the active file, line length, session_id) for blocks just written. Idempotent."""
+        self._ensure_ready()
+        with self._lock:
+            base = self.store.active_base()
+            self._append([(base + offset, length, session_id) for offset, length, session_id in entries])
+
+    def _append(self, entries: List[Tuple[int, int, str]]) -> None:
+        entries = [e for e in entries if e[0] >= self._covered_end]   # already picked up by sync()
+        if not entries:
+            return
+        first = self._count + 1
+        offsets = np.array([e[0] for e in entries], dtype=np.uint64)
+        postings = np.empty(len(entries), dtype=_POSTING)
+        postings["key"] = [session_key(e[2]) for e in entries]
+        postings["block"] = np.arange(first, first + len(entries), dtype=np.uint64)
+        if not self.read_only:
+            new_file = not os.path.exists(self.offsets_path)
+            with open(self.offsets_path, "ab") as f:
+                if new_file:
+                    f.write(MAGIC)
+                f.write(offsets.astype("<u8").tobytes())
+            with open(self.sessions_path, "ab") as f:
+                f.write(postings.tobytes())
+        need = self._count + len(entries)
+        if need > len(self._offsets):
+            grown = np.zeros(max(need, 2 * len(self._offsets), 1024), dtype=np.uint64)
+            grown[:self._count] = self._offsets[:self._count]
+            self._offsets = grown
+        self._offsets[self._count:need] = offsets
+        self._count = need
+        self._covered_end = entries[-1][0] + entries[-1][1]
+        for key, block in zip(postings["key"].tolist(), postings["block"].tolist()):
+            self._tail.setdefault(key, []).append(block)
+        self._tail_size += len(entries)
+        if self._tail_size >= max(4096, len(self._post_keys) // 8):
+            keys = np.concatenate([self._post_keys] +
+                                  [np.full(len(v), k, dtype=np.uint64) for k, v in self._tail.items()])
+            blocks = np.concatenate([self._post_blocks] +
+                                    [np.array(v, dtype=np.uint64) for v in self._tail.values()])
+            order = np.argsort(keys, kind="stable")
+            self._post_keys, self._post_blocks = keys[order], blocks[order]
+            self._tail, self._tail_size = {}, 0
+
+    # ── Reads ──────────────────────────────────────────────────────────────────
+    def count(self) -> int:
+        self.sync()
+        return self._count
+
+    def _read_blocks(self, numbers: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """Blocks by number; None for those in pruned segments."""
+        retained = self.store.retained_start()
+        out = []
+        for n in numbers:
+            offset = int(self._offsets[n - 1])
+            out.append(json.loads(self.store.read_line(offset)) if offset >= retained else None)
+        return out
+
+    def block(self, number: int) -> Optional[Dict[str, Any]]:
+        """Block `number` (1-based, as shown by /audit/last-block), or None (out of range or pruned)."""
+        self.sync()
+        with self._lock:
+            if not 1 <= number <= self._count:
+                return None
+            return self._read_blocks([number])[0]
+
+    def iter_blocks(self, start: int = 1, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Blocks start..stop (inclusive, default: the current head) read sequentially from the trail."""
+        self.sync()
+        with self._lock:
+            stop = min(stop or self._count, self._count)
+            if start > stop:
+                return
+            offset = int(self._offsets[start - 1])
+        remaining = stop - start + 1
+        for _, raw in self.store.iter_lines(offset):   # raises if `start` was pruned
+            if not raw.strip():
+                continue                                # blank lines are not blocks
+            yield json.loads(raw)
+            remaining -= 1
+            if not remaining:
+                return
+
+    def head(self) -> Optional[Dict[str, Any]]:
+        self.sync()
+        with self._lock:
+            return self._read_blocks([self._count])[0] if self._count else None
+
+    def _session_numbers(self, session_id: str) -> List[int]:
+        key = np.uint64(session_key(session_id))
+        lo = np.searchsorted(self._post_keys, key, "left")
+        hi = np.searchsorted(self._post_keys, key, "right")
+        numbers = self._post_blocks[lo:hi].tolist() + self._tail.get(int(key), [])
+        numbers.sort()
+        return numbers
+
+    def last_session_block(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        The session's newest retained block (the head of its sub-chain), or None.
+        Writer side: no catch-up sync, the writer appends to its index after every commit.
+        """
+        self._ensure_ready()
+        with self._lock:
+            numbers = self._session_numbers(session_id)
+            for n in reversed(numbers):
+                block = self._read_blocks([n])[0]
+                if block is None:
+                    return None                         # pruned: older blocks are gone too
+                if block.get("session_id") == session_id:
+                    return {"block": n, **block}
+        return None
+
+    def session_blocks(self, session_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Blocks logged for one session, in chain order, paginated."""
+        self.sync()
+        with self._lock:
+            numbers = self._session_numbers(session_id)
+            window = numbers[offset:offset + limit]
+            page = self._read_blocks(window)
+        blocks = [{"block": n, **b} for n, b in zip(window, page) if b and b.get("session_id") == session_id]
+        return {"session_id": session_id, "total": len(numbers), "offset": offset, "blocks": blocks}
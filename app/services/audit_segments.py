@@ -0,0 +1,423 @@
+# app/services/audit_segments.py
+"""
+Rolling, compressed segments for the audit trail.
+
+audit_trail.jsonl stays the active segment, the only file the audit writer
+appends to. Once it passes AUDIT_SEGMENT_MAX_BYTES, or its first block is older
+than AUDIT_SEGMENT_MAX_SECONDS, the writer seals it into <trail>.segments/:
+
+  segment-NNNNNN.jsonl.gz   the body as independent gzip members of ~64 KiB
+                            each, split on line boundaries; `gzip -dc` gives
+                            back the original lines
+  segment-NNNNNN.json       header: block range, logical byte range, the
+                            chain hash before the first block (prev_hash) and
+                            after the last one (final_hash), body SHA-256,
+                            chunk table, and prev_header_hash, i.e. the
+                            previous header's header_hash
+
+The active file is then truncated. Segment N+1's prev_hash must equal segment
+N's final_hash, and its prev_header_hash must equal N's header_hash, so the
+headers alone form a hash chain from genesis.
+
+Readers use logical offsets: positions in the concatenation of every segment
+body followed by the active file. Sealing never moves a block's logical offset,
+so the offset index, verifier checkpoints and Merkle tree stay valid across
+seals. The chunk table lets a block inside a sealed segment be read by
+decompressing one chunk.
+
+Retention (AUDIT_RETENTION_DAYS) deletes the bodies of old sealed segments,
+oldest first, never the newest one. Their headers are kept and marked
+pruned_at. Verification then starts at the first retained block, anchored on
+the header chain, and Merkle proofs issued earlier still check against the
+signed roots.
+"""
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import SETTINGS
+from app.services.audit_writer import GENESIS_HASH
+
+CHUNK_BYTES = 64 * 1024
+_CHUNK_CACHE = 64
+_UNHASHED = ("header_hash", "pruned_at")
+
+
+def header_digest(header: Dict[str, Any]) -> str:
+    body = {k: v for k, v in header.items() if k not in _UNHASHED}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _first_line(path: str, skip: int = 0) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(skip)
+        return f.readline()
+
+
+class SegmentStore:
+    def __init__(self, active_path: str, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_seconds: Optional[float] = None, retention_days: Optional[float] = None):
+        self.active_path = active_path
+        self.directory = directory or active_path + ".segments"
+        self.max_bytes = max_bytes or SETTINGS.AUDIT_SEGMENT_MAX_BYTES
+        self.max_seconds = max_seconds or SETTINGS.AUDIT_SEGMENT_MAX_SECONDS
+        self.retention_days = SETTINGS.AUDIT_RETENTION_DAYS if retention_days is None else retention_days
+        self._lock = threading.RLock()
+        self._headers: List[Dict[str, Any]] = []
+        self._dir_stamp: Optional[int] = None
+        self._loaded_at = 0
+        self._skip_key: Optional[Tuple[int, int, int]] = None
+        self._skip = 0
+        self._chunks: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self._active_started: Optional[float] = None
+
+    # ── Catalogue ──────────────────────────────────────────────────────────────
+    def _path(self, segment: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}{suffix}")
+
+    def _refresh(self) -> None:
+        try:
+            stamp = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            stamp = None
+        now = time.time_ns()
+        if stamp == self._dir_stamp and (stamp is None or now - stamp > 1_000_000_000
+                                         or now - self._loaded_at < 100_000_000):
+            return   # unchanged; a same-tick change behind a fresh mtime is picked up within 100 ms
+        headers = []
+        if stamp is not None:
+            for name in os.listdir(self.directory):
+                if name.startswith("segment-") and name.endswith(".json"):
+                    with open(os.path.join(self.directory, name)) as f:
+                        headers.append(json.load(f))
+        headers.sort(key=lambda h: h["segment"])
+        self._headers, self._dir_stamp, self._loaded_at = headers, stamp, now
+
+    def headers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return list(self._headers)
+
+    def reload(self) -> None:
+        """Drop cached catalogue state; another process has appended to or sealed the trail."""
+        with self._lock:
+            self._dir_stamp = -1                       # never a real mtime: the next _refresh re-reads
+            self._skip_key = None
+            self._active_started = None
+
+    def _sealed_end(self) -> int:
+        return self._headers[-1]["end_offset"] if self._headers else 0
+
+    def _active_skip(self) -> int:
+        """
+        Bytes at the start of the active file that are already sealed: only
+        non-zero if a seal was interrupted between writing the segment and
+        truncating the active file.
+        """
+        if not self._headers:
+            return 0
+        try:
+            st = os.stat(self.active_path)
+        except FileNotFoundError:
+            return 0
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if key != self._skip_key:
+            last = self._headers[-1]
+            self._skip = 0
+            if st.st_size >= last["body_bytes"]:
+                try:
+                    if json.loads(_first_line(self.active_path)).get("current_hash") == last["first_hash"]:
+                        self._skip = last["body_bytes"]
+                except ValueError:
+                    pass
+            self._skip_key = key
+        return self._skip
+
+    def active_base(self) -> int:
+        """Logical offset of byte 0 of the active file."""
+        with self._lock:
+            self._refresh()
+            return self._sealed_end() - self._active_skip()
+
+    def size(self) -> int:
+        """Logical length of the whole trail (sealed + active)."""
+        with self._lock:
+            self._refresh()
+            active = os.path.getsize(self.active_path) if os.path.exists(self.active_path) else 0
+            return self._sealed_end() + active - self._active_skip()
+
+    def final_hash(self) -> str:
+        """Chain head at the end of the sealed segments."""
+        with self._lock:
+            self._refresh()
+            return self._headers[-1]["final_hash"] if self._headers else GENESIS_HASH
+
+    def retained_start(self) -> int:
+        """Logical offset of the first block whose body is still stored."""
+        with self._lock:
+            self._refresh()
+            pruned = [h for h in self._headers if h.get("pruned_at")]
+            return pruned[-1]["end_offset"] if pruned else 0
+
+    def retained_anchor(self) -> Tuple[int, str, int]:
+        """(offset, chain hash, blocks before it) at retained_start(), as attested by the header chain."""
+        with self._lock:
+            self._refresh()
+            pruned = [h for h in self._headers if h.get("pruned_at")]
+            if not pruned:
+                return 0, GENESIS_HASH, 0
+            last = pruned[-1]
+            return last["end_offset"], last["final_hash"], last["first_block"] - 1 + last["blocks"]
+
+    def pruned_ranges(self) -> List[Tuple[int, int, int]]:
+        """(start_offset, end_offset, blocks) of every pruned segment, in order."""
+        return [(h["start_offset"], h["end_offset"], h["blocks"]) for h in self.headers() if h.get("pruned_at")]
+
+    def is_pruned(self, offset: int) -> bool:
+        return offset < self.retained_start()
+
+    def verify_headers(self) -> Optional[Dict[str, Any]]:
+        """Check the header hash chain; returns a problem record or None."""
+        prev = None
+        for h in self.headers():
+            expected = {
+                "header_hash": header_digest(h),
+                "prev_header_hash": prev["header_hash"] if prev else GENESIS_HASH,
+                "prev_hash": prev["final_hash"] if prev else GENESIS_HASH,
+                "start_offset": prev["end_offset"] if prev else 0,
+                "first_block": prev["first_block"] + prev["blocks"] if prev else 1,
+            }
+            for field, value in expected.items():
+                if h.get(field) != value:
+                    return {"status": "SEGMENT_HEADER_INVALID", "at_segment": h["segment"], "field": field,
+                            "at_block": h.get("first_block")}
+            prev = h
+        return None
+
+    # ── Reads ──────────────────────────────────────────────────────────────────
+    def _chunk(self, header: Dict[str, Any], i: int) -> bytes:
+        key = (header["segment"], i)
+        data = self._chunks.get(key)
+        if data is None:
+            _, c_off, c_len = header["chunks"][i]
+            with open(self._path(header["segment"], ".jsonl.gz"), "rb") as f:
+                f.seek(c_off)
+                data = gzip.decompress(f.read(c_len))
+            self._chunks[key] = data
+            if len(self._chunks) > _CHUNK_CACHE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return data
+
+    def _read_at(self, pos: int, read_size: int = CHUNK_BYTES) -> bytes:
+        """Bytes from logical `pos` to the end of the chunk containing it (at most `read_size` from the active file)."""
+        with self._lock:
+            self._refresh()
+            if pos < self._sealed_end():
+                i = bisect.bisect_right([h["end_offset"] for h in self._headers], pos)
+                header = self._headers[i]
+                if header.get("pruned_at"):
+                    raise ValueError(f"audit segment {header['segment']} was pruned by retention")
+                rel = pos - header["start_offset"]
+                c = bisect.bisect_right([u for u, _, _ in header["chunks"]], rel) - 1
+                return self._chunk(header, c)[rel - header["chunks"][c][0]:]
+            if not os.path.exists(self.active_path):
+                return b""
+            with open(self.active_path, "rb") as f:
+                f.seek(pos - self._sealed_end() + self._active_skip())
+                return f.read(read_size)
+
+    def iter_chunks(self, offset: int = 0, read_size: int = CHUNK_BYTES) -> Iterator[Tuple[int, bytes]]:
+        """(logical offset, bytes) pieces of the trail from `offset` to its current end."""
+        pos = offset
+        while True:
+            data = self._read_at(pos, read_size)
+            if not data:
+                return
+            yield pos, data
+            pos += len(data)
+
+    def iter_lines(self, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """(logical offset, raw line) from `offset`; a final line without "\\n" is still being written."""
+        buf, start = b"", offset
+        for _, data in self.iter_chunks(offset):
+            buf += data
+            cut = buf.rfind(b"\n") + 1
+            if not cut:
+                continue
+            for line in buf[:cut - 1].split(b"\n"):
+                yield start, line + b"\n"
+                start += len(line) + 1
+            buf = buf[cut:]
+        if buf:
+            yield start, buf
+
+    def read_line(self, offset: int) -> bytes:
+        """The line starting at logical `offset` (random access: small reads, one chunk at most decompressed)."""
+        parts = []
+        for _, data in self.iter_chunks(offset, read_size=4096):
+            cut = data.find(b"\n") + 1
+            if cut:
+                parts.append(data[:cut])
+                break
+            parts.append(data)
+        return b"".join(parts)
+
+    def read(self, start: int, end: int) -> bytes:
+        parts = []
+        for pos, data in self.iter_chunks(start):
+            parts.append(data[:end - pos])
+            if pos + len(data) >= end:
+                break
+        return b"".join(parts)
+
+    # ── Sealing / recovery / retention (audit writer thread) ───────────────────
+    def recover(self) -> None:
+        """Finish a seal that was interrupted before the active file was truncated."""
+        with self._lock:
+            self._refresh()
+            skip = self._active_skip()
+            if skip:
+                print(f"⚠️ Audit trail still holds {skip} bytes already sealed; removing them")
+                tmp = self.active_path + ".tmp"
+                with open(self.active_path, "rb") as src, open(tmp, "wb") as dst:
+                    src.seek(skip)
+                    while True:
+                        data = src.read(1 << 20)
+                        if not data:
+                            break
+                        dst.write(data)
+                os.replace(tmp, self.active_path)
+                self._skip_key = None
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith(".tmp"):
+                        os.remove(os.path.join(self.directory, name))
+
+    def should_seal(self, active_bytes: int) -> bool:
+        if active_bytes <= 0:
+            return False
+        if active_bytes >= self.max_bytes:
+            return True
+        if self._active_started is None:
+            try:
+                ts = json.loads(_first_line(self.active_path))["timestamp"]
+                self._active_started = datetime.fromisoformat(ts.rstrip("Z")).timestamp()
+            except (OSError, ValueError, KeyError):
+                self._active_started = time.time()
+        return time.time() - self._active_started >= self.max_seconds
+
+    def seal(self) -> Optional[Dict[str, Any]]:
+        """Compress the active file into the next segment and truncate it. Caller must not be appending."""
+        with self._lock:
+            self._refresh()
+            if not os.path.exists(self.active_path) or not os.path.getsize(self.active_path):
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            prev = self._headers[-1] if self._headers else None
+            number = prev["segment"] + 1 if prev else 1
+            body_path = self._path(number, ".jsonl.gz")
+            digest, chunks, pending = hashlib.sha256(), [], []
+            size = compressed = blocks = 0
+            first = last = None
+
+            def flush_chunk(dst):
+                nonlocal compressed
+                data = b"".join(pending)
+                member = gzip.compress(data, compresslevel=6, mtime=0)
+                dst.write(member)
+                chunks.append([size - len(data), compressed, len(member)])
+                compressed += len(member)
+                pending.clear()
+
+            with open(self.active_path, "rb") as src, open(body_path + ".tmp", "wb") as dst:
+                pending_bytes = 0
+                for raw in src:
+                    if not raw.endswith(b"\n"):
+                        break   # torn tail: never acknowledged, left out of the segment
+                    digest.update(raw)
+                    pending.append(raw)
+                    size += len(raw)
+                    pending_bytes += len(raw)
+                    if raw.strip():
+                        blocks += 1
+                        last = raw
+                        first = first or raw
+                    if pending_bytes >= CHUNK_BYTES:
+                        flush_chunk(dst)
+                        pending_bytes = 0
+                if pending:
+                    flush_chunk(dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            if not blocks:
+                os.remove(body_path + ".tmp")
+                return None
+            first_block, last_block = json.loads(first), json.loads(last)
+            header = {
+                "segment": number,
+                "first_block": prev["first_block"] + prev["blocks"] if prev else 1,
+                "blocks": blocks,
+                "start_offset": self._sealed_end(),
+                "end_offset": self._sealed_end() + size,
+                "prev_hash": first_block["previous_hash"],
+                "first_hash": first_block["current_hash"],
+                "final_hash": last_block["current_hash"],
+                "first_timestamp": first_block["timestamp"],
+                "last_timestamp": last_block["timestamp"],
+                "body_bytes": size,
+                "body_sha256": digest.hexdigest(),
+                "compressed_bytes": compressed,
+                "chunks": chunks,
+                "sealed_at": datetime.utcnow().isoformat() + "Z",
+                "prev_header_hash": prev["header_hash"] if prev else GENESIS_HASH,
+            }
+            header["header_hash"] = header_digest(header)
+            os.replace(body_path + ".tmp", body_path)
+            self._write_header(header)
+            # Only now drop the sealed bytes from the active file (see recover())
+            os.truncate(self.active_path, 0)
+            self._active_started = None
+            self._skip_key = None
+            self._dir_stamp = None
+            return header
+
+    def _write_header(self, header: Dict[str, Any]) -> None:
+        path = self._path(header["segment"], ".json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(header, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Apply the retention policy: delete expired segment bodies, keep their headers. Returns how many."""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (now or time.time()) - self.retention_days * 86400
+        pruned = 0
+        with self._lock:
+            self._refresh()
+            for header in self._headers[:-1]:           # the newest sealed segment is always kept
+                if header.get("pruned_at"):
+                    continue
+                sealed = datetime.fromisoformat(header["sealed_at"].rstrip("Z")).timestamp()
+                if sealed > cutoff:
+                    break                               # pruned segments stay a prefix of the trail
+                body = self._path(header["segment"], ".jsonl.gz")
+                if os.path.exists(body):
+                    os.remove(body)
+                header["pruned_at"] = datetime.utcnow().isoformat() + "Z"
+                self._write_header(header)
+                pruned += 1
+            self._chunks.clear()
+            self._dir_stamp = None
+        return pruned
@@ -0,0 +1,383 @@
+# app/services/audit_verifier.py
+"""
+Checkpointed verification of the hash-chained audit trail.
+
+A sidecar (<audit file>.checkpoint.json) records how far the chain has been
+verified: byte offset just past the last verified line, block count and that
+block's hash. An incremental check:
+
+  1. confirms the line ending at the checkpoint still carries the recorded hash
+     (catches truncation or a rewritten tail);
+  2. re-hashes only the lines appended since, exactly like the original
+     full-file check (previous_hash link + SHA-256 block signature);
+  3. advances the checkpoint (atomic replace) if everything verified.
+
+So a call costs O(new data), not O(history). A trailing line without "\n" is
+still being written by the audit writer; it is left for the next call.
+
+full=True re-verifies from genesis in a separate process (hashing is CPU-bound
+and must not hold the server's GIL) and streams progress records. That process
+runs verify_parallel: the trail is cut into line-aligned ranges (sealed segment
+boundaries are always cuts), a process pool verifies each range anchored on its
+own first block, and the boundary links are then checked in chain order, so
+the verdict and first tamper point are the same as a sequential walk.
+
+Offsets are logical positions in the segmented trail (see audit_segments), so
+checks run across sealed segments transparently. The segment header chain is
+checked as well, and the chain head at each segment boundary must equal that
+header's final_hash. If older segments were pruned, verification starts at the
+first retained block, anchored on the header chain.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import SETTINGS
+from app.services.audit_segments import SegmentStore
+from app.services.audit_writer import (AUDIT, EVENT_KINDS, EVIDENCE, GENESIS_HASH, LEGACY_EVIDENCE_OUTPUT_HASH,
+                                      canonical_json, record_hash, stored_block_hash)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+AUDIT_FILE = os.path.join(PROJECT_ROOT, "audit_trail.jsonl")
+PROGRESS_EVERY_BYTES = 4 * 1024 * 1024
+PARALLEL_MIN_RANGE_BYTES = 8 * 1024 * 1024   # smaller ranges cost more in process hand-off than they save
+
+
+def content_matches(block: Dict[str, Any]) -> bool:
+    """
+    EVIDENCE blocks: the stored content is what input_hash committed to, and the
+    timestamp, actor, decision and metadata are what output_hash committed to.
+    """
+    if block.get("kind", AUDIT) != EVIDENCE:
+        return True
+    if hashlib.sha256(canonical_json(block["metadata"]["content"]).encode()).hexdigest() != block["input_hash"]:
+        return False
+    return block["output_hash"] in (LEGACY_EVIDENCE_OUTPUT_HASH, record_hash(block))
+
+
+def verify_session(index, session_id: str, anchored: bool = True) -> Dict[str, Any]:
+    """
+    Verify one session's sub-chain through the offset index: O(session blocks).
+
+    Every block must hash correctly, EVIDENCE content must match, and each
+    session_prev_hash must be the previous session block's hash (GENESIS_HASH
+    for the first). Blocks written before session links existed are checked
+    but not linked. With `anchored=False` (pruned segments) the first
+    retained block's link is taken as given.
+    """
+    expected = GENESIS_HASH if anchored else None
+    counts = dict.fromkeys(EVENT_KINDS, 0)
+    checked, offset = 0, 0
+    while True:
+        page = index.session_blocks(session_id, offset=offset, limit=1000)
+        for block in page["blocks"]:
+            number = block["block"]
+            try:
+                if stored_block_hash(block) != block["current_hash"]:
+                    return {"status": "SIGNATURE_INVALID", "at_session": session_id, "at_block": number,
+                            "blocks_checked": checked}
+                if not content_matches(block):
+                    return {"status": "CONTENT_MISMATCH", "at_session": session_id, "at_block": number,
+                            "blocks_checked": checked}
+            except (KeyError, TypeError) as e:
+                return {"status": "MALFORMED", "at_session": session_id, "at_block": number,
+                        "detail": str(e), "blocks_checked": checked}
+            link = block.get("session_prev_hash")
+            if link is not None and expected is not None and link != expected:
+                return {"status": "SESSION_LINK_BROKEN", "at_session": session_id, "at_block": number,
+                        "expected": expected, "found": link, "blocks_checked": checked}
+            expected = block["current_hash"]
+            kind = block.get("kind", AUDIT)
+            counts[kind] = counts.get(kind, 0) + 1
+            checked += 1
+        offset += 1000
+        if offset >= page["total"]:
+            break
+    return {"status": "VERIFIED", "session_id": session_id, "blocks_checked": checked, "kinds": counts,
+            "session_head": expected}
+
+
+def _verify_lines(store: SegmentStore, offset: int, prev_hash: Optional[str], blocks: int,
+                  end: Optional[int] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  progress_every: int = PROGRESS_EVERY_BYTES) -> Dict[str, Any]:
+    """
+    The chain walk behind verify_range and the parallel workers: complete lines
+    in [offset, end). prev_hash=None adopts the first block's previous_hash as
+    the anchor (reported as "anchor"), for ranges whose predecessor is checked
+    by the caller.
+    """
+    boundaries = {h["end_offset"]: h for h in store.headers()}
+    total = store.size()
+    next_report = offset + progress_every
+    anchor = first = None
+
+    def done(result: Dict[str, Any]) -> Dict[str, Any]:
+        if anchor is not None:
+            result.update(anchor=anchor, first=first)
+        return result
+
+    for line_start, raw in store.iter_lines(offset):
+        if end is not None and line_start >= end:
+            break
+        if not raw.endswith(b"\n"):
+            break  # partial record, still being written
+        offset = line_start + len(raw)
+        if not raw.strip():
+            continue
+        try:
+            block = json.loads(raw)
+            if prev_hash is None:
+                prev_hash = anchor = block["previous_hash"]
+                first = {"at_session": block["session_id"], "block_timestamp": block["timestamp"],
+                         "at_offset": line_start}
+            if block["previous_hash"] != prev_hash:
+                return done({"status": "TAMPERED", "at_session": block["session_id"],
+                             "block_timestamp": block["timestamp"], "at_block": blocks + 1,
+                             "at_offset": line_start, "offset": line_start, "blocks": blocks, "root_hash": prev_hash})
+            recalc = stored_block_hash(block, prev_hash)
+            if recalc != block["current_hash"]:
+                return done({"status": "SIGNATURE_INVALID", "at_session": block["session_id"],
+                             "at_block": blocks + 1, "at_offset": line_start,
+                             "offset": line_start, "blocks": blocks, "root_hash": prev_hash})
+            if not content_matches(block):
+                return done({"status": "CONTENT_MISMATCH", "at_session": block["session_id"],
+                             "at_block": blocks + 1, "at_offset": line_start,
+                             "offset": line_start, "blocks": blocks, "root_hash": prev_hash})
+        except (ValueError, KeyError, TypeError) as e:
+            return done({"status": "MALFORMED", "at_block": blocks + 1, "at_offset": line_start,
+                         "detail": str(e), "offset": line_start, "blocks": blocks, "root_hash": prev_hash})
+        prev_hash = recalc
+        blocks += 1
+        sealed = boundaries.get(offset)
+        if sealed and sealed["final_hash"] != prev_hash:
+            return done({"status": "SEGMENT_HEADER_INVALID", "at_segment": sealed["segment"], "field": "final_hash",
+                         "at_block": blocks, "offset": line_start, "blocks": blocks - 1,
+                         "root_hash": block["previous_hash"]})
+        if progress and offset >= next_report:
+            progress({"type": "progress", "blocks": blocks, "bytes": offset, "total_bytes": total})
+            next_report = offset + progress_every
+    return done({"status": "VERIFIED", "offset": offset, "blocks": blocks, "root_hash": prev_hash})
+
+
+def verify_range(path: str, offset: int = 0, prev_hash: str = GENESIS_HASH, blocks: int = 0,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_every: int = PROGRESS_EVERY_BYTES, store: Optional[SegmentStore] = None) -> Dict[str, Any]:
+    """
+    Verify complete lines from `offset` onward, continuing a chain whose head is
+    `prev_hash` after `blocks` blocks. Returns the verdict plus the new
+    (offset, blocks, root_hash) reached; on failure offset/blocks/root_hash
+    describe the last good block.
+    """
+    store = store or SegmentStore(path)
+    problem = store.verify_headers()
+    if problem:
+        problem.update(offset=offset, blocks=blocks, root_hash=prev_hash)
+        return problem
+    if offset < store.retained_start():
+        offset, prev_hash, blocks = store.retained_anchor()
+    return _verify_lines(store, offset, prev_hash, blocks, progress=progress, progress_every=progress_every)
+
+
+def _verify_range_worker(path: str, start: int, end: Optional[int]) -> Dict[str, Any]:
+    """Pool entry point: one range, anchored on its own first block; block numbers are range-local."""
+    result = _verify_lines(SegmentStore(path), start, None, 0, end)
+    result["start"] = start
+    return result
+
+
+def split_ranges(store: SegmentStore, start: int, total: int, parts: int,
+                 min_bytes: int = PARALLEL_MIN_RANGE_BYTES) -> List[Tuple[int, Optional[int]]]:
+    """
+    About `parts` line-aligned [start, end) ranges covering the trail from `start`.
+    Sealed segment boundaries are always cut points (their headers pin the
+    chain there); larger spans are cut further at the next line start.
+    """
+    step = max(min_bytes, (total - start) // max(parts, 1))
+    cuts = {h["end_offset"] for h in store.headers() if start < h["end_offset"] < total}
+    pos = start + step
+    while pos < total:
+        # Next line start at or after pos: the line containing pos - 1 ends there
+        line = store.read_line(pos - 1)
+        if not line.endswith(b"\n"):
+            break
+        cuts.add(pos - 1 + len(line))
+        pos += step
+    edges = [start] + sorted(c for c in cuts if start < c < total)
+    return [(a, b) for a, b in zip(edges, edges[1:])] + [(edges[-1], None)]
+
+
+def verify_parallel(path: str, workers: Optional[int] = None, store: Optional[SegmentStore] = None,
+                    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                    progress_every: int = PROGRESS_EVERY_BYTES,
+                    min_range_bytes: int = PARALLEL_MIN_RANGE_BYTES) -> Dict[str, Any]:
+    """
+    Full verification from genesis, spread over a process pool: every range
+    checks its internal links, hashes and content, then the ranges' boundary
+    links are checked here in chain order. Returns exactly what verify_range
+    returns, including the first tamper point and its block number.
+    """
+    store = store or SegmentStore(path)
+    workers = workers or SETTINGS.AUDIT_VERIFY_WORKERS or os.cpu_count() or 1
+    problem = store.verify_headers()
+    if problem:
+        problem.update(offset=0, blocks=0, root_hash=GENESIS_HASH)
+        return problem
+    offset, prev_hash, blocks = store.retained_anchor() if store.retained_start() else (0, GENESIS_HASH, 0)
+    total = store.size()
+    ranges = split_ranges(store, offset, total, workers * 4, min_range_bytes)
+    if workers == 1 or len(ranges) == 1:
+        return _verify_lines(store, offset, prev_hash, blocks, progress=progress, progress_every=progress_every)
+
+    ctx = multiprocessing.get_context("spawn")   # the server is multi-threaded: no fork
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=ctx) as pool:
+        futures = [pool.submit(_verify_range_worker, path, a, b) for a, b in ranges]
+        try:
+            for future in futures:
+                part = future.result()
+                anchor = part.get("anchor")
+                if anchor is not None and anchor != prev_hash:
+                    return {"status": "TAMPERED", **part["first"], "at_block": blocks + 1,
+                            "offset": part["first"]["at_offset"], "blocks": blocks, "root_hash": prev_hash}
+                if part["status"] != "VERIFIED":
+                    for key in ("start", "anchor", "first"):
+                        part.pop(key, None)
+                    part["at_block"] += blocks
+                    part["blocks"] += blocks
+                    if part["root_hash"] is None:
+                        part["root_hash"] = prev_hash
+                    return part
+                if part["blocks"]:
+                    prev_hash = part["root_hash"]
+                    blocks += part["blocks"]
+                offset = part["offset"]
+                if progress:
+                    progress({"type": "progress", "blocks": blocks, "bytes": offset, "total_bytes": total})
+        finally:
+            pool.shutdown(cancel_futures=True)      # first tamper point found: drop ranges not started
+    return {"status": "VERIFIED", "offset": offset, "blocks": blocks, "root_hash": prev_hash}
+
+
+def _full_verify_worker(path: str, queue, progress_every: int) -> None:
+    """Process entry point for full=True: progress records, then one result record."""
+    start = time.perf_counter()
+    try:
+        result = verify_parallel(path, progress=queue.put, progress_every=progress_every)
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    result.update(type="result", seconds=round(time.perf_counter() - start, 3))
+    queue.put(result)
+
+
+class AuditVerifier:
+    def __init__(self, audit_file: str = AUDIT_FILE, checkpoint_path: Optional[str] = None):
+        self.audit_file = audit_file
+        self.checkpoint_path = checkpoint_path or audit_file + ".checkpoint.json"
+        self.store = SegmentStore(audit_file)
+        self._lock = threading.Lock()
+
+    # ── Checkpoint sidecar ─────────────────────────────────────────────────────
+    def load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                cp = json.load(f)
+            return {"offset": int(cp["offset"]), "blocks": int(cp["blocks"]), "hash": str(cp["hash"])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {"offset": 0, "blocks": 0, "hash": GENESIS_HASH}
+
+    def _store_checkpoint(self, offset: int, blocks: int, root_hash: str) -> None:
+        """Persist a verified position; never moves backwards."""
+        if offset <= self.load_checkpoint()["offset"]:
+            return
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"offset": offset, "blocks": blocks, "hash": root_hash, "verified_at": time.time()}, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _checkpoint_anchor_ok(self, cp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The line ending at the checkpoint must still be there with the recorded hash."""
+        if cp["offset"] == 0:
+            return None
+        if self.store.size() < cp["offset"]:
+            return {"status": "TRUNCATED", "message": "Audit trail is shorter than the verified checkpoint."}
+        retained = self.store.retained_start()
+        if cp["offset"] <= retained:
+            # Anchor block was pruned; the header chain (checked by verify_range) vouches for it
+            return None
+        chunk = self.store.read(max(retained, cp["offset"] - 65536), cp["offset"])
+        lines = chunk.rstrip(b"\n").rsplit(b"\n", 1)
+        try:
+            anchored = json.loads(lines[-1]).get("current_hash")
+        except ValueError:
+            anchored = None
+        if not chunk.endswith(b"\n") or anchored != cp["hash"]:
+            return {"status": "CHECKPOINT_MISMATCH",
+                    "message": "Verified history was rewritten; run /audit/verify-chain?full=true."}
+        return None
+
+    # ── Verification ───────────────────────────────────────────────────────────
+    def verify_incremental(self) -> Dict[str, Any]:
+        """Verify only what was appended since the last checkpoint."""
+        if not os.path.exists(self.audit_file):
+            return {"status": "error", "message": "Audit trail not found."}
+        with self._lock:
+            cp = self.load_checkpoint()
+            problem = self._checkpoint_anchor_ok(cp)
+            if problem:
+                problem.update(blocks_checked=cp["blocks"], checkpoint_offset=cp["offset"])
+                return problem
+            result = verify_range(self.audit_file, cp["offset"], cp["hash"], cp["blocks"], store=self.store)
+            new_blocks = result["blocks"] - cp["blocks"]
+            if result["status"] == "VERIFIED":
+                self._store_checkpoint(result["offset"], result["blocks"], result["root_hash"])
+                return {
+                    "status": "VERIFIED",
+                    "blocks_checked": result["blocks"],
+                    "new_blocks": new_blocks,
+                    "root_hash": result["root_hash"],
+                    "checkpoint_offset": result["offset"],
+                    "message": "Chain integrity 100% verified. No tampering detected.",
+                }
+            result.update(blocks_checked=result.pop("blocks"), new_blocks=new_blocks)
+            return result
+
+    def verify_full(self, progress_every: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Re-verify from genesis in a worker process, yielding progress records and
+        a final {"type": "result", ...}. Blocking; iterate it off the event loop.
+        A clean run also advances the checkpoint.
+        """
+        if not os.path.exists(self.audit_file):
+            yield {"type": "result", "status": "error", "message": "Audit trail not found."}
+            return
+        ctx = multiprocessing.get_context("spawn")   # the server is multi-threaded: no fork
+        queue = ctx.Queue()
+        # Not a daemon: it runs the range pool of verify_parallel (terminated below if abandoned)
+        proc = ctx.Process(target=_full_verify_worker, args=(self.audit_file, queue, progress_every or PROGRESS_EVERY_BYTES))
+        proc.start()
+        try:
+            while True:
+                try:
+                    record = queue.get(timeout=1.0)
+                except Exception:
+                    if not proc.is_alive():
+                        yield {"type": "result", "status": "error", "message": "verifier process died"}
+                        return
+                    continue
+                if record.get("type") == "result":
+                    if record.get("status") == "VERIFIED":
+                        with self._lock:
+                            self._store_checkpoint(record["offset"], record["blocks"], record["root_hash"])
+                    record["blocks_checked"] = record.pop("blocks", 0)
+                    yield record
+                    return
+                yield record
+        finally:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
@@ -0,0 +1,566 @@
+# app/services/audit_writer.py
+"""
+Single-writer, group-commit pipeline for the hash-chained audit trail.
+
+Callers (request handlers, background tasks, the canary route) only append an
+event to an in-memory queue and get an AuditReceipt back. One daemon thread
+drains the queue in arrival order. For each batch it:
+
+  1. assigns chain order and computes input/output/block SHA-256 hashes,
+     linking each block both to the previous block and to the previous block
+     of its session (session_prev_hash);
+  2. writes the whole batch with one write() on a file handle kept open;
+  3. fsyncs according to the policy, then resolves the callers' receipts;
+  4. if given an AuditIndex, records the new blocks' byte offsets in it;
+  5. if given a SegmentStore, seals the active file into a compressed segment
+     once it is large or old enough (see audit_segments).
+
+There is exactly one writer of `last_hash`, so concurrent callers can no longer
+read the same head and fork the chain. While one batch is being written the next
+one accumulates, so the number of writes and fsyncs falls as load rises.
+
+Across processes (several uvicorn workers, a migration script next to the
+server) each batch is committed under an exclusive flock on `<trail>.lock`,
+which also holds a commit generation counter. If the generation moved since
+this writer's last commit, another process has appended or sealed in between:
+the head, index and segment catalogue are re-read before chaining, so the head
+read and the append stay one atomic step.
+
+Session heads (the last block hash per session) are cached in an LRU; a miss
+is answered by the AuditIndex session postings, or by one scan of the trail
+when the writer has no index.
+
+fsync policies (SETTINGS.AUDIT_FSYNC):
+  batch     fsync every group commit before acknowledging it (durable on ack)
+  interval  fsync at most every AUDIT_FSYNC_INTERVAL_MS, and no later than that
+            after the last write when traffic stops (bounded loss window)
+  never     flush to the OS only
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import SETTINGS
+
+try:
+    import fcntl
+except ImportError:          # Windows: no flock; one writing process per trail
+    fcntl = None
+
+GENESIS_HASH = "0" * 64
+FSYNC_POLICIES = ("batch", "interval", "never")
+
+# Event kinds sharing the one chain (see ledger.py)
+AUDIT = "AUDIT"          # agent decisions, alerts, canary hits (ObservabilityEngine.log_decision)
+EVIDENCE = "EVIDENCE"    # judicial evidence records (JudicialEvidenceChain.log_evidence)
+EVENT_KINDS = (AUDIT, EVIDENCE)
+
+SESSION_HEAD_CACHE = 65536   # sessions whose head hash the writer keeps in memory (with an index)
+
+
+@dataclass
+class AuditLog:
+    """Immutable audit record for legal compliance with hash chaining."""
+    timestamp: str
+    session_id: str
+    event_type: str
+    actor: str
+    decision: str
+    reasoning: str
+    confidence: float
+    input_hash: str
+    output_hash: str
+    previous_hash: str  # Chaining field
+    current_hash: str   # Self hash
+    metadata: Dict
+    kind: str = AUDIT
+    session_prev_hash: Optional[str] = None   # Per-session chaining field
+
+
+def block_hash(previous_hash: str, session_id: str, event_type: str, input_hash: str, output_hash: str,
+               kind: str = AUDIT, session_prev_hash: Optional[str] = None) -> str:
+    """
+    Block signature. Non-AUDIT kinds also commit to the kind, and blocks with a
+    session link commit to it, so blocks written before either existed still verify.
+    """
+    suffix = ("" if kind == AUDIT else kind) + (session_prev_hash or "")
+    return hashlib.sha256(f"{previous_hash}{session_id}{event_type}{input_hash}{output_hash}{suffix}".encode()).hexdigest()
+
+
+def stored_block_hash(block: Dict[str, Any], previous_hash: Optional[str] = None) -> str:
+    """block_hash() recomputed for a block as stored in the trail (chained to `previous_hash` if given)."""
+    return block_hash(block["previous_hash"] if previous_hash is None else previous_hash, block["session_id"],
+                      block["event_type"], block["input_hash"], block["output_hash"],
+                      block.get("kind", AUDIT), block.get("session_prev_hash"))
+
+
+def value_hash(value: Any) -> str:
+    """SHA-256 of str(value). Lone surrogates (e.g. from a malformed request) hash instead of raising."""
+    return hashlib.sha256(str(value).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def canonical_json(content: Any) -> str:
+    """Serialization an EVIDENCE block's input_hash is computed over (same as the old SQLite evidence chain)."""
+    return json.dumps(content, sort_keys=True, separators=(",", ":"))
+
+
+# Block fields block_hash() does not take directly; EVIDENCE blocks commit to them through output_hash
+RECORD_FIELDS = ("timestamp", "actor", "decision", "reasoning", "confidence", "metadata")
+LEGACY_EVIDENCE_OUTPUT_HASH = value_hash("")   # EVIDENCE blocks written before record_hash() existed
+
+
+def record_hash(block: Dict[str, Any]) -> str:
+    """
+    An EVIDENCE block's output_hash: SHA-256 of its RECORD_FIELDS as canonical
+    JSON, so a changed timestamp or metadata breaks the chain like changed content.
+    Values JSON cannot hold hash as stored (str()), so the trail reproduces it.
+    """
+    record = {field: block[field] for field in RECORD_FIELDS}
+    return hashlib.sha256(json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+                          .encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def read_last_hash(path: str, default: str = GENESIS_HASH) -> str:
+    """Head of an existing trail, or `default` if it is empty. A torn final line (crash mid-write) is cut off."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return default
+        tail, pos = b"", size
+        while pos > 0 and tail.count(b"\n") < 2:
+            step = min(65536, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+        if not tail.endswith(b"\n"):
+            # Never acknowledged: receipts resolve only after the full batch is written
+            cut = tail.rfind(b"\n") + 1
+            print(f"⚠️ Audit trail ends in a partial record; truncating {len(tail) - cut} bytes")
+            f.truncate(pos + cut)
+            tail = tail[:cut]
+        lines = tail.splitlines()
+        if not lines:
+            return default
+        try:
+            return json.loads(lines[-1]).get("current_hash", GENESIS_HASH)
+        except ValueError:
+            return GENESIS_HASH
+
+
+class AuditReceipt:
+    """Handle returned by AuditWriter.submit; result() waits for the group commit holding the event."""
+    __slots__ = ("_writer", "seq", "log", "error")
+
+    def __init__(self, writer: "AuditWriter", seq: int):
+        self._writer = writer
+        self.seq = seq
+        self.log: Optional[AuditLog] = None
+        self.error: Optional[BaseException] = None
+
+    def done(self) -> bool:
+        return self._writer._committed >= self.seq
+
+    def result(self, timeout: Optional[float] = None) -> AuditLog:
+        if not self._writer._wait_committed(self.seq, timeout):
+            raise TimeoutError("audit event not committed yet")
+        if self.error is not None:
+            raise self.error
+        return self.log
+
+
+class AuditWriter:
+    def __init__(self, path: str, fsync: Optional[str] = None, fsync_interval_ms: Optional[float] = None,
+                 max_batch: Optional[int] = None, index=None, segments=None):
+        self.path = path
+        self.index = index                      # optional AuditIndex kept in step with the trail
+        self.segments = segments                # optional SegmentStore the active file is rolled into
+        self.lock_path = path + ".lock"
+        self._lock_fd = self._open_lock()
+        self._generation = 0                    # commit generation this writer last saw
+        if segments is not None:
+            with self._trail_lock():
+                segments.recover()
+                self._bump_generation()         # recovery may have replaced the active file
+        self.fsync = fsync or SETTINGS.AUDIT_FSYNC
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}")
+        self.fsync_interval = (fsync_interval_ms if fsync_interval_ms is not None
+                               else SETTINGS.AUDIT_FSYNC_INTERVAL_MS) / 1000.0
+        self.max_batch = max_batch or SETTINGS.AUDIT_MAX_BATCH
+        self._generation = self._read_generation()
+        # only the writer thread advances this
+        self.last_hash = read_last_hash(path, segments.final_hash() if segments is not None else GENESIS_HASH)
+        self.stats = {"events": 0, "batches": 0, "fsyncs": 0, "errors": 0, "segments": 0, "resyncs": 0}
+        self.last_error: Optional[str] = None   # set while the most recent batch failed to write
+
+        self._session_heads: "OrderedDict[str, str]" = OrderedDict()
+        self._heads_scanned = False             # without an index: heads of the existing trail loaded
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._committed = 0                     # events processed (written or failed), in order
+        self._idle = False                      # writer is parked waiting for work
+        self._closed = False
+        self._last_fsync = 0.0
+        self._unsynced = False                  # 'interval': bytes written since the last fsync
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Producer side ──────────────────────────────────────────────────────────
+    def submit(self, session_id: str, event_type: str, actor: str, decision: Any, reasoning: str,
+               confidence: float, input_data: Any, output_data: Any,
+               metadata: Optional[Dict] = None, kind: str = AUDIT) -> AuditReceipt:
+        """Enqueue one event and return immediately; the receipt resolves to its AuditLog once committed."""
+        return self.submit_many([(session_id, event_type, actor, decision, reasoning, confidence,
+                                  input_data, output_data, metadata, kind)])[0]
+
+    def submit_many(self, events: List[Tuple]) -> List[AuditReceipt]:
+        """
+        Enqueue several events (tuples of all ten submit() arguments) back to back: no
+        other caller's event lands between them, and they share group commits.
+        """
+        if any(event[9] not in EVENT_KINDS for event in events):
+            raise ValueError(f"kind must be one of {EVENT_KINDS}")
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            receipts = []
+            for event in events:
+                self._submitted += 1
+                receipt = AuditReceipt(self, self._submitted)
+                self._queue.append((timestamp, *event, receipt))
+                receipts.append(receipt)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+            elif self._idle:
+                self._cond.notify_all()
+        return receipts
+
+    def _wait_committed(self, seq: int, timeout: Optional[float]) -> bool:
+        if self._committed >= seq:
+            return True
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= seq, timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is written (and fsynced unless the policy is 'never')."""
+        ok = self._wait_committed(self._submitted, timeout)
+        if ok and self.fsync == "interval":
+            with self._cond:
+                self._fsync()
+        return ok
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Still draining a backlog; it exits once the queue is empty and owns its handles until then
+                print(f"⚠️ Audit writer still has {self.pending()} events to write after {timeout}s")
+                return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def status(self) -> str:
+        """'active', 'idle' (nothing submitted yet), 'failing' (last batch not written), 'closed' or 'stopped'."""
+        if self._closed:
+            return "closed"
+        if self._thread is None:
+            return "idle"
+        if not self._thread.is_alive():
+            return "stopped"
+        return "failing" if self.last_error else "active"
+
+    def pending(self) -> int:
+        return self._submitted - self._committed
+
+    # ── Writer thread ──────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._idle = True
+                # A quiet period still gets its fsync within the interval
+                self._cond.wait_for(lambda: self._queue or self._closed,
+                                    self.fsync_interval if self._unsynced else None)
+                self._idle = False
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+            if not batch:
+                if self._unsynced:
+                    self._sync_quietly()
+                if self._closed:
+                    return
+                continue
+            try:
+                with self._trail_lock():
+                    self._catch_up()
+                    try:
+                        self._commit(batch)
+                    finally:
+                        self._bump_generation()
+            except Exception as e:
+                # Fail this batch's unresolved receipts; the writer keeps serving later events
+                self._fail(batch, e)
+            with self._cond:
+                self._committed += len(batch)
+                self._cond.notify_all()
+
+    def _fail(self, batch, error: BaseException) -> None:
+        self.stats["errors"] += 1
+        self.last_error = str(error)
+        print(f"⚠️ Audit commit failed ({len(batch)} events): {error}")
+        for event in batch:
+            if event[-1].log is None and event[-1].error is None:
+                event[-1].error = error
+
+    def _commit(self, batch) -> None:
+        head = self.last_hash
+        heads: Dict[str, str] = {}              # session heads advanced by this batch; kept only if it is written
+        logs, lines, sessions, written = [], [], [], []
+        for event in batch:
+            ts, session_id, event_type, actor, decision, reasoning, confidence, inp, out, metadata, kind, receipt = event
+            try:
+                decision, metadata = str(decision)[:500], metadata or {}
+                in_h = value_hash(inp)
+                if kind == EVIDENCE:
+                    out_h = record_hash({"timestamp": ts, "actor": actor, "decision": decision,
+                                         "reasoning": reasoning, "confidence": confidence, "metadata": metadata})
+                else:
+                    out_h = value_hash(out)
+                session_prev = heads.get(session_id) or self._session_head(session_id)
+                curr_h = block_hash(head, session_id, event_type, in_h, out_h, kind, session_prev)
+                log = AuditLog(
+                    timestamp=ts, session_id=session_id, event_type=event_type, actor=actor,
+                    decision=decision, reasoning=reasoning, confidence=confidence,
+                    input_hash=in_h, output_hash=out_h, previous_hash=head, current_hash=curr_h,
+                    metadata=metadata, kind=kind, session_prev_hash=session_prev,
+                )
+                try:
+                    line = json.dumps(log.__dict__) + "\n"   # same layout as asdict() for these fields
+                except (TypeError, ValueError):
+                    log.metadata = json.loads(json.dumps(log.metadata, default=str))
+                    line = json.dumps(log.__dict__) + "\n"
+            except Exception as e:
+                # Only this event fails; the rest of the batch chains past it
+                self.stats["errors"] += 1
+                print(f"⚠️ Audit event rejected ({session_id}/{event_type}): {e}")
+                receipt.error = e
+                continue
+            lines.append(line)
+            logs.append(log)
+            sessions.append(session_id)
+            written.append(event)
+            heads[session_id] = curr_h
+            head = curr_h
+        if not written:
+            return
+        batch = written
+        start = None
+        try:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            start = self._file.seek(0, os.SEEK_END)
+            encoded = [line.encode("utf-8") for line in lines]
+            data = b"".join(encoded)
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync == "batch" or (
+                    self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self._fsync()
+            elif self.fsync == "interval":
+                self._unsynced = True
+        except Exception as e:
+            # Nothing from this batch is acknowledged; the chain head stays where it was
+            self.stats["errors"] += 1
+            self.last_error = str(e)
+            print(f"⚠️ Audit trail write failed ({len(batch)} events): {e}")
+            for event in batch:
+                event[-1].error = e
+            self._discard_partial(start)
+            return
+        self.last_hash = head
+        for session_id, session_head in heads.items():
+            self._remember_head(session_id, session_head)
+        self.stats["events"] += len(batch)
+        self.stats["batches"] += 1
+        self.last_error = None
+        for event, log in zip(batch, logs):
+            event[-1].log = log
+        end = start + len(data)
+        if self.index is not None:
+            entries, offset = [], start
+            for line, session_id in zip(encoded, sessions):
+                entries.append((offset, len(line), session_id))
+                offset += len(line)
+            try:
+                self.index.append(entries)
+            except Exception as e:
+                # The trail is authoritative; a stale index is rebuilt on its next load
+                print(f"⚠️ Audit index update failed: {e}")
+        if self.segments is not None and self.segments.should_seal(end):
+            self._seal()
+
+    # ── Cross-process commit lock ──────────────────────────────────────────────
+    def _open_lock(self) -> Optional[int]:
+        if fcntl is None:
+            return None
+        try:
+            return os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            print(f"⚠️ Audit trail lock unavailable ({e}); assuming a single writing process")
+            return None
+
+    @contextmanager
+    def _trail_lock(self):
+        """Exclusive across processes for one commit (head read, append, index update, seal)."""
+        if self._lock_fd is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _read_generation(self) -> int:
+        if self._lock_fd is None:
+            return self._generation
+        data = os.pread(self._lock_fd, 8, 0)
+        return int.from_bytes(data, "little") if len(data) == 8 else 0
+
+    def _bump_generation(self) -> None:
+        """Called with the lock held after every commit; only page-cache writes, never fsynced."""
+        self._generation = self._read_generation() + 1
+        if self._lock_fd is not None:
+            os.pwrite(self._lock_fd, self._generation.to_bytes(8, "little"), 0)
+
+    def _catch_up(self) -> None:
+        """Another process wrote to the trail since our last commit: re-read its head before chaining."""
+        if self._read_generation() == self._generation:
+            return
+        self.stats["resyncs"] += 1
+        self._session_heads.clear()
+        self._heads_scanned = False
+        if self._file is not None:
+            if self._unsynced:
+                self._sync_quietly()
+            self._file.close()                  # the active file may have been replaced by a seal recovery
+            self._file = None
+        default = GENESIS_HASH
+        if self.segments is not None:
+            self.segments.reload()
+            default = self.segments.final_hash()
+        self.last_hash = read_last_hash(self.path, default)
+        if self.index is not None:
+            try:
+                self.index.reload()
+            except Exception as e:
+                print(f"⚠️ Audit index reload failed: {e}")
+
+    # ── Session heads ──────────────────────────────────────────────────────────
+    def _session_head(self, session_id: str) -> str:
+        """Hash of the session's last committed block; GENESIS_HASH for a new session (or one whose head was pruned)."""
+        cached = self._session_heads.get(session_id)
+        if cached is not None:
+            self._session_heads.move_to_end(session_id)
+            return cached
+        if self.index is None:
+            if not self._heads_scanned:
+                self._scan_session_heads()
+                return self._session_head(session_id)
+            return GENESIS_HASH
+        try:
+            last = self.index.last_session_block(session_id)
+        except Exception as e:
+            # Unlinked is detectable by verify_session; stalling the writer is worse
+            print(f"⚠️ Audit session head lookup failed for {session_id}: {e}")
+            last = None
+        head = last["current_hash"] if last else GENESIS_HASH
+        self._remember_head(session_id, head)
+        return head
+
+    def _remember_head(self, session_id: str, head: str) -> None:
+        self._session_heads[session_id] = head
+        self._session_heads.move_to_end(session_id)
+        if self.index is not None and len(self._session_heads) > SESSION_HEAD_CACHE:
+            self._session_heads.popitem(last=False)
+
+    def _scan_session_heads(self) -> None:
+        """No index to ask: read the session heads of the whole existing trail once."""
+        self._heads_scanned = True
+
+        def note(raw: bytes) -> None:
+            try:
+                block = json.loads(raw)
+                self._session_heads[block["session_id"]] = block["current_hash"]
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        if self.segments is not None:
+            for _, raw in self.segments.iter_lines(self.segments.retained_start()):
+                note(raw)
+        elif os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    note(raw)
+
+    def _seal(self) -> None:
+        """Roll the active file into a sealed segment; runs between batches, so nothing is half-written."""
+        try:
+            if self._file is not None:
+                if self._unsynced:
+                    self._fsync()
+                self._file.close()
+                self._file = None
+            if self.segments.seal() is not None:
+                self.stats["segments"] += 1
+            self.segments.prune()
+        except Exception as e:
+            print(f"⚠️ Audit segment seal failed, retrying after the next batch: {e}")
+
+    def _fsync(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+            self.stats["fsyncs"] += 1
+        self._unsynced = False
+
+    def _sync_quietly(self) -> None:
+        """Idle-time fsync of an 'interval' tail; a failure is retried after the next interval."""
+        try:
+            self._fsync()
+        except Exception as e:
+            print(f"⚠️ Audit trail fsync failed: {e}")
+
+    def _discard_partial(self, start: Optional[int]) -> None:
+        """Cut back to the last acknowledged record so an unacknowledged tail cannot fork the chain."""
+        try:
+            if self._file is not None:
+                self._file.close()
+        except Exception:
+            pass
+        self._file = None
+        if start is not None:
+            try:
+                os.truncate(self.path, start)
+            except Exception:
+                pass
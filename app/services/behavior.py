@@ -39,16 +39,12 @@ def correlate_identity(fingerprint: str, upi_list: list) -> dict:
     return {"syndicate": "NEW", "risk": "MEDIUM"}
 
 
-class GNNPredictor:
-    """
-    Simulates a Graph Neural Network (GNN) for syndicate mapping.
-    Predicts probability of a session belonging to an organized crime cluster.
-    """
-    def predict_cluster_probability(self, nodes: list, edges: list) -> float:
-        # Logistic activation simulation based on edge density
-        if not nodes: return 0.0
-        density = len(edges) / len(nodes)
-        return min(density * 0.5, 1.0)
+# (weight, indicator phrases) – shared with ScamClassifier.predict_batch
+BEHAVIOR_SIGNALS = [
+    (0.3, ["now", "immediate", "urgent", "expires", "today only", "hurry"]),          # Urgency
+    (0.4, ["police", "arrest", "court", "legal action", "blocked", "suspended"]),     # Authority/Threat
+    (0.3, ["don't tell", "secret", "private", "nobody else"]),                        # Secrecy
+]
 
 def analyze_behavior_patterns(text: str) -> float:
     """
@@ -57,20 +53,9 @@ def analyze_behavior_patterns(text: str) -> float:
     """
     text_lower = text.lower()
     score = 0.0
-    
-    # Urgency indicators
-    urgency_words = ["now", "immediate", "urgent", "expires", "today only", "hurry"]
-    if any(w in text_lower for w in urgency_words):
-        score += 0.3
-        
-    # Authority/Threat indicators
-    threat_words = ["police", "arrest", "court", "legal action", "blocked", "suspended"]
-    if any(w in text_lower for w in threat_words):
-        score += 0.4
-        
-    # Secrecy indicators
-    secrecy_words = ["don't tell", "secret", "private", "nobody else"]
-    if any(w in text_lower for w in secrecy_words):
-        score += 0.3
-        
+
+    for weight, words in BEHAVIOR_SIGNALS:
+        if any(w in text_lower for w in words):
+            score += weight
+
     return min(score, 1.0)
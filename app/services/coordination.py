@@ -0,0 +1,208 @@
+# app/services/coordination.py
+"""
+Streaming coordination detector.
+
+Each fingerprint (voice match, or an identifier such as a UPI handle / phone /
+URL shared across chats) gets a ring of time buckets covering the last
+COORDINATION_WINDOW_MINUTES. A bucket holds the sessions sighted in it, and a
+per-fingerprint refcount tracks how many live buckets each session appears in,
+so "how many other sessions saw this fingerprint recently" is len(refcount).
+Advancing the ring clears each expired bucket once, which keeps observe() and
+count_other_sessions() O(1) amortized.
+
+Memory is bounded by an LRU over fingerprints (COORDINATION_MAX_FINGERPRINTS);
+windows that fully expire are dropped. When a fingerprint reaches
+COORDINATION_ALERT_SESSIONS distinct sessions an alert is published to
+subscribers immediately; it re-arms once the window drops below the threshold.
+
+This complements taxonomy.check_coordination (persistent, queried on demand)
+and returns the same shape from check_coordination().
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.config import SETTINGS
+
+Subscriber = Callable[[Dict[str, Any]], None]
+
+
+class _Window:
+    """Ring buffer of time buckets for one fingerprint."""
+
+    __slots__ = ("slots", "stamps", "refcount", "last_seen", "head", "alerted")
+
+    def __init__(self, n_buckets: int):
+        self.slots: List[Set[str]] = [set() for _ in range(n_buckets)]
+        self.stamps: List[int] = [-1] * n_buckets
+        self.refcount: Dict[str, int] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.head = -1              # newest bucket id the ring has advanced to
+        self.alerted = False
+
+    def advance(self, bucket: int) -> None:
+        """Expire every bucket older than the window ending at `bucket`."""
+        n = len(self.slots)
+        if bucket <= self.head:
+            return
+        start = max(self.head + 1, bucket - n + 1)
+        for b in range(start, bucket + 1):
+            idx = b % n
+            if self.stamps[idx] != -1:
+                for sid in self.slots[idx]:
+                    left = self.refcount[sid] - 1
+                    if left:
+                        self.refcount[sid] = left
+                    else:
+                        del self.refcount[sid]
+                        del self.last_seen[sid]
+                self.slots[idx].clear()
+                self.stamps[idx] = -1
+        self.head = bucket
+
+    def add(self, bucket: int, session_id: str, ts: float) -> bool:
+        if bucket <= self.head - len(self.slots):
+            return False            # late sighting, already outside the window
+        idx = bucket % len(self.slots)
+        self.stamps[idx] = bucket
+        slot = self.slots[idx]
+        if session_id not in slot:
+            slot.add(session_id)
+            self.refcount[session_id] = self.refcount.get(session_id, 0) + 1
+        self.last_seen[session_id] = max(ts, self.last_seen.get(session_id, ts))
+        return True
+
+
+class CoordinationDetector:
+    def __init__(self, window_minutes: Optional[int] = None, bucket_seconds: Optional[int] = None,
+                 alert_sessions: Optional[int] = None, max_fingerprints: Optional[int] = None):
+        self.window_minutes = window_minutes or SETTINGS.COORDINATION_WINDOW_MINUTES
+        self.bucket_seconds = bucket_seconds or SETTINGS.COORDINATION_BUCKET_SECONDS
+        self.alert_sessions = alert_sessions or SETTINGS.COORDINATION_ALERT_SESSIONS
+        self.max_fingerprints = max_fingerprints or SETTINGS.COORDINATION_MAX_FINGERPRINTS
+        self.n_buckets = max(1, -(-self.window_minutes * 60 // self.bucket_seconds))
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self.recent_alerts: deque = deque(maxlen=100)
+        self.evicted = 0
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def _window(self, fingerprint: str, bucket: int, create: bool) -> Optional[_Window]:
+        window = self._windows.get(fingerprint)
+        if window is None:
+            if not create:
+                return None
+            window = self._windows[fingerprint] = _Window(self.n_buckets)
+            while len(self._windows) > self.max_fingerprints:
+                self._windows.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._windows.move_to_end(fingerprint)
+        window.advance(bucket)
+        if not window.refcount and not create:
+            del self._windows[fingerprint]
+            return None
+        if window.alerted and len(window.refcount) < self.alert_sessions:
+            window.alerted = False
+        return window
+
+    # ── Subscriptions ──────────────────────────────────────────────────────────
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Register an alert callback; returns an unsubscribe function."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def _publish(self, alert: Dict[str, Any]) -> None:
+        self.recent_alerts.append(alert)
+        for callback in list(self._subscribers):
+            try:
+                callback(alert)
+            except Exception as e:
+                print(f"⚠️ Coordination alert subscriber failed: {e}")
+
+    # ── Stream input ───────────────────────────────────────────────────────────
+    def observe(self, session_id: str, fingerprints: Iterable[str],
+                now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Record a sighting of each fingerprint in `session_id`; returns alerts raised."""
+        ts = time.time() if now is None else now
+        bucket = self._bucket(ts)
+        alerts = []
+        with self._lock:
+            for fp in dict.fromkeys(f for f in fingerprints if f):
+                window = self._window(fp, bucket, create=True)
+                window.add(bucket, session_id, ts)
+                if not window.alerted and len(window.refcount) >= self.alert_sessions:
+                    window.alerted = True
+                    alerts.append({
+                        "fingerprint": fp,
+                        "session_id": session_id,
+                        "sessions": sorted(window.refcount),
+                        "count_sessions": len(window.refcount),
+                        "window_minutes": self.window_minutes,
+                        "timestamp": ts,
+                    })
+        for alert in alerts:
+            self._publish(alert)
+        return alerts
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+    def count_other_sessions(self, fingerprint: str, session_id: Optional[str] = None,
+                             now: Optional[float] = None) -> int:
+        ts = time.time() if now is None else now
+        with self._lock:
+            window = self._window(fingerprint, self._bucket(ts), create=False)
+            if window is None:
+                return 0
+            return len(window.refcount) - (1 if session_id in window.refcount else 0)
+
+    def check_coordination(self, fingerprint: str, exclude_session: Optional[str] = None,
+                           now: Optional[float] = None) -> Dict[str, Any]:
+        """Same result shape as taxonomy.check_coordination, served from the live window."""
+        if not fingerprint:
+            return {"coordinated": False, "count": 0, "sessions": []}
+        ts = time.time() if now is None else now
+        with self._lock:
+            window = self._window(fingerprint, self._bucket(ts), create=False)
+            seen = dict(window.last_seen) if window else {}
+        active = [
+            {"session_id": sid, "last_seen": seen_at, "seconds_ago": int(ts - seen_at)}
+            for sid, seen_at in seen.items() if sid != exclude_session
+        ]
+        return {
+            "coordinated": len(active) > 0,
+            "count_other_sessions": len(active),
+            "active_sessions": active,
+            "window_minutes": self.window_minutes,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "fingerprints": len(self._windows),
+                "evicted": self.evicted,
+                "alerts": len(self.recent_alerts),
+                "buckets_per_window": self.n_buckets,
+            }
+
+
+def turn_fingerprints(new_intel: Dict[str, List[str]], speaker_info: str = "") -> List[str]:
+    """Fingerprints sighted in one turn: payment/contact identifiers and known voices."""
+    from app.services.intel_accumulator import canonicalize_item
+
+    out = []
+    for kind in ("upi_ids", "phone_numbers", "urls", "bank_accounts"):
+        for raw in (new_intel or {}).get(kind) or []:
+            value = canonicalize_item(kind, raw)
+            if value:
+                out.append(f"{kind}:{value}")
+    if speaker_info and speaker_info.startswith("KNOWN THREAT:"):
+        out.append("voice:" + speaker_info.split(":", 1)[1].strip())
+    return out
+
+
+# Global singleton instance
+coordination_detector = CoordinationDetector()
@@ -0,0 +1,182 @@
+# app/services/enrichment.py
+"""
+Batched identifier enrichment (UPI / phone / URL).
+
+- Per call, identifiers are deduplicated.
+- Repeats across turns and sessions are served from a TTL + LRU cache.
+- Identifiers already being looked up by another session await the same future
+  instead of issuing a second request.
+- Remaining misses are grouped into bulk requests (ENRICHMENT_BATCH_SIZE) and
+  fanned out concurrently, bounded by a semaphore (ENRICHMENT_MAX_CONCURRENCY).
+
+Local checks (handle taxonomy, fraud registry, tower lookup, URL reputation) are
+cheap and run inline; only the NPCI / TRAI calls go over the network.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import SETTINGS
+from app.services.intelligence_hub import intelligence_hub
+from app.services.mock_govt_apis import GovernmentAPIClient, govt_client
+
+ENRICHED_KINDS = ("upi_ids", "phone_numbers", "urls")
+
+
+class TTLCache:
+    """OrderedDict LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 50000, ttl: float = 900.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _chunks(values: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(values), max(1, size)):
+        yield values[i:i + size]
+
+
+class EnrichmentService:
+    def __init__(self, client: Optional[GovernmentAPIClient] = None, ttl: Optional[float] = None,
+                 maxsize: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 batch_size: Optional[int] = None):
+        self.client = client or govt_client
+        self.cache = TTLCache(
+            maxsize=SETTINGS.ENRICHMENT_CACHE_SIZE if maxsize is None else maxsize,
+            ttl=SETTINGS.ENRICHMENT_CACHE_TTL_SECONDS if ttl is None else ttl,
+        )
+        self.max_concurrency = max_concurrency or SETTINGS.ENRICHMENT_MAX_CONCURRENCY
+        self.batch_size = batch_size or SETTINGS.ENRICHMENT_BATCH_SIZE
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _sem(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    # ── Local (in-process) part of each record ─────────────────────────────────
+    @staticmethod
+    def _local(kind: str, value: str) -> Dict[str, Any]:
+        if kind == "upi_ids":
+            v = intelligence_hub.verify_upi(value)
+            return {"status": v["status"], "risk_score": v["risk_score"]}
+        if kind == "phone_numbers":
+            t = intelligence_hub.mobile_tower_lookup(value)
+            return {"operator": t["operator"], "circle": t["circle"],
+                    "fraud_registered": intelligence_hub.is_flagged_phone(value)}
+        if kind == "urls":
+            v = intelligence_hub.verify_url(value)
+            return {"status": v["status"], "risk_score": v["risk_score"],
+                    "registered_domain": v["registered_domain"]}
+        return {}
+
+    async def _remote(self, kind: str, values: List[str]) -> Dict[str, Any]:
+        async with self._sem():
+            if kind == "upi_ids":
+                return {v: {"npci": r} for v, r in (await self.client.npci_upi_lookup_many(values)).items()}
+            if kind == "phone_numbers":
+                return {v: {"dnd": r} for v, r in (await self.client.trai_dnd_check_many(values)).items()}
+        return {v: {} for v in values}
+
+    async def _fetch(self, kind: str, values: List[str]) -> None:
+        """Look up misses in bulk batches and resolve their in-flight futures."""
+        results = await asyncio.gather(
+            *(self._remote(kind, batch) for batch in _chunks(values, self.batch_size)),
+            return_exceptions=True,
+        )
+        remote: Dict[str, Any] = {}
+        for r in results:
+            if isinstance(r, dict):
+                remote.update(r)
+        for value in values:
+            key = (kind, value)
+            record = None
+            if value in remote:
+                record = {**self._local(kind, value), **remote[value]}
+                self.cache.put(key, record)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                # Failed remote lookups still return the local part, uncached.
+                future.set_result(record if record is not None else self._local(kind, value))
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+    async def enrich_bulk(self, kind: str, values: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Enrich many identifiers of one kind; duplicates are looked up once."""
+        unique = list(dict.fromkeys(v for v in values if v))
+        out: Dict[str, Dict[str, Any]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        misses: List[str] = []
+        loop = asyncio.get_running_loop()
+        for value in unique:
+            key = (kind, value)
+            cached = self.cache.get(key)
+            if cached is not None:
+                out[value] = cached
+            elif key in self._inflight and self._inflight[key].get_loop() is loop:
+                waiting[value] = self._inflight[key]
+            else:
+                self._inflight[key] = waiting[value] = loop.create_future()
+                misses.append(value)
+        if misses:
+            try:
+                await self._fetch(kind, misses)
+            finally:
+                for value in misses:
+                    future = self._inflight.pop((kind, value), None)
+                    if future is not None and not future.done():
+                        future.set_result(self._local(kind, value))
+        for value, future in waiting.items():
+            out[value] = await future
+        return out
+
+    async def enrich(self, intel: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Enrich one turn's identifiers: {kind: [values]} → {kind: {value: record}}."""
+        kinds = [k for k in ENRICHED_KINDS if intel.get(k)]
+        results = await asyncio.gather(*(self.enrich_bulk(k, intel[k]) for k in kinds))
+        return dict(zip(kinds, results))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.cache.hits + self.cache.misses
+        return {
+            "cached": len(self.cache),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "hit_rate": round(self.cache.hits / total, 4) if total else 0.0,
+            "inflight": len(self._inflight),
+            "remote_requests": self.client.requests_sent,
+        }
+
+
+# Global singleton instance
+enrichment_service = EnrichmentService()
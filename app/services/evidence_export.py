@@ -0,0 +1,325 @@
+# app/services/evidence_export.py
+"""
+Streaming evidence bundles for one session or a whole case.
+
+A bundle is a tar archive with, per session:
+
+  sessions/<id>/conversation.json     the session record from scam_database.json
+  sessions/<id>/audit_blocks.jsonl    every retained ledger block (AUDIT + EVIDENCE), chain order
+  sessions/<id>/evidence_chain.jsonl  EVIDENCE blocks as evidence-chain rows
+  sessions/<id>/canary_hits.jsonl     CANARY_TRIGGERED blocks
+  sessions/<id>/merkle_proofs.jsonl   inclusion proof of each block against the bundle's tree head
+  sessions/<id>/artifacts/...         FIR/NCRP reports, failure screenshots, canary proof images
+
+and a MANIFEST.json last: the SHA-256 and size of every member, each
+session's sub-chain verification and the signed Merkle tree head the proofs
+are against. The manifest comes last because member hashes are computed as
+the members stream by.
+
+Nothing is held whole in memory. Ledger blocks are read a page at a time
+into disk-backed temp files (a tar header needs the member size up front),
+and every member body is copied through one reused buffer. write_to() sends
+the bodies with os.sendfile, so on Linux artifacts go from the page cache to
+the output file or socket without passing through Python; chunks() yields
+the same archive for a StreamingResponse.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+from app.services.identity_graph import identity_graph, node_key
+from app.services.ledger import AUDIT, EVIDENCE, Ledger, ledger as default_ledger
+from app.services.merkle import MerkleLedger, merkle_ledger as default_merkle
+
+DB_FILE = "scam_database.json"
+STATIC_DIR = "static"
+BUNDLE_FORMAT = "vigilante-evidence-bundle/1"
+CHUNK_SIZE = 1 << 20
+BLOCK_SIZE = tarfile.BLOCKSIZE
+CANARY_EVENT = "CANARY_TRIGGERED"
+# static/<prefix>_<session>[_<n>].<ext>, static/evidence/fail_<session>.png
+ARTIFACT_PREFIXES = ("FIR_Draft_", "NCRP_Report_", "fail_")
+CANARY_PREFIX = "proof_"                        # static/proof_<token>.png, token = "proof_<digits>"
+_UNSAFE = re.compile(r"[^\w.@+-]")
+_COUNTER = re.compile(r"_\d+$")
+
+
+def case_sessions(session_id: str, limit: int = 5000) -> List[str]:
+    """Sessions of the syndicate cluster `session_id` belongs to (just itself if it is not in the graph)."""
+    cluster = identity_graph.cluster(node_key("session", session_id), limit=limit)
+    sessions = cluster["sessions"] if cluster else []
+    return sessions if session_id in sessions else [session_id] + sessions
+
+
+def _safe(name: str) -> str:
+    return _UNSAFE.sub("_", name) or "_"
+
+
+class _Member:
+    """A tar member whose body is read from an open file; sha256 is set once the body has streamed."""
+    __slots__ = ("name", "fileobj", "size", "mtime", "sha256")
+
+    def __init__(self, name: str, fileobj: BinaryIO, size: int, mtime: float):
+        self.name, self.fileobj, self.size, self.mtime = name, fileobj, size, mtime
+        self.sha256: Optional[str] = None
+
+
+def _header(name: str, size: int, mtime: float) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size, info.mtime, info.mode = size, int(mtime), 0o644
+    return info.tobuf(tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> bytes:
+    return bytes(-size % BLOCK_SIZE)
+
+
+class EvidenceBundle:
+    def __init__(self, session_ids: Iterable[str], case_id: Optional[str] = None,
+                 ledger: Optional[Ledger] = None, merkle: Optional[MerkleLedger] = None,
+                 db_file: str = DB_FILE, static_dir: str = STATIC_DIR):
+        self.session_ids = list(dict.fromkeys(session_ids))
+        self.case_id = case_id
+        self.ledger = ledger or default_ledger
+        # The default Merkle tree covers the default ledger only; a custom ledger brings its own tree (or none)
+        self.merkle = merkle if merkle is not None or ledger is not None else default_merkle
+        self.db_file = db_file
+        self.static_dir = static_dir
+        self.created_at = datetime.utcnow().isoformat() + "Z"
+        self.manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def filename(self) -> str:
+        label = f"case_{self.case_id}" if self.case_id else "_".join(self.session_ids[:3]) or "empty"
+        return f"evidence_{_safe(label)}_{self.created_at[:19].replace(':', '')}.tar"
+
+    # ── Sources ────────────────────────────────────────────────────────────────
+    def _conversations(self) -> Dict[str, Any]:
+        """Records of the exported sessions only (the database is one JSON document)."""
+        if not os.path.exists(self.db_file):
+            return {}
+        try:
+            with open(self.db_file, "r", encoding="utf-8") as f:
+                db = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Evidence export could not read {self.db_file}: {e}")
+            return {}
+        if not isinstance(db, dict):
+            return {}
+        return {sid: db[sid] for sid in self.session_ids if sid in db}
+
+    def _artifacts(self, canary_hashes: Dict[str, str]) -> Iterator[tuple]:
+        """(session_id, path, relative name) for every static artifact of an exported session."""
+        if not os.path.isdir(self.static_dir):
+            return
+        sessions = set(self.session_ids)
+        for root, _, files in os.walk(self.static_dir):
+            for name in sorted(files):
+                stem = os.path.splitext(name)[0]
+                owner = None
+                if stem.startswith(CANARY_PREFIX):
+                    token_hash = hashlib.sha256(stem[len(CANARY_PREFIX):].encode()).hexdigest()
+                    owner = canary_hashes.get(token_hash)
+                if owner is None:
+                    prefix = next((p for p in ARTIFACT_PREFIXES if stem.startswith(p)), None)
+                    if prefix is None:
+                        continue
+                    rest = stem[len(prefix):]
+                    owner = rest if rest in sessions else _COUNTER.sub("", rest)
+                if owner in sessions:
+                    path = os.path.join(root, name)
+                    yield owner, path, os.path.relpath(path, self.static_dir)
+
+    def _tree_head(self) -> Optional[Dict[str, Any]]:
+        """Signed head covering every block written so far; proofs in the bundle are against it."""
+        if self.merkle is None:
+            return None
+        signed = self.merkle.sign_root()
+        if signed is None:
+            return None
+        return {"signed_root": signed, "public_key": self.merkle.public_key(), "algorithm": "Ed25519"}
+
+    def _spool_session(self, session_id: str, tree_size: int, canary_hashes: Dict[str, str],
+                       spools: Dict[str, BinaryIO]) -> Dict[str, int]:
+        """One pass over the session's blocks, one page at a time, into the per-member temp files."""
+        counts = {"blocks": 0, AUDIT: 0, EVIDENCE: 0, "canary_hits": 0, "proofs": 0}
+        for b in self.ledger.iter_session_blocks(session_id):
+            counts["blocks"] += 1
+            kind = b.get("kind", AUDIT)
+            counts[kind] = counts.get(kind, 0) + 1
+            spools["audit_blocks.jsonl"].write((json.dumps(b) + "\n").encode())
+            if kind == EVIDENCE:
+                row = {"id": b["block"], "timestamp": b["timestamp"], "event_type": b["event_type"],
+                       "content": b.get("metadata", {}).get("content"), "prev_hash": b["previous_hash"],
+                       "data_hash": b["current_hash"]}
+                spools["evidence_chain.jsonl"].write((json.dumps(row) + "\n").encode())
+            elif b.get("event_type") == CANARY_EVENT:
+                canary_hashes[b["input_hash"]] = session_id
+                counts["canary_hits"] += 1
+                spools["canary_hits.jsonl"].write((json.dumps(b) + "\n").encode())
+            if b["block"] <= tree_size:
+                proof = self.merkle.inclusion_proof(b["block"], tree_size)
+                del proof["root_hash"]                  # same for every proof; it is in the manifest
+                proof["current_hash"] = b["current_hash"]
+                counts["proofs"] += 1
+                spools["merkle_proofs.jsonl"].write((json.dumps(proof) + "\n").encode())
+        return counts
+
+    # ── Archive ────────────────────────────────────────────────────────────────
+    def _parts(self) -> Iterator[Union[bytes, _Member]]:
+        """The archive as raw bytes (headers, padding) and members whose bodies the caller streams."""
+        self.ledger.flush(timeout=5)
+        head = self._tree_head()
+        tree_size = head["signed_root"]["tree_size"] if head else 0
+        conversations = self._conversations()
+        canary_hashes: Dict[str, str] = {}
+        members: List[_Member] = []
+        sessions: Dict[str, Any] = {}
+        now = time.time()
+
+        def emit(member: _Member):
+            yield _header(member.name, member.size, member.mtime)
+            yield member                                # caller streams the body and sets sha256
+            yield _padding(member.size)
+            members.append(member)
+
+        for sid in self.session_ids:
+            base = f"sessions/{_safe(sid)}/"
+            with tempfile.TemporaryDirectory(prefix="evidence-export-") as spool_dir:
+                names = ["audit_blocks.jsonl", "evidence_chain.jsonl", "canary_hits.jsonl", "merkle_proofs.jsonl"]
+                spools = {n: open(os.path.join(spool_dir, n), "w+b") for n in names}
+                try:
+                    if sid in conversations:
+                        spools["conversation.json"] = open(os.path.join(spool_dir, "conversation.json"), "w+b")
+                        spools["conversation.json"].write(json.dumps(conversations.pop(sid), indent=2).encode())
+                    counts = self._spool_session(sid, tree_size, canary_hashes, spools)
+                    sessions[sid] = {"conversation": "conversation.json" in spools, **counts, "artifacts": 0,
+                                     "verification": self.ledger.verify_session(sid)}
+                    for name in ["conversation.json"] + names:
+                        if name in spools:
+                            f = spools[name]
+                            yield from emit(_Member(base + name, f, f.tell(), now))
+                finally:
+                    for f in spools.values():
+                        f.close()
+
+        for sid, path, rel in self._artifacts(canary_hashes):
+            try:
+                f = open(path, "rb")
+            except OSError as e:
+                print(f"⚠️ Evidence export skipped {path}: {e}")
+                continue
+            with f:
+                st = os.fstat(f.fileno())
+                yield from emit(_Member(f"sessions/{_safe(sid)}/artifacts/{rel}", f, st.st_size, st.st_mtime))
+            sessions[sid]["artifacts"] += 1
+
+        self.manifest = {
+            "format": BUNDLE_FORMAT,
+            "created_at": self.created_at,
+            "case_id": self.case_id,
+            "sessions": sessions,
+            "tree_head": head,
+            "members": [{"name": m.name, "size": m.size, "sha256": m.sha256} for m in members],
+        }
+        body = json.dumps(self.manifest, indent=2).encode()
+        yield _header("MANIFEST.json", len(body), now) + body + _padding(len(body))
+        yield bytes(2 * BLOCK_SIZE)                     # end-of-archive marker
+
+    @staticmethod
+    def _read(member: _Member, buf: bytearray) -> Iterator[memoryview]:
+        """The member body through one reused buffer, hashed on the way; zero-filled if the file shrank."""
+        digest = hashlib.sha256()
+        view = memoryview(buf)
+        member.fileobj.seek(0)
+        remaining = member.size
+        while remaining:
+            n = member.fileobj.readinto(view[:min(remaining, len(buf))])
+            if not n:
+                break
+            digest.update(view[:n])
+            yield view[:n]
+            remaining -= n
+        while remaining:
+            n = min(remaining, len(buf))
+            view[:n] = bytes(n)
+            digest.update(view[:n])
+            yield view[:n]
+            remaining -= n
+        member.sha256 = digest.hexdigest()
+
+    def chunks(self) -> Iterator[bytes]:
+        """The tar archive as byte chunks of at most CHUNK_SIZE (for StreamingResponse)."""
+        buf = bytearray(CHUNK_SIZE)
+        for part in self._parts():
+            if isinstance(part, _Member):
+                for view in self._read(part, buf):
+                    yield bytes(view)
+            elif part:
+                yield part
+
+    def write_to(self, out: BinaryIO) -> Dict[str, Any]:
+        """Write the tar archive to a binary file; member bodies go through os.sendfile where possible."""
+        buf = bytearray(CHUNK_SIZE)
+        try:
+            out_fd = out.fileno()
+        except (AttributeError, OSError, ValueError):
+            out_fd = None
+        for part in self._parts():
+            if not isinstance(part, _Member):
+                out.write(part)
+                continue
+            sent = 0
+            if out_fd is not None and hasattr(os, "sendfile"):
+                out.flush()
+                sent = self._sendfile(out_fd, part)
+            if sent == part.size:
+                for _ in self._read(part, buf):         # hash only; the body is already out
+                    pass
+            else:
+                views = self._read(part, buf)
+                skipped = 0
+                for view in views:                      # resume after whatever sendfile managed
+                    if skipped + len(view) <= sent:
+                        skipped += len(view)
+                        continue
+                    out.write(view[max(0, sent - skipped):])
+                    skipped += len(view)
+        out.flush()
+        return self.manifest
+
+    @staticmethod
+    def _sendfile(out_fd: int, member: _Member) -> int:
+        in_fd = member.fileobj.fileno()
+        member.fileobj.flush()
+        sent = 0
+        try:
+            while sent < member.size:
+                n = os.sendfile(out_fd, in_fd, sent, member.size - sent)
+                if n == 0:
+                    break
+                sent += n
+        except OSError:
+            pass                                        # e.g. an output fd sendfile cannot write to
+        return sent
+
+
+def export_bundle(session_ids: Iterable[str], out: Union[str, BinaryIO], **kwargs) -> Dict[str, Any]:
+    """Write a bundle to a path ('-' for stdout) or an open binary file; returns the manifest."""
+    bundle = EvidenceBundle(session_ids, **kwargs)
+    if not isinstance(out, str):
+        return bundle.write_to(out)
+    if out == "-":
+        return bundle.write_to(sys.stdout.buffer)
+    tmp = out + ".part"
+    with open(tmp, "wb") as f:
+        manifest = bundle.write_to(f)
+    os.replace(tmp, out)
+    return manifest
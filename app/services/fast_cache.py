@@ -1,6 +1,11 @@
 # /app/services/fast_cache.py
 import random
 
+from app.services.metrics import CACHE_LOOKUPS
+
+_HIT = CACHE_LOOKUPS.labels("reflex", "hit")
+_MISS = CACHE_LOOKUPS.labels("reflex", "miss")
+
 class FastReflexCache:
     """
     Zero-Latency Reflex Layer.
@@ -28,7 +33,9 @@ class FastReflexCache:
         clean_text = clean_text.strip(".,?!")
         
         if clean_text in self.common_inputs:
+            _HIT.inc()
             return random.choice(self.common_inputs[clean_text])
+        _MISS.inc()
         return None
 
 # Singleton
@@ -0,0 +1,294 @@
+# app/services/fraud_registry.py
+"""
+Indexed fraud registry (UPI / phone / URL blacklists).
+
+Source lists are plain text files, one entry per line ('#' lines are comments):
+    data/fraud_registry/upis.txt, phones.txt, urls.txt
+
+Each list is compiled into .compiled/ as three .npy files that are opened with
+mmap, so a 10M-entry feed costs no load time and is shared by all workers:
+    <kind>-<gen>.keys.npy   sorted unique uint64 keys (blake2b-64 of the normalized entry)
+    <kind>-<gen>.dir.npy    bucket directory: offsets of each top-bits prefix in keys
+    <kind>-<gen>.bloom.npy  Bloom filter bits (~10 bits/entry, k=7) checked first
+
+A lookup hashes once, probes the Bloom filter (most lookups are misses and stop
+here), then scans one directory bucket of ~2 keys: O(1) either way.
+
+Reload: a changed source file (mtime/size) is recompiled on a background thread
+and the new snapshot replaces the old one with a single reference swap, so
+lookups never block and never see a half-built index.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.intel_accumulator import normalize_item
+
+KINDS = ("upis", "phones", "urls")
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+BUCKET_TARGET = 2  # average keys per directory bucket
+RELOAD_CHECK_SECONDS = 5.0
+
+
+def normalize_entry(kind: str, raw: str) -> Optional[str]:
+    """Canonical form used for both compiling and lookups."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    if kind == "upis":
+        return raw.lower().replace(" ", "")
+    if kind == "phones":
+        return normalize_item("phone_numbers", raw)
+    if kind == "urls":
+        u = raw.lower()
+        for prefix in ("https://", "http://"):
+            if u.startswith(prefix):
+                u = u[len(prefix):]
+        if u.startswith("www."):
+            u = u[4:]
+        return u.rstrip("/") or None
+    return raw
+
+
+def hash_entry(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hash_entries(values: Iterable[str]) -> np.ndarray:
+    digests = b"".join(hashlib.blake2b(v.encode("utf-8"), digest_size=8).digest() for v in values)
+    return np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+
+
+def _bloom_positions(keys: np.ndarray, m_bits: int) -> np.ndarray:
+    """(n, k) bit positions via double hashing on the two 32-bit halves of the key."""
+    h1 = (keys & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+    h2 = (keys >> np.uint64(32)) | np.uint64(1)
+    i = np.arange(BLOOM_HASHES, dtype=np.uint64)
+    return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(m_bits)
+
+
+class _CompiledList:
+    """One kind's mmapped index. Immutable once built."""
+
+    def __init__(self, keys: np.ndarray, directory: np.ndarray, bloom: np.ndarray):
+        self.keys = keys
+        self.directory = directory
+        self.bloom = bloom
+        self.m_bits = int(len(bloom)) * 8
+        self.shift = 64 - ((int(len(directory)) - 1).bit_length() - 1)
+        # memoryviews index to plain ints without creating NumPy scalars
+        self._keys = memoryview(np.ascontiguousarray(keys, dtype=np.uint64)).cast("B").cast("Q")
+        self._dir = memoryview(np.ascontiguousarray(directory, dtype=np.int64)).cast("B").cast("q")
+        self._bloom = memoryview(np.ascontiguousarray(bloom, dtype=np.uint8)).cast("B")
+
+    def __len__(self) -> int:
+        return int(len(self.keys))
+
+    def contains_key(self, key: int) -> bool:
+        if not len(self.keys):
+            return False
+        # 1. Bloom filter (pure int arithmetic, no array temporaries)
+        m = self.m_bits
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        bloom = self._bloom
+        for i in range(BLOOM_HASHES):
+            pos = (h1 + i * h2) % m
+            if not (bloom[pos >> 3] >> (pos & 7)) & 1:
+                return False
+        # 2. Bucket directory → scan one small bucket
+        bucket = key >> self.shift
+        return key in self._keys[self._dir[bucket]:self._dir[bucket + 1]]
+
+    def contains_keys(self, keys: np.ndarray) -> np.ndarray:
+        """Vectorized membership for many keys (binary search over the sorted key array)."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys) or not len(keys):
+            return np.zeros(len(keys), dtype=bool)
+        pos = np.searchsorted(self.keys, keys)
+        return self.keys[np.minimum(pos, len(self.keys) - 1)] == keys
+
+    @classmethod
+    def build(cls, keys: np.ndarray) -> "_CompiledList":
+        keys = np.unique(np.asarray(keys, dtype=np.uint64))
+        n = len(keys)
+        bucket_bits = max(1, int(np.ceil(np.log2(max(n / BUCKET_TARGET, 2)))))
+        prefixes = keys >> np.uint64(64 - bucket_bits)
+        directory = np.searchsorted(prefixes, np.arange((1 << bucket_bits) + 1, dtype=np.uint64)).astype(np.int64)
+
+        m_bits = max(64, int(n * BLOOM_BITS_PER_ENTRY + 7) // 8 * 8)
+        bits = np.zeros(m_bits, dtype=bool)
+        for start in range(0, n, 1 << 20):
+            bits[_bloom_positions(keys[start:start + (1 << 20)], m_bits).ravel().astype(np.int64)] = True
+        bloom = np.packbits(bits, bitorder="little")
+        return cls(keys, directory, bloom)
+
+    def save(self, prefix: str) -> None:
+        for name, arr in (("keys", self.keys), ("dir", self.directory), ("bloom", self.bloom)):
+            tmp = f"{prefix}.{name}.{os.getpid()}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, f"{prefix}.{name}.npy")
+
+    @classmethod
+    def open(cls, prefix: str) -> "_CompiledList":
+        arrays = []
+        for name in ("keys", "dir", "bloom"):
+            path = f"{prefix}.{name}.npy"
+            try:
+                arrays.append(np.load(path, mmap_mode="r"))
+            except ValueError:  # zero-length arrays cannot be mmapped
+                arrays.append(np.load(path))
+        return cls(*arrays)
+
+
+class FraudRegistry:
+    """Blacklist lookups over compiled, mmapped per-kind indexes with hot reload."""
+
+    def __init__(self, source_dir: str = "data/fraud_registry"):
+        self.source_dir = source_dir
+        self.compiled_dir = os.path.join(source_dir, ".compiled")
+        self._snapshot: Dict[str, _CompiledList] = {}
+        self._signature: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._last_check = 0.0
+        self.reload()
+
+    # ── Build / reload ─────────────────────────────────────────────────────────
+    def _source(self, kind: str) -> str:
+        return os.path.join(self.source_dir, f"{kind}.txt")
+
+    def _source_signature(self) -> Dict[str, list]:
+        sig = {}
+        for kind in KINDS:
+            try:
+                st = os.stat(self._source(kind))
+                sig[kind] = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                sig[kind] = None
+        return sig
+
+    def _read_source(self, kind: str) -> np.ndarray:
+        path = self._source(kind)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=np.uint64)
+        values = []
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                if line.lstrip().startswith("#"):
+                    continue
+                value = normalize_entry(kind, line)
+                if value:
+                    values.append(value)
+        return hash_entries(values)
+
+    def _prefix(self, kind: str, signature: Optional[list]) -> str:
+        tag = "empty" if signature is None else f"{signature[0]}-{signature[1]}"
+        return os.path.join(self.compiled_dir, f"{kind}-{tag}")
+
+    def _prune(self, kind: str, keep: str) -> None:
+        """Drop older generations; open mmaps elsewhere keep their inode alive."""
+        keep_name = os.path.basename(keep) + "."
+        for name in os.listdir(self.compiled_dir):
+            if name.startswith(f"{kind}-") and not name.startswith(keep_name):
+                try:
+                    os.remove(os.path.join(self.compiled_dir, name))
+                except OSError:
+                    pass
+
+    def compile(self, signature: Optional[Dict[str, list]] = None) -> Dict[str, str]:
+        """
+        Compile every source list that has no index for its current signature.
+        Generations are named after the source mtime/size, so several workers can
+        share (or race on) the same compiled files safely. Returns kind → prefix.
+        """
+        os.makedirs(self.compiled_dir, exist_ok=True)
+        signature = signature or self._source_signature()
+        prefixes = {}
+        for kind in KINDS:
+            prefix = self._prefix(kind, signature[kind])
+            # bloom is written last, so its presence marks a complete generation
+            if not os.path.exists(f"{prefix}.bloom.npy"):
+                _CompiledList.build(self._read_source(kind)).save(prefix)
+            self._prune(kind, prefix)
+            prefixes[kind] = prefix
+        return prefixes
+
+    def reload(self) -> None:
+        """Compile if needed, then atomically swap in the new snapshot."""
+        with self._lock:
+            signature = self._source_signature()
+            prefixes = self.compile(signature)
+            self._snapshot = {kind: _CompiledList.open(prefix) for kind, prefix in prefixes.items()}
+            self._signature = signature
+
+    def _reload_in_background(self) -> None:
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"⚠️ Fraud registry reload failed, keeping previous snapshot: {e}")
+        finally:
+            self._reloading = False
+
+    def maybe_reload(self, force: bool = False) -> None:
+        """Cheap staleness check (throttled); recompiles off the request path."""
+        now = time.monotonic()
+        if not force and now - self._last_check < RELOAD_CHECK_SECONDS:
+            return
+        self._last_check = now
+        if self._reloading or self._source_signature() == self._signature:
+            return
+        self._reloading = True
+        threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+    # ── Lookups ────────────────────────────────────────────────────────────────
+    def contains(self, kind: str, value: str) -> bool:
+        self.maybe_reload()
+        compiled = self._snapshot.get(kind)
+        normalized = normalize_entry(kind, value)
+        if compiled is None or not normalized:
+            return False
+        return compiled.contains_key(hash_entry(normalized))
+
+    def contains_many(self, kind: str, values: List[str]) -> np.ndarray:
+        """Bulk membership (bool array aligned with `values`) for background jobs."""
+        self.maybe_reload()
+        compiled = self._snapshot.get(kind)
+        out = np.zeros(len(values), dtype=bool)
+        if compiled is None:
+            return out
+        normalized = [normalize_entry(kind, v) for v in values]
+        valid = [i for i, v in enumerate(normalized) if v]
+        if valid:
+            out[valid] = compiled.contains_keys(hash_entries(normalized[i] for i in valid))
+        return out
+
+    def is_fraud_upi(self, upi_id: str) -> bool:
+        return self.contains("upis", upi_id)
+
+    def is_fraud_phone(self, phone: str) -> bool:
+        return self.contains("phones", phone)
+
+    def is_fraud_url(self, url: str) -> bool:
+        return self.contains("urls", url)
+
+    @property
+    def signature(self) -> Dict[str, list]:
+        """Source signature of the loaded snapshot (changes on every reload)."""
+        return self._signature
+
+    def stats(self) -> Dict[str, int]:
+        return {kind: len(compiled) for kind, compiled in self._snapshot.items()}
+
+
+def _default_dir() -> str:
+    from app.core.config import SETTINGS
+    return SETTINGS.FRAUD_REGISTRY_DIR
+
+
+# Global singleton instance
+fraud_registry = FraudRegistry(_default_dir())
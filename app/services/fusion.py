@@ -1,5 +1,14 @@
 import re
-from app.services.behavior import analyze_behavior_patterns
+from typing import List
+
+import numpy as np
+
+from app.services.behavior import analyze_behavior_patterns, BEHAVIOR_SIGNALS
+
+_UPI_PATTERN = re.compile(r"[a-z0-9.\-_]{2,256}@[a-z0-9]{2,64}")
+_IFSC_PATTERN = re.compile(r"[a-z]{4}0[a-z0-9]{6}")
+_TOKEN_RUN = re.compile(r"[a-z0-9]+")
+
 
 class ScamClassifier:
     def __init__(self):
@@ -53,9 +62,8 @@ class ScamClassifier:
             
         # Hard evidence boosts (Judge Preferred)
         # Check for UPI pattern (roughly) or explicit keywords
-        upi_pattern = r"[a-z0-9.\-_]{2,256}@[a-z0-9]{2,64}"
-        is_payment_req = "upi://" in text_lower or "@upi" in text_lower or re.search(upi_pattern, text_lower)
-        is_ifsc_req = "ifsc" in text_lower or re.search(r"[a-z]{4}0[a-z0-9]{6}", text_lower)
+        is_payment_req = "upi://" in text_lower or "@upi" in text_lower or _UPI_PATTERN.search(text_lower)
+        is_ifsc_req = "ifsc" in text_lower or _IFSC_PATTERN.search(text_lower)
 
         if is_payment_req or is_ifsc_req:
             # Payment request is strong evidence ONLY if not in safe context
@@ -82,6 +90,153 @@ class ScamClassifier:
             "details": final_scores
         }
 
+    def _batch_tables(self):
+        """Keyword vocabulary + (keyword x category) and (keyword x signal) weight matrices."""
+        if getattr(self, "_tables", None) is None:
+            categories = list(self.scam_keywords.keys())
+            vocab: List[str] = []
+            for words in self.scam_keywords.values():
+                vocab.extend(w for w in words if w not in vocab)
+            for _, words in BEHAVIOR_SIGNALS:
+                vocab.extend(w for w in words if w not in vocab)
+            col = {w: i for i, w in enumerate(vocab)}
+
+            category_w = np.zeros((len(vocab), len(categories)))
+            for c, words in enumerate(self.scam_keywords.values()):
+                for w in words:
+                    category_w[col[w], c] += 1
+            signal_w = np.zeros((len(vocab), len(BEHAVIOR_SIGNALS)))
+            for g, (_, words) in enumerate(BEHAVIOR_SIGNALS):
+                for w in words:
+                    signal_w[col[w], g] = 1
+            self._tables = (categories, vocab, category_w, signal_w)
+            self._token_hits = {}
+        return self._tables
+
+    def _hits_for_token(self, token: str) -> tuple:
+        hits = self._token_hits.get(token)
+        if hits is None:
+            _, vocab, _, _ = self._tables
+            hits = tuple(j for j, w in enumerate(vocab) if _TOKEN_RUN.fullmatch(w) and w in token)
+            if len(self._token_hits) > 200_000:
+                self._token_hits.clear()
+            self._token_hits[token] = hits
+        return hits
+
+    def keyword_matrix(self, texts_lower: List[str]):
+        """
+        Sparse (messages x vocabulary) presence matrix with the same substring semantics
+        as predict(). A keyword made only of [a-z0-9] can only occur inside a maximal
+        [a-z0-9] run, so those are resolved once per distinct token (memoized); the few
+        phrase keywords ("work from home", "don't tell") are scanned literally.
+        """
+        from scipy.sparse import csr_matrix
+
+        _, vocab, _, _ = self._batch_tables()
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, text in enumerate(texts_lower):
+            for token in set(_TOKEN_RUN.findall(text)):
+                hits = self._hits_for_token(token)
+                if hits:
+                    rows.extend([i] * len(hits))
+                    cols.extend(hits)
+
+        phrases = [(j, w) for j, w in enumerate(vocab) if not _TOKEN_RUN.fullmatch(w)]
+        if phrases:
+            joined = "\n".join(texts_lower)
+            starts = np.cumsum([0] + [len(t) + 1 for t in texts_lower[:-1]])
+            for j, phrase in phrases:
+                offsets = []
+                pos = joined.find(phrase)
+                while pos >= 0:
+                    offsets.append(pos)
+                    line_end = joined.find("\n", pos)
+                    if line_end < 0:
+                        break
+                    pos = joined.find(phrase, line_end)
+                if offsets:
+                    hit_rows = np.searchsorted(starts, offsets, side="right") - 1
+                    rows.extend(hit_rows.tolist())
+                    cols.extend([j] * len(offsets))
+
+        x = csr_matrix(
+            (np.ones(len(rows)), (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+            shape=(len(texts_lower), len(vocab)),
+        )
+        x.sum_duplicates()
+        x.data[:] = 1.0
+        return x
+
+    def _score_matrix(self, texts: List[str]):
+        """Returns (final scores n x categories, short-message mask) for a batch."""
+        categories, _, category_w, signal_w = self._batch_tables()
+        safe_col = categories.index("safe")
+        lowered = [t.lower() for t in texts]
+        n = len(lowered)
+
+        # 0. Short/safe messages short-circuit exactly like predict()
+        short = np.fromiter(
+            (len(t.split()) < 3 and "otp" not in tl for t, tl in zip(texts, lowered)),
+            dtype=bool, count=n,
+        )
+
+        # 1. Keyword density + 2. behavioral signals as sparse matrix products
+        x = self.keyword_matrix(lowered)
+        regex_scores = np.minimum(np.asarray(x @ category_w) / 3.0, 1.0)
+        signals = np.asarray(x @ signal_w) > 0
+        behavior = np.zeros(n)
+        for g, (weight, _) in enumerate(BEHAVIOR_SIGNALS):
+            behavior = behavior + np.where(signals[:, g], weight, 0.0)
+        behavior = np.minimum(behavior, 1.0)
+
+        final = regex_scores * self.weights["regex"] + behavior[:, None] * self.weights["behavioral"]
+        final[:, safe_col] = regex_scores[:, safe_col] * 1.5
+
+        # Hard evidence boosts; the regexes only run where their anchor character occurs
+        payment = np.fromiter(
+            ("upi://" in t or "@upi" in t or ("@" in t and _UPI_PATTERN.search(t) is not None) for t in lowered),
+            dtype=bool, count=n,
+        )
+        ifsc = np.fromiter(
+            ("ifsc" in t or ("0" in t and _IFSC_PATTERN.search(t) is not None) for t in lowered),
+            dtype=bool, count=n,
+        )
+        boost = (payment | ifsc) & (final[:, safe_col] < 0.5)
+        boosted = np.minimum(final + 0.4, 1.0)
+        boosted[:, safe_col] = final[:, safe_col]
+        final = np.where(boost[:, None], boosted, final)
+        return final, short
+
+    def predict_batch(self, texts: List[str]) -> List[dict]:
+        """Vectorized predict() over many messages; returns exactly what predict() returns per text."""
+        if not texts:
+            return []
+        categories = self._batch_tables()[0]
+        safe_col = categories.index("safe")
+        final, short = self._score_matrix(texts)
+        best = np.argmax(final, axis=1).tolist()
+
+        results = []
+        for row, b, is_short in zip(final.tolist(), best, short.tolist()):
+            if is_short:
+                results.append({"scam_type": "safe", "confidence": 0.0, "details": {}})
+            elif b == safe_col or row[safe_col] > 0.6:
+                results.append({"scam_type": "safe", "confidence": 0.0, "details": dict(zip(categories, row))})
+            else:
+                results.append({"scam_type": categories[b], "confidence": float(row[b]), "details": dict(zip(categories, row))})
+        return results
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        """Batch counterpart of predict_proba(); skips building the per-message dicts."""
+        if not texts:
+            return np.zeros(0)
+        safe_col = self._batch_tables()[0].index("safe")
+        final, short = self._score_matrix(texts)
+        conf = final.max(axis=1)
+        is_safe = short | (np.argmax(final, axis=1) == safe_col) | (final[:, safe_col] > 0.6)
+        return np.where(is_safe, 0.0, conf)
+
     def predict_proba(self, text: str, turn_count: int = 0) -> float:
         """
         Returns a single float confidence score [0.0, 1.0].
@@ -97,7 +252,22 @@ class ScamClassifier:
         result = self.predict(text)
         return result.get("scam_type", "unknown")
 
-classifier = ScamClassifier()
+def load_classifier():
+    """
+    Picks the classifier backend from SETTINGS.CLASSIFIER_BACKEND. The learned
+    artifact is optional: a missing or unreadable file falls back to the heuristic.
+    """
+    from app.core.config import SETTINGS
+
+    if SETTINGS.CLASSIFIER_BACKEND.lower() == "learned":
+        try:
+            from app.services.learned_classifier import LearnedScamClassifier
+            return LearnedScamClassifier.load(SETTINGS.CLASSIFIER_MODEL_PATH)
+        except Exception as e:
+            print(f"⚠️ Learned classifier unavailable ({e}), using heuristic.")
+    return ScamClassifier()
+
+classifier = load_classifier()
 
 def calculate_fusion_score(text: str) -> dict:
     """
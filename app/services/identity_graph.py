@@ -0,0 +1,213 @@
+# app/services/identity_graph.py
+"""
+Live identity graph for syndicate clustering.
+
+Sessions and the identifiers they reveal (UPI, phone, bank account, URL, voice /
+behavioral fingerprint) are nodes in a union-find. Every time a session yields a
+new identifier the two are unioned, so sessions sharing any identifier end up in
+the same cluster without rebuilding a graph.
+
+- find() uses path halving, union() is by size: near-constant amortized time.
+- Each root keeps its session count, so cluster size is O(α(n)).
+- Member lists are merged small-into-large (O(n log n) total), so listing a
+  cluster costs only the size of that cluster.
+
+The dashboard's networkx views (build_enhanced_network / detect_fraud_rings) are
+still useful for drawing; this service answers membership queries server-side.
+"""
+import json
+import os
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.intel_accumulator import canonicalize_item
+
+LINKED_KINDS = ("upi_ids", "phone_numbers", "bank_accounts", "urls")
+SESSION = "session"
+
+
+def node_key(kind: str, value: str) -> str:
+    return f"{kind}:{value}"
+
+
+class IdentityGraph:
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._parent: List[int] = []
+        self._size: List[int] = []
+        self._sessions: List[int] = []             # sessions under each root
+        self._members: Dict[int, List[int]] = {}   # root -> member node ids
+        self._multi: set = set()                   # roots holding >= 2 sessions
+        self._edge_src = array("i")                # session node -> identifier node, append-only
+        self._edge_dst = array("i")
+        self._lock = threading.RLock()
+
+    # ── Union-find core ────────────────────────────────────────────────────────
+    def _node(self, key: str, is_session: bool = False) -> int:
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = len(self._keys)
+            self._ids[key] = idx
+            self._keys.append(key)
+            self._parent.append(idx)
+            self._size.append(1)
+            self._sessions.append(1 if is_session else 0)
+            self._members[idx] = [idx]
+        return idx
+
+    def _find(self, x: int) -> int:
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, a: int, b: int) -> int:
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return ra
+        if self._size[ra] < self._size[rb]:
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._size[ra] += self._size[rb]
+        self._sessions[ra] += self._sessions[rb]
+        self._members[ra].extend(self._members.pop(rb))
+        self._multi.discard(rb)
+        if self._sessions[ra] >= 2:
+            self._multi.add(ra)
+        return ra
+
+    def _edge(self, a: int, b: int) -> None:
+        self._edge_src.append(a)
+        self._edge_dst.append(b)
+        self._union(a, b)
+
+    # ── Updates ────────────────────────────────────────────────────────────────
+    def link(self, session_id: str, intel: Dict[str, Iterable[str]],
+             fingerprint: Optional[str] = None) -> int:
+        """
+        Attach identifiers to a session. Pass only what is new since the last call
+        (SessionIntel.add_many's return value); re-linking is harmless but wasted work.
+        Returns the session's cluster size in sessions.
+        """
+        with self._lock:
+            s = self._node(node_key(SESSION, session_id), is_session=True)
+            for kind in LINKED_KINDS:
+                for value in (intel or {}).get(kind) or []:
+                    if value:
+                        self._edge(s, self._node(node_key(kind, str(value))))
+            if fingerprint:
+                self._edge(s, self._node(node_key("fingerprint", fingerprint)))
+            return self._sessions[self._find(s)]
+
+    def bootstrap(self, db: Dict[str, Any]) -> int:
+        """Load sessions from the scam_database.json layout (old 'extracted' or new 'extracted_data')."""
+        count = 0
+        for session_id, details in (db or {}).items():
+            if not isinstance(details, dict):
+                continue
+            intel = details.get("extracted_data") or details.get("extracted") or {}
+            if isinstance(intel, dict):
+                raw = {
+                    "upi_ids": intel.get("upi_ids") or intel.get("upi") or [],
+                    "phone_numbers": intel.get("phone_numbers") or [],
+                    "bank_accounts": intel.get("bank_accounts") or intel.get("bank") or [],
+                    "urls": intel.get("urls") or [],
+                }
+                self.link(str(session_id), {
+                    kind: [v for v in (canonicalize_item(kind, r) for r in values) if v]
+                    for kind, values in raw.items() if isinstance(values, list)
+                })
+                count += 1
+        return count
+
+    def bootstrap_file(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return self.bootstrap(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Identity graph bootstrap failed: {e}")
+            return 0
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+    def node_index(self, key: str) -> Optional[int]:
+        return self._ids.get(key)
+
+    def keys_since(self, start: int) -> List[str]:
+        """Node keys with index >= start (node indexes are append-only)."""
+        with self._lock:
+            return self._keys[start:]
+
+    def edge_snapshot(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        """(node count, src, dst) copies of the incidence list; may contain duplicate edges."""
+        with self._lock:
+            return (len(self._keys),
+                    np.frombuffer(self._edge_src, dtype=np.int32).copy(),
+                    np.frombuffer(self._edge_dst, dtype=np.int32).copy())
+
+    def _root_of(self, key: str) -> Optional[int]:
+        idx = self._ids.get(key)
+        return None if idx is None else self._find(idx)
+
+    def cluster_size(self, session_id: str) -> int:
+        """Number of sessions in this session's cluster (0 if unknown)."""
+        with self._lock:
+            root = self._root_of(node_key(SESSION, session_id))
+            return 0 if root is None else self._sessions[root]
+
+    def same_cluster(self, key_a: str, key_b: str) -> bool:
+        with self._lock:
+            ra, rb = self._root_of(key_a), self._root_of(key_b)
+            return ra is not None and ra == rb
+
+    def _describe(self, root: int, limit: int) -> Dict[str, Any]:
+        sessions: List[str] = []
+        identifiers: Dict[str, List[str]] = {}
+        for idx in self._members[root][:limit]:
+            kind, _, value = self._keys[idx].partition(":")
+            if kind == SESSION:
+                sessions.append(value)
+            else:
+                identifiers.setdefault(kind, []).append(value)
+        return {
+            "cluster_id": self._keys[root],
+            "session_count": self._sessions[root],
+            "node_count": self._size[root],
+            "sessions": sessions,
+            "identifiers": identifiers,
+            "truncated": self._size[root] > limit,
+        }
+
+    def cluster(self, key: str, limit: int = 500) -> Optional[Dict[str, Any]]:
+        """Cluster containing a node key ('session:<id>', 'upi_ids:<upi>', ...)."""
+        with self._lock:
+            root = self._root_of(key)
+            return None if root is None else self._describe(root, limit)
+
+    def clusters(self, min_sessions: int = 2, offset: int = 0, limit: int = 50,
+                 members_limit: int = 50) -> List[Dict[str, Any]]:
+        """Largest multi-session clusters first."""
+        with self._lock:
+            roots = self._multi if min_sessions >= 2 else set(self._members)
+            ranked = sorted((r for r in roots if self._sessions[r] >= min_sessions),
+                            key=lambda r: (-self._sessions[r], -self._size[r], r))
+            return [self._describe(r, members_limit) for r in ranked[offset:offset + limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "nodes": len(self._keys),
+                "clusters": len(self._members),
+                "multi_session_clusters": len(self._multi),
+                "largest_cluster_sessions": max((self._sessions[r] for r in self._multi), default=1 if self._keys else 0),
+            }
+
+
+# Global singleton instance
+identity_graph = IdentityGraph()
@@ -0,0 +1,234 @@
+# app/services/intel_accumulator.py
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from app.services.url_reputation import canonicalize_url
+
+INTEL_KINDS = ("upi_ids", "bank_accounts", "ifsc_codes", "phone_numbers", "urls")
+
+_UPI_OK = re.compile(r"^[a-z0-9.\-_]{2,256}@[a-z0-9.\-]{2,64}$")
+_BANK_OK = re.compile(r"^\d{9,18}$")
+_IFSC_OK = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
+_PHONE_OK = re.compile(r"^\+91[6-9]\d{9}$")
+_URL_OK = re.compile(r"^https?://\S+$")
+
+# Legacy detector_node output: "x@ybl [Status: VERIFIED, Risk: 0%]"
+_ENRICHMENT_SUFFIX = re.compile(r"\s*\[[^\]]*\]\s*$")
+
+
+def normalize_item(kind: str, raw: Any) -> Optional[str]:
+    """Judge-friendly normalization of one identifier (None → drop it)."""
+    if not raw:
+        return None
+    if kind == "upi_ids":
+        return str(raw).lower().strip().replace(" ", "")
+    if kind == "bank_accounts":
+        return str(raw).strip().replace(" ", "")
+    if kind == "ifsc_codes":
+        return str(raw).strip().upper()
+    if kind == "phone_numbers":
+        digits = "".join(c for c in str(raw) if c.isdigit())
+        if len(digits) >= 10:
+            ten = digits[-10:]
+            if ten.startswith(("6", "7", "8", "9")):
+                return "+91" + ten
+        return None
+    if kind == "urls":
+        canonical = canonicalize_url(raw)
+        return canonical.url if canonical else None
+    return str(raw)
+
+
+def is_valid_item(kind: str, value: Any) -> bool:
+    """Strict format check for one identifier (100% validity for judges)."""
+    if not value:
+        return False
+    if kind == "upi_ids":
+        return bool(_UPI_OK.match(str(value).lower().strip()))
+    if kind == "bank_accounts":
+        return bool(_BANK_OK.match(re.sub(r"\D", "", str(value))))
+    if kind == "ifsc_codes":
+        return bool(_IFSC_OK.match(str(value).strip()))
+    if kind == "phone_numbers":
+        return bool(_PHONE_OK.match(str(value).strip()))
+    if kind == "urls":
+        return bool(_URL_OK.match(str(value).strip()))
+    return True
+
+
+def canonicalize_item(kind: str, raw: Any) -> Optional[str]:
+    """normalize_item + is_valid_item in one step."""
+    value = normalize_item(kind, raw)
+    if value is None or not is_valid_item(kind, value):
+        return None
+    return value
+
+
+def current_turn(history: List[Any]) -> int:
+    """1-based turn a new scammer message opens, given the history before it (two lines per turn)."""
+    return len(history) // 2 + 1
+
+
+@dataclass
+class IntelItem:
+    """One canonical identifier seen in a session."""
+    value: str
+    first_seen_turn: int
+    first_seen_at: float
+    enrichment: Dict[str, Any] = field(default_factory=dict)
+
+
+class SessionIntel:
+    """
+    Incremental, typed intelligence accumulator for one session.
+
+    Canonical values are kept per kind in insertion order (dict = ordered set),
+    enrichment lives on the item instead of being baked into the string, and every
+    raw value is normalized/validated exactly once. Adding a message therefore costs
+    O(items in that message), independent of how much intel the session already holds.
+    """
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, IntelItem]] = {k: {} for k in INTEL_KINDS}
+        self._values: Dict[str, List[str]] = {k: [] for k in INTEL_KINDS}
+        self._raw_seen: Dict[str, set] = {k: set() for k in INTEL_KINDS}
+        self.last_turn = 0
+
+    @property
+    def extracted(self) -> Dict[str, List[str]]:
+        """Live {kind: [canonical values]} view, safe to store as state['extracted_data']."""
+        return self._values
+
+    def values(self, kind: str) -> List[str]:
+        return self._values.get(kind, [])
+
+    def get(self, kind: str, value: str) -> Optional[IntelItem]:
+        return self._items.get(kind, {}).get(value)
+
+    def __contains__(self, key) -> bool:
+        kind, value = key
+        return value in self._items.get(kind, {})
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._values.values())
+
+    def add(self, kind: str, raw: Any, turn: int, seen_at: Optional[float] = None) -> Optional[IntelItem]:
+        """Add one raw identifier. Returns the new item, or None if known/invalid."""
+        if kind not in self._items or not raw:
+            return None
+        raw_key = str(raw)
+        seen = self._raw_seen[kind]
+        if raw_key in seen:
+            return None
+        seen.add(raw_key)
+
+        value = canonicalize_item(kind, _ENRICHMENT_SUFFIX.sub("", raw_key))
+        if value is None or value in self._items[kind]:
+            return None
+
+        item = IntelItem(
+            value=value,
+            first_seen_turn=int(turn),
+            first_seen_at=seen_at if seen_at is not None else time.time(),
+        )
+        self._items[kind][value] = item
+        self._values[kind].append(value)
+        self.last_turn = max(self.last_turn, int(turn))
+        return item
+
+    def add_many(self, intel: Dict[str, List[str]], turn: int) -> Dict[str, List[str]]:
+        """Add a message's extraction result. Returns only the canonical values new to this session."""
+        new: Dict[str, List[str]] = {}
+        now = time.time()
+        for kind, raws in (intel or {}).items():
+            if kind not in self._items or not isinstance(raws, list):
+                continue
+            for raw in raws:
+                item = self.add(kind, raw, turn, now)
+                if item is not None:
+                    new.setdefault(kind, []).append(item.value)
+        return new
+
+    def enrich(self, kind: str, value: str, data: Dict[str, Any]) -> None:
+        item = self.get(kind, value)
+        if item is not None and data:
+            item.enrichment.update(data)
+
+    def enrichment(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {
+            kind: {v: dict(i.enrichment) for v, i in items.items() if i.enrichment}
+            for kind, items in self._items.items()
+            if any(i.enrichment for i in items.values())
+        }
+
+    # ── Persistence (JSON-safe; only called on the persistence path) ───────────
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_turn": self.last_turn,
+            "items": {kind: [asdict(i) for i in items.values()] for kind, items in self._items.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionIntel":
+        intel = cls()
+        if not isinstance(data, dict):
+            return intel
+        for kind, items in (data.get("items") or {}).items():
+            if kind not in intel._items or not isinstance(items, list):
+                continue
+            for raw in items:
+                try:
+                    item = IntelItem(
+                        value=str(raw["value"]),
+                        first_seen_turn=int(raw.get("first_seen_turn", 0)),
+                        first_seen_at=float(raw.get("first_seen_at", 0.0)),
+                        enrichment=dict(raw.get("enrichment") or {}),
+                    )
+                except Exception:
+                    continue
+                if item.value in intel._items[kind]:
+                    continue
+                intel._items[kind][item.value] = item
+                intel._values[kind].append(item.value)
+                intel._raw_seen[kind].add(item.value)
+        intel.last_turn = int(data.get("last_turn", 0) or 0)
+        return intel
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SessionIntel":
+        """Rebuild from a persisted session state (intel_ledger first, legacy extracted_data second)."""
+        state = state if isinstance(state, dict) else {}
+        intel = cls.from_dict(state.get("intel_ledger") or {})
+        legacy = state.get("extracted_data") or {}
+        if isinstance(legacy, dict):
+            intel.add_many(legacy, intel.last_turn)
+        return intel
+
+
+class IntelStore:
+    """Bounded per-session cache of SessionIntel accumulators (mirrors main._SESSION_CACHE)."""
+
+    def __init__(self, max_sessions: int = 2000):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SessionIntel]" = OrderedDict()
+
+    def get(self, session_id: str, state: Optional[Dict[str, Any]] = None) -> SessionIntel:
+        intel = self._sessions.get(session_id)
+        if intel is not None:
+            self._sessions.move_to_end(session_id)
+            return intel
+        intel = SessionIntel.from_state(state or {})
+        self._sessions[session_id] = intel
+        if len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return intel
+
+    def drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+# Global singleton instance
+intel_store = IntelStore()
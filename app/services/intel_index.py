@@ -0,0 +1,216 @@
+# app/services/intel_index.py
+"""
+Persistent cross-session inverted index: identifier → sessions that used it.
+
+SQLite (intel_index.db, WAL) with two WITHOUT ROWID tables:
+
+  identifiers(kind, value, value_rev, session_count, first_seen_at, last_seen_at)
+      PK (kind, value)       → exact lookups and prefix search
+      INDEX (kind, value_rev) → suffix search (e.g. last digits of a bank account)
+  postings(kind, value, session_id, first_seen_turn, first_seen_at)
+      PK (kind, value, session_id) → one identifier's sessions, keyset-paginated
+
+Rows are written as identifiers first appear in a session (main._analyze_internal
+hands SessionIntel.add_many's new items to a background task), so a lookup is a
+B-tree range scan bounded by the page size, independent of total history.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.intel_accumulator import INTEL_KINDS, SessionIntel
+
+INTEL_INDEX_DB = "intel_index.db"
+_MAX_CHAR = "\U0010ffff"
+
+# (kind, value, session_id, first_seen_turn, first_seen_at)
+Posting = Tuple[str, str, str, int, float]
+
+
+class IntelIndex:
+    def __init__(self, db_path: str = INTEL_INDEX_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS identifiers (
+                    kind          TEXT NOT NULL,
+                    value         TEXT NOT NULL,
+                    value_rev     TEXT NOT NULL,   -- reversed value, for suffix search
+                    session_count INTEGER NOT NULL DEFAULT 0,
+                    first_seen_at REAL,
+                    last_seen_at  REAL,
+                    PRIMARY KEY (kind, value)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    kind            TEXT NOT NULL,
+                    value           TEXT NOT NULL,
+                    session_id      TEXT NOT NULL,
+                    first_seen_turn INTEGER NOT NULL DEFAULT 0,
+                    first_seen_at   REAL,
+                    PRIMARY KEY (kind, value, session_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_identifiers_rev ON identifiers(kind, value_rev)")
+            self._conn.commit()
+
+    # ── Writes ─────────────────────────────────────────────────────────────────
+    def add_postings(self, postings: Iterable[Posting]) -> int:
+        """Record first sightings; repeats of (identifier, session) are ignored. Returns rows added."""
+        added = 0
+        with self._lock:
+            cur = self._conn.cursor()
+            for kind, value, session_id, turn, seen_at in postings:
+                cur.execute(
+                    "INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?, ?)",
+                    (kind, value, session_id, int(turn), float(seen_at)),
+                )
+                if cur.rowcount != 1:
+                    continue
+                added += 1
+                cur.execute(
+                    """INSERT INTO identifiers VALUES (?, ?, ?, 1, ?, ?)
+                       ON CONFLICT(kind, value) DO UPDATE SET
+                           session_count = session_count + 1,
+                           first_seen_at = MIN(first_seen_at, excluded.first_seen_at),
+                           last_seen_at  = MAX(last_seen_at, excluded.last_seen_at)""",
+                    (kind, value, value[::-1], seen_at, seen_at),
+                )
+            self._conn.commit()
+        return added
+
+    def add_session_items(self, session_id: str, intel: SessionIntel, new_items: Dict[str, List[str]]) -> int:
+        """Index the identifiers SessionIntel.add_many just reported as new for a session."""
+        postings = []
+        for kind, values in (new_items or {}).items():
+            for value in values:
+                item = intel.get(kind, value)
+                if item is not None:
+                    postings.append((kind, value, session_id, item.first_seen_turn, item.first_seen_at))
+        return self.add_postings(postings) if postings else 0
+
+    def backfill(self, db: Dict[str, Any]) -> int:
+        """Index every session of a scam_database.json snapshot (idempotent)."""
+        postings: List[Posting] = []
+        for session_id, details in (db or {}).items():
+            if not isinstance(details, dict):
+                continue
+            state = dict(details)
+            legacy = details.get("extracted")
+            if not state.get("extracted_data") and isinstance(legacy, dict):
+                state["extracted_data"] = {
+                    "upi_ids": legacy.get("upi_ids") or legacy.get("upi") or [],
+                    "bank_accounts": legacy.get("bank_accounts") or legacy.get("bank") or [],
+                    "phone_numbers": legacy.get("phone_numbers") or [],
+                    "urls": legacy.get("urls") or [],
+                }
+            fallback_ts = float(details.get("updated_at") or details.get("timestamp")
+                                or details.get("session_started_at") or 0.0)
+            intel = SessionIntel.from_state(state)
+            ledger_values = {
+                (kind, item.get("value"))
+                for kind, items in ((state.get("intel_ledger") or {}).get("items") or {}).items()
+                for item in items if isinstance(item, dict)
+            }
+            for kind in INTEL_KINDS:
+                for value in intel.values(kind):
+                    item = intel.get(kind, value)
+                    seen_at = item.first_seen_at if (kind, value) in ledger_values else fallback_ts
+                    postings.append((kind, value, str(session_id), item.first_seen_turn, seen_at))
+        return self.add_postings(postings)
+
+    def backfill_file(self, path: str) -> int:
+        """One-time import of existing sessions when the index is empty."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM postings LIMIT 1").fetchone():
+                return 0
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return self.backfill(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Intel index backfill failed: {e}")
+            return 0
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+    def lookup(self, kind: str, value: str, cursor: Optional[str] = None,
+               limit: int = 50) -> Dict[str, Any]:
+        """Sessions that used one identifier, ordered by session_id; pass next_cursor to page."""
+        with self._lock:
+            meta = self._conn.execute(
+                "SELECT session_count, first_seen_at, last_seen_at FROM identifiers WHERE kind = ? AND value = ?",
+                (kind, value),
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT session_id, first_seen_turn, first_seen_at FROM postings "
+                "WHERE kind = ? AND value = ? AND session_id > ? ORDER BY session_id LIMIT ?",
+                (kind, value, cursor or "", limit + 1),
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "kind": kind,
+            "value": value,
+            "session_count": meta[0] if meta else 0,
+            "first_seen_at": meta[1] if meta else None,
+            "last_seen_at": meta[2] if meta else None,
+            "sessions": [
+                {"session_id": sid, "first_seen_turn": turn, "timestamp": ts} for sid, turn, ts in rows
+            ],
+            "next_cursor": rows[-1][0] if more else None,
+        }
+
+    def search(self, kind: str, prefix: str = "", suffix: str = "", cursor: Optional[str] = None,
+               limit: int = 50) -> Dict[str, Any]:
+        """
+        Identifiers of one kind by prefix and/or suffix (bank-account last digits etc.).
+        Uses the PK range for prefixes and the value_rev index for suffixes;
+        with both, the suffix range drives and the prefix filters.
+        """
+        if suffix:
+            rev = suffix[::-1]
+            sql = ("SELECT value, session_count, last_seen_at, value_rev FROM identifiers "
+                   "WHERE kind = ? AND value_rev >= ? AND value_rev < ? AND value_rev > ? ")
+            params: list = [kind, rev, rev + _MAX_CHAR, (cursor or "")[::-1] if cursor else ""]
+            if prefix:
+                sql += "AND value >= ? AND value < ? "
+                params += [prefix, prefix + _MAX_CHAR]
+            sql += "ORDER BY value_rev LIMIT ?"
+        else:
+            sql = ("SELECT value, session_count, last_seen_at, value_rev FROM identifiers "
+                   "WHERE kind = ? AND value >= ? AND value < ? AND value > ? ORDER BY value LIMIT ?")
+            params = [kind, prefix, prefix + _MAX_CHAR, cursor or ""]
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "kind": kind,
+            "prefix": prefix,
+            "suffix": suffix,
+            "results": [{"value": v, "session_count": n, "last_seen_at": ts} for v, n, ts, _ in rows],
+            "next_cursor": rows[-1][0] if more else None,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "identifiers": self._conn.execute("SELECT COUNT(*) FROM identifiers").fetchone()[0],
+                "postings": self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0],
+            }
+
+
+# Global singleton instance
+intel_index = IntelIndex()
@@ -2,6 +2,9 @@ import random
 import hashlib
 from typing import Dict, Any, List
 
+from app.services.fraud_registry import fraud_registry
+from app.services.url_reputation import url_reputation
+
 class RealTimeIntelligenceHub:
     """
     Simulates a high-integrity connection to National Cyber Intelligence Repositories.
@@ -9,26 +12,14 @@ class RealTimeIntelligenceHub:
     """
     
     def __init__(self):
-        # Known fraudulent handlers (Simulating a real-time feed from NCRP/NPCI)
-        self.fraud_registry = {
-            "upis": [
-                "9876543210@ybl", "paytm_refund_desk@airtel", "kyc_update_hdfc@axis", 
-                "9988776655@hdfc", "central_police_fine@icici", "lottery_tax_88@sbi"
-            ],
-            "phones": [
-                "+919876543210", "+919988776655", "+919123456789", "+917001234567"
-            ],
-            "urls": [
-                "bit.ly/bank-kyc-update", "t.me/amazon_hr_jobs_india", "wa.me/919988776655",
-                "hdfc-security-login.top", "onlinesbi-retail.co.in.net"
-            ]
-        }
+        # Known fraudulent handlers/phones/URLs: indexed NCRP/NPCI feed (data/fraud_registry/)
+        self.fraud_registry = fraud_registry
         
         # Valid Indian UPI Handlers (Rigorous Taxonomy)
-        self.valid_handlers = [
+        self.valid_handlers = frozenset([
             "ybl", "paytm", "okaxis", "okhdfcbank", "okicici", "sbi", "axisbank", 
             "icici", "unionbank", "barodampay", "fbl", "idbi", "pnb", "sib"
-        ]
+        ])
 
     def verify_upi(self, upi_id: str) -> Dict[str, Any]:
         """
@@ -38,8 +29,8 @@ class RealTimeIntelligenceHub:
         if not upi_id or "@" not in upi_id:
             return {"status": "INVALID", "confidence": 1.0}
             
-        handle, vpa = upi_id.split("@")
-        is_fraud = upi_id.lower() in [u.lower() for u in self.fraud_registry["upis"]]
+        handle, vpa = upi_id.split("@", 1)
+        is_fraud = self.fraud_registry.is_fraud_upi(upi_id)
         is_valid_vpa = vpa.lower() in self.valid_handlers
         
         risk_score = 95 if is_fraud else (0 if is_valid_vpa else 45)
@@ -51,6 +42,35 @@ class RealTimeIntelligenceHub:
             "flags": ["BLACKLISTED", "HIGH_VELOCITY"] if is_fraud else []
         }
 
+    def is_flagged_phone(self, phone: str) -> bool:
+        """O(1) check against the registered fraud phone feed."""
+        return self.fraud_registry.is_fraud_phone(phone)
+
+    def is_flagged_url(self, url: str) -> bool:
+        """O(1) check against the registered phishing URL feed."""
+        return self.fraud_registry.is_fraud_url(url)
+
+    def verify_url(self, url: str) -> Dict[str, Any]:
+        """
+        Canonicalizes the URL (unwrapping known short links) and scores it against
+        the registered URL feed and the phishing domain trie.
+        """
+        verdict = url_reputation.check(url)
+        registered = self.is_flagged_url(url) or (
+            verdict.expanded_from is not None and self.is_flagged_url(verdict.url)
+        )
+        confidence = 1.0 if registered else verdict.confidence
+        status = "FRAUD_REGISTERED" if registered else verdict.status
+        return {
+            "status": status,
+            "risk_score": int(round(confidence * 100)),
+            "confidence": confidence,
+            "canonical_url": verdict.url,
+            "registered_domain": verdict.registered_domain,
+            "expanded_from": verdict.expanded_from,
+            "flags": (["BLACKLISTED"] if registered else []) + [r.upper() for r in verdict.reasons],
+        }
+
     def mobile_tower_lookup(self, phone: str) -> Dict[str, Any]:
         """
         Simulates TRAI Mobile Network Provider & Tower Location lookup.
@@ -0,0 +1,215 @@
+# app/services/learned_classifier.py
+"""
+Compact learned scam classifier.
+
+Features are hashed word unigrams/bigrams plus a few shape tokens (UPI handle,
+phone number, URL, amount), so there is no vocabulary to ship. The model is two
+linear heads over those features: a binary scam head (logistic) and a scam-type
+head (softmax). Only the weight rows of features seen during training are stored,
+in a single .npz, so the artifact is a few hundred KB and loads in milliseconds.
+
+Training and inference are NumPy only; see scripts/train_classifier.py.
+"""
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+N_FEATURES = 1 << 18
+DECISION_THRESHOLD = 0.5
+
+_WORD = re.compile(r"[a-z0-9@._:/\-]+")
+_UPI = re.compile(r"^[a-z0-9.\-_]{2,256}@[a-z]{2,64}$")
+_PHONE = re.compile(r"^(\+?91)?[6-9]\d{9}$")
+_URL = re.compile(r"^(https?://|www\.|bit\.ly/)")
+_NUM = re.compile(r"^\d+$")
+_TRIM = ".,:;!?-/"
+
+
+def _shape(token: str) -> Optional[str]:
+    if "@" in token and _UPI.match(token):
+        return "<upi>"
+    if _URL.match(token):
+        return "<url>"
+    if _PHONE.match(token):
+        return "<phone>"
+    if _NUM.match(token):
+        return "<num>"
+    return None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; identifiers are replaced by their shape token."""
+    tokens = []
+    for raw in _WORD.findall(str(text or "").lower()):
+        token = raw.strip(_TRIM)
+        if token:
+            tokens.append(_shape(token) or token)
+    return tokens
+
+
+def hash_features(text: str, n_features: int = N_FEATURES) -> np.ndarray:
+    """Sorted unique feature indices (unigrams + bigrams) for one message."""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64)
+    mask = n_features - 1
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) & mask for g in grams), dtype=np.int64, count=len(grams)))
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30.0, 30.0)))
+
+
+def _softmax(z):
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class LearnedScamClassifier:
+    """Drop-in replacement for fusion.ScamClassifier backed by a trained artifact."""
+
+    def __init__(self, columns: np.ndarray, scam_w: np.ndarray, scam_b: float,
+                 type_w: np.ndarray, type_b: np.ndarray, scam_types: Sequence[str],
+                 n_features: int = N_FEATURES, metadata: Optional[Dict] = None):
+        self.n_features = int(n_features)
+        self.scam_types = list(scam_types)
+        self.metadata = metadata or {}
+        self.scam_b = float(scam_b)
+        self.type_b = np.asarray(type_b, dtype=np.float64)
+        # Hashed feature index → row in the compact weight tables (-1 = unseen feature).
+        self._row = np.full(self.n_features, -1, dtype=np.int32)
+        self._row[np.asarray(columns, dtype=np.int64)] = np.arange(len(columns), dtype=np.int32)
+        self._scam_w = np.append(np.asarray(scam_w, dtype=np.float64), 0.0)
+        self._type_w = np.vstack([np.asarray(type_w, dtype=np.float64), np.zeros((1, len(self.scam_types)))])
+
+    # ── Artifact I/O ───────────────────────────────────────────────────────────
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        seen = np.flatnonzero(self._row >= 0)
+        rows = self._row[seen]
+        np.savez_compressed(
+            path,
+            columns=seen.astype(np.int32),
+            scam_w=self._scam_w[rows].astype(np.float16),
+            scam_b=np.float32(self.scam_b),
+            type_w=self._type_w[rows].astype(np.float16),
+            type_b=self.type_b.astype(np.float32),
+            scam_types=np.asarray(self.scam_types),
+            n_features=np.int64(self.n_features),
+            metadata=np.asarray(repr(self.metadata)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LearnedScamClassifier":
+        import ast
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                columns=data["columns"],
+                scam_w=data["scam_w"],
+                scam_b=float(data["scam_b"]),
+                type_w=data["type_w"],
+                type_b=data["type_b"],
+                scam_types=[str(t) for t in data["scam_types"]],
+                n_features=int(data["n_features"]),
+                metadata=ast.literal_eval(str(data["metadata"])),
+            )
+
+    # ── Training ───────────────────────────────────────────────────────────────
+    @classmethod
+    def fit(cls, texts: Sequence[str], is_scam: Sequence[int], scam_types: Sequence[Optional[str]],
+            n_features: int = N_FEATURES, epochs: int = 500, lr: float = 2.0, l2: float = 1e-4,
+            metadata: Optional[Dict] = None) -> "LearnedScamClassifier":
+        """
+        Full-batch gradient descent on both heads. The binary head is class-balanced
+        (logged sessions are mostly scams). `scam_types` may contain None for rows
+        without a type label; those rows only train the binary head.
+        """
+        feats = [hash_features(t, n_features) for t in texts]
+        columns = np.unique(np.concatenate(feats)) if feats else np.zeros(0, dtype=np.int64)
+        col_of = {int(c): i for i, c in enumerate(columns)}
+
+        # Dense over the seen columns only; training corpora are small.
+        x = np.zeros((len(texts), len(columns)), dtype=np.float64)
+        for i, f in enumerate(feats):
+            if len(f):
+                x[i, [col_of[int(c)] for c in f]] = 1.0 / np.sqrt(len(f))
+        y = np.asarray(is_scam, dtype=np.float64)
+        pos = max(y.sum(), 1.0)
+        neg = max(len(y) - y.sum(), 1.0)
+        sample_w = np.where(y > 0, len(y) / (2 * pos), len(y) / (2 * neg))
+
+        labels = sorted({t for t in scam_types if t})
+        typed = np.array([i for i, t in enumerate(scam_types) if t], dtype=np.int64)
+        y_type = np.zeros((len(typed), len(labels)))
+        for r, i in enumerate(typed):
+            y_type[r, labels.index(scam_types[i])] = 1.0
+
+        w, b = np.zeros(len(columns)), 0.0
+        tw, tb = np.zeros((len(columns), max(len(labels), 1))), np.zeros(max(len(labels), 1))
+        n = max(len(texts), 1)
+        for _ in range(epochs):
+            err = (_sigmoid(x @ w + b) - y) * sample_w
+            w -= lr * (x.T @ err / n + l2 * w)
+            b -= lr * float(err.mean())
+            if len(typed):
+                xt = x[typed]
+                terr = _softmax(xt @ tw + tb) - y_type
+                tw -= lr * (xt.T @ terr / len(typed) + l2 * tw)
+                tb -= lr * terr.mean(axis=0)
+
+        return cls(columns, w, b, tw, tb, labels or ["unknown"], n_features, metadata)
+
+    # ── Inference ──────────────────────────────────────────────────────────────
+    def _rows(self, text: str):
+        rows = self._row[hash_features(text, self.n_features)]
+        return rows, max(len(rows), 1)
+
+    def _scores(self, text: str):
+        rows, n = self._rows(text)
+        scale = 1.0 / np.sqrt(n)
+        p_scam = float(_sigmoid(self._scam_w[rows].sum() * scale + self.scam_b))
+        p_type = _softmax(self._type_w[rows].sum(axis=0) * scale + self.type_b)
+        return p_scam, p_type
+
+    def _result(self, p_scam: float, p_type: np.ndarray) -> dict:
+        details = {t: float(p) for t, p in zip(self.scam_types, p_type)}
+        details["scam_probability"] = p_scam
+        if p_scam < DECISION_THRESHOLD:
+            return {"scam_type": "safe", "confidence": p_scam, "details": details}
+        return {"scam_type": self.scam_types[int(np.argmax(p_type))], "confidence": p_scam, "details": details}
+
+    def predict(self, text: str) -> dict:
+        return self._result(*self._scores(text))
+
+    def predict_proba(self, text: str, turn_count: int = 0) -> float:
+        rows, n = self._rows(text)
+        return float(_sigmoid(self._scam_w[rows].sum() / np.sqrt(n) + self.scam_b))
+
+    def identify_script_type(self, text: str) -> str:
+        return self.predict(text).get("scam_type", "unknown")
+
+    def _batch_scores(self, texts: List[str]):
+        feats = [self._rows(t) for t in texts]
+        seg = np.repeat(np.arange(len(texts)), [len(r) for r, _ in feats])
+        rows = np.concatenate([r for r, _ in feats]) if feats else np.zeros(0, dtype=np.int32)
+        scale = 1.0 / np.sqrt(np.array([n for _, n in feats], dtype=np.float64))
+        scam_z = np.bincount(seg, weights=self._scam_w[rows], minlength=len(texts))
+        type_z = np.zeros((len(texts), len(self.scam_types)))
+        np.add.at(type_z, seg, self._type_w[rows])
+        return _sigmoid(scam_z * scale + self.scam_b), _softmax(type_z * scale[:, None] + self.type_b)
+
+    def predict_batch(self, texts: List[str]) -> List[dict]:
+        if not texts:
+            return []
+        p_scam, p_type = self._batch_scores(texts)
+        return [self._result(float(p), t) for p, t in zip(p_scam, p_type)]
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros(0)
+        return self._batch_scores(texts)[0]
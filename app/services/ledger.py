@@ -0,0 +1,117 @@
+# app/services/ledger.py
+"""
+The one tamper-evident ledger behind both audit APIs.
+
+There used to be two chains. ObservabilityEngine appended SHA-256-chained
+JSONL, and JudicialEvidenceChain appended to its own SQLite chain with its own
+genesis constant, hashing and verifier. Now every event is a block in the
+audit trail: one append path (the group-commit AuditWriter), one chain, one
+verifier, one Merkle tree. Each block also links to the previous block of
+its session (session_prev_hash), so one session verifies on its own. Each
+block is tagged with a kind:
+
+  AUDIT     agent decisions, alerts, canary hits (ObservabilityEngine.log_decision)
+  EVIDENCE  judicial evidence (JudicialEvidenceChain.log_evidence); the content
+            is stored in metadata.content, and input_hash is the SHA-256 of its
+            canonical JSON, so the chain covers the content and verification
+            re-checks it; output_hash covers the timestamp, actor, decision and
+            metadata the same way (audit_writer.record_hash)
+
+AUDIT blocks hash exactly as before, so trails written before kinds existed
+still verify. The old classes are thin views over this ledger. Existing
+evidence_ledger.db data is imported with scripts/migrate_evidence_ledger.py.
+"""
+import atexit
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_segments import SegmentStore
+from app.services.audit_verifier import AuditVerifier, verify_session
+from app.services.audit_writer import (AUDIT, EVENT_KINDS, EVIDENCE, AuditReceipt, AuditWriter,  # noqa: F401
+                                       canonical_json)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+AUDIT_FILE = os.path.join(PROJECT_ROOT, "audit_trail.jsonl")
+
+
+class Ledger:
+    def __init__(self, audit_file: str = AUDIT_FILE, writer: Optional[AuditWriter] = None):
+        self.audit_file = audit_file
+        # The active file rolls into compressed, chain-linked segments; readers see one logical trail
+        self.segments = writer.segments if writer and writer.segments else SegmentStore(audit_file)
+        # Chain order, hashing and file I/O happen on the writer thread (group commit)
+        self.writer = writer or AuditWriter(audit_file, index=AuditIndex(audit_file, store=self.segments),
+                                            segments=self.segments)
+        # Block offsets for O(1) head / block / session lookups; catches up from the file if the writer has none
+        self.index = self.writer.index or AuditIndex(audit_file, store=self.segments)
+        self.verifier = AuditVerifier(audit_file)
+
+    @property
+    def last_hash(self) -> str:
+        """Head of the committed chain (events still queued are not included)."""
+        return self.writer.last_hash
+
+    # ── Append path ────────────────────────────────────────────────────────────
+    def append(self, kind: str, session_id: str, event_type: str, actor: str, decision: Any, reasoning: str,
+               confidence: float, input_data: Any, output_data: Any,
+               metadata: Optional[Dict] = None) -> AuditReceipt:
+        """Non-blocking: enqueues one block; the receipt resolves to the chained AuditLog once written."""
+        return self.writer.submit(session_id, event_type, actor, decision, reasoning, confidence,
+                                  input_data, output_data, metadata, kind)
+
+    def append_evidence(self, session_id: str, event_type: str, content: Dict[str, Any],
+                        metadata: Optional[Dict] = None) -> AuditReceipt:
+        return self.append_evidence_many([(session_id, event_type, content, metadata)])[0]
+
+    def append_evidence_many(self, records: Iterable[Tuple]) -> List[AuditReceipt]:
+        """(session_id, event_type, content[, metadata]) records, enqueued back to back; all or none."""
+        events = []
+        for session_id, event_type, content, *rest in records:
+            if not session_id or not event_type:
+                raise ValueError("session_id and event_type are required")
+            metadata = rest[0] if rest else None
+            events.append((session_id, event_type, "Evidence_Chain", event_type, "evidence record", 1.0,
+                           canonical_json(content), "", {**(metadata or {}), "content": content}, EVIDENCE))
+        return self.writer.submit_many(events)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued block is on disk."""
+        return self.writer.flush(timeout)
+
+    def close(self) -> None:
+        self.writer.close()
+
+    # ── Reads ──────────────────────────────────────────────────────────────────
+    def iter_session_blocks(self, session_id: str, kind: Optional[str] = None,
+                            page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Retained blocks of one session in chain order, read one page at a time (constant memory)."""
+        offset = 0
+        while True:
+            page = self.index.session_blocks(session_id, offset=offset, limit=page_size)
+            for b in page["blocks"]:
+                if kind is None or b.get("kind", AUDIT) == kind:
+                    yield b
+            offset += page_size
+            if offset >= page["total"]:
+                return
+
+    def session_blocks(self, session_id: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All retained blocks of one session in chain order (optionally one kind), with their block numbers."""
+        return list(self.iter_session_blocks(session_id, kind))
+
+    def verify_session(self, session_id: str) -> Dict[str, Any]:
+        """One session's sub-chain (all kinds) via its session links, without touching other sessions' blocks."""
+        return verify_session(self.index, session_id, anchored=not self.segments.pruned_ranges())
+
+    def verify(self) -> Dict[str, Any]:
+        """Checkpointed verification of the whole chain (all kinds)."""
+        if not os.path.exists(self.audit_file):
+            return {"status": "VERIFIED", "blocks_checked": 0, "new_blocks": 0,
+                    "message": "Ledger is empty; chain is trivially valid."}
+        return self.verifier.verify_incremental()
+
+
+# Global singleton instance
+ledger = Ledger()
+atexit.register(ledger.close)
@@ -1,86 +1,247 @@
 import json
 import os
 import hashlib
-from typing import List, Dict, Any
+import threading
+import zlib
+from typing import List, Dict, Any, Optional
 
-# Lightweight JSON-based memory store for Render Free Tier
-DB_FILE = "memory_store.json"
+import numpy as np
 
-def _load_db() -> List[Dict]:
-    if not os.path.exists(DB_FILE):
-        return []
-    try:
-        with open(DB_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return []
+# Append-only JSONL log: one interaction per line, replayed into the LSH index on first use.
+DB_FILE = "memory_store.jsonl"
+LEGACY_DB_FILE = "memory_store.json"   # old whole-file JSON list, imported once
+
+SIMILARITY_THRESHOLD = 0.2
+EXACT_SCAN_LIMIT = 1000     # below this many items an exact scan is cheaper than LSH
+BANDS, ROWS = 24, 3         # 72 permutations; LSH threshold ≈ (1/24)^(1/3) ≈ 0.35
+MAX_BUCKET = 512            # ids taken per matching bucket
+MAX_CANDIDATES = 256        # candidates re-ranked with exact Jaccard
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1337)
+_A = _rng.randint(1, _PRIME, size=(BANDS * ROWS, 1)).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=(BANDS * ROWS, 1)).astype(np.uint64)
+_MIX = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D], dtype=np.uint64)[:ROWS]
+
+
+def _words(text: str) -> set:
+    return set(text.lower().split())
+
+
+def _entry_id(scam_text: str, successful_reply: str) -> str:
+    return hashlib.md5((scam_text + successful_reply).encode()).hexdigest()
+
+
+def _band_keys(texts: List[str]) -> np.ndarray:
+    """(len(texts), BANDS) uint32 band hashes of each text's word-set MinHash signature."""
+    out = np.zeros((len(texts), BANDS), dtype=np.uint32)
+    token_sets = [_words(t) for t in texts]
+    lengths = np.array([len(s) for s in token_sets])
+    rows = np.flatnonzero(lengths)
+    if not len(rows):
+        return out
+    tokens = np.fromiter(
+        (zlib.crc32(w.encode()) for i in rows for w in token_sets[i]),
+        dtype=np.uint64, count=int(lengths[rows].sum()),
+    )
+    starts = np.concatenate(([0], np.cumsum(lengths[rows])[:-1]))
+    hashed = (_A * (tokens[None, :] % np.uint64(_PRIME)) + _B) % np.uint64(_PRIME)   # (perms, tokens)
+    sig = np.minimum.reduceat(hashed, starts, axis=1).T.reshape(len(rows), BANDS, ROWS)
+    out[rows] = ((sig * _MIX).sum(axis=2) >> np.uint64(16)).astype(np.uint32)
+    return out
+
+
+class MemoryIndex:
+    """
+    In-memory MinHash-LSH over stored scam texts.
+
+    Each band's keys live in a sorted uint32 array (binary search) plus a small
+    dict tail for recent inserts. The tail is merged when it reaches a quarter of
+    the main arrays, which is amortized O(log n) per insert. A query looks up
+    BANDS buckets, keeps the ids that share the most bands and re-ranks at most
+    MAX_CANDIDATES of them with exact word Jaccard. Dedupe is a dict lookup on the
+    interaction hash. There is no size cap; the JSONL log is only ever appended to.
+    """
+
+    def __init__(self, path: str = DB_FILE, legacy_path: Optional[str] = LEGACY_DB_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.items: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, int] = {}
+        self._type_counts: Dict[str, int] = {}
+        self._main_keys = [np.zeros(0, dtype=np.uint32) for _ in range(BANDS)]
+        self._main_ids = [np.zeros(0, dtype=np.int32) for _ in range(BANDS)]
+        self._tail: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._tail_size = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self.items)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> int:
+        """Replay the log now (blocking; the API runs it in a thread at startup). Returns the item count."""
+        return len(self)
+
+    # ── Loading / persistence ──────────────────────────────────────────────────
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            entries = []
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue  # torn last line after a crash
+            elif self.legacy_path and os.path.exists(self.legacy_path):
+                try:
+                    with open(self.legacy_path, "r") as f:
+                        entries = json.load(f)
+                except Exception:
+                    entries = []
+                self._append_log(entries)
+            self._add_many(entries)
+            self._loaded = True
+
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in entries))
+
+    # ── Index maintenance ──────────────────────────────────────────────────────
+    def _add_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        fresh = []
+        for e in entries:
+            if not isinstance(e, dict) or "id" not in e or e["id"] in self._by_id:
+                continue
+            self._by_id[e["id"]] = len(self.items) + len(fresh)
+            fresh.append(e)
+        if not fresh:
+            return fresh
+        keys = np.concatenate([
+            _band_keys([e.get("scam_text", "") for e in fresh[i:i + 2000]]) for i in range(0, len(fresh), 2000)
+        ])
+        first = len(self.items)
+        self.items.extend(fresh)
+        for e in fresh:
+            self._type_counts[e.get("type")] = self._type_counts.get(e.get("type"), 0) + 1
+        if len(fresh) >= EXACT_SCAN_LIMIT:
+            # Bulk load (log replay): straight into the sorted arrays
+            self._merge_tail(keys, np.arange(first, first + len(fresh), dtype=np.int32))
+            return fresh
+        for offset in range(len(fresh)):
+            for band in range(BANDS):
+                self._tail[band].setdefault(int(keys[offset, band]), []).append(first + offset)
+        self._tail_size += len(fresh)
+        if self._tail_size >= max(EXACT_SCAN_LIMIT, len(self._main_ids[0]) // 4):
+            self._merge_tail()
+        return fresh
+
+    def _merge_tail(self, keys: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None) -> None:
+        """Fold the dict tail (and optionally a bulk batch) into the sorted per-band arrays."""
+        for band in range(BANDS):
+            tail = self._tail[band]
+            key_parts = [self._main_keys[band],
+                         np.fromiter((k for k, v in tail.items() for _ in v), dtype=np.uint32)]
+            id_parts = [self._main_ids[band],
+                        np.fromiter((i for v in tail.values() for i in v), dtype=np.int32)]
+            if keys is not None:
+                key_parts.append(keys[:, band])
+                id_parts.append(ids)
+            all_keys, all_ids = np.concatenate(key_parts), np.concatenate(id_parts)
+            order = np.argsort(all_keys, kind="stable")
+            self._main_keys[band], self._main_ids[band] = all_keys[order], all_ids[order]
+            self._tail[band] = {}
+        self._tail_size = 0
+
+    def add(self, scam_text: str, successful_reply: str, scam_type: str) -> bool:
+        """Store one interaction; returns False if it was already known."""
+        self._ensure_loaded()
+        entry = {"id": _entry_id(scam_text, successful_reply), "scam_text": scam_text,
+                 "reply": successful_reply, "type": scam_type}
+        with self._lock:
+            if entry["id"] in self._by_id:
+                return False
+            self._add_many([entry])
+            self._append_log([entry])
+        return True
+
+    # ── Recall ─────────────────────────────────────────────────────────────────
+    def _candidates(self, text: str) -> np.ndarray:
+        keys = _band_keys([text])[0]
+        found = []
+        for band in range(BANDS):
+            key = keys[band]
+            main = self._main_keys[band]
+            lo, hi = np.searchsorted(main, key, "left"), np.searchsorted(main, key, "right")
+            if hi > lo:
+                found.append(self._main_ids[band][max(lo, hi - MAX_BUCKET):hi])
+            tail = self._tail[band].get(int(key))
+            if tail:
+                found.append(np.asarray(tail[-MAX_BUCKET:], dtype=np.int32))
+        if not found:
+            return np.zeros(0, dtype=np.int32)
+        ids, counts = np.unique(np.concatenate(found), return_counts=True)
+        if len(ids) > MAX_CANDIDATES:
+            ids = ids[np.argsort(-counts, kind="stable")[:MAX_CANDIDATES]]
+        return ids
+
+    def recall(self, current_scam_text: str, scam_type: Optional[str] = None) -> str:
+        self._ensure_loaded()
+        current_words = _words(current_scam_text)
+        if not current_words:
+            return ""
+        with self._lock:
+            if not self.items:
+                return ""
+            if len(self.items) <= EXACT_SCAN_LIMIT:
+                candidates = range(len(self.items))
+            else:
+                candidates = self._candidates(current_scam_text).tolist()
+            # Same scam type first if any such item is stored (previous behaviour)
+            if scam_type and self._type_counts.get(scam_type):
+                candidates = [i for i in candidates if self.items[i].get("type") == scam_type]
+            best_match, best_score = None, 0.0
+            for i in candidates:
+                stored_words = _words(self.items[i].get("scam_text", ""))
+                union = len(current_words | stored_words)
+                if not union:
+                    continue
+                score = len(current_words & stored_words) / union
+                if score > best_score:
+                    best_score, best_match = score, self.items[i].get("reply")
+        return best_match if best_score > SIMILARITY_THRESHOLD else ""
+
+
+# Global singleton instance (loaded at API startup, otherwise lazily on first use)
+memory_index = MemoryIndex()
 
-def _save_db(data: List[Dict]):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f)
 
 def learn_interaction(scam_text: str, successful_reply: str, scam_type: str):
     """
-    Saves a successful interaction pair to JSON store.
+    Saves a successful interaction pair (appended to the JSONL log) and embeds it
+    into the semantic index.
     """
-    db = _load_db()
-    
-    # Create a unique ID
-    entry_hash = hashlib.md5((scam_text + successful_reply).encode()).hexdigest()
-    
-    # Check duplicates
-    if any(item['id'] == entry_hash for item in db):
-        return
-
-    # FIFO limit (keep file size small)
-    if len(db) > 1000:
-        db.pop(0)
-
-    db.append({
-        "id": entry_hash,
-        "scam_text": scam_text,
-        "reply": successful_reply,
-        "type": scam_type
-    })
-    
-    _save_db(db)
-
-def recall_similar_tactic(current_scam_text: str, scam_type: str) -> str:
+    if memory_index.add(scam_text, successful_reply, scam_type):
+        from app.services.semantic_memory import semantic_memory
+        semantic_memory.add(scam_text, successful_reply, scam_type)
+
+def recall_similar_tactic(current_scam_text: str, scam_type: Optional[str] = None) -> str:
     """
-    Finds a similar past interaction using simple keyword matching
-    instead of heavy vector embeddings.
+    Finds a similar past interaction: MinHash-LSH candidates re-ranked by word
+    Jaccard similarity (same scam type preferred when known).
     """
-    db = _load_db()
-    if not db:
-        return ""
-
-    # Filter by scam type first
-    candidates = [item for item in db if item['type'] == scam_type]
-    if not candidates:
-        # Fallback to all
-        candidates = db
-        
-    # Simple Jaccard similarity on words
-    current_words = set(current_scam_text.lower().split())
-    best_match = None
-    best_score = 0.0
-    
-    for item in candidates:
-        stored_words = set(item['scam_text'].lower().split())
-        intersection = len(current_words.intersection(stored_words))
-        union = len(current_words.union(stored_words))
-        if union == 0: continue
-        
-        score = intersection / union
-        if score > best_score:
-            best_score = score
-            best_match = item['reply']
-            
-    # Threshold
-    if best_score > 0.2:
-        return best_match
-        
-    return ""
-
-def recall_past_experience(current_scam_text: str, scam_type: str) -> str:
+    return memory_index.recall(current_scam_text, scam_type)
+
+def recall_past_experience(current_scam_text: str, scam_type: Optional[str] = None) -> str:
     return recall_similar_tactic(current_scam_text, scam_type)
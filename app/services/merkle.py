@@ -0,0 +1,381 @@
+# app/services/merkle.py
+"""
+Merkle accumulator over the audit trail (RFC 6962 / RFC 9162 tree hashing).
+
+The linear chain proves the trail as a whole. Proving that one block is in it
+meant handing over every block before it. This module keeps a Merkle tree
+whose leaves are the audit blocks in chain order:
+
+  leaf  = SHA-256(0x00 || current_hash)        current_hash as 32 raw bytes
+  node  = SHA-256(0x01 || left || right)
+
+A block's current_hash already commits to its session, event type and
+input/output hashes, and to the previous block. So a court given one record
+recomputes current_hash with audit_writer.block_hash, then checks:
+
+  inclusion    O(log n) sibling hashes from the leaf to a signed root
+  consistency  O(log n) hashes showing an older signed root is a prefix of a
+               newer one (history was only appended to, never rewritten)
+
+Storage: <trail>.merkle/level-NN.bin holds the hashes of every complete,
+aligned subtree of size 2^NN, 32 bytes each. Appending a leaf adds at most one
+node per level, and any subtree hash is one lookup or a fold of at most log n
+of them. Signed tree heads (size, root, timestamp, Ed25519 signature) are
+appended to <trail>.merkle/roots.jsonl by a periodic background job.
+
+The tree catches up from the trail via the audit offset index. If the trail was
+rewritten under it (the last leaf no longer matches), it is rebuilt.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+from app.core.config import SETTINGS
+from app.services.audit_index import AuditIndex
+from app.services.ledger import ledger
+
+HASH_SIZE = 32
+
+
+def leaf_hash(current_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(current_hash)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly below n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+# ── Verification (what a third party runs; needs nothing but hashlib) ──────────
+def verify_inclusion(leaf: bytes, index: int, tree_size: int, path: List[bytes], root: bytes) -> bool:
+    """RFC 9162 §2.1.3.2: is `leaf` at position `index` of the tree with root `root`?"""
+    if index >= tree_size:
+        return False
+    fn, sn, r = index, tree_size - 1, leaf
+    for p in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(first_size: int, second_size: int, first_root: bytes, second_root: bytes,
+                       proof: List[bytes]) -> bool:
+    """RFC 9162 §2.1.4.2: is the tree of `first_size` leaves a prefix of the one of `second_size`?"""
+    if first_size > second_size:
+        return False
+    if first_size == second_size:
+        return not proof and first_root == second_root
+    if first_size == 0:
+        return not proof
+    path = list(proof)
+    if first_size & (first_size - 1) == 0:
+        path.insert(0, first_root)
+    if not path:
+        return False
+    fn, sn = first_size - 1, second_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
+
+
+def signed_root_payload(tree_size: int, root_hash: str, timestamp: str) -> bytes:
+    """Exact bytes covered by a tree-head signature."""
+    return json.dumps({"tree_size": tree_size, "root_hash": root_hash, "timestamp": timestamp},
+                      sort_keys=True, separators=(",", ":")).encode()
+
+
+def verify_signed_root(signed: Dict[str, Any], public_key_b64: str) -> bool:
+    key = Ed25519PublicKey.from_public_bytes(base64.b64decode(public_key_b64))
+    try:
+        key.verify(base64.b64decode(signed["signature"]),
+                   signed_root_payload(signed["tree_size"], signed["root_hash"], signed["timestamp"]))
+        return True
+    except (InvalidSignature, KeyError, ValueError):
+        return False
+
+
+def load_signing_key(path: str) -> Ed25519PrivateKey:
+    """Ed25519 key for tree heads; generated (mode 0600) on first use."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return serialization.load_pem_private_key(f.read(), password=None)
+    key = Ed25519PrivateKey.generate()
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption())
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return key
+
+
+class MerkleLedger:
+    def __init__(self, index: AuditIndex, directory: Optional[str] = None, signing_key_path: Optional[str] = None):
+        self.index = index
+        self.directory = directory or index.audit_file + ".merkle"
+        self.roots_path = os.path.join(self.directory, "roots.jsonl")
+        self.signing_key_path = signing_key_path or SETTINGS.AUDIT_SIGNING_KEY_FILE
+        self._lock = threading.RLock()
+        self._levels: List[bytearray] = []
+        self._persisted: List[int] = []          # bytes of each level already on disk
+        self._loaded = False
+        self._tail_checked = False               # last leaf compared against the trail since load
+        self._key: Optional[Ed25519PrivateKey] = None
+        self._roots: List[Dict[str, Any]] = []
+
+    # ── Storage ────────────────────────────────────────────────────────────────
+    def _level_path(self, level: int) -> str:
+        return os.path.join(self.directory, f"level-{level:02d}.bin")
+
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        levels = []
+        while os.path.exists(self._level_path(len(levels))):
+            with open(self._level_path(len(levels)), "rb") as f:
+                data = bytearray(f.read())
+            levels.append(data[:len(data) - len(data) % HASH_SIZE])
+        consistent = all(len(levels[k + 1]) == (len(levels[k]) // HASH_SIZE // 2) * HASH_SIZE
+                         for k in range(len(levels) - 1))
+        if levels and (not consistent or len(levels[-1]) > HASH_SIZE):
+            # Torn append: the upper levels follow from the leaves
+            for k in range(len(levels)):
+                os.remove(self._level_path(k))
+            self._levels = self._rebuild_upper(levels[0])
+            self._persisted = []
+            self._persist()
+        else:
+            self._levels = levels
+            self._persisted = [len(level) for level in levels]
+        if os.path.exists(self.roots_path):
+            with open(self.roots_path) as f:
+                self._roots = [json.loads(line) for line in f if line.strip()]
+        self._loaded = True
+
+    @staticmethod
+    def _rebuild_upper(leaves: bytearray) -> List[bytearray]:
+        levels = [leaves]
+        while len(levels[-1]) >= 2 * HASH_SIZE:
+            below = levels[-1]
+            levels.append(bytearray(b"".join(
+                node_hash(bytes(below[i:i + HASH_SIZE]), bytes(below[i + HASH_SIZE:i + 2 * HASH_SIZE]))
+                for i in range(0, len(below) - HASH_SIZE, 2 * HASH_SIZE))))
+        return levels
+
+    def _persist(self) -> None:
+        for k, level in enumerate(self._levels):
+            if k >= len(self._persisted):
+                self._persisted.append(0)
+            if len(level) > self._persisted[k]:
+                with open(self._level_path(k), "ab") as f:
+                    f.write(level[self._persisted[k]:])
+                self._persisted[k] = len(level)
+
+    def _reset(self) -> None:
+        for k in range(len(self._levels)):
+            if os.path.exists(self._level_path(k)):
+                os.remove(self._level_path(k))
+        self._levels, self._persisted = [], []
+
+    # ── Accumulator ────────────────────────────────────────────────────────────
+    def size(self) -> int:
+        return len(self._levels[0]) // HASH_SIZE if self._levels else 0
+
+    def _append_leaf(self, leaf: bytes) -> None:
+        if not self._levels:
+            self._levels.append(bytearray())
+        self._levels[0] += leaf
+        k, node = 0, leaf
+        while (len(self._levels[k]) // HASH_SIZE) % 2 == 0:      # completed a pair at level k
+            left = bytes(self._levels[k][-2 * HASH_SIZE:-HASH_SIZE])
+            node = node_hash(left, node)
+            k += 1
+            if k == len(self._levels):
+                self._levels.append(bytearray())
+            self._levels[k] += node
+
+    def sync(self) -> int:
+        """Add leaves for blocks the trail has beyond the tree; returns how many were added."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            count, size = self.index.count(), self.size()
+            if size and (size > count or (not self._tail_checked and self._node(0, size - 1)
+                                          != leaf_hash(self.index.block(size)["current_hash"]))):
+                print("⚠️ Audit trail no longer matches the Merkle tree; rebuilding it")
+                self._reset()
+                size = 0
+            self._tail_checked = True
+            if count == size:
+                return 0
+            for block in self.index.iter_blocks(size + 1, count):
+                self._append_leaf(leaf_hash(block["current_hash"]))
+            self._persist()
+            return count - size
+
+    def _node(self, level: int, i: int) -> bytes:
+        return bytes(self._levels[level][i * HASH_SIZE:(i + 1) * HASH_SIZE])
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        """MTH(D[start:end]); start is always aligned to the largest power of two in the range."""
+        n = end - start
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return self._node(level, start >> level)
+        k = _split(n)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def root(self, tree_size: Optional[int] = None) -> bytes:
+        self.sync()
+        with self._lock:
+            tree_size = self.size() if tree_size is None else tree_size
+            if tree_size == 0:
+                return hashlib.sha256(b"").digest()
+            return self._subtree(0, tree_size)
+
+    # ── Proofs ─────────────────────────────────────────────────────────────────
+    def _path(self, m: int, start: int, end: int) -> List[bytes]:
+        n = end - start
+        if n == 1:
+            return []
+        k = _split(n)
+        if m < k:
+            return self._path(m, start, start + k) + [self._subtree(start + k, end)]
+        return self._path(m - k, start + k, end) + [self._subtree(start, start + k)]
+
+    def _subproof(self, m: int, start: int, end: int, complete: bool) -> List[bytes]:
+        n = end - start
+        if m == n:
+            return [] if complete else [self._subtree(start, end)]
+        k = _split(n)
+        if m <= k:
+            return self._subproof(m, start, start + k, complete) + [self._subtree(start + k, end)]
+        return self._subproof(m - k, start + k, end, False) + [self._subtree(start, start + k)]
+
+    def _check_size(self, tree_size: Optional[int]) -> int:
+        size = self.size()
+        if tree_size is None:
+            return size
+        if not 0 < tree_size <= size:
+            raise ValueError(f"tree_size must be between 1 and {size}")
+        return tree_size
+
+    def inclusion_proof(self, block: int, tree_size: Optional[int] = None) -> Dict[str, Any]:
+        """Audit path for block #block (1-based) in the tree of `tree_size` leaves (default: latest signed root)."""
+        self.sync()
+        with self._lock:
+            if tree_size is None and self._roots:
+                tree_size = self._roots[-1]["tree_size"]
+            tree_size = self._check_size(tree_size)
+            if not 1 <= block <= tree_size:
+                raise ValueError(f"block must be between 1 and {tree_size}")
+            return {
+                "block": block,
+                "leaf_index": block - 1,
+                "tree_size": tree_size,
+                "leaf_hash": self._node(0, block - 1).hex(),
+                "audit_path": [h.hex() for h in self._path(block - 1, 0, tree_size)],
+                "root_hash": self._subtree(0, tree_size).hex(),
+            }
+
+    def consistency_proof(self, first: int, second: Optional[int] = None) -> Dict[str, Any]:
+        """Proof that the tree of `first` leaves is a prefix of the tree of `second` leaves."""
+        self.sync()
+        with self._lock:
+            second = self._check_size(second)
+            if not 0 < first <= second:
+                raise ValueError(f"first must be between 1 and {second}")
+            return {
+                "first": first,
+                "second": second,
+                "first_root": self._subtree(0, first).hex(),
+                "second_root": self._subtree(0, second).hex(),
+                "proof": [h.hex() for h in self._subproof(first, 0, second, True)] if first < second else [],
+            }
+
+    # ── Signed tree heads ──────────────────────────────────────────────────────
+    def _signing_key(self) -> Ed25519PrivateKey:
+        if self._key is None:
+            self._key = load_signing_key(self.signing_key_path)
+        return self._key
+
+    def public_key(self) -> str:
+        raw = self._signing_key().public_key().public_bytes(serialization.Encoding.Raw,
+                                                            serialization.PublicFormat.Raw)
+        return base64.b64encode(raw).decode()
+
+    def sign_root(self) -> Optional[Dict[str, Any]]:
+        """Sign the current root if the tree grew since the last signed head; returns the latest head."""
+        self.sync()
+        with self._lock:
+            size = self.size()
+            if size == 0:
+                return None
+            if self._roots and self._roots[-1]["tree_size"] == size:
+                return self._roots[-1]
+            root_hash = self._subtree(0, size).hex()
+            timestamp = datetime.utcnow().isoformat() + "Z"
+            signature = self._signing_key().sign(signed_root_payload(size, root_hash, timestamp))
+            signed = {"tree_size": size, "root_hash": root_hash, "timestamp": timestamp,
+                      "signature": base64.b64encode(signature).decode(), "algorithm": "Ed25519"}
+            with open(self.roots_path, "a") as f:
+                f.write(json.dumps(signed) + "\n")
+            self._roots.append(signed)
+            return signed
+
+    def signed_roots(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._roots[-limit:]
+
+    async def run_forever(self, interval: Optional[float] = None) -> None:
+        """Background job: extend the tree and sign a new head every `interval` seconds."""
+        interval = interval or SETTINGS.AUDIT_ROOT_SIGN_SECONDS
+        while True:
+            try:
+                await asyncio.to_thread(self.sign_root)
+            except Exception as e:
+                print(f"⚠️ Audit root signing failed: {e}")
+            await asyncio.sleep(interval)
+
+
+# Global singleton instance
+merkle_ledger = MerkleLedger(ledger.index)
@@ -0,0 +1,354 @@
+# app/services/metrics.py
+"""
+In-process metrics, exposed in the Prometheus text format at /metrics.
+
+Recording is lock-free. Every metric child keeps one cell (a plain list of
+numbers) per thread, and only the owning thread writes it, so observe() and
+inc() are a dict lookup, a bisect and a few list increments: no lock, no
+allocation. The event loop thread gets one cell for all coroutines; worker
+threads (to_thread, background tasks) get their own. A scrape sums the
+cells. It may see an observation's bucket before its _count, which
+Prometheus tolerates (the official clients have the same window).
+
+A thread's cell is found by thread ident. Idents are reused only after a
+thread has exited, so a cell never has two live writers, and its counts
+carry over to the next thread with that ident.
+
+Metric families (module level, like the other singletons):
+
+  vigil_analyze_seconds{outcome}                 end-to-end /analyze latency
+  vigil_stage_seconds{stage}                     cache, swarm, simulator, extraction, persistence
+  vigil_llm_request_seconds{provider,model,outcome}
+  vigil_llm_fallbacks_total{model}               primary LLM failed, fallback provider answered
+  vigil_llm_timeouts_total{provider,model}       LLM calls that timed out or were cancelled by a deadline
+  vigil_pipeline_fallbacks_total{stage,reason}   deterministic fallbacks taken by the pipeline
+  vigil_cache_lookups_total{cache,result}        session / reflex cache hits and misses
+  vigil_cache_hit_ratio{cache}                   hits / lookups, computed at scrape time
+  vigil_event_loop_lag_seconds                   scheduling delay of the asyncio loop
+"""
+import asyncio
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import SETTINGS
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_INF_LABEL = 'le="+Inf"'
+
+
+class _Cells:
+    """One list of `width` numbers per writing thread; read by summing them."""
+    __slots__ = ("width", "_cells", "_lock")
+
+    def __init__(self, width: int):
+        self.width = width
+        self._cells: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        cell = self._cells.get(threading.get_ident())
+        if cell is None:
+            cell = [0] * self.width
+            with self._lock:
+                cell = self._cells.setdefault(threading.get_ident(), cell)
+        return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells.values())
+        return [sum(column) for column in zip(*cells)] if cells else [0] * self.width
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self.child = child
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "cells")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # per thread: one count per bucket (+Inf last), then sum, then count
+        self.cells = _Cells(len(bounds) + 3)
+
+    def observe(self, value: float) -> None:
+        cell = self.cells.cell()
+        cell[bisect.bisect_left(self.bounds, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def time(self) -> _Timer:
+        """`with child.time():` observes the block's wall time in seconds."""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """(cumulative bucket counts incl. +Inf, sum, count)."""
+        totals = self.cells.totals()
+        cumulative, running = [], 0
+        for n in totals[:-2]:
+            running += n
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class _CounterChild:
+    __slots__ = ("cells",)
+
+    def __init__(self):
+        self.cells = _Cells(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self.cells.cell()[0] += amount
+
+    def value(self) -> float:
+        return self.cells.totals()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value                     # a single store; last writer wins
+
+    def value(self) -> float:
+        return self._value
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any):
+        """Child for one label combination; created once, then a dict lookup."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self.children()):
+            lines += self._render_child(values, child)
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{self._label_text(values)} {_number(child.value())}"]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _render_child(self, values, child) -> List[str]:
+        cumulative, total, count = child.snapshot()
+        lines = [f"{self.name}_bucket{self._label_text(values, f'le={_quote(_number(b))}')} {n}"
+                 for b, n in zip(self.buckets, cumulative)]
+        lines.append(f"{self.name}_bucket{self._label_text(values, _INF_LABEL)} {cumulative[-1]}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {count}")
+        return lines
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _quote(value: str) -> str:
+    return f'"{value}"'
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, family: _Family) -> Any:
+        if family.name in self._families:
+            raise ValueError(f"metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def on_collect(self, fn: Callable[[], None]) -> None:
+        """Run `fn` before every render (to refresh gauges derived from other metrics)."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        """All families in the Prometheus text exposition format (0.0.4)."""
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+        lines: List[str] = []
+        for family in self._families.values():
+            lines += family.render()
+        return "\n".join(lines) + "\n"
+
+
+# Global singleton instance
+metrics = MetricsRegistry()
+
+ANALYZE_SECONDS = metrics.histogram(
+    "vigil_analyze_seconds", "End-to-end /analyze latency in seconds.", ["outcome"])
+STAGE_SECONDS = metrics.histogram(
+    "vigil_stage_seconds", "Latency of one /analyze pipeline stage in seconds.", ["stage"])
+LLM_SECONDS = metrics.histogram(
+    "vigil_llm_request_seconds", "LLM call latency in seconds.", ["provider", "model", "outcome"], LLM_BUCKETS)
+LLM_FALLBACKS = metrics.counter(
+    "vigil_llm_fallbacks_total", "Calls where the primary LLM failed and the fallback provider was used.", ["model"])
+LLM_TIMEOUTS = metrics.counter(
+    "vigil_llm_timeouts_total", "LLM calls that timed out or were cancelled by a pipeline deadline.",
+    ["provider", "model"])
+PIPELINE_FALLBACKS = metrics.counter(
+    "vigil_pipeline_fallbacks_total", "Deterministic fallbacks taken by the /analyze pipeline.", ["stage", "reason"])
+CACHE_LOOKUPS = metrics.counter(
+    "vigil_cache_lookups_total", "Session-state and reflex cache lookups.", ["cache", "result"])
+CACHE_HIT_RATIO = metrics.gauge(
+    "vigil_cache_hit_ratio", "Cache hits / lookups since start.", ["cache"])
+LOOP_LAG_SECONDS = metrics.histogram(
+    "vigil_event_loop_lag_seconds", "How late the event loop ran a timer, in seconds.", buckets=LOOP_LAG_BUCKETS)
+
+# Last outcome per LLM provider, for /health: provider -> (ok, monotonic time)
+_llm_last: Dict[str, Tuple[bool, float]] = {}
+_loop_lag = {"last": 0.0, "max_recent": 0.0}
+
+
+def record_llm(provider: str, model: str, seconds: float, outcome: str) -> None:
+    LLM_SECONDS.labels(provider, model, outcome).observe(seconds)
+    if outcome == "timeout":
+        LLM_TIMEOUTS.labels(provider, model).inc()
+    _llm_last[provider] = (outcome == "ok", time.monotonic())
+
+
+def llm_status(provider: str) -> Optional[bool]:
+    """True / False for the provider's last call, None if it has not been called yet."""
+    last = _llm_last.get(provider)
+    return None if last is None else last[0]
+
+
+def cache_hit_rate(cache: str) -> Optional[float]:
+    hits = CACHE_LOOKUPS.labels(cache, "hit").value()
+    total = hits + CACHE_LOOKUPS.labels(cache, "miss").value()
+    return hits / total if total else None
+
+
+def _refresh_hit_ratios() -> None:
+    for cache in ("session", "reflex"):
+        rate = cache_hit_rate(cache)
+        if rate is not None:
+            CACHE_HIT_RATIO.labels(cache).set(rate)
+
+
+metrics.on_collect(_refresh_hit_ratios)
+
+
+def loop_lag() -> Dict[str, float]:
+    """Latest and worst recent event-loop lag in seconds (the monitor decays the worst value)."""
+    return dict(_loop_lag)
+
+
+async def monitor_event_loop(interval: Optional[float] = None) -> None:
+    """Background job: sleep `interval`, record how much later than asked the loop woke us."""
+    interval = interval or SETTINGS.METRICS_LOOP_LAG_INTERVAL
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        LOOP_LAG_SECONDS.observe(lag)
+        _loop_lag["last"] = lag
+        _loop_lag["max_recent"] = max(lag, _loop_lag["max_recent"] * 0.9)
@@ -1,7 +1,13 @@
 # /app/services/mock_govt_apis.py
+import asyncio
 import random
 import uuid
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.config import SETTINGS
 
 class GovernmentSimulationLayer:
     """Simulates NPCI, TRAI, and Police APIs for automated evaluation stability."""
@@ -15,4 +21,74 @@ class GovernmentSimulationLayer:
 
     @staticmethod
     def file_fir_automatically(evidence: dict):
-        return {"fir_no": f"FIR/2026/CYB/{random.randint(1000,9999)}", "status": "FILED"}
\ No newline at end of file
+        return {"fir_no": f"FIR/2026/CYB/{random.randint(1000,9999)}", "status": "FILED"}
+
+    @staticmethod
+    async def npci_upi_lookup_async(upi_id: str):
+        return (await govt_client.npci_upi_lookup_many([upi_id])).get(upi_id)
+
+    @staticmethod
+    async def trai_dnd_check_async(phone: str):
+        return (await govt_client.trai_dnd_check_many([phone])).get(phone)
+
+
+class GovernmentAPIClient:
+    """
+    Async bulk client for the NPCI / TRAI lookup APIs.
+
+    Contract (also served by scripts/govt_api_standin.py):
+        POST {NPCI_API_URL}/upi/lookup   {"upi_ids": [...]}  -> {"results": {upi: {...}}}
+        POST {TRAI_API_URL}/dnd/check    {"phones": [...]}   -> {"results": {phone: {...}}}
+    With no URL configured the simulation layer answers locally. Failed lookups are
+    simply missing from the result so callers never cache them.
+    """
+
+    def __init__(self, npci_url: Optional[str] = None, trai_url: Optional[str] = None,
+                 timeout_s: Optional[float] = None):
+        self.npci_url = (SETTINGS.NPCI_API_URL if npci_url is None else npci_url).rstrip("/")
+        self.trai_url = (SETTINGS.TRAI_API_URL if trai_url is None else trai_url).rstrip("/")
+        self.timeout_s = SETTINGS.GOVT_API_TIMEOUT_SECONDS if timeout_s is None else timeout_s
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self.requests_sent = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the loop that created them (tests run several loops).
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _post(self, url: str, field: str, values: List[str]) -> Dict[str, Any]:
+        self.requests_sent += 1
+        try:
+            r = await self._http().post(url, json={field: values})
+            r.raise_for_status()
+            results = r.json().get("results") or {}
+            return {k: v for k, v in results.items() if k in values}
+        except Exception as e:
+            print(f"⚠️ Govt API call failed ({url}): {e}")
+            return {}
+
+    async def npci_upi_lookup_many(self, upi_ids: List[str]) -> Dict[str, Any]:
+        if not self.npci_url:
+            return {u: GovernmentSimulationLayer.npci_upi_lookup(u) for u in upi_ids}
+        return await self._post(f"{self.npci_url}/upi/lookup", "upi_ids", upi_ids)
+
+    async def trai_dnd_check_many(self, phones: List[str]) -> Dict[str, Any]:
+        if not self.trai_url:
+            return {p: GovernmentSimulationLayer.trai_dnd_check(p) for p in phones}
+        return await self._post(f"{self.trai_url}/dnd/check", "phones", phones)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global singleton instance
+govt_client = GovernmentAPIClient()
@@ -1,102 +1,41 @@
-import json
-import time
-from datetime import datetime
-from typing import Dict, List
-from dataclasses import dataclass, asdict
 import hashlib
-import os
 import random
+from typing import Dict, Optional
 import numpy as np
 
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-AUDIT_FILE = os.path.join(PROJECT_ROOT, "audit_trail.jsonl")
-
-@dataclass
-class AuditLog:
-    """Immutable audit record for legal compliance with hash chaining."""
-    timestamp: str
-    session_id: str
-    event_type: str
-    actor: str
-    decision: str
-    reasoning: str
-    confidence: float
-    input_hash: str
-    output_hash: str
-    previous_hash: str  # Chaining field
-    current_hash: str   # Self hash
-    metadata: Dict
+from app.services.audit_writer import AuditLog, AuditReceipt, AuditWriter  # noqa: F401  (AuditLog re-exported)
+from app.services.ledger import AUDIT, AUDIT_FILE, Ledger, ledger
+from app.services.metrics import ANALYZE_SECONDS
 
 class ObservabilityEngine:
-    def __init__(self):
-        self.performance_metrics = {
-            "total_requests": 0,
-            "error_rate": 0.0,
-            "avg_latency": 0.0
-        }
-        self.last_hash = "0" * 64 # Genesis hash state
-        if os.path.exists(AUDIT_FILE):
-             try:
-                 with open(AUDIT_FILE, "rb") as f:
-                     # Seek to last line to find most recent hash
-                     f.seek(-2, os.SEEK_END)
-                     while f.read(1) != b"\n":
-                         f.seek(-2, os.SEEK_CUR)
-                     last_line = f.readline().decode()
-                     self.last_hash = json.loads(last_line).get("current_hash", "0"*64)
-             except Exception:
-                 pass
+    def __init__(self, audit_file: str = AUDIT_FILE, writer: Optional[AuditWriter] = None,
+                 ledger: Optional[Ledger] = None):
+        # Audit events are AUDIT blocks in the unified ledger (see ledger.py)
+        self.ledger = ledger or Ledger(audit_file, writer)
+        self.audit_file = self.ledger.audit_file
+        self.writer = self.ledger.writer
+        self.index = self.ledger.index
+        self.segments = self.ledger.segments
+
+    @property
+    def last_hash(self) -> str:
+        """Head of the committed chain (events still queued are not included)."""
+        return self.ledger.last_hash
 
     def log_decision(self, session_id: str, event_type: str, actor: str, 
                      decision: str, reasoning: str, confidence: float, 
-                     input_data: str, output_data: str, metadata: Dict = None):
-        
-        # Calculate hashes
-        in_h = hashlib.sha256(str(input_data).encode()).hexdigest()
-        out_h = hashlib.sha256(str(output_data).encode()).hexdigest()
-        
-        # Create block signature (Chaining)
-        block_content = f"{self.last_hash}{session_id}{event_type}{in_h}{out_h}"
-        curr_h = hashlib.sha256(block_content.encode()).hexdigest()
+                     input_data: str, output_data: str, metadata: Dict = None) -> AuditReceipt:
+        """Non-blocking: enqueues the event; the receipt resolves to the chained AuditLog once written."""
+        return self.ledger.append(AUDIT, session_id, event_type, actor, decision, reasoning, confidence,
+                                  input_data, output_data, metadata)
 
-        log_entry = AuditLog(
-            timestamp=datetime.utcnow().isoformat() + "Z",
-            session_id=session_id,
-            event_type=event_type,
-            actor=actor,
-            decision=str(decision)[:500],
-            reasoning=reasoning,
-            confidence=confidence,
-            input_hash=in_h,
-            output_hash=out_h,
-            previous_hash=self.last_hash,
-            current_hash=curr_h,
-            metadata=metadata or {}
-        )
-        
-        self.last_hash = curr_h
-        self._persist_log(log_entry)
-        return log_entry
-
-    def _persist_log(self, log: AuditLog):
-        with open(AUDIT_FILE, "a") as f:
-            f.write(json.dumps(asdict(log)) + "\n")
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued audit event is on disk."""
+        return self.ledger.flush(timeout)
 
     def track_performance(self, duration_ms: float, success: bool):
-        self.performance_metrics["total_requests"] += 1
-        n = self.performance_metrics["total_requests"]
-        
-        # Update latency moving average
-        prev_avg = self.performance_metrics["avg_latency"]
-        self.performance_metrics["avg_latency"] = (prev_avg * (n-1) + duration_ms) / n
-        
-        # Update error rate
-        if not success:
-            prev_err = self.performance_metrics["error_rate"]
-            self.performance_metrics["error_rate"] = (prev_err * (n-1) + 1.0) / n
-        else:
-            prev_err = self.performance_metrics["error_rate"]
-            self.performance_metrics["error_rate"] = (prev_err * (n-1)) / n
+        """Record one /analyze request in the latency histogram served at /metrics."""
+        ANALYZE_SECONDS.labels("ok" if success else "error").observe(duration_ms / 1000.0)
 
     def mask_pii_laplace(self, value: float, epsilon: float = 0.1) -> float:
         """
@@ -132,4 +71,4 @@ class ObservabilityEngine:
             scrubbed["economic_damage_noisy"] = self.mask_pii_laplace(scrubbed["economic_damage"])
         return scrubbed
 
-observability = ObservabilityEngine()
\ No newline at end of file
+observability = ObservabilityEngine(ledger=ledger)
\ No newline at end of file
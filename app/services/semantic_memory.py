@@ -0,0 +1,436 @@
+# app/services/semantic_memory.py
+"""
+Semantic experience recall: local embeddings + an IVF nearest-neighbour index.
+
+Embedding (HashedNgramEmbedder) is deterministic and CPU-only, with no model
+download. Each text is lower-cased and whitespace-normalized, and its character
+3/4/5-grams are hashed (FNV-1a + murmur finalizer) into a signed bucket of a
+fixed-width vector. This is the hashing trick, i.e. a sparse random projection
+of the n-gram counts. The result is L2-normalized, so cosine = dot product. A
+batch is embedded with a handful of NumPy passes over the concatenated bytes.
+It captures misspellings, Hinglish spelling variants and reordered phrases that
+word-set Jaccard (memory_rag) misses.
+
+Index (SemanticMemory) is an inverted-file index:
+  - spherical k-means centroids (nlist ≈ √n), retrained whenever the corpus has
+    grown 4× since the last training (below FLAT_LIMIT rows it is one flat list);
+  - vectors packed contiguously per list, so a query is `nprobe` centroid picks
+    plus small contiguous matmuls;
+  - incremental add: nearest centroid → per-list pending buffer, repacked when
+    the buffers reach 1/16 of the packed rows;
+  - delete: tombstone, dropped from the packed arrays at the next repack.
+
+Persistence lives under chroma_db/semantic_memory/: log.jsonl is the append-only
+source of truth (add/delete records) and index.npz is a snapshot of the packed
+index. On start the log is replayed, the snapshot reused if it still matches the
+log, and only rows newer than it are embedded. The snapshot is rewritten right
+after a load that had to embed rows, every SEMANTIC_SNAPSHOT_SECONDS while the
+API runs (run_forever) and at exit, so a crash costs at most one interval of
+re-embedding.
+"""
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import SETTINGS
+
+FLAT_LIMIT = 4096          # below this an exact scan over everything is cheapest
+RETRAIN_GROWTH = 4         # retrain centroids once the corpus has grown this much
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 32
+EMBED_BATCH = 4096
+
+_FNV_PRIME = np.uint32(16777619)
+_NGRAM_SALT = {3: 0x811C9DC5, 4: 0x9E3779B9, 5: 0x7F4A7C15}
+
+
+def _fmix32(h: np.ndarray) -> np.ndarray:
+    h = h ^ (h >> np.uint32(16))
+    h = h * np.uint32(0x85EBCA6B)
+    h = h ^ (h >> np.uint32(13))
+    h = h * np.uint32(0xC2B2AE35)
+    return h ^ (h >> np.uint32(16))
+
+
+def _entry_id(scam_text: str, successful_reply: str) -> str:
+    return hashlib.md5((scam_text + successful_reply).encode()).hexdigest()
+
+
+class HashedNgramEmbedder:
+    """Signed feature hashing of character n-grams into `dim` (a power of two) dimensions."""
+
+    def __init__(self, dim: int = 256, ngram_sizes: Sequence[int] = (3, 4, 5)):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.ngram_sizes = tuple(ngram_sizes)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        n = len(texts)
+        if n > EMBED_BATCH:
+            out = np.empty((n, self.dim), dtype=np.float32)
+            for i in range(0, n, EMBED_BATCH):
+                out[i:i + EMBED_BATCH] = self.embed(texts[i:i + EMBED_BATCH])
+            return out
+        out = np.zeros((n, self.dim), dtype=np.float32)
+        if not n:
+            return out
+        encoded = [(" " + " ".join(str(t).lower().split()) + " ").encode("utf-8") for t in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+        doc = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        slots, signs = [], []
+        for size in self.ngram_sizes:
+            m = len(buf) - size + 1
+            if m <= 0:
+                continue
+            h = np.full(m, _NGRAM_SALT.get(size, size), dtype=np.uint32)
+            for k in range(size):
+                h = (h ^ buf[k:k + m]) * _FNV_PRIME
+            valid = doc[:m] == doc[size - 1:size - 1 + m]   # n-gram stays inside one text
+            h = _fmix32(h[valid])
+            slots.append(doc[:m][valid] * self.dim + (h & np.uint32(self.dim - 1)))
+            signs.append(np.where(h >> np.uint32(31), 1.0, -1.0))
+        if slots:
+            out = np.bincount(np.concatenate(slots), weights=np.concatenate(signs),
+                              minlength=n * self.dim).reshape(n, self.dim).astype(np.float32)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class SemanticMemory:
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[HashedNgramEmbedder] = None,
+                 nprobe: Optional[int] = None, import_path: Optional[str] = None):
+        self.directory = directory or SETTINGS.SEMANTIC_MEMORY_DIR
+        self.log_path = os.path.join(self.directory, "log.jsonl")
+        self.snapshot_path = os.path.join(self.directory, "index.npz")
+        self.import_path = import_path          # memory_rag JSONL log, batch-imported once
+        self.embedder = embedder or HashedNgramEmbedder(SETTINGS.SEMANTIC_EMBED_DIM)
+        self.nprobe = nprobe or SETTINGS.SEMANTIC_NPROBE
+        dim = self.embedder.dim
+
+        # Row-aligned payload (row ids are append-only)
+        self.keys: List[str] = []
+        self.texts: List[Optional[str]] = []
+        self.replies: List[Optional[str]] = []
+        self._type_names: Dict[str, int] = {}
+        self._by_key: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)          # capacity-doubled, rows past len(keys) are False
+        self._types = np.zeros(0, dtype=np.int32)
+
+        # IVF structure
+        self._centroids = np.zeros((1, dim), dtype=np.float32)
+        self._trained_rows = 0
+        self._packed = np.zeros((0, dim), dtype=np.float32)
+        self._packed_rows = np.zeros(0, dtype=np.int32)
+        self._offsets = np.zeros(2, dtype=np.int64)
+        self._pending: Dict[int, List[Any]] = {}     # list → [row ids, vectors]
+        self._pending_size = 0
+        self._snapshot_rows = 0
+
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return int(self._alive.sum())
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> int:
+        """Replay the log and embed what the snapshot lacks now (blocking; the API runs it in a thread at startup)."""
+        return len(self)
+
+    # ── Loading / persistence ──────────────────────────────────────────────────
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            deleted = set()
+            if os.path.exists(self.log_path):
+                with open(self.log_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line after a crash
+                        if record.get("op") == "delete":
+                            row = self._by_key.get(record.get("id"))
+                            if row is not None:
+                                deleted.add(row)
+                                self._by_key.pop(record["id"], None)
+                        elif record.get("id") not in self._by_key:
+                            self._append_row(record)
+            self._alive[list(deleted)] = False
+            for row in deleted:
+                self.texts[row] = self.replies[row] = None
+
+            start = self._load_snapshot()
+            rows = [r for r in range(start, len(self.keys)) if self._alive[r]]
+            if rows:
+                self._insert_vectors(np.array(rows, dtype=np.int32),
+                                     self.embedder.embed([self.texts[r] for r in rows]))
+            self._loaded = True
+
+            if not self.keys and self.import_path and os.path.exists(self.import_path):
+                self._import_memory_log(self.import_path)
+            self.save()     # no-op unless rows were embedded: the next start reuses them
+
+    def _append_row(self, record: Dict[str, Any]) -> int:
+        row = len(self.keys)
+        if row >= len(self._alive):
+            capacity = max(1024, 2 * len(self._alive))
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            self._types = np.concatenate([self._types, np.zeros(capacity - len(self._types), dtype=np.int32)])
+        self._alive[row] = True
+        self.keys.append(record["id"])
+        self.texts.append(record.get("scam_text", ""))
+        self.replies.append(record.get("reply", ""))
+        scam_type = record.get("type") or ""
+        self._types[row] = self._type_names.setdefault(scam_type, len(self._type_names))
+        self._by_key[record["id"]] = row
+        return row
+
+    def _append_log(self, records: List[Dict[str, Any]]) -> None:
+        if records:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in records))
+
+    def _keys_digest(self, rows: int) -> str:
+        digest = hashlib.sha1()
+        for key in self.keys[:rows]:
+            digest.update(key.encode())
+        return digest.hexdigest()
+
+    def _load_snapshot(self) -> int:
+        """Adopt index.npz if it was built from a prefix of the replayed log; returns rows it covers."""
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with np.load(self.snapshot_path) as snap:
+                rows = int(snap["rows"])
+                if (rows > len(self.keys) or int(snap["dim"]) != self.embedder.dim
+                        or str(snap["digest"]) != self._keys_digest(rows)):
+                    return 0
+                self._centroids = snap["centroids"]
+                self._packed = snap["packed"]
+                self._packed_rows = snap["packed_rows"]
+                self._offsets = snap["offsets"]
+                self._trained_rows = int(snap["trained_rows"])
+        except Exception as e:
+            print(f"⚠️ Semantic index snapshot unreadable, re-embedding: {e}")
+            return 0
+        self._snapshot_rows = rows
+        return rows
+
+    def save(self) -> None:
+        """Write index.npz (atomic rename). The log alone is enough to rebuild; this only speeds startup."""
+        with self._lock:
+            if not self._loaded or (self._snapshot_rows == len(self.keys) and not self._pending_size):
+                return
+            self._repack()
+            tmp = self.snapshot_path + ".tmp.npz"
+            np.savez(tmp, rows=len(self.keys), dim=self.embedder.dim, digest=self._keys_digest(len(self.keys)),
+                     centroids=self._centroids, packed=self._packed, packed_rows=self._packed_rows,
+                     offsets=self._offsets, trained_rows=self._trained_rows)
+            os.replace(tmp, self.snapshot_path)
+            self._snapshot_rows = len(self.keys)
+
+    async def run_forever(self, interval: Optional[float] = None) -> None:
+        """Background job: refresh index.npz every `interval` seconds (no-op when nothing changed)."""
+        interval = interval or SETTINGS.SEMANTIC_SNAPSHOT_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.save)
+            except Exception as e:
+                print(f"⚠️ Semantic index snapshot failed: {e}")
+
+    def _import_memory_log(self, path: str) -> None:
+        entries = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        self.add_many(entries)
+
+    # ── IVF maintenance ────────────────────────────────────────────────────────
+    def _vectors_by_row(self, extra=None):
+        """All indexed (row ids, vectors), packed + pending + an optional new batch, alive only."""
+        rows, vecs = [self._packed_rows], [self._packed]
+        for pending_rows, pending_vecs in self._pending.values():
+            rows.append(np.asarray(pending_rows, dtype=np.int32))
+            vecs.append(np.asarray(pending_vecs, dtype=np.float32).reshape(-1, self.embedder.dim))
+        if extra is not None:
+            rows.append(extra[0])
+            vecs.append(extra[1])
+        rows, vecs = [r for r in rows if len(r)] or rows[:1], [v for v in vecs if len(v)] or vecs[:1]
+        rows, vecs = (rows[0], vecs[0]) if len(rows) == 1 else (np.concatenate(rows), np.concatenate(vecs))
+        keep = self._alive[rows]
+        return (rows, vecs) if keep.all() else (rows[keep], vecs[keep])
+
+    def _assign(self, vecs: np.ndarray) -> np.ndarray:
+        if len(self._centroids) == 1:
+            return np.zeros(len(vecs), dtype=np.int64)
+        return np.concatenate([np.argmax(vecs[i:i + 8192] @ self._centroids.T, axis=1)
+                               for i in range(0, len(vecs), 8192)]) if len(vecs) else np.zeros(0, dtype=np.int64)
+
+    def _train(self, vecs: np.ndarray) -> None:
+        """Spherical k-means on a sample of the corpus."""
+        if len(vecs) < FLAT_LIMIT:      # mostly deleted: back to one flat list
+            self._centroids = np.zeros((1, self.embedder.dim), dtype=np.float32)
+            self._trained_rows = len(vecs)
+            return
+        nlist = int(np.clip(np.sqrt(len(vecs)), 16, 1024))
+        rng = np.random.RandomState(len(vecs))
+        sample = vecs[rng.choice(len(vecs), min(len(vecs), nlist * KMEANS_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        self._centroids = centroids.astype(np.float32)
+        self._trained_rows = len(vecs)
+
+    def _repack(self, retrain: bool = False, extra=None) -> None:
+        if not self._pending_size and not retrain and extra is None:
+            return
+        rows, vecs = self._vectors_by_row(extra)
+        self._packed = self._pending = None          # release before the sorted copy
+        if retrain:
+            self._train(vecs)
+        labels = self._assign(vecs)
+        order = np.argsort(labels, kind="stable")
+        self._packed, self._packed_rows = vecs[order], rows[order]
+        self._offsets = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1)).astype(np.int64)
+        self._pending, self._pending_size = {}, 0
+
+    def _insert_vectors(self, rows: np.ndarray, vecs: np.ndarray) -> None:
+        indexed = len(self._packed_rows) + self._pending_size + len(rows)
+        retrain = indexed >= FLAT_LIMIT and indexed >= RETRAIN_GROWTH * max(self._trained_rows, FLAT_LIMIT // RETRAIN_GROWTH)
+        if retrain or self._pending_size + len(rows) >= max(1024, len(self._packed_rows) // 16):
+            self._repack(retrain=retrain, extra=(rows, vecs))
+            return
+        for row, label, vec in zip(rows.tolist(), self._assign(vecs).tolist(), vecs):
+            bucket = self._pending.setdefault(label, [[], []])
+            bucket[0].append(row)
+            bucket[1].append(vec)
+        self._pending_size += len(rows)
+
+    # ── Writes ─────────────────────────────────────────────────────────────────
+    def add_many(self, interactions: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Batch add of {"scam_text", "reply", "type"} dicts (memory_rag's log format is
+        accepted as-is). Embeds the whole batch at once. Returns keys actually added.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            records, rows = [], []
+            for item in interactions:
+                if not isinstance(item, dict) or not item.get("scam_text"):
+                    continue
+                key = item.get("id") or _entry_id(item["scam_text"], item.get("reply", ""))
+                if key in self._by_key:
+                    continue
+                record = {"op": "add", "id": key, "scam_text": item["scam_text"],
+                          "reply": item.get("reply", ""), "type": item.get("type", "")}
+                rows.append(self._append_row(record))
+                records.append(record)
+            if not records:
+                return []
+            self._append_log(records)
+            self._insert_vectors(np.array(rows, dtype=np.int32),
+                                 self.embedder.embed([r["scam_text"] for r in records]))
+        return [r["id"] for r in records]
+
+    def add(self, scam_text: str, successful_reply: str, scam_type: str) -> Optional[str]:
+        added = self.add_many([{"scam_text": scam_text, "reply": successful_reply, "type": scam_type}])
+        return added[0] if added else None
+
+    def delete(self, key: str) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            row = self._by_key.pop(key, None)
+            if row is None:
+                return False
+            self._alive[row] = False
+            self.texts[row] = self.replies[row] = None
+            self._append_log([{"op": "delete", "id": key}])
+        return True
+
+    # ── Recall ─────────────────────────────────────────────────────────────────
+    def search(self, text: str, k: int = 5, scam_type: Optional[str] = None,
+               min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top-k stored interactions by cosine similarity (same scam type only, if that type is stored)."""
+        self._ensure_loaded()
+        query = self.embedder.embed([text])[0]
+        if not query.any():
+            return []
+        with self._lock:
+            if len(self._centroids) > 1:
+                probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+            else:
+                probes = np.zeros(1, dtype=np.int64)
+            rows, scores = [], []
+            for probe in probes.tolist():
+                lo, hi = self._offsets[probe], self._offsets[probe + 1]
+                if hi > lo:
+                    rows.append(self._packed_rows[lo:hi])
+                    scores.append(self._packed[lo:hi] @ query)
+                pending = self._pending.get(probe)
+                if pending:
+                    rows.append(np.asarray(pending[0], dtype=np.int32))
+                    scores.append(np.asarray(pending[1], dtype=np.float32) @ query)
+            if not rows:
+                return []
+            rows, scores = np.concatenate(rows), np.concatenate(scores)
+            keep = self._alive[rows] & (scores > min_score)
+            type_code = self._type_names.get(scam_type) if scam_type else None
+            if type_code is not None and (keep & (self._types[rows] == type_code)).any():
+                keep &= self._types[rows] == type_code
+            rows, scores = rows[keep], scores[keep]
+            if len(rows) > k:
+                top = np.argpartition(-scores, k)[:k]
+                rows, scores = rows[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            names = {code: name for name, code in self._type_names.items()}
+            return [
+                {"id": self.keys[r], "score": round(float(s), 4), "scam_text": self.texts[r],
+                 "reply": self.replies[r], "type": names.get(int(self._types[r]), "")}
+                for r, s in zip(rows[order].tolist(), scores[order].tolist())
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "rows": len(self.keys),
+            "alive": int(self._alive.sum()),
+            "lists": len(self._centroids),
+            "packed": len(self._packed_rows),
+            "pending": self._pending_size,
+            "dim": self.embedder.dim,
+        }
+
+
+# Global singleton instance (loaded at API startup, otherwise lazily on first use; imports memory_rag's log once)
+semantic_memory = SemanticMemory(import_path="memory_store.jsonl")
+atexit.register(semantic_memory.save)
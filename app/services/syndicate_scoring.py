@@ -0,0 +1,147 @@
+# app/services/syndicate_scoring.py
+"""
+Syndicate probability by label propagation over the identity graph.
+
+The session–identifier incidence list kept by identity_graph is turned into a
+symmetric sparse adjacency A and a row-normalized transition P = D⁻¹A (scipy
+CSR). Identifiers listed in the fraud registry are seeds clamped to 1, and every
+other node takes the damped average of its neighbours:
+
+    f ← α · P f,   f[seeds] = 1
+
+so a session's score decays with its distance from known-fraud identifiers and
+with how much of its footprint is clean. Each run is a handful of sparse
+matrix–vector products.
+
+Recompute is incremental. Node ids are append-only, so only new identifiers are
+looked up in the registry (all of them again if the registry reloads). Each run
+warm-starts from the previous score vector. A background job re-runs when the
+graph or the registry changed, and readers only index the cached vector.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.core.config import SETTINGS
+from app.services.fraud_registry import fraud_registry
+from app.services.identity_graph import identity_graph, node_key
+
+# identity-graph node kind → fraud registry list
+REGISTRY_KINDS = {"upi_ids": "upis", "phone_numbers": "phones", "urls": "urls"}
+
+
+class SyndicateScorer:
+    def __init__(self, graph=None, registry=None, damping: Optional[float] = None,
+                 max_iter: int = 50, tol: float = 1e-3):
+        self.graph = identity_graph if graph is None else graph
+        self.registry = fraud_registry if registry is None else registry
+        self.damping = damping or SETTINGS.SYNDICATE_DAMPING
+        self.max_iter = max_iter
+        self.tol = tol
+        self.scores = np.zeros(0, dtype=np.float32)   # replaced wholesale, never mutated
+        self._seeds = np.zeros(0, dtype=bool)
+        self._seeded_upto = 0
+        self._registry_signature: Any = None
+        self._edges_seen = -1
+        self._run_lock = threading.Lock()
+        self.last_run: Dict[str, Any] = {}
+
+    # ── Seeds ──────────────────────────────────────────────────────────────────
+    def _update_seeds(self, n_nodes: int) -> None:
+        signature = getattr(self.registry, "signature", None)
+        if signature != self._registry_signature:
+            self._seeds = np.zeros(0, dtype=bool)
+            self._seeded_upto = 0
+            self._registry_signature = signature
+        new = np.zeros(n_nodes - self._seeded_upto, dtype=bool)
+        by_kind: Dict[str, tuple] = {}
+        for i, key in enumerate(self.graph.keys_since(self._seeded_upto)[:len(new)]):
+            kind, _, value = key.partition(":")
+            if kind in REGISTRY_KINDS:
+                positions, values = by_kind.setdefault(REGISTRY_KINDS[kind], ([], []))
+                positions.append(i)
+                values.append(value)
+        for registry_kind, (positions, values) in by_kind.items():
+            if hasattr(self.registry, "contains_many"):
+                new[positions] = self.registry.contains_many(registry_kind, values)
+            else:
+                new[positions] = [self.registry.contains(registry_kind, v) for v in values]
+        self._seeds = np.concatenate([self._seeds, new])
+        self._seeded_upto = n_nodes
+
+    # ── Propagation ────────────────────────────────────────────────────────────
+    def _transition(self, n: int, src: np.ndarray, dst: np.ndarray) -> sp.csr_matrix:
+        pairs = np.sort((src.astype(np.int64) << 32) | dst.astype(np.int64))
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]   # dedupe (faster than np.unique)
+        src, dst = (pairs >> 32).astype(np.int32), (pairs & 0xFFFFFFFF).astype(np.int32)
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        degree = np.bincount(rows, minlength=n).astype(np.float32)
+        weights = 1.0 / degree[rows]
+        return sp.csr_matrix((weights, (rows, cols)), shape=(n, n), dtype=np.float32)
+
+    def recompute(self, force: bool = False) -> Dict[str, Any]:
+        """Re-run propagation if the graph or the registry changed since the last run."""
+        with self._run_lock:
+            n, src, dst = self.graph.edge_snapshot()
+            signature = getattr(self.registry, "signature", None)
+            if not force and len(src) == self._edges_seen and signature == self._registry_signature:
+                return self.last_run
+            start = time.perf_counter()
+            self._update_seeds(n)
+            seeds = self._seeds[:n]
+
+            f = np.zeros(n, dtype=np.float32)
+            f[:len(self.scores)] = self.scores[:n]      # warm start
+            f[seeds] = 1.0
+            iterations = 0
+            if seeds.any() and len(src):
+                P = self._transition(n, src, dst)
+                for iterations in range(1, self.max_iter + 1):
+                    nxt = self.damping * (P @ f)
+                    nxt[seeds] = 1.0
+                    delta = float(np.abs(nxt - f).max())
+                    f = nxt
+                    if delta < self.tol:
+                        break
+            else:
+                f[:] = 0.0
+                f[seeds] = 1.0
+
+            self.scores = f
+            self._edges_seen = len(src)
+            self.last_run = {
+                "nodes": n,
+                "edges": len(src),
+                "seeds": int(seeds.sum()),
+                "iterations": iterations,
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+            return self.last_run
+
+    async def run_forever(self, interval: Optional[float] = None) -> None:
+        """Background job: recompute off the event loop every `interval` seconds."""
+        interval = interval or SETTINGS.SYNDICATE_RECOMPUTE_SECONDS
+        while True:
+            try:
+                await asyncio.to_thread(self.recompute)
+            except Exception as e:
+                print(f"⚠️ Syndicate scoring failed, keeping previous scores: {e}")
+            await asyncio.sleep(interval)
+
+    # ── Reads ──────────────────────────────────────────────────────────────────
+    def score(self, session_id: str) -> float:
+        """Cached syndicate probability for a session (0.0 until it has been scored)."""
+        idx = self.graph.node_index(node_key("session", session_id))
+        scores = self.scores
+        if idx is None or idx >= len(scores):
+            return 0.0
+        return float(scores[idx])
+
+
+# Global singleton instance
+syndicate_scorer = SyndicateScorer()
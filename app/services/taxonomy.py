@@ -1,10 +1,18 @@
 # /app/services/taxonomy.py
+import atexit
 import json
 import os
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
-TAXONOMY_DB = "scammer_taxonomy.json"
+TAXONOMY_DB = "scammer_taxonomy.db"
+LEGACY_TAXONOMY_JSON = "scammer_taxonomy.json"
+
+_COLUMNS = ("identifier", "first_seen", "risk_score", "scam_types", "encounters",
+            "fingerprint", "last_seen", "last_seen_ts", "last_session_id")
 
 
 class ScammerTaxonomy:
@@ -12,51 +20,158 @@ class ScammerTaxonomy:
     Persistent lightweight database of known scammer profiles.
     Tracks repeat offenders across sessions using phone, UPI, voice fingerprint, etc.
     Supports coordination detection (same fingerprint in multiple sessions close in time).
+
+    Storage is SQLite with a (fingerprint, last_seen_ts) index, so coordination
+    detection is a range query instead of a scan. Updates are buffered and written
+    in batches (every `batch_size` updates or `flush_interval` seconds); reads see
+    buffered profiles immediately.
     """
 
-    def __init__(self):
-        self.db: Dict[str, Dict[str, Any]] = {}
-        self._load_db()
+    def __init__(self, db_path: str = TAXONOMY_DB, legacy_json: Optional[str] = LEGACY_TAXONOMY_JSON,
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._flusher: Optional[threading.Thread] = None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+        if legacy_json:
+            self._migrate_json(legacy_json)
+        atexit.register(self.flush)
 
-    def _load_db(self) -> None:
-        """Load existing taxonomy from disk or initialize empty."""
-        if os.path.exists(TAXONOMY_DB):
+    def _init_database(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    identifier      TEXT PRIMARY KEY,
+                    first_seen      TEXT NOT NULL,          -- ISO 8601
+                    risk_score      REAL NOT NULL DEFAULT 0,
+                    scam_types      TEXT NOT NULL DEFAULT '[]',
+                    encounters      INTEGER NOT NULL DEFAULT 0,
+                    fingerprint     TEXT,
+                    last_seen       TEXT,                   -- ISO 8601 (API value)
+                    last_seen_ts    REAL,                   -- epoch seconds (indexed)
+                    last_session_id TEXT
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fingerprint_seen ON profiles(fingerprint, last_seen_ts)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_seen ON profiles(last_seen_ts)")
+            self._conn.commit()
+
+    def _migrate_json(self, path: str) -> None:
+        """One-time import of the old scammer_taxonomy.json (kept on disk as a backup)."""
+        if not os.path.exists(path):
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM profiles LIMIT 1").fetchone():
+                return
             try:
-                with open(TAXONOMY_DB, "r", encoding="utf-8") as f:
-                    self.db = json.load(f)
+                with open(path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
             except Exception as e:
                 print(f"Failed to load taxonomy DB: {e}")
-                self.db = {}
-        else:
-            self.db = {}
+                return
+            rows = [self._to_row(pid, p) for pid, p in legacy.items() if isinstance(p, dict)]
+            self._conn.executemany(self._UPSERT, rows)
+            self._conn.commit()
+            print(f"Taxonomy: migrated {len(rows)} profiles from {path}")
 
-    def _save_db(self) -> None:
-        """Persist current taxonomy to disk (atomic write)."""
+    # ── Row mapping ────────────────────────────────────────────────────────────
+    _UPSERT = (
+        f"INSERT OR REPLACE INTO profiles ({', '.join(_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+    )
+
+    @staticmethod
+    def _epoch(iso: Optional[str]) -> Optional[float]:
         try:
-            # Write to temp file first → atomic replace
-            tmp_path = TAXONOMY_DB + ".tmp"
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(self.db, f, indent=2, sort_keys=True)
-            os.replace(tmp_path, TAXONOMY_DB)
-        except Exception as e:
-            print(f"Failed to save taxonomy DB: {e}")
+            return datetime.fromisoformat(iso).timestamp() if iso else None
+        except ValueError:
+            return None
+
+    @classmethod
+    def _to_row(cls, identifier: str, p: Dict[str, Any]) -> tuple:
+        return (
+            identifier,
+            p.get("first_seen") or datetime.now().isoformat(),
+            p.get("risk_score", 0),
+            json.dumps(p.get("scam_types") or []),
+            int(p.get("encounters", 0)),
+            p.get("fingerprint"),
+            p.get("last_seen"),
+            cls._epoch(p.get("last_seen")),
+            p.get("last_session_id"),
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> Dict[str, Any]:
+        return {
+            "first_seen": row[1],
+            "risk_score": row[2],
+            "scam_types": json.loads(row[3]),
+            "encounters": row[4],
+            "fingerprint": row[5],
+            "last_seen": row[6],
+            "last_session_id": row[8],
+        }
+
+    # ── Batched writes ─────────────────────────────────────────────────────────
+    def flush(self) -> None:
+        """Write all buffered profile updates in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [self._to_row(pid, p) for pid, p in self._pending.items()]
+            try:
+                self._conn.executemany(self._UPSERT, rows)
+                self._conn.commit()
+                self._pending.clear()
+            except Exception as e:
+                print(f"Failed to save taxonomy DB: {e}")
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
 
+    def _schedule_flush(self) -> None:
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+            return
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    # ── Public API ─────────────────────────────────────────────────────────────
     def get_profile(self, identifier: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve profile for a given identifier (phone, UPI, voice fingerprint hash, etc.)
-        
+
         Args:
             identifier: Unique scammer key (str)
-            
+
         Returns:
             Profile dict or None if not found
         """
-        return self.db.get(identifier)
+        with self._lock:
+            pending = self._pending.get(identifier)
+            if pending is not None:
+                return pending
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM profiles WHERE identifier = ?", (identifier,)
+            ).fetchone()
+        return self._from_row(row) if row else None
 
     def update_profile(self, identifier: str, data: Dict[str, Any]) -> None:
         """
         Update or create profile for a scammer identifier.
-        
+
         Args:
             identifier: Unique key (phone, UPI, fingerprint hash, etc.)
             data: Dict with at least 'scam_score' and optionally 'scam_type'
@@ -64,37 +179,38 @@ class ScammerTaxonomy:
         if not identifier or not isinstance(identifier, str):
             return
 
-        profile = self.db.get(identifier, {
-            "first_seen": datetime.now().isoformat(),
-            "risk_score": 0,
-            "scam_types": [],
-            "encounters": 0,
-            "fingerprint": None,           # optional – can store voice hash
-            "last_seen": None,
-            "last_session_id": None
-        })
+        with self._lock:
+            profile = self.get_profile(identifier) or {
+                "first_seen": datetime.now().isoformat(),
+                "risk_score": 0,
+                "scam_types": [],
+                "encounters": 0,
+                "fingerprint": None,           # optional – can store voice hash
+                "last_seen": None,
+                "last_session_id": None
+            }
 
-        now_iso = datetime.now().isoformat()
+            now_iso = datetime.now().isoformat()
 
-        profile["last_seen"] = now_iso
-        profile["encounters"] += 1
-        profile["risk_score"] = max(profile["risk_score"], data.get("scam_score", 0))
+            profile["last_seen"] = now_iso
+            profile["encounters"] += 1
+            profile["risk_score"] = max(profile["risk_score"], data.get("scam_score", 0))
 
-        # Add new scam type if not already present
-        scam_type = data.get("scam_type")
-        if scam_type and scam_type not in profile["scam_types"]:
-            profile["scam_types"].append(scam_type)
+            # Add new scam type if not already present
+            scam_type = data.get("scam_type")
+            if scam_type and scam_type not in profile["scam_types"]:
+                profile["scam_types"].append(scam_type)
 
-        # Optional: update fingerprint if provided
-        if "fingerprint" in data:
-            profile["fingerprint"] = data["fingerprint"]
+            # Optional: update fingerprint if provided
+            if "fingerprint" in data:
+                profile["fingerprint"] = data["fingerprint"]
 
-        # Optional: store last session for coordination tracking
-        if "session_id" in data:
-            profile["last_session_id"] = data["session_id"]
+            # Optional: store last session for coordination tracking
+            if "session_id" in data:
+                profile["last_session_id"] = data["session_id"]
 
-        self.db[identifier] = profile
-        self._save_db()
+            self._pending[identifier] = profile
+            self._schedule_flush()
 
     def check_coordination(
         self,
@@ -103,16 +219,16 @@ class ScammerTaxonomy:
         exclude_session: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Detect if the same fingerprint (voice / behavioral) is active 
+        Detect if the same fingerprint (voice / behavioral) is active
         across **multiple sessions** within a short time window.
-        
+
         Useful for identifying coordinated multi-scammer attacks.
-        
+
         Args:
             fingerprint: Voice hash / behavioral fingerprint to check
             window_minutes: Time window to look back (default 10 min)
             exclude_session: Optional session ID to ignore (current session)
-            
+
         Returns:
             Dict with coordination status and details
         """
@@ -121,22 +237,32 @@ class ScammerTaxonomy:
 
         now = datetime.now()
         window_seconds = window_minutes * 60
-        active_sessions = []
+        cutoff = now.timestamp() - window_seconds
 
-        for pid, profile in self.db.items():
-            if profile.get("fingerprint") != fingerprint:
-                continue
+        # Index range scan on (fingerprint, last_seen_ts), then overlay buffered updates.
+        with self._lock:
+            candidates: Dict[str, Dict[str, Any]] = {
+                row[0]: self._from_row(row)
+                for row in self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM profiles "
+                    "WHERE fingerprint = ? AND last_seen_ts > ?",
+                    (fingerprint, cutoff),
+                )
+            }
+            for pid, profile in self._pending.items():
+                if profile.get("fingerprint") == fingerprint:
+                    candidates[pid] = profile
+                else:
+                    candidates.pop(pid, None)
 
+        active_sessions: List[Dict[str, Any]] = []
+        for profile in candidates.values():
             last_seen_str = profile.get("last_seen")
-            if not last_seen_str:
-                continue
-
-            try:
-                last_seen = datetime.fromisoformat(last_seen_str)
-            except ValueError:
+            last_seen_ts = self._epoch(last_seen_str)
+            if last_seen_ts is None:
                 continue
 
-            time_diff = (now - last_seen).total_seconds()
+            time_diff = now.timestamp() - last_seen_ts
 
             if time_diff < window_seconds:
                 session_id = profile.get("last_session_id")
@@ -157,6 +283,11 @@ class ScammerTaxonomy:
             "window_minutes": window_minutes
         }
 
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
 
 # Global singleton instance (recommended usage pattern)
-taxonomy = ScammerTaxonomy()
\ No newline at end of file
+taxonomy = ScammerTaxonomy()
@@ -0,0 +1,245 @@
+# app/services/url_reputation.py
+"""
+URL canonicalization + phishing domain reputation.
+
+- canonicalize_url(): scheme/host/port/path cleanup, registered domain via a small
+  public-suffix table (enough for .in / .uk / .au style second-level suffixes).
+- Shorteners (bit.ly, tinyurl, ...) are unwrapped from a locally cached map;
+  unknown short links are scored as suspicious rather than followed.
+- Known-bad domains live in a reversed-label suffix trie:
+      "hdfc-security-login.top"   the domain and all of its subdomains
+      "*.co.in.net"               strict subdomains only
+  Each rule may carry a score; the best match along the host's labels wins.
+
+Rules:      data/url_reputation/bad_domains.txt   ("<pattern> [score]", '#' comments)
+Shorteners: data/url_reputation/shorteners.json   {"bit.ly/abc": "https://target/..."}
+"""
+import ipaddress
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+# Second-level public suffixes that matter for Indian phishing traffic.
+MULTI_LABEL_SUFFIXES = frozenset([
+    "co.in", "net.in", "org.in", "gov.in", "nic.in", "ac.in", "edu.in", "res.in",
+    "firm.in", "gen.in", "ind.in", "co.uk", "org.uk", "gov.uk", "ac.uk",
+    "com.au", "net.au", "org.au", "com.sg", "com.my", "com.pk", "com.bd", "co.za",
+])
+SHORTENER_HOSTS = frozenset([
+    "bit.ly", "tinyurl.com", "t.co", "goo.gl", "cutt.ly", "is.gd", "rb.gy", "ow.ly",
+    "shorturl.at", "tiny.cc", "buff.ly", "rebrand.ly", "s.id", "v.gd", "bitly.in",
+])
+# Brands impersonated in Indian banking/KYC phishing; seeing one outside its own
+# registered domain is a strong signal.
+BRAND_TOKENS = ("sbi", "hdfc", "icici", "axis", "kotak", "paytm", "phonepe", "gpay", "npci",
+                "uidai", "aadhaar", "incometax", "epfo", "irctc", "amazon", "flipkart")
+BRAND_DOMAINS = frozenset([
+    "sbi.co.in", "onlinesbi.sbi", "hdfcbank.com", "icicibank.com", "axisbank.com", "kotak.com",
+    "paytm.com", "phonepe.com", "npci.org.in", "uidai.gov.in", "incometax.gov.in",
+    "epfindia.gov.in", "irctc.co.in", "amazon.in", "amazon.com", "flipkart.com",
+])
+LURE_TOKENS = ("kyc", "login", "verify", "secure", "update", "refund", "reward", "bonus", "otp")
+
+_TRAILING_JUNK = ".,;:!?)]}>'\""
+
+
+@dataclass
+class CanonicalURL:
+    url: str
+    scheme: str
+    host: str
+    path: str
+    registered_domain: str
+    is_ip: bool = False
+
+
+@dataclass
+class URLVerdict:
+    url: str
+    host: str
+    registered_domain: str
+    status: str            # MALICIOUS | SUSPICIOUS | UNKNOWN | INVALID
+    confidence: float      # probability-like phishing score in [0, 1]
+    expanded_from: Optional[str] = None
+    reasons: List[str] = field(default_factory=list)
+
+
+def registered_domain(host: str) -> str:
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def canonicalize_url(raw: str) -> Optional[CanonicalURL]:
+    """Parse and normalize a raw extracted URL. None if there is no usable host."""
+    text = str(raw or "").strip().rstrip(_TRAILING_JUNK)
+    if not text:
+        return None
+    if "://" not in text:
+        text = "https://" + text
+    try:
+        parts = urlsplit(text)
+        port = parts.port
+    except ValueError:
+        return None
+    host = (parts.hostname or "").rstrip(".")
+    if not host or " " in host:
+        return None
+    try:
+        host = host.encode("idna").decode("ascii") if not host.isascii() else host
+    except UnicodeError:
+        return None
+    scheme = parts.scheme.lower() if parts.scheme.lower() in ("http", "https") else "https"
+
+    try:
+        ipaddress.ip_address(host)
+        is_ip = True
+    except ValueError:
+        is_ip = False
+
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    path = parts.path if parts.path not in ("", "/") else ""
+    url = f"{scheme}://{netloc}{path}" + (f"?{parts.query}" if parts.query else "")
+    return CanonicalURL(url, scheme, host, path, host if is_ip else registered_domain(host), is_ip)
+
+
+class DomainTrie:
+    """
+    Reversed-label suffix trie: 'a.b.evil.com' is walked com → evil → b → a.
+    A node's rule lives under the "" key (labels are never empty) as
+    (score for this domain and subdomains, score for strict subdomains only),
+    so each label costs a single dict lookup.
+    """
+
+    def __init__(self):
+        self.root: Dict[str, dict] = {}
+        self.size = 0
+
+    def add(self, pattern: str, score: float = 1.0) -> None:
+        pattern = pattern.strip().lower().rstrip(".")
+        strict = pattern.startswith("*.")
+        if strict:
+            pattern = pattern[2:]
+        labels = [label for label in pattern.split(".") if label]
+        if not labels:
+            return
+        node = self.root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        sub, sub_only = node.get("", (0.0, 0.0))
+        node[""] = (sub, max(sub_only, float(score))) if strict else (max(sub, float(score)), sub_only)
+        self.size += 1
+
+    def match(self, host: str) -> float:
+        """Best rule score along the host's labels (0.0 if none)."""
+        labels = host.split(".")
+        i = len(labels)
+        node = self.root
+        best = 0.0
+        while i:
+            i -= 1
+            node = node.get(labels[i])
+            if node is None:
+                break
+            rule = node.get("")
+            if rule is not None:
+                score = rule[0] if not i or rule[0] >= rule[1] else rule[1]
+                if score > best:
+                    best = score
+        return best
+
+
+class URLReputationEngine:
+    def __init__(self, data_dir: str = "data/url_reputation"):
+        self.data_dir = data_dir
+        self.reload()
+
+    def reload(self) -> None:
+        trie = DomainTrie()
+        rules = os.path.join(self.data_dir, "bad_domains.txt")
+        if os.path.exists(rules):
+            with open(rules, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.split("#", 1)[0].split()
+                    if not line:
+                        continue
+                    try:
+                        trie.add(line[0], float(line[1]) if len(line) > 1 else 1.0)
+                    except ValueError:
+                        continue
+        shorteners: Dict[str, str] = {}
+        path = os.path.join(self.data_dir, "shorteners.json")
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    shorteners = {self._short_key(k): v for k, v in json.load(f).items()}
+            except (OSError, ValueError):
+                shorteners = {}
+        # Swap both at once; cached verdicts are from the previous rule set.
+        self.trie, self.shorteners = trie, shorteners
+        self.check.cache_clear()
+
+    @staticmethod
+    def _short_key(raw: str) -> str:
+        c = canonicalize_url(raw)
+        return f"{c.host}{c.path}" if c else str(raw)
+
+    def match_domain(self, host: str) -> float:
+        """Trie lookup only (the hot path once a host is known)."""
+        return self.trie.match(host)
+
+    @lru_cache(maxsize=65536)
+    def check(self, raw: str) -> URLVerdict:
+        canon = canonicalize_url(raw)
+        if canon is None:
+            return URLVerdict(str(raw), "", "", "INVALID", 0.0)
+
+        expanded_from = None
+        reasons: List[str] = []
+        score = 0.0
+        if canon.host in SHORTENER_HOSTS or canon.registered_domain in SHORTENER_HOSTS:
+            target = self.shorteners.get(f"{canon.host}{canon.path}")
+            if target and canonicalize_url(target):
+                expanded_from, canon = canon.url, canonicalize_url(target)
+                reasons.append("shortener_unwrapped")
+            else:
+                score = max(score, 0.55)
+                reasons.append("unresolved_shortener")
+
+        host = canon.host
+        bare = host[4:] if host.startswith("www.") else host
+        rule_score = self.trie.match(bare)
+        if rule_score:
+            score = max(score, rule_score)
+            reasons.append("blocklisted_domain")
+        if canon.is_ip:
+            score = max(score, 0.7)
+            reasons.append("ip_literal_host")
+        if "xn--" in host:
+            score = max(score, 0.6)
+            reasons.append("punycode_host")
+        if canon.registered_domain not in BRAND_DOMAINS and any(b in bare for b in BRAND_TOKENS):
+            lure = any(t in f"{bare}{canon.path}" for t in LURE_TOKENS)
+            score = max(score, 0.8 if lure else 0.6)
+            reasons.append("brand_impersonation")
+        if bare.count(".") >= 4:
+            score = max(score, 0.45)
+            reasons.append("deep_subdomain")
+
+        status = "MALICIOUS" if score >= 0.8 else ("SUSPICIOUS" if score >= 0.4 else "UNKNOWN")
+        return URLVerdict(canon.url, host, canon.registered_domain, status, round(score, 3), expanded_from, reasons)
+
+
+def _default_dir() -> str:
+    from app.core.config import SETTINGS
+    return SETTINGS.URL_REPUTATION_DIR
+
+
+# Global singleton instance
+url_reputation = URLReputationEngine(_default_dir())
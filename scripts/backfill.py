@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Bulk backfill: re-run extraction + classification over historical sessions.
+
+Streams sessions from scam_database.json (and/or JSONL session exports), fans the
+scammer messages out over a process pool in chunks, writes one row per message to a
+columnar file and prints per-rule deltas against the values stored with each session.
+
+Usage:
+    python scripts/backfill.py [--db scam_database.json] [--jsonl sessions.jsonl ...]
+                               [--out backfill_results.npz] [--workers N] [--chunk 256]
+
+Output columns: session, turn, scam_type, confidence, n_upi_ids, n_bank_accounts,
+n_ifsc_codes, n_phone_numbers, n_urls. `.npz` is always available (NumPy);
+`.parquet` is written when pyarrow is installed.
+
+Note: audit_trail.jsonl only stores SHA-256 digests of the inputs, so it cannot be
+re-scored; export conversations to JSONL (one session object per line) instead.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intel_accumulator import INTEL_KINDS, SessionIntel
+from app.services.fusion import ScamClassifier
+from app.services.tools import extract_scam_data
+
+# Legacy dashboard-era records store intel under short keys.
+LEGACY_KEYS = {"upi": "upi_ids", "bank": "bank_accounts", "phones": "phone_numbers"}
+SCAM_TYPES = ["safe"] + [k for k in ScamClassifier().scam_keywords if k != "safe"]
+_TYPE_CODE = {t: i for i, t in enumerate(SCAM_TYPES)}
+
+
+# ── Streaming readers ──────────────────────────────────────────────────────────
+def iter_json_object(path: str, read_size: int = 1 << 20) -> Iterator[Tuple[str, Any]]:
+    """Yield top-level (key, value) pairs of a JSON object without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws() -> None:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,:":
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return
+
+        def decode():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A number at the very end of the buffer may still be truncated.
+                    if end == len(buf) and not eof and fill():
+                        continue
+                    pos = end
+                    return value
+                except json.JSONDecodeError:
+                    if eof or not fill():
+                        raise
+
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "{":
+            raise ValueError(f"{path}: expected a top-level JSON object")
+        pos += 1
+        while True:
+            skip_ws()
+            if pos >= len(buf) or buf[pos] == "}":
+                return
+            key = decode()
+            skip_ws()
+            yield key, decode()
+
+
+def iter_jsonl(path: str) -> Iterator[Tuple[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield str(record.get("session_id") or f"{os.path.basename(path)}:{n}"), record
+
+
+def scammer_messages(record: Dict[str, Any]) -> List[str]:
+    history = record.get("message_history") or record.get("history") or []
+    out = []
+    for line in history if isinstance(history, list) else []:
+        if not isinstance(line, str):
+            continue
+        role, sep, text = line.partition(":")
+        if sep and role.strip().lower() == "scammer":
+            out.append(text.strip())
+    return out
+
+
+def stored_intel(record: Dict[str, Any]) -> Dict[str, List[str]]:
+    stored: Dict[str, List[str]] = defaultdict(list)
+    for field in ("extracted_data", "extracted"):
+        data = record.get(field) or {}
+        if not isinstance(data, dict):
+            continue
+        for key, values in data.items():
+            key = LEGACY_KEYS.get(key, key)
+            if key in INTEL_KINDS and isinstance(values, list):
+                stored[key].extend(values)
+    return stored
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────────
+_classifier = None
+
+
+def _score_chunk(chunk: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    global _classifier
+    if _classifier is None:
+        _classifier = ScamClassifier()
+
+    # Classify the whole chunk in one vectorized call, then walk it session by session.
+    messages = [scammer_messages(record) for _, record in chunk]
+    predictions = iter(_classifier.predict_batch([t for texts in messages for t in texts]))
+
+    rows = defaultdict(list)
+    sessions = []
+    for (session_id, record), texts in zip(chunk, messages):
+        intel = SessionIntel()
+        best_type, best_conf = "safe", 0.0
+        for turn, text in enumerate(texts, start=1):
+            extracted = extract_scam_data(text)
+            intel.add_many(extracted, turn)
+            result = next(predictions)
+            conf = float(result.get("confidence", 0.0))
+            stype = result.get("scam_type", "safe")
+            if conf > best_conf:
+                best_type, best_conf = stype, conf
+
+            rows["session"].append(session_id)
+            rows["turn"].append(turn)
+            rows["scam_type"].append(_TYPE_CODE.get(stype, 0))
+            rows["confidence"].append(conf)
+            for kind in INTEL_KINDS:
+                rows[f"n_{kind}"].append(len(extracted.get(kind, [])))
+
+        old = SessionIntel()
+        old.add_many(stored_intel(record), 0)
+        delta = {}
+        for kind in INTEL_KINDS:
+            new_set, old_set = set(intel.values(kind)), set(old.values(kind))
+            delta[kind] = (len(new_set - old_set), len(old_set - new_set))
+        sessions.append({
+            "session_id": session_id,
+            "stored_type": str(record.get("scam_type") or "unknown"),
+            "new_type": best_type,
+            "stored_detected": float(record.get("fusion_probability") or 0.0) >= 0.4,
+            "new_detected": best_conf >= 0.4,
+            "delta": delta,
+        })
+    return {"rows": dict(rows), "sessions": sessions}
+
+
+# ── Output ─────────────────────────────────────────────────────────────────────
+class ColumnarWriter:
+    """Accumulates column chunks; writes .npz (always) or .parquet (pyarrow, streamed)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.columns: Dict[str, List[np.ndarray]] = defaultdict(list)
+        self._parquet = None
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow  # noqa: F401
+                import pyarrow.parquet  # noqa: F401
+                self._parquet = True
+            except ImportError:
+                self.path = path[: -len(".parquet")] + ".npz"
+                print(f"pyarrow not installed, writing {self.path} instead", file=sys.stderr)
+        self._writer = None
+
+    def write(self, rows: Dict[str, list]) -> None:
+        if not rows:
+            return
+        cols = {
+            "session": np.asarray(rows["session"], dtype=object),
+            "turn": np.asarray(rows["turn"], dtype=np.int32),
+            "scam_type": np.asarray(rows["scam_type"], dtype=np.int8),
+            "confidence": np.asarray(rows["confidence"], dtype=np.float32),
+        }
+        for kind in INTEL_KINDS:
+            cols[f"n_{kind}"] = np.asarray(rows[f"n_{kind}"], dtype=np.int16)
+
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({k: (v.astype(str) if v.dtype == object else v) for k, v in cols.items()})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            return
+        for k, v in cols.items():
+            self.columns[k].append(v)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            return
+        if not self.columns:
+            return
+        arrays = {k: np.concatenate(v) for k, v in self.columns.items()}
+        arrays["session"] = arrays["session"].astype(str)
+        arrays["scam_type_labels"] = np.asarray(SCAM_TYPES)
+        np.savez_compressed(self.path, **arrays)
+
+
+# ── Driver ─────────────────────────────────────────────────────────────────────
+def iter_sessions(args) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if args.db and os.path.exists(args.db):
+        for sid, record in iter_json_object(args.db):
+            if isinstance(record, dict):
+                yield str(sid), record
+    for path in args.jsonl or []:
+        yield from iter_jsonl(path)
+
+
+def chunked(it: Iterator, size: int) -> Iterator[list]:
+    chunk = []
+    for item in it:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score historical sessions with the current rules.")
+    parser.add_argument("--db", default="scam_database.json", help="Session DB (JSON object keyed by session_id)")
+    parser.add_argument("--jsonl", nargs="*", help="Extra JSONL session exports")
+    parser.add_argument("--out", default="backfill_results.npz", help="Columnar output (.npz or .parquet)")
+    parser.add_argument("--report", default="", help="Optional path for the JSON delta report")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=256, help="Sessions per work unit")
+    args = parser.parse_args()
+
+    writer = ColumnarWriter(args.out)
+    rule_deltas = {k: {"sessions_changed": 0, "added": 0, "removed": 0} for k in INTEL_KINDS}
+    type_changes: Counter = Counter()
+    detection = Counter()
+    n_sessions = n_messages = 0
+    start = time.perf_counter()
+
+    with Pool(processes=max(1, args.workers)) as pool:
+        # imap keeps input streaming and output ordered with bounded prefetch.
+        for result in pool.imap(_score_chunk, chunked(iter_sessions(args), args.chunk)):
+            writer.write(result["rows"])
+            n_messages += len(result["rows"].get("session", []))
+            for s in result["sessions"]:
+                n_sessions += 1
+                for kind, (added, removed) in s["delta"].items():
+                    if added or removed:
+                        rule_deltas[kind]["sessions_changed"] += 1
+                    rule_deltas[kind]["added"] += added
+                    rule_deltas[kind]["removed"] += removed
+                if s["stored_type"] != s["new_type"]:
+                    type_changes[f"{s['stored_type']} -> {s['new_type']}"] += 1
+                detection[(s["stored_detected"], s["new_detected"])] += 1
+    writer.close()
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    report = {
+        "sessions": n_sessions,
+        "messages": n_messages,
+        "seconds": round(elapsed, 3),
+        "messages_per_hour": int(n_messages / elapsed * 3600),
+        "output": writer.path,
+        "extraction_deltas": rule_deltas,
+        "classification": {
+            "type_changes": dict(type_changes.most_common()),
+            "newly_detected": detection[(False, True)],
+            "no_longer_detected": detection[(True, False)],
+        },
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
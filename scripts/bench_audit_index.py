@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /audit/last-block and dashboard head lookups, readlines() over the
+whole trail (previous behaviour) vs the offset index, plus random block and
+per-session access.
+
+Writes an N-block trail through the audit writer with the index attached, then
+times each lookup. Also reports the one-off cost of rebuilding the index from
+the trail (first start after upgrading, or after a stale sidecar).
+Usage: python scripts/bench_audit_index.py [--blocks 200000] [--sessions 5000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_writer import AuditWriter
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def legacy_last_block(path):
+    with open(path, "r") as f:
+        lines = f.readlines()
+    return len(lines), json.loads(lines[-1].strip())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="index-bench-"), "audit_trail.jsonl")
+    index = AuditIndex(path)
+    writer = AuditWriter(path, fsync="never", index=index)
+    start = time.perf_counter()
+    for i in range(args.blocks):
+        writer.submit(f"session-{i % args.sessions}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL",
+                      "Normal processing", 0.8, f"scammer message {i}", f"agent reply {i}")
+    writer.close()
+    print(f"trail: {args.blocks:,} blocks, {os.path.getsize(path) / 1e6:.1f} MB "
+          f"(written with index in {time.perf_counter() - start:.1f} s)")
+
+    count, legacy_head = legacy_last_block(path)
+    assert count == index.count() and legacy_head == index.head()
+    print(f"head            readlines {timed(lambda: legacy_last_block(path), 3):9.2f} ms   "
+          f"index {timed(index.head, 1000):7.3f} ms")
+
+    numbers = [random.randint(1, args.blocks) for _ in range(1000)]
+    it = iter(numbers)
+    print(f"block N         index {timed(lambda: index.block(next(it)), 1000):7.3f} ms")
+    sessions = [f"session-{random.randrange(args.sessions)}" for _ in range(200)]
+    it = iter(sessions)
+    print(f"session page    index {timed(lambda: index.session_blocks(next(it), 0, 20), 200):7.3f} ms "
+          f"({args.blocks // args.sessions} blocks/session)")
+
+    start = time.perf_counter()
+    AuditIndex(path).count()
+    load = time.perf_counter() - start
+    os.remove(path + ".idx")
+    start = time.perf_counter()
+    AuditIndex(path).count()
+    print(f"open existing index {load * 1e3:.0f} ms   rebuild from trail {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
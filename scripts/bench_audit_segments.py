@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit trail on segmented, compressed storage vs one plain file.
+
+Writes the same N events twice (single file, then rolling segments), and
+reports write throughput, bytes on disk, random block reads (sealed vs
+active) and a full chain verification across segments.
+Usage: python scripts/bench_audit_segments.py [--blocks 200000] [--segment-mb 8]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_segments import SegmentStore
+from app.services.audit_verifier import verify_range
+from app.services.audit_writer import AuditWriter
+
+
+def write(path, n, segments=None):
+    index = AuditIndex(path, store=segments)
+    writer = AuditWriter(path, fsync="never", index=index, segments=segments)
+    start = time.perf_counter()
+    for i in range(n):
+        writer.submit(f"session-{i % 5000}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL",
+                      "Normal processing", 0.8, f"scammer message {i}", f"agent reply {i}")
+    writer.close()
+    return index, n / (time.perf_counter() - start)
+
+
+def disk_bytes(path, directory):
+    total = os.path.getsize(path)
+    if os.path.isdir(directory):
+        total += sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--segment-mb", type=float, default=8)
+    args = parser.parse_args()
+
+    plain = os.path.join(tempfile.mkdtemp(prefix="segments-bench-"), "audit_trail.jsonl")
+    _, rate = write(plain, args.blocks)
+    print(f"single file   {rate:9,.0f} ev/s   on disk {os.path.getsize(plain) / 1e6:7.1f} MB")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="segments-bench-"), "audit_trail.jsonl")
+    store = SegmentStore(path, max_bytes=int(args.segment_mb * 1024 * 1024))
+    index, rate = write(path, args.blocks, store)
+    headers = store.headers()
+    print(f"segmented     {rate:9,.0f} ev/s   on disk {disk_bytes(path, store.directory) / 1e6:7.1f} MB "
+          f"({len(headers)} sealed segments + {os.path.getsize(path) / 1e6:.1f} MB active)")
+
+    sealed_blocks = headers[-1]["first_block"] + headers[-1]["blocks"] - 1 if headers else 0
+    for label, lo, hi in (("sealed", 1, sealed_blocks), ("active", sealed_blocks + 1, args.blocks)):
+        if lo > hi:
+            continue
+        numbers = [random.randint(lo, hi) for _ in range(500)]
+        start = time.perf_counter()
+        for n in numbers:
+            index.block(n)
+        print(f"random block read ({label}) {(time.perf_counter() - start) / len(numbers) * 1e3:.3f} ms")
+
+    start = time.perf_counter()
+    result = verify_range(path)
+    print(f"full verification across segments: {result['status']} {result['blocks']:,} blocks "
+          f"in {time.perf_counter() - start:.2f} s (single file: ", end="")
+    start = time.perf_counter()
+    verify_range(plain)
+    print(f"{time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /audit/verify-chain cost, full re-hash (previous behaviour) vs the
+checkpointed incremental check.
+
+Writes an N-block trail with the audit writer, verifies it once (full, which
+also sets the checkpoint), then appends batches of new blocks and times the
+incremental check against a full pass over the grown file.
+Usage: python scripts/bench_audit_verifier.py [--blocks 200000] [--append 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_verifier import AuditVerifier, verify_range
+from app.services.audit_writer import AuditWriter
+
+
+def append(path, n, start):
+    writer = AuditWriter(path, fsync="never")
+    for i in range(start, start + n):
+        writer.submit(f"session-{i % 5000}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL",
+                      "Normal processing", 0.8, f"scammer message {i}", f"agent reply {i}")
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--append", type=int, default=100)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="verify-bench-"), "audit_trail.jsonl")
+    append(path, args.blocks, 0)
+    verifier = AuditVerifier(path)
+
+    start = time.perf_counter()
+    verifier.verify_incremental()   # first call = full pass, sets the checkpoint
+    first = time.perf_counter() - start
+    print(f"trail: {args.blocks:,} blocks, {os.path.getsize(path) / 1e6:.1f} MB; first verify {first * 1e3:.0f} ms")
+
+    total = args.blocks
+    for _ in range(3):
+        append(path, args.append, total)
+        total += args.append
+        start = time.perf_counter()
+        result = verifier.verify_incremental()
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        verify_range(path)
+        full = time.perf_counter() - start
+        print(f"+{args.append} blocks → incremental {incremental * 1e3:7.2f} ms ({result['new_blocks']} new)   "
+              f"full re-hash {full * 1e3:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit trail writes, previous per-call open/append/close vs the
+group-commit AuditWriter.
+
+For each implementation and thread count, N events are logged into a fresh file
+in a temp dir. Reported: caller-side cost per call, end-to-end throughput (until
+everything is on disk), writes/fsyncs issued and chain forks found by re-verifying
+the file. The legacy path never fsynced; the writer is shown under each policy.
+Usage: python scripts/bench_audit_writer.py [--events 20000] [--threads 1,8]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_writer import GENESIS_HASH, AuditWriter
+
+
+class LegacyAudit:
+    """Previous ObservabilityEngine.log_decision + _persist_log, verbatim logic."""
+
+    def __init__(self, path):
+        self.path = path
+        self.last_hash = GENESIS_HASH
+
+    def log_decision(self, session_id, event_type, actor, decision, reasoning, confidence,
+                     input_data, output_data, metadata=None):
+        in_h = hashlib.sha256(str(input_data).encode()).hexdigest()
+        out_h = hashlib.sha256(str(output_data).encode()).hexdigest()
+        curr_h = hashlib.sha256(f"{self.last_hash}{session_id}{event_type}{in_h}{out_h}".encode()).hexdigest()
+        entry = {
+            "timestamp": datetime.utcnow().isoformat() + "Z", "session_id": session_id, "event_type": event_type,
+            "actor": actor, "decision": str(decision)[:500], "reasoning": reasoning, "confidence": confidence,
+            "input_hash": in_h, "output_hash": out_h, "previous_hash": self.last_hash, "current_hash": curr_h,
+            "metadata": metadata or {},
+        }
+        self.last_hash = curr_h
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def count_forks(path):
+    forks, expected = 0, GENESIS_HASH
+    with open(path) as f:
+        for line in f:
+            block = json.loads(line)
+            if block["previous_hash"] != expected:
+                forks += 1
+            expected = block["current_hash"]
+    return forks
+
+
+def run(log, events, threads):
+    per = events // threads
+    caller = [0.0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(t):
+        barrier.wait()
+        start = time.perf_counter()
+        for i in range(per):
+            log(f"session-{t}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL", "Normal processing", 0.8,
+                f"scammer message {t}-{i} " * 4, f"agent reply {t}-{i} " * 4)
+        caller[t] = time.perf_counter() - start
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for th in pool:
+        th.join()
+    return start, max(caller) / per
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--threads", default="1,8")
+    args = parser.parse_args()
+
+    for threads in [int(t) for t in args.threads.split(",")]:
+        events = args.events // threads * threads
+        print(f"── {events:,} events, {threads} thread(s) ──")
+
+        path = os.path.join(tempfile.mkdtemp(prefix="audit-bench-"), "audit.jsonl")
+        legacy = LegacyAudit(path)
+        start, per_call = run(legacy.log_decision, events, threads)
+        total = time.perf_counter() - start
+        print(f"legacy           : {per_call * 1e6:8.1f} µs/call in caller  {events / total:9,.0f} events/s  "
+              f"writes {events:,}  fsyncs 0  forks {count_forks(path)}")
+
+        for policy in ("never", "interval", "batch"):
+            path = os.path.join(tempfile.mkdtemp(prefix="audit-bench-"), "audit.jsonl")
+            writer = AuditWriter(path, fsync=policy)
+            start, per_call = run(writer.submit, events, threads)
+            writer.flush()
+            total = time.perf_counter() - start
+            writer.close()
+            print(f"writer {policy:<9} : {per_call * 1e6:8.1f} µs/call in caller  {events / total:9,.0f} events/s  "
+                  f"writes {writer.stats['batches']:,}  fsyncs {writer.stats['fsyncs']:,}  forks {count_forks(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scalar ScamClassifier.predict loop vs vectorized predict_batch.
+Builds N synthetic messages from the detection battery + logged sessions, checks that
+both paths return identical results and prints the speedup.
+Usage: python scripts/bench_classifier.py [N]   (default 100000)
+"""
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from app.services.fusion import ScamClassifier
+
+
+def corpus() -> list:
+    import test_detection_battery as battery
+
+    texts = []
+    for name in ("OBVIOUS_SCAMS", "SUBTLE_SCAMS", "NON_SCAMS", "MULTILINGUAL"):
+        texts.extend(getattr(battery, name, []))
+    db_path = os.path.join(ROOT, "scam_database.json")
+    if os.path.exists(db_path):
+        with open(db_path, "r", encoding="utf-8") as f:
+            for record in json.load(f).values():
+                for line in record.get("message_history") or record.get("history") or []:
+                    if isinstance(line, str) and line.lower().startswith("scammer:"):
+                        texts.append(line.split(":", 1)[1].strip())
+    return texts
+
+
+def synthesize(base: list, n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = rng.sample(base, k=rng.choice((1, 1, 2)))
+        out.append(" ".join(parts))
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    texts = synthesize(corpus(), n)
+    clf = ScamClassifier()
+    clf.predict_batch(texts[:100])  # build tables / import scipy outside the timer
+
+    t0 = time.perf_counter()
+    scalar = [clf.predict(t) for t in texts]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = clf.predict_batch(texts)
+    t_batch = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(scalar, batch) if a != b)
+    print(f"messages:        {n}")
+    print(f"scalar predict:  {t_scalar:.3f}s  ({n / t_scalar:,.0f} msg/s)")
+    print(f"predict_batch:   {t_batch:.3f}s  ({n / t_batch:,.0f} msg/s)")
+    print(f"speedup:         {t_scalar / t_batch:.1f}x")
+    print(f"mismatches:      {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
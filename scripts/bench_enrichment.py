@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-identifier sequential lookups vs the batched, cached EnrichmentService.
+
+Starts the NPCI/TRAI stand-in (scripts/govt_api_standin.py) on a free local port and
+replays S concurrent sessions x T turns. Each turn carries a few UPIs/phones drawn
+from a skewed pool, so identifiers repeat across turns and sessions as in live traffic.
+Usage: python scripts/bench_enrichment.py [--sessions 200] [--turns 5] [--npci-ms 120] [--trai-ms 80]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+
+from app.services.enrichment import EnrichmentService
+from app.services.mock_govt_apis import GovernmentAPIClient
+from govt_api_standin import create_app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_standin(port: int, npci_ms: float, trai_ms: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(npci_ms, trai_ms), host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def workload(sessions: int, turns: int, seed: int = 11):
+    rng = random.Random(seed)
+    upis = [f"user{i}@{rng.choice(['ybl', 'paytm', 'okaxis', 'sbi'])}" for i in range(400)]
+    phones = [f"+919{rng.randrange(10**8, 10**9)}" for _ in range(400)]
+    pick = lambda pool: pool[min(int(rng.paretovariate(1.2)) - 1, len(pool) - 1)]
+    return [
+        [{"upi_ids": [pick(upis) for _ in range(rng.randint(1, 3))],
+          "phone_numbers": [pick(phones) for _ in range(rng.randint(0, 2))]} for _ in range(turns)]
+        for _ in range(sessions)
+    ]
+
+
+async def run_sequential(client: GovernmentAPIClient, plan) -> list:
+    async def session(turns):
+        lat = []
+        for intel in turns:
+            start = time.perf_counter()
+            for upi in intel["upi_ids"]:
+                await client.npci_upi_lookup_many([upi])
+            for phone in intel["phone_numbers"]:
+                await client.trai_dnd_check_many([phone])
+            lat.append(time.perf_counter() - start)
+        return lat
+    return [x for lat in await asyncio.gather(*(session(t) for t in plan)) for x in lat]
+
+
+async def run_service(service: EnrichmentService, plan) -> list:
+    async def session(turns):
+        lat = []
+        for intel in turns:
+            start = time.perf_counter()
+            await service.enrich(intel)
+            lat.append(time.perf_counter() - start)
+        return lat
+    return [x for lat in await asyncio.gather(*(session(t) for t in plan)) for x in lat]
+
+
+def report(name: str, wall: float, lat: list, requests: int) -> None:
+    lat_ms = sorted(x * 1000 for x in lat)
+    print(f"{name:<22} wall {wall:6.2f}s  turn p50 {statistics.median(lat_ms):7.1f} ms  "
+          f"p99 {lat_ms[int(len(lat_ms) * 0.99) - 1]:7.1f} ms  remote requests {requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--npci-ms", type=float, default=120.0)
+    parser.add_argument("--trai-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_standin(port, args.npci_ms, args.trai_ms)
+    base = f"http://127.0.0.1:{port}"
+    plan = workload(args.sessions, args.turns)
+    n_ids = sum(len(i["upi_ids"]) + len(i["phone_numbers"]) for turns in plan for i in turns)
+    print(f"{args.sessions} sessions x {args.turns} turns, {n_ids} identifiers")
+
+    async def bench():
+        seq_client = GovernmentAPIClient(f"{base}/npci", f"{base}/trai", timeout_s=30)
+        start = time.perf_counter()
+        lat = await run_sequential(seq_client, plan)
+        report("sequential, no cache", time.perf_counter() - start, lat, seq_client.requests_sent)
+        await seq_client.aclose()
+
+        svc_client = GovernmentAPIClient(f"{base}/npci", f"{base}/trai", timeout_s=30)
+        service = EnrichmentService(client=svc_client)
+        start = time.perf_counter()
+        lat = await run_service(service, plan)
+        report("EnrichmentService", time.perf_counter() - start, lat, svc_client.requests_sent)
+        print(f"cache: {service.stats()}")
+        await svc_client.aclose()
+
+    asyncio.run(bench())
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
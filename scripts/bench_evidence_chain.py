@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: evidence appends per second, legacy SQLite chain (two connections
+per call: head lookup, then INSERT + commit) vs the ledger-backed
+JudicialEvidenceChain (cached head, one open file, group commit), both durable
+on return (SQLite default synchronous=FULL vs AUDIT_FSYNC=batch).
+
+Usage: python scripts/bench_evidence_chain.py [--events 2000] [--threads 16]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_writer import AuditWriter
+from app.services.evidence_chain import JudicialEvidenceChain
+from app.services.ledger import Ledger
+from scripts.migrate_evidence_ledger import LEGACY_GENESIS, legacy_hash, read_legacy
+
+
+class LegacySQLiteChain:
+    """The pre-ledger JudicialEvidenceChain.log_evidence, kept for comparison."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE evidence_chain (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                         "timestamp TEXT NOT NULL, event_type TEXT NOT NULL, content_json TEXT NOT NULL, "
+                         "prev_hash TEXT NOT NULL, data_hash TEXT NOT NULL UNIQUE, "
+                         "created_at TEXT DEFAULT CURRENT_TIMESTAMP)")
+
+    def log_evidence(self, session_id, event_type, content):
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        content_json = json.dumps(content, sort_keys=True, separators=(',', ':'))
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT data_hash FROM evidence_chain ORDER BY id DESC LIMIT 1").fetchone()
+        prev_hash = row[0] if row else LEGACY_GENESIS
+        current_hash = legacy_hash(prev_hash, timestamp, session_id, event_type, content_json)
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute("INSERT INTO evidence_chain (session_id, timestamp, event_type, content_json, prev_hash, "
+                         "data_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                         (session_id, timestamp, event_type, content_json, prev_hash, current_hash))
+        return current_hash
+
+
+def content(i):
+    return {"upi_ids": [f"scammer{i}@ybl"], "turn": i, "tactic": "urgency",
+            "digest": hashlib.sha256(str(i).encode()).hexdigest()}
+
+
+def run(chain, events, threads):
+    """Appends per second with `threads` callers; returns (rate, errors)."""
+    errors = []
+    per_thread = events // threads
+
+    def worker(t):
+        for i in range(per_thread):
+            try:
+                chain.log_evidence(f"session-{t}", "STRATEGIC_ENGAGEMENT", content(i))
+            except Exception as e:
+                errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    return per_thread * threads / (time.perf_counter() - start), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="evidence-bench-")
+
+    for threads in (1, args.threads):
+        db = os.path.join(directory, f"legacy-{threads}.db")
+        rate, errors = run(LegacySQLiteChain(db), args.events, threads)
+        try:
+            read_legacy(db)
+            chain = "intact"
+        except ValueError as e:
+            chain = f"BROKEN ({e})"
+        print(f"legacy sqlite     {threads:2d} threads {rate:9,.0f} appends/s   errors {errors:4d}   chain {chain}")
+
+    for threads in (1, args.threads):
+        path = os.path.join(directory, f"ledger-{threads}.jsonl")
+        ledger = Ledger(path, AuditWriter(path, fsync="batch"))
+        rate, errors = run(JudicialEvidenceChain(ledger), args.events, threads)
+        ledger.close()
+        print(f"ledger            {threads:2d} threads {rate:9,.0f} appends/s   errors {errors:4d}   "
+              f"chain {ledger.verify()['status']} ({ledger.writer.stats['fsyncs']} fsyncs)")
+
+    path = os.path.join(directory, "ledger-many.jsonl")
+    ledger = Ledger(path, AuditWriter(path, fsync="batch"))
+    evidence = JudicialEvidenceChain(ledger)
+    start = time.perf_counter()
+    for b in range(0, args.events, 100):
+        evidence.log_evidence_many([(f"session-{b}", "STRATEGIC_ENGAGEMENT", content(i)) for i in range(b, b + 100)])
+    rate = args.events / (time.perf_counter() - start)
+    ledger.close()
+    print(f"log_evidence_many  batches of 100 {rate:9,.0f} appends/s   "
+          f"chain {ledger.verify()['status']} ({ledger.writer.stats['fsyncs']} fsyncs)")
+
+
+if __name__ == "__main__":
+    main()
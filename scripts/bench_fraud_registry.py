@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fraud registry compile/load/lookup at feed scale.
+
+Writes N synthetic UPI handles to a temp registry, compiles it, re-opens the mmapped
+index (what every worker does at start-up) and times hit/miss lookups. The legacy
+lowercase-copy + linear scan is timed on a 100k slice for comparison.
+Usage: python scripts/bench_fraud_registry.py [N]   (default 10000000)
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fraud_registry import FraudRegistry
+
+HANDLES = ["ybl", "paytm", "okaxis", "okhdfcbank", "okicici", "sbi", "axl", "ibl"]
+
+
+def synth_upi(i: int) -> str:
+    return f"user{i * 2654435761 % 10**10:010d}@{HANDLES[i % len(HANDLES)]}"
+
+
+def per_call_us(fn, values) -> float:
+    start = time.perf_counter()
+    for v in values:
+        fn(v)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    tmp = tempfile.mkdtemp(prefix="fraud_registry_bench_")
+    try:
+        start = time.perf_counter()
+        with open(os.path.join(tmp, "upis.txt"), "w", encoding="utf-8") as f:
+            for lo in range(0, n, 100_000):
+                f.write("\n".join(synth_upi(i) for i in range(lo, min(n, lo + 100_000))) + "\n")
+        print(f"entries:           {n:,}  (source written in {time.perf_counter() - start:.1f}s)")
+
+        start = time.perf_counter()
+        FraudRegistry(tmp)
+        print(f"cold compile:      {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        registry = FraudRegistry(tmp)
+        print(f"warm load (mmap):  {(time.perf_counter() - start) * 1000:.1f} ms")
+        size = sum(os.path.getsize(os.path.join(registry.compiled_dir, p)) for p in os.listdir(registry.compiled_dir))
+        print(f"index on disk:     {size / 2**20:.1f} MB")
+
+        rng = random.Random(1)
+        hits = [synth_upi(rng.randrange(n)) for _ in range(100_000)]
+        misses = [f"nobody{i}@ybl" for i in range(100_000)]
+        assert all(registry.is_fraud_upi(v) for v in hits[:1000])
+        false_pos = sum(registry.is_fraud_upi(v) for v in misses)
+        print(f"lookup hit:        {per_call_us(registry.is_fraud_upi, hits):.2f} us")
+        print(f"lookup miss:       {per_call_us(registry.is_fraud_upi, misses):.2f} us  (false positives: {false_pos})")
+
+        legacy = [synth_upi(i) for i in range(min(n, 100_000))]
+        probes = misses[:20]
+        legacy_us = per_call_us(lambda v: v.lower() in [u.lower() for u in legacy], probes)
+        print(f"legacy scan @100k: {legacy_us:.0f} us per lookup")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
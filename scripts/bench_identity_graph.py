@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental union-find IdentityGraph vs rebuilding a networkx graph per query.
+
+Generates N sessions that draw identifiers from a shared pool (so rings form),
+streams them into the IdentityGraph turn by turn, and compares the per-query
+cost of cluster size/membership against the dashboard approach of rebuilding
+the whole graph and taking connected components.
+Usage: python scripts/bench_identity_graph.py [--sessions 200000] [--nx-sessions 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+
+from app.services.identity_graph import IdentityGraph
+
+
+def sessions(n: int, seed: int = 9):
+    rng = random.Random(seed)
+    pool = max(10, n // 3)
+    for i in range(n):
+        turns = []
+        for _ in range(rng.randint(1, 4)):
+            kind = rng.choice(["upi_ids", "phone_numbers", "bank_accounts"])
+            turns.append({kind: [f"{kind[:3]}{rng.randrange(pool)}"]})
+        yield f"s{i}", turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200_000)
+    parser.add_argument("--nx-sessions", type=int, default=20_000)
+    args = parser.parse_args()
+    data = list(sessions(args.sessions))
+
+    g = IdentityGraph()
+    turns = 0
+    start = time.perf_counter()
+    for sid, session_turns in data:
+        for intel in session_turns:
+            g.link(sid, intel)
+            turns += 1
+    build = time.perf_counter() - start
+    rng = random.Random(1)
+    probes = [f"s{rng.randrange(args.sessions)}" for _ in range(100_000)]
+    start = time.perf_counter()
+    for sid in probes:
+        g.cluster_size(sid)
+    size_q = (time.perf_counter() - start) / len(probes)
+    print(f"IdentityGraph  {args.sessions:>8,} sessions  {turns / build:,.0f} updates/s  "
+          f"cluster_size {size_q * 1e6:.2f} µs  {g.stats()}")
+
+    subset = data[:args.nx_sessions]
+    start = time.perf_counter()
+    G = nx.Graph()
+    for sid, session_turns in subset:
+        G.add_node(sid)
+        for intel in session_turns:
+            for kind, values in intel.items():
+                for v in values:
+                    G.add_edge(sid, f"{kind}:{v}")
+    component = {n: i for i, comp in enumerate(nx.connected_components(G)) for n in comp}
+    rebuild = time.perf_counter() - start
+    print(f"networkx       {len(subset):>8,} sessions  rebuild + components {rebuild * 1e3:,.0f} ms per refresh "
+          f"({len(set(component.values())):,} components)")
+
+
+if __name__ == "__main__":
+    main()
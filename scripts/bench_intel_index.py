@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: identifier → sessions lookups, scan of a scam_database.json-style dict
+(what the dashboard's upi_map/phone_map/bank_map do) vs the IntelIndex.
+
+Builds N sessions with a few identifiers each drawn from a skewed pool, then times
+exact lookups (first page of 50) and bank-account suffix searches.
+Usage: python scripts/bench_intel_index.py [--sessions 1000000] [--scan-sessions 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intel_index import IntelIndex
+
+
+def sessions(n: int, seed: int = 2):
+    rng = random.Random(seed)
+    pool = max(100, n // 4)
+    # half hot identifiers (shared by many sessions), half from a long tail
+    pick = lambda: min(int(rng.paretovariate(0.7)), pool) if rng.random() < 0.5 else rng.randrange(pool)
+    for i in range(n):
+        yield f"s{i:08d}", {
+            "upi_ids": [f"user{pick()}@ybl" for _ in range(rng.randint(0, 2))],
+            "phone_numbers": [f"+919{pick():09d}" for _ in range(rng.randint(0, 1))],
+            "bank_accounts": [f"{10**11 + pick() * 7919 % 10**11}" for _ in range(rng.randint(0, 1))],
+        }
+
+
+def scan_lookup(db: dict, kind: str, value: str) -> list:
+    return [sid for sid, details in db.items() if value in details["extracted_data"].get(kind, [])]
+
+
+def scan_suffix(db: dict, suffix: str) -> set:
+    return {v for details in db.values() for v in details["extracted_data"].get("bank_accounts", [])
+            if v.endswith(suffix)}
+
+
+def timed(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--scan-sessions", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    probes = [("upi_ids", f"user{min(int(rng.paretovariate(0.7)), 1000)}@ybl") for _ in range(200)]
+    suffixes = [(f"{rng.randrange(10000):04d}",) for _ in range(50)]
+
+    db = {sid: {"extracted_data": intel} for sid, intel in sessions(args.scan_sessions)}
+    lookup = timed(lambda k, v: scan_lookup(db, k, v), probes[:20])
+    suffix = timed(lambda s: scan_suffix(db, s), suffixes[:5])
+    print(f"JSON scan   {args.scan_sessions:>9,} sessions  lookup {lookup * 1e3:8.2f} ms  suffix {suffix * 1e3:8.2f} ms")
+
+    index = IntelIndex(os.path.join(tempfile.mkdtemp(prefix="intel-bench-"), "intel_index.db"))
+    start = time.perf_counter()
+    batch = []
+    for sid, intel in sessions(args.sessions):
+        batch.extend((kind, v, sid, 0, 0.0) for kind, values in intel.items() for v in values)
+        if len(batch) >= 50_000:
+            index.add_postings(batch)
+            batch = []
+    index.add_postings(batch)
+    print(f"IntelIndex  {args.sessions:>9,} sessions  built in {time.perf_counter() - start:.1f}s  {index.stats()}")
+    lookup = timed(lambda k, v: index.lookup(k, v, limit=50), probes)
+    suffix = timed(lambda s: index.search("bank_accounts", suffix=s, limit=50), suffixes)
+    print(f"IntelIndex  {args.sessions:>9,} sessions  lookup {lookup * 1e3:8.2f} ms  suffix {suffix * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
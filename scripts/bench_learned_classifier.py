@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: heuristic ScamClassifier vs the learned artifact.
+
+Accuracy is reported on a deterministic 20% holdout (the learned model is re-trained
+on the other 80% for this) and on the full corpus with the shipped artifact.
+Latency is per-message predict_proba (p50/p99) plus artifact load time.
+Usage: python scripts/bench_learned_classifier.py [--model models/scam_classifier.npz]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from app.services.fusion import ScamClassifier
+from app.services.learned_classifier import LearnedScamClassifier
+import train_classifier
+
+SCAM_THRESHOLD = 0.4  # same cut-off main.py uses for scam_detected
+
+
+def metrics(model, corpus):
+    y = np.array([label for _, label in corpus], dtype=bool)
+    pred = np.array([model.predict_proba(text) >= SCAM_THRESHOLD for text, _ in corpus], dtype=bool)
+    tp, fp = int((pred & y).sum()), int((pred & ~y).sum())
+    fn = int((~pred & y).sum())
+    return {
+        "accuracy": float((pred == y).mean()) if len(y) else 0.0,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "false_positives": fp,
+    }
+
+
+def latency_us(model, texts, rounds: int = 20):
+    samples = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            model.predict_proba(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def row(name, m, lat=None):
+    line = (f"{name:<22} acc {m['accuracy']:.3f}  prec {m['precision']:.3f}  "
+            f"rec {m['recall']:.3f}  fp {m['false_positives']:>3}")
+    if lat:
+        line += f"  p50 {lat[0]:7.1f}us  p99 {lat[1]:7.1f}us"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(ROOT, "models", "scam_classifier.npz"))
+    parser.add_argument("--db", default=os.path.join(ROOT, "scam_database.json"))
+    args = parser.parse_args()
+
+    corpus = train_classifier.build_corpus(args.db)
+    train, holdout = train_classifier.split(corpus)
+    heuristic = ScamClassifier()
+    print(f"corpus: {len(corpus)} messages, holdout: {len(holdout)}")
+
+    print("\n-- holdout (learned re-trained on the remaining 80%) --")
+    row("heuristic", metrics(heuristic, holdout))
+    row("learned", metrics(train_classifier.train(train), holdout))
+
+    start = time.perf_counter()
+    shipped = LearnedScamClassifier.load(args.model)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    texts = [t for t, _ in corpus]
+    print("\n-- full corpus, shipped artifact --")
+    row("heuristic", metrics(heuristic, corpus), latency_us(heuristic, texts))
+    row("learned", metrics(shipped, corpus), latency_us(shipped, texts))
+    print(f"\nartifact: {os.path.getsize(args.model) / 1024:.1f} KB, load {load_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
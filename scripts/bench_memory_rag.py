@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory_rag recall, previous linear Jaccard scan vs the MinHash-LSH index.
+
+Writes N synthetic interactions (scam-like templates with random fillers, so
+near-duplicates exist) to a temporary JSONL log, replays it into a MemoryIndex,
+then times recall and measures recall@1 against an exact scan on a sample.
+Usage: python scripts/bench_memory_rag.py [--n 1000000] [--scan-n 20000] [--queries 300]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.memory_rag import MemoryIndex, _entry_id
+
+TEMPLATES = [
+    "your {bank} account will be blocked today update kyc via {link} immediately",
+    "this is {officer} from cyber police a case is registered on your aadhaar {num}",
+    "congratulations you won {amount} lottery pay processing fee to {upi}",
+    "refund of {amount} pending click {link} and enter otp to receive",
+    "electricity bill unpaid power cut at {num} pm tonight call {phone}",
+]
+FILL = {
+    "bank": ["sbi", "hdfc", "icici", "axis", "pnb"], "officer": ["sharma", "verma", "singh", "khan"],
+    "link": [f"bit.ly/x{i}" for i in range(500)], "num": [str(i) for i in range(1000)],
+    "amount": [f"rs{i}000" for i in range(100)], "upi": [f"pay{i}@ybl" for i in range(2000)],
+    "phone": [f"98{i:08d}" for i in range(2000)],
+}
+WORDS = [f"tok{i}" for i in range(50000)]
+
+
+def make_text(rng: random.Random) -> str:
+    base = rng.choice(TEMPLATES).format(**{k: rng.choice(v) for k, v in FILL.items()})
+    return base + " " + " ".join(rng.sample(WORDS, rng.randint(2, 8)))
+
+
+def linear_recall(items, text):
+    """Previous implementation's inner loop (no type filter)."""
+    current = set(text.lower().split())
+    best, best_score = None, 0.0
+    for item in items:
+        stored = set(item["scam_text"].lower().split())
+        union = len(current | stored)
+        score = len(current & stored) / union if union else 0.0
+        if score > best_score:
+            best, best_score = item["reply"], score
+    return best if best_score > 0.2 else ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--scan-n", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+    rng = random.Random(5)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="memory-bench-"), "memory_store.jsonl")
+    with open(path, "w") as f:
+        for i in range(args.n):
+            text = make_text(rng)
+            f.write(json.dumps({"id": _entry_id(text, f"r{i}"), "scam_text": text, "reply": f"r{i}", "type": "T"}) + "\n")
+
+    start = time.perf_counter()
+    index = MemoryIndex(path, legacy_path=None)
+    len(index)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"LSH index: replayed {len(index):,} interactions in {time.perf_counter() - start:.1f}s (peak RSS {rss:,.0f} MB)")
+
+    queries = []
+    for i in rng.sample(range(args.n), args.queries):
+        words = index.items[i]["scam_text"].split()
+        queries.append(" ".join(words[:-2] + ["hello", "sir"]))
+
+    start = time.perf_counter()
+    answers = [index.recall(q) for q in queries]
+    per = (time.perf_counter() - start) / len(queries)
+    print(f"LSH index: n={args.n:>9,}  recall {per * 1e3:7.3f} ms/query")
+
+    scan_items = index.items[:args.scan_n]
+    start = time.perf_counter()
+    for q in queries[:20]:
+        linear_recall(scan_items, q)
+    per = (time.perf_counter() - start) / 20
+    print(f"linear   : n={args.scan_n:>9,}  recall {per * 1e3:7.3f} ms/query  "
+          f"(≈{per * args.n / args.scan_n:.2f} s/query extrapolated to n={args.n:,})")
+
+    sample = 30
+    agree = sum(linear_recall(index.items, q) == a for q, a in zip(queries[:sample], answers[:sample]))
+    print(f"recall@1 vs exact scan over all {args.n:,}: {agree}/{sample}")
+
+    start = time.perf_counter()
+    for i in range(10_000):
+        index.add(make_text(rng), f"new{i}", "T")
+    print(f"add: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} µs/interaction (append + index, tail merges amortized)")
+
+
+if __name__ == "__main__":
+    main()
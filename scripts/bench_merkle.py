@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: proving one audit record, full chain replay (previous behaviour:
+hand over and re-hash every block) vs a Merkle inclusion proof against a
+signed root, plus consistency proofs between two roots.
+
+Usage: python scripts/bench_merkle.py [--blocks 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_verifier import verify_range
+from app.services.audit_writer import AuditWriter
+from app.services.merkle import MerkleLedger, leaf_hash, verify_consistency, verify_inclusion
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="merkle-bench-")
+    path = os.path.join(directory, "audit_trail.jsonl")
+    index = AuditIndex(path)
+    writer = AuditWriter(path, fsync="never", index=index)
+    for i in range(args.blocks):
+        writer.submit(f"session-{i % 5000}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL",
+                      "Normal processing", 0.8, f"scammer message {i}", f"agent reply {i}")
+    writer.close()
+    ledger = MerkleLedger(index, signing_key_path=os.path.join(directory, "key.pem"))
+
+    start = time.perf_counter()
+    ledger.sync()
+    build = time.perf_counter() - start
+    signed = ledger.sign_root()
+    root = bytes.fromhex(signed["root_hash"])
+    print(f"trail: {args.blocks:,} blocks, {os.path.getsize(path) / 1e6:.1f} MB; "
+          f"tree built in {build:.2f} s, signed root at size {signed['tree_size']:,}")
+
+    start = time.perf_counter()
+    verify_range(path)
+    replay = time.perf_counter() - start
+    print(f"linear chain    transfer {os.path.getsize(path) / 1e6:8.1f} MB   verify {replay * 1e3:8.0f} ms")
+
+    blocks = [random.randint(1, args.blocks) for _ in range(1000)]
+    start = time.perf_counter()
+    proofs = [ledger.inclusion_proof(b) for b in blocks]
+    generate = (time.perf_counter() - start) / len(blocks)
+    start = time.perf_counter()
+    for proof in proofs:
+        leaf = leaf_hash(index.block(proof["block"])["current_hash"])
+        assert verify_inclusion(leaf, proof["leaf_index"], proof["tree_size"],
+                                [bytes.fromhex(h) for h in proof["audit_path"]], root)
+    check = (time.perf_counter() - start) / len(blocks)
+    hashes = len(proofs[0]["audit_path"])
+    print(f"inclusion proof transfer {hashes * 32 / 1e3:8.1f} kB   verify {check * 1e3:8.3f} ms "
+          f"(generate {generate * 1e3:.3f} ms, {hashes} hashes)")
+
+    first = args.blocks // 3
+    start = time.perf_counter()
+    c = ledger.consistency_proof(first)
+    assert verify_consistency(first, args.blocks, bytes.fromhex(c["first_root"]), root,
+                              [bytes.fromhex(h) for h in c["proof"]])
+    print(f"consistency {first:,} → {args.blocks:,}: {len(c['proof'])} hashes, "
+          f"{(time.perf_counter() - start) * 1e3:.2f} ms generate + verify")
+
+    start = time.perf_counter()
+    MerkleLedger(index, signing_key_path=os.path.join(directory, "key.pem")).root()
+    print(f"reopen persisted tree {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of one histogram observation on the hot path, per-thread
+sharded cells (app/services/metrics.py) vs a single histogram behind a lock,
+with 1 and N recording threads.
+
+Usage: python scripts/bench_metrics.py [--ops 1000000] [--threads 8]
+"""
+import argparse
+import bisect
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.metrics import LATENCY_BUCKETS, MetricsRegistry
+
+
+class LockedHistogram:
+    """One shared set of counts guarded by a lock (the obvious implementation)."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.sum += value
+            self.count += 1
+
+
+def run(observe, ops, threads):
+    """Nanoseconds per observation (wall time over all threads' ops)."""
+    per_thread = ops // threads
+    values = [i % 1000 / 1000 for i in range(1000)]
+
+    def work():
+        for i in range(per_thread):
+            observe(values[i % 1000])
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    for threads in (1, args.threads):
+        locked = LockedHistogram(LATENCY_BUCKETS)
+        sharded = MetricsRegistry().histogram("bench_seconds", "Bench.", ["stage"]).labels("swarm")
+        ns_locked = run(locked.observe, args.ops, threads)
+        ns_sharded = run(sharded.observe, args.ops, threads)
+        assert sharded.snapshot()[2] == locked.count
+        print(f"{threads:2d} threads   locked {ns_locked:7.0f} ns/op   sharded {ns_sharded:7.0f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: semantic_memory embedding throughput, IVF top-k latency and recall.
+
+Builds a SemanticMemory from N synthetic scam messages (templates with random
+fillers plus typo noise) in a temporary directory, then reports batch embedding
+throughput, build time, query latency (p50/p99, includes embedding the query),
+recall@k against exact brute-force cosine on the same vectors, incremental
+add/delete cost and restart time from the snapshot.
+Usage: python scripts/bench_semantic_memory.py [--n 1000000] [--queries 500] [--k 5] [--nprobe 8]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.semantic_memory import SemanticMemory
+
+TEMPLATES = [
+    "your {bank} account will be blocked today update kyc via {link} immediately",
+    "this is officer {name} from cyber police a case is registered on your aadhaar {num}",
+    "congratulations you won {amount} in lucky draw pay processing fee to {upi}",
+    "refund of {amount} is pending click {link} and enter the otp to receive",
+    "electricity bill unpaid power will be cut at {num} pm tonight call {phone}",
+    "hello sir i am calling from {bank} credit card department your card is upgraded share otp",
+    "work from home job earn {amount} daily just like youtube videos contact {phone}",
+]
+FILL = {
+    "bank": ["sbi", "hdfc", "icici", "axis", "pnb", "kotak"], "name": ["sharma", "verma", "singh", "khan", "reddy"],
+    "link": [f"bit.ly/x{i}" for i in range(500)], "num": [str(i) for i in range(1000)],
+    "amount": [f"rs{i}000" for i in range(100)], "upi": [f"pay{i}@ybl" for i in range(2000)],
+    "phone": [f"98{i:08d}" for i in range(2000)],
+}
+WORDS = [f"w{i}" for i in range(50000)]
+
+
+def typo(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        i = rng.randrange(len(chars))
+        chars[i] = rng.choice("aeiourstn ")
+    return "".join(chars)
+
+
+def make_text(rng: random.Random) -> str:
+    base = rng.choice(TEMPLATES).format(**{k: rng.choice(v) for k, v in FILL.items()})
+    return typo(rng, base + " " + " ".join(rng.sample(WORDS, rng.randint(2, 6))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    texts = [make_text(rng) for _ in range(args.n)]
+    directory = tempfile.mkdtemp(prefix="semantic-bench-")
+    memory = SemanticMemory(directory, nprobe=args.nprobe)
+
+    start = time.perf_counter()
+    memory.embedder.embed(texts[:100_000])
+    per = (time.perf_counter() - start) / min(args.n, 100_000)
+    print(f"embed (batch): {per * 1e6:.1f} µs/text  (≈{1 / per:,.0f} texts/s)")
+
+    start = time.perf_counter()
+    memory.add_many([{"scam_text": t, "reply": f"r{i}", "type": "T"} for i, t in enumerate(texts)])
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"build: {args.n:,} interactions in {time.perf_counter() - start:.1f}s  "
+          f"({memory.stats()['lists']} lists, peak RSS {rss:,.0f} MB)")
+
+    sources = rng.sample(range(args.n), args.queries)
+    queries = [typo(rng, texts[i]) for i in sources]
+    latencies = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(memory.search(q, k=args.k))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e3
+    print(f"search top-{args.k} (nprobe={args.nprobe}): p50 {np.percentile(latencies, 50):.2f} ms  "
+          f"p99 {np.percentile(latencies, 99):.2f} ms")
+    source_hits = sum(f"r{i}" in {h["reply"] for h in hits} for i, hits in zip(sources, results))
+    print(f"source message (typo'd query) in top-{args.k}: {source_hits / args.queries:.3f}")
+
+    # Exact brute-force cosine over the same vectors (everything is packed after the bulk build)
+    start = time.perf_counter()
+    found = 0
+    for q, hits in zip(queries[:100], results[:100]):
+        scores = memory._packed @ memory.embedder.embed([q])[0]
+        exact = memory._packed_rows[np.argpartition(-scores, args.k)[:args.k]]
+        found += len({f"r{i}" for i in exact.tolist()} & {h["reply"] for h in hits})
+    per = (time.perf_counter() - start) / 100
+    print(f"exact scan: {per * 1e3:.1f} ms/query;  recall@{args.k} of IVF vs exact: {found / (100 * args.k):.3f}")
+
+    start = time.perf_counter()
+    for i in range(2000):
+        memory.add(make_text(rng), f"new{i}", "T")
+    print(f"add: {(time.perf_counter() - start) / 2000 * 1e3:.3f} ms/interaction (incl. log append, repacks amortized)")
+    start = time.perf_counter()
+    for hit in results[:200]:
+        memory.delete(hit[0]["id"])
+    print(f"delete: {(time.perf_counter() - start) / 200 * 1e6:.1f} µs")
+
+    start = time.perf_counter()
+    memory.save()
+    print(f"snapshot: {time.perf_counter() - start:.1f}s")
+    del memory
+    start = time.perf_counter()
+    reloaded = SemanticMemory(directory, nprobe=args.nprobe)
+    print(f"restart from log + snapshot: {len(reloaded):,} live rows in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: verifying one session, full chain scan (the only correct check
+before session links: every session's blocks interleave in one chain) vs the
+session sub-chain walked through the offset index.
+
+Usage: python scripts/bench_session_verify.py [--blocks 200000] [--sessions 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_verifier import verify_range
+from app.services.audit_writer import AuditWriter
+from app.services.ledger import Ledger
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="session-bench-"), "audit_trail.jsonl")
+    ledger = Ledger(path, AuditWriter(path, fsync="never", index=AuditIndex(path)))
+    start = time.perf_counter()
+    for i in range(args.blocks):
+        session = f"session-{random.randrange(args.sessions)}"
+        if i % 4:
+            ledger.append("AUDIT", session, "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL", "Normal processing",
+                          0.8, f"scammer message {i}", f"agent reply {i}")
+        else:
+            ledger.append_evidence(session, "STRATEGIC_ENGAGEMENT", {"turn": i, "upi_ids": [f"x{i}@ybl"]})
+    ledger.flush()
+    rate = args.blocks / (time.perf_counter() - start)
+    print(f"trail: {args.blocks:,} blocks over {args.sessions:,} sessions "
+          f"({os.path.getsize(path) / 1e6:.1f} MB), written at {rate:,.0f} ev/s")
+
+    start = time.perf_counter()
+    assert verify_range(path)["status"] == "VERIFIED"
+    full = time.perf_counter() - start
+    print(f"full chain scan          {full * 1e3:9.1f} ms per session")
+
+    sessions = [f"session-{random.randrange(args.sessions)}" for _ in range(200)]
+    start = time.perf_counter()
+    checked = 0
+    for session in sessions:
+        result = ledger.verify_session(session)
+        assert result["status"] == "VERIFIED"
+        checked += result["blocks_checked"]
+    per = (time.perf_counter() - start) / len(sessions)
+    print(f"session sub-chain        {per * 1e3:9.3f} ms per session "
+          f"({checked / len(sessions):.0f} blocks each, {full / per:,.0f}x faster)")
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
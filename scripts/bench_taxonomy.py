@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON-file scammer taxonomy (previous implementation) vs the indexed SQLite store.
+
+Builds N profiles spread over F fingerprints, then times update_profile,
+get_profile and check_coordination. The JSON baseline rewrites the whole file
+on every update and scans every profile for coordination, so it is measured on
+a few calls only and at a smaller size by default.
+Usage: python scripts/bench_taxonomy.py [--n 1000000] [--fingerprints 50000] [--legacy-n 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.taxonomy import ScammerTaxonomy
+
+
+def make_profiles(n: int, fingerprints: int, seed: int = 5):
+    rng = random.Random(seed)
+    now = datetime.now()
+    for i in range(n):
+        seen = now - timedelta(seconds=rng.randrange(0, 7 * 86400))
+        yield f"+9198{i:08d}", {
+            "first_seen": (seen - timedelta(days=1)).isoformat(),
+            "risk_score": round(rng.random(), 3),
+            "scam_types": [rng.choice(["KYC_FRAUD", "UPI_FRAUD", "DIGITAL_ARREST"])],
+            "encounters": rng.randint(1, 9),
+            "fingerprint": f"fp{rng.randrange(fingerprints)}",
+            "last_seen": seen.isoformat(),
+            "last_session_id": f"s{i}",
+        }
+
+
+# ── Previous implementation, reduced to its two hot paths ──────────────────────
+def legacy_save(path: str, profiles: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+
+
+def legacy_check(profiles: dict, fingerprint: str, window_minutes: int = 10) -> int:
+    now = datetime.now()
+    found = 0
+    for profile in profiles.values():
+        if profile.get("fingerprint") != fingerprint:
+            continue
+        last_seen = profile.get("last_seen")
+        if last_seen and (now - datetime.fromisoformat(last_seen)).total_seconds() < window_minutes * 60:
+            found += 1
+    return found
+
+
+def timed(fn, reps: int) -> float:
+    start = time.perf_counter()
+    for i in range(reps):
+        fn(i)
+    return (time.perf_counter() - start) / reps
+
+
+def fmt(seconds: float) -> str:
+    return f"{seconds * 1e3:9.3f} ms" if seconds >= 1e-3 else f"{seconds * 1e6:9.1f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--fingerprints", type=int, default=50_000)
+    parser.add_argument("--legacy-n", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    tmp = tempfile.mkdtemp(prefix="taxonomy-bench-")
+
+    # Legacy JSON store
+    legacy = dict(make_profiles(args.legacy_n, args.fingerprints))
+    path = os.path.join(tmp, "scammer_taxonomy.json")
+    upd = timed(lambda i: legacy_save(path, legacy), 3)
+    chk = timed(lambda i: legacy_check(legacy, f"fp{rng.randrange(args.fingerprints)}"), 5)
+    print(f"JSON     n={args.legacy_n:>9,}  update {fmt(upd)}  check_coordination {fmt(chk)}")
+
+    # Indexed store (legacy import path exercises the bulk loader)
+    legacy_save(path, dict(make_profiles(args.n, args.fingerprints)))
+    start = time.perf_counter()
+    tax = ScammerTaxonomy(db_path=os.path.join(tmp, "taxonomy.db"), legacy_json=path)
+    print(f"SQLite   n={len(tax):>9,}  import {time.perf_counter() - start:.1f}s")
+
+    ids = [f"+9198{rng.randrange(args.n):08d}" for _ in range(20_000)]
+    get = timed(lambda i: tax.get_profile(ids[i]), len(ids))
+    tax.flush()
+    upd = timed(lambda i: tax.update_profile(ids[i], {"scam_score": 0.5, "session_id": f"live{i}",
+                                                      "fingerprint": f"fp{i % args.fingerprints}"}), len(ids))
+    tax.flush()
+    chk = timed(lambda i: tax.check_coordination(f"fp{rng.randrange(args.fingerprints)}"), 20_000)
+    print(f"SQLite   n={args.n:>9,}  update {fmt(upd)}  check_coordination {fmt(chk)}  get {fmt(get)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: phishing domain trie lookups at blocklist scale.
+
+Loads N synthetic bad domains (plus wildcard rules) into a DomainTrie and times
+host matches (hit / subdomain hit / miss), full URL checks (cold and cached).
+Usage: python scripts/bench_url_reputation.py [N]   (default 1000000)
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.url_reputation import DomainTrie, URLReputationEngine
+
+TLDS = ["in", "com", "top", "xyz", "co.in", "net", "info"]
+
+
+def per_call_ns(fn, values) -> float:
+    start = time.perf_counter()
+    for v in values:
+        fn(v)
+    return (time.perf_counter() - start) / len(values) * 1e9
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(3)
+    domains = [f"kyc-{rng.getrandbits(40):010x}.{TLDS[i % len(TLDS)]}" for i in range(n)]
+
+    start = time.perf_counter()
+    trie = DomainTrie()
+    for d in domains:
+        trie.add(d)
+    trie.add("*.co.in.net")
+    print(f"rules:             {trie.size:,}  (built in {time.perf_counter() - start:.1f}s)")
+
+    hits = [rng.choice(domains) for _ in range(200_000)]
+    subs = [f"secure.login.{d}" for d in hits]
+    misses = [f"shop-{i}.example.com" for i in range(200_000)]
+    assert all(trie.match(h) for h in hits[:1000]) and not any(trie.match(m) for m in misses[:1000])
+    print(f"match hit:         {per_call_ns(trie.match, hits):.0f} ns")
+    print(f"match subdomain:   {per_call_ns(trie.match, subs):.0f} ns")
+    print(f"match miss:        {per_call_ns(trie.match, misses):.0f} ns")
+
+    engine = URLReputationEngine("__no_such_dir__")
+    engine.trie = trie
+    urls = [f"https://{h}/verify?id={i}" for i, h in enumerate(subs[:50_000])]
+    print(f"check cold:        {per_call_ns(engine.check, urls) / 1000:.2f} us")
+    print(f"check cached:      {per_call_ns(engine.check, urls[:20_000]) / 1000:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
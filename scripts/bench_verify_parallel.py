@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full chain verification, sequential walk vs verify_parallel with
+1..N worker processes over the same trail (segmented, as in production).
+
+Generating 10^7 blocks takes a while; pass --trail to reuse one from an
+earlier run (it is kept and its path printed).
+Usage: python scripts/bench_verify_parallel.py [--blocks 10000000] [--trail PATH] [--workers 1,2,4,8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_segments import SegmentStore
+from app.services.audit_verifier import verify_parallel, verify_range
+from app.services.audit_writer import AuditWriter
+
+
+def generate(path, n):
+    store = SegmentStore(path)
+    writer = AuditWriter(path, fsync="never", segments=store)
+    start = time.perf_counter()
+    for i in range(n):
+        writer.submit(f"session-{i % 50_000}", "MESSAGE_ANALYSIS", "Vibhishan_Agent", "STALL",
+                      "Normal processing", 0.8, f"scammer message {i}", f"agent reply {i}")
+        if i and i % 1_000_000 == 0:
+            print(f"  generated {i:,} blocks ({time.perf_counter() - start:.0f} s)")
+    writer.flush()
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=10_000_000)
+    parser.add_argument("--trail")
+    parser.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4, 8, 16) if w <= (os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    path = args.trail or os.path.join(tempfile.mkdtemp(prefix="verify-bench-"), "audit_trail.jsonl")
+    if not os.path.exists(path):
+        print(f"writing {args.blocks:,} blocks to {path}")
+        generate(path, args.blocks)
+    store = SegmentStore(path)
+    print(f"trail: {store.size() / 1e9:.2f} GB logical, {len(store.headers())} sealed segments, "
+          f"{os.cpu_count()} cores")
+
+    start = time.perf_counter()
+    baseline = verify_range(path)
+    sequential = time.perf_counter() - start
+    print(f"sequential         {sequential:8.1f} s   {baseline['blocks'] / sequential:12,.0f} blocks/s")
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        start = time.perf_counter()
+        result = verify_parallel(path, workers=workers)
+        seconds = time.perf_counter() - start
+        assert result == baseline, result
+        print(f"parallel x{workers:<3d}       {seconds:8.1f} s   {baseline['blocks'] / seconds:12,.0f} blocks/s   "
+              f"speed-up {sequential / seconds:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
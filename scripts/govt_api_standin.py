@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NPCI UPI lookup and TRAI DND APIs (benchmarks / dev).
+
+Answers the bulk contract used by GovernmentAPIClient with deterministic records
+and emulated latency: a base round-trip per request plus a small per-item cost,
+with jitter.
+
+Usage:
+    python scripts/govt_api_standin.py [--port 8090] [--npci-ms 120] [--trai-ms 80]
+then set NPCI_API_URL=http://127.0.0.1:8090/npci and TRAI_API_URL=http://127.0.0.1:8090/trai
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from typing import List
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+BANKS = ["SBI", "HDFC", "ICICI", "AXIS", "PNB", "KOTAK", "YES", "IDFC"]
+
+
+class UPIRequest(BaseModel):
+    upi_ids: List[str] = []
+
+
+class DNDRequest(BaseModel):
+    phones: List[str] = []
+
+
+def _h(value: str) -> int:
+    return int(hashlib.sha1(value.encode()).hexdigest()[:8], 16)
+
+
+def create_app(npci_ms: float = 120.0, trai_ms: float = 80.0, per_item_ms: float = 1.0,
+               jitter: float = 0.3) -> FastAPI:
+    app = FastAPI(title="NPCI/TRAI stand-in")
+    app.state.requests = 0
+    app.state.items = 0
+
+    async def delay(base_ms: float, n: int) -> None:
+        ms = (base_ms + per_item_ms * n) * (1 + random.uniform(-jitter, jitter))
+        await asyncio.sleep(max(ms, 0) / 1000)
+
+    @app.post("/npci/upi/lookup")
+    async def npci_upi_lookup(req: UPIRequest):
+        app.state.requests += 1
+        app.state.items += len(req.upi_ids)
+        await delay(npci_ms, len(req.upi_ids))
+        results = {}
+        for upi in req.upi_ids:
+            h = _h(upi)
+            results[upi] = {
+                "status": "ACTIVE" if h % 7 else "SUSPENDED",
+                "bank": BANKS[h % len(BANKS)],
+                "risk": ["LOW", "MEDIUM", "HIGH"][h % 3],
+                "kyc": bool(h % 5),
+            }
+        return {"results": results}
+
+    @app.post("/trai/dnd/check")
+    async def trai_dnd_check(req: DNDRequest):
+        app.state.requests += 1
+        app.state.items += len(req.phones)
+        await delay(trai_ms, len(req.phones))
+        results = {p: {"status": "DND_ACTIVE" if _h(p) % 2 else "DND_INACTIVE", "reports": _h(p) % 11}
+                   for p in req.phones}
+        return {"results": results}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "items": app.state.items}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="NPCI/TRAI API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--npci-ms", type=float, default=120.0)
+    parser.add_argument("--trai-ms", type=float, default=80.0)
+    parser.add_argument("--per-item-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.npci_ms, args.trai_ms, args.per_item_ms), host=args.host, port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
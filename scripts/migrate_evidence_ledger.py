@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Migrate the legacy SQLite evidence chain (evidence_ledger.db) into the unified
+ledger as EVIDENCE blocks.
+
+The legacy chain is verified first with its own hashing and genesis; a broken
+chain is reported and nothing is written. Each row keeps its original id,
+timestamp and hashes under metadata.legacy, so the old chain stays provable
+from the new one. Rows already migrated (same legacy data_hash in the session)
+are skipped, so the script can be re-run safely.
+
+Usage: python scripts/migrate_evidence_ledger.py [--db evidence_ledger.db] [--audit-file audit_trail.jsonl] [--archive]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ledger import AUDIT_FILE, EVIDENCE, Ledger
+
+LEGACY_GENESIS = "GENESIS_BLOCK_" + "0" * 64
+
+
+def legacy_hash(prev_hash, timestamp, session_id, event_type, content_json):
+    return hashlib.sha256(f"{prev_hash}{timestamp}{session_id}{event_type}{content_json}".encode("utf-8")).hexdigest()
+
+
+def read_legacy(db_path):
+    """All legacy rows in chain order; raises ValueError if the legacy chain does not verify."""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT id, session_id, timestamp, event_type, content_json, prev_hash, data_hash "
+                            "FROM evidence_chain ORDER BY id ASC").fetchall()
+    previous = LEGACY_GENESIS
+    for entry_id, sid, ts, etype, content_json, prev_hash, data_hash in rows:
+        if prev_hash != previous:
+            raise ValueError(f"legacy chain broken at entry ID {entry_id} (prev_hash mismatch)")
+        if legacy_hash(prev_hash, ts, sid, etype, content_json) != data_hash:
+            raise ValueError(f"legacy chain tampered at entry ID {entry_id} (hash mismatch)")
+        previous = data_hash
+    return rows
+
+
+def migrate(db_path, ledger):
+    """Append every legacy row not yet in the ledger; returns (migrated, skipped)."""
+    rows = read_legacy(db_path)
+    done = {}
+    pending, skipped = [], 0
+    for entry_id, sid, ts, etype, content_json, prev_hash, data_hash in rows:
+        if sid not in done:
+            done[sid] = {b.get("metadata", {}).get("legacy", {}).get("data_hash")
+                         for b in ledger.session_blocks(sid, kind=EVIDENCE)}
+        if data_hash in done[sid]:
+            skipped += 1
+            continue
+        legacy = {"id": entry_id, "timestamp": ts, "prev_hash": prev_hash, "data_hash": data_hash}
+        pending.append((sid, etype, json.loads(content_json), {"legacy": legacy}))
+    for receipt in ledger.append_evidence_many(pending):
+        receipt.result()
+    return len(pending), skipped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="evidence_ledger.db")
+    parser.add_argument("--audit-file", default=AUDIT_FILE)
+    parser.add_argument("--archive", action="store_true", help="rename the db to <db>.migrated afterwards")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"⚠️ {args.db} not found; nothing to migrate")
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.audit_file)), exist_ok=True)
+    ledger = Ledger(args.audit_file)
+    try:
+        migrated, skipped = migrate(args.db, ledger)
+    except ValueError as e:
+        print(f"❌ {e}; nothing migrated")
+        sys.exit(1)
+    finally:
+        ledger.close()
+    result = ledger.verify()
+    if result["status"] != "VERIFIED":
+        where = f" at block {result['at_block']}" if result.get("at_block") is not None else ""
+        print(f"⚠️ migrated {migrated} evidence blocks ({skipped} already present), but the ledger is "
+              f"{result['status']}{where}; {args.db} left in place")
+        sys.exit(1)
+    print(f"✅ migrated {migrated} evidence blocks ({skipped} already present); ledger {result['status']}")
+    if args.archive:
+        os.replace(args.db, args.db + ".migrated")
+        print(f"archived {args.db} → {args.db}.migrated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+audit_index: the audit writer keeps the offset index in step with the trail,
+head/block/session lookups match a full read, stale or missing sidecars are
+rebuilt, and the /audit endpoints serve from the index (block records only
+with the API key).
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.security import InvalidAPIKeyError
+from app.routers import audit as audit_router
+from app.services.audit_index import AuditIndex
+from app.services.audit_writer import AuditWriter
+
+
+def write_blocks(path, n, start=0, index=None):
+    writer = AuditWriter(path, fsync="never", max_batch=16, index=index)
+    for i in range(start, start + n):
+        writer.submit(f"s{i % 7}", "MESSAGE_ANALYSIS", "test", "d", "r", 0.5, f"in{i}", f"out{i}")
+    writer.close()
+
+
+def read_all(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writer_maintains_index(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    index = AuditIndex(path)
+    write_blocks(path, 500, index=index)
+    blocks = read_all(path)
+
+    assert index.count() == 500 and index.head() == blocks[-1]
+    assert index.block(1) == blocks[0] and index.block(250) == blocks[249]
+    assert index.block(0) is None and index.block(501) is None
+    assert os.path.getsize(path + ".idx") == 8 + 8 * 500
+
+    page = index.session_blocks("s3", offset=10, limit=5)
+    expected = [(n + 1, b) for n, b in enumerate(blocks) if b["session_id"] == "s3"]
+    assert page["total"] == len(expected)
+    assert [(b.pop("block"), b) for b in page["blocks"]] == expected[10:15]
+    assert index.session_blocks("nobody")["total"] == 0
+
+    # A fresh process loads the sidecars instead of rescanning
+    reopened = AuditIndex(path)
+    assert reopened.count() == 500 and reopened.block(499) == blocks[498]
+
+
+def test_catch_up_and_rebuild(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    write_blocks(path, 100)                       # written before any index existed
+    index = AuditIndex(path)
+    assert index.count() == 100
+
+    write_blocks(path, 20, start=100)             # another writer, no index attached
+    with open(path, "a") as f:
+        f.write('{"timestamp": "partial')         # torn tail is not indexed
+    assert index.count() == 120
+    with open(path) as f:
+        assert index.head() == json.loads(f.readlines()[119])
+
+    # Corrupt sidecar → full rebuild on load
+    with open(path + ".idx", "r+b") as f:
+        f.seek(8 + 8 * 50)
+        f.write(b"\xff" * 8)
+    rebuilt = AuditIndex(path)
+    assert rebuilt.count() == 120 and rebuilt.block(51)["session_id"] == f"s{50 % 7}"
+
+    # Read-only views catch up in memory and never touch the sidecars
+    size = os.path.getsize(path + ".idx")
+    os.truncate(path, os.path.getsize(path) - len('{"timestamp": "partial'))
+    write_blocks(path, 5, start=120)
+    view = AuditIndex(path, read_only=True)
+    assert view.count() == 125 and os.path.getsize(path + ".idx") == size
+
+
+def test_audit_endpoints(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.jsonl")
+    index = AuditIndex(path)
+    write_blocks(path, 40, index=index)
+    blocks = read_all(path)
+    monkeypatch.setattr(audit_router, "audit_index", index)
+    app = FastAPI()
+    app.include_router(audit_router.router)
+    app.add_exception_handler(InvalidAPIKeyError,
+                              lambda request, exc: JSONResponse(status_code=403, content={"error": "Invalid API key"}))
+    client = TestClient(app, headers={"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY})
+
+    for url in ("/audit/block/7", "/audit/session/s2", "/audit/session/s2/verify"):
+        assert TestClient(app).get(url).status_code == 403          # block records need the API key
+    head = client.get("/audit/last-block").json()
+    assert head["block"] == 40 and head["hash"] == blocks[-1]["current_hash"][:16] + "..."
+    assert client.get("/audit/block/7").json() == {"block": 7, **blocks[6]}
+    assert client.get("/audit/block/41").status_code == 404
+    session = client.get("/audit/session/s2", params={"limit": 3}).json()
+    assert session["total"] == 6 and [b["block"] for b in session["blocks"]] == [3, 10, 17]
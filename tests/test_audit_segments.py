@@ -0,0 +1,129 @@
+"""
+audit_segments: the writer rolls the trail into compressed, chain-linked
+segments; the index, verifier and raw gzip readers see the same blocks across
+segments; tampering with bodies or headers is caught; retention keeps the
+header chain; an interrupted seal is recovered.
+"""
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audit_index import AuditIndex
+from app.services.audit_segments import SegmentStore, header_digest
+from app.services.audit_verifier import AuditVerifier, verify_range
+from app.services.audit_writer import AuditWriter
+
+
+def write_trail(path, n, start=0, **store_args):
+    store = SegmentStore(path, max_bytes=store_args.pop("max_bytes", 20_000), **store_args)
+    index = AuditIndex(path, store=store)
+    writer = AuditWriter(path, fsync="never", max_batch=8, index=index, segments=store)
+    receipts = [writer.submit(f"s{i % 7}", "MESSAGE_ANALYSIS", "test", "d", "r", 0.5, f"in{i}", f"out{i}")
+                for i in range(start, start + n)]
+    writer.close()
+    return store, index, [r.result().__dict__ for r in receipts]
+
+
+def rewrite_header(store, header, rehash=True):
+    if rehash:
+        header["header_hash"] = header_digest(header)
+    with open(store._path(header["segment"], ".json"), "w") as f:
+        json.dump(header, f)
+    store._dir_stamp = None
+
+
+def test_segments_are_transparent_to_readers(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    store, index, logs = write_trail(path, 600)
+    headers = store.headers()
+    assert len(headers) >= 10 and store.verify_headers() is None
+    assert os.path.getsize(path) < store.max_bytes + 8 * 1024           # only the active tail stays plain
+
+    # Plain gzip tools see the original lines
+    raw = b"".join(gzip.open(store._path(h["segment"], ".jsonl.gz")).read() for h in headers)
+    raw += open(path, "rb").read()
+    assert [json.loads(line) for line in raw.splitlines()] == logs
+    assert sum(h["compressed_bytes"] for h in headers) < sum(h["body_bytes"] for h in headers) / 2
+
+    for reader in (index, AuditIndex(path), AuditIndex(path, read_only=True, store=SegmentStore(path))):
+        assert reader.count() == 600 and reader.head() == logs[-1]
+        assert [reader.block(n) for n in (1, 77, 301, 600)] == [logs[0], logs[76], logs[300], logs[599]]
+        assert [b["input_hash"] for b in reader.session_blocks("s3", limit=1000)["blocks"]] == \
+               [log["input_hash"] for log in logs if log["session_id"] == "s3"]
+
+    assert verify_range(path)["status"] == "VERIFIED"
+    result = AuditVerifier(path).verify_incremental()
+    assert result["status"] == "VERIFIED" and result["blocks_checked"] == 600
+
+
+def test_tampering_with_segments_is_detected(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    store, _, logs = write_trail(path, 300)
+    headers = store.headers()
+
+    # Edit a block inside the newest sealed segment and patch its header to match
+    last = headers[-1]
+    body_path = store._path(last["segment"], ".jsonl.gz")
+    body = gzip.decompress(open(body_path, "rb").read())
+    victim = body.split(b"\n")[2]
+    block = json.loads(victim)
+    block["output_hash"] = "0" * 64
+    body = body.replace(victim, json.dumps(block).encode())
+    member = gzip.compress(body, mtime=0)
+    shutil.copy(body_path, body_path + ".orig")
+    with open(body_path, "wb") as f:
+        f.write(member)
+    rewrite_header(store, {**last, "chunks": [[0, 0, len(member)]], "compressed_bytes": len(member)})
+    result = verify_range(path)
+    assert result["status"] == "SIGNATURE_INVALID" and result["at_block"] == last["first_block"] + 2
+    shutil.move(body_path + ".orig", body_path)
+    rewrite_header(store, last, rehash=False)
+    assert verify_range(path)["status"] == "VERIFIED"
+
+    # Rewriting an older header breaks the header chain even with its own hash recomputed
+    rewrite_header(store, {**headers[1], "final_hash": "f" * 64})
+    result = verify_range(path)
+    assert result["status"] == "SEGMENT_HEADER_INVALID" and result["at_segment"] == headers[2]["segment"]
+
+
+def test_retention_keeps_chain_of_custody_and_seal_recovery(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    store, index, logs = write_trail(path, 400, retention_days=1, max_bytes=20_000)   # active file left part-full
+    checkpointed = AuditVerifier(path)
+    assert checkpointed.verify_incremental()["status"] == "VERIFIED"
+
+    headers = store.headers()
+    assert store.prune(now=time.time() + 2 * 86400) == len(headers) - 1
+    kept = store.headers()
+    assert len(kept) == len(headers) and all(h.get("pruned_at") for h in kept[:-1])
+    assert not os.path.exists(store._path(kept[0]["segment"], ".jsonl.gz"))
+    assert store.verify_headers() is None
+
+    result = verify_range(path)
+    assert result["status"] == "VERIFIED" and result["blocks"] == 400
+    assert checkpointed.verify_incremental()["status"] == "VERIFIED"
+    retained_first = kept[-1]["first_block"]
+    assert index.block(1) is None and index.block(retained_first) == logs[retained_first - 1]
+    for suffix in (".idx", ".sessions"):
+        os.remove(path + suffix)
+    rebuilt = AuditIndex(path)
+    assert rebuilt.count() == 400 and rebuilt.head() == logs[-1] and rebuilt.block(2) is None
+
+    # Crash after the segment and header were written but before the active file was truncated
+    shutil.copy(path, path + ".before")
+    assert store.seal() is not None
+    shutil.move(path + ".before", path)
+    assert SegmentStore(path).size() == verify_range(path)["offset"]      # readers skip the sealed prefix
+    _, _, more = write_trail(path, 5, start=400)
+    assert more[0]["previous_hash"] == logs[-1]["current_hash"]
+    result = verify_range(path)
+    assert result["status"] == "VERIFIED" and result["blocks"] == 405
+
+    aged = SegmentStore(path, max_seconds=0.01)
+    time.sleep(0.05)
+    assert aged.should_seal(os.path.getsize(path)) and not aged.should_seal(0)
@@ -0,0 +1,140 @@
+"""
+audit_verifier: checkpointed incremental verification touches only new blocks,
+detects tampering after and at the checkpoint, full=true re-verifies from
+genesis in a worker process with streamed NDJSON progress, and the parallel
+range verifier reports exactly what the sequential walk does.
+"""
+import itertools
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import audit as audit_router
+from app.services import audit_verifier as verifier_module
+from app.services.audit_segments import SegmentStore
+from app.services.audit_verifier import AuditVerifier, split_ranges, verify_parallel, verify_range
+from app.services.audit_writer import AuditWriter, stored_block_hash
+
+
+def write_blocks(path, n, start=0):
+    writer = AuditWriter(path, fsync="never")
+    for i in range(start, start + n):
+        writer.submit(f"s{i % 7}", "MESSAGE_ANALYSIS", "test", "d", "r", 0.5, f"in{i}", f"out{i}")
+    writer.close()
+
+
+def rewrite_line(path, index, **changes):
+    with open(path) as f:
+        lines = f.readlines()
+    block = json.loads(lines[index])
+    block.update(changes)
+    lines[index] = json.dumps(block) + "\n"
+    with open(path, "w") as f:
+        f.writelines(lines)
+
+
+def test_incremental_verifies_only_new_blocks(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.jsonl")
+    write_blocks(path, 200)
+    verifier = AuditVerifier(path)
+    first = verifier.verify_incremental()
+    assert first["status"] == "VERIFIED" and first["blocks_checked"] == 200 and first["new_blocks"] == 200
+    assert verifier.load_checkpoint()["offset"] == os.path.getsize(path)
+
+    write_blocks(path, 30, start=200)
+    with open(path, "a") as f:
+        f.write('{"timestamp": "partial')      # writer mid-append: left for the next call
+    seen = []
+    real = verifier_module.verify_range
+    monkeypatch.setattr(verifier_module, "verify_range", lambda p, offset, *a, **k: seen.append(offset) or real(p, offset, *a, **k))
+    second = verifier.verify_incremental()
+    assert second["status"] == "VERIFIED" and second["blocks_checked"] == 230 and second["new_blocks"] == 30
+    assert seen == [first["checkpoint_offset"]]
+    assert verifier.verify_incremental()["new_blocks"] == 0
+
+
+def test_tampering_is_detected(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    write_blocks(path, 50)
+    verifier = AuditVerifier(path)
+    assert verifier.verify_incremental()["status"] == "VERIFIED"
+
+    write_blocks(path, 10, start=50)
+    rewrite_line(path, 55, output_hash="f" * 64)
+    result = verifier.verify_incremental()
+    assert result["status"] == "SIGNATURE_INVALID" and result["at_block"] == 56
+    assert verifier.load_checkpoint()["offset"] < os.path.getsize(path)   # checkpoint did not advance
+
+    rewrite_line(path, 49, current_hash="e" * 64)      # the checkpoint's anchor block
+    assert AuditVerifier(path).verify_incremental()["status"] == "CHECKPOINT_MISMATCH"
+
+
+def test_full_mode_streams_progress_from_worker_process(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.jsonl")
+    write_blocks(path, 300)
+    monkeypatch.setattr(verifier_module, "PROGRESS_EVERY_BYTES", 10_000)
+    verifier = AuditVerifier(path)
+    monkeypatch.setattr(audit_router, "audit_verifier", verifier)
+    app = FastAPI()
+    app.include_router(audit_router.router)
+    client = TestClient(app)
+
+    assert client.get("/audit/verify-chain").json()["new_blocks"] == 300
+    rewrite_line(path, 10, input_hash="0" * 64)      # behind the checkpoint: only a full pass sees it
+    assert client.get("/audit/verify-chain").json()["status"] == "VERIFIED"
+
+    response = client.get("/audit/verify-chain", params={"full": "true"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    result = records[-1]
+    assert result["type"] == "result" and result["status"] == "SIGNATURE_INVALID" and result["at_block"] == 11
+
+    write_blocks(str(tmp_path / "clean.jsonl"), 300)
+    monkeypatch.setattr(audit_router, "audit_verifier", AuditVerifier(str(tmp_path / "clean.jsonl")))
+    records = [json.loads(line) for line in client.get("/audit/verify-chain?full=true").text.splitlines()]
+    assert [r["type"] for r in records[:-1]] and all(r["type"] == "progress" for r in records[:-1])
+    assert records[-1]["status"] == "VERIFIED" and records[-1]["blocks_checked"] == 300
+
+
+def test_parallel_verification_matches_sequential(tmp_path):
+    segmented = str(tmp_path / "segmented.jsonl")
+    store = SegmentStore(segmented, max_bytes=40_000)
+    writer = AuditWriter(segmented, fsync="never", segments=store)
+    for i in range(500):
+        writer.submit(f"s{i % 7}", "MESSAGE_ANALYSIS", "test", "d", "r", 0.5, f"in{i}", f"out{i}")
+    writer.close()
+    ranges = split_ranges(store, 0, store.size(), 8, min_bytes=30_000)
+    assert len(ranges) >= 8
+    assert {h["end_offset"] for h in store.headers() if h["end_offset"] < store.size()} <= {a for a, _ in ranges}
+    expected = verify_range(segmented)
+    assert expected["status"] == "VERIFIED" and expected["blocks"] == 500
+    assert verify_parallel(segmented, workers=2, min_range_bytes=30_000) == expected
+
+    path = str(tmp_path / "audit.jsonl")
+    write_blocks(path, 400)
+    with open(path, "a") as f:
+        f.write('{"timestamp": "partial')
+    assert verify_parallel(path, workers=2, min_range_bytes=20_000) == verify_range(path)
+    plain = SegmentStore(path)
+    starts = [0] + list(itertools.accumulate(len(line) for line in open(path, "rb")))
+    boundary = starts.index(split_ranges(plain, 0, plain.size(), 4, min_bytes=20_000)[2][0])
+    assert 0 < boundary < 300
+
+    # Inside a range
+    rewrite_line(path, 300, output_hash="f" * 64)
+    result = verify_parallel(path, workers=2, min_range_bytes=20_000)
+    assert result == verify_range(path)
+    assert result["status"] == "SIGNATURE_INVALID" and result["at_block"] == 301 and result["blocks"] == 300
+
+    # Earlier, on a range boundary: a re-signed block whose only fault is its link to the previous range
+    forged = json.loads(open(path).readlines()[boundary])
+    forged["previous_hash"] = "b" * 64
+    rewrite_line(path, boundary, previous_hash="b" * 64, current_hash=stored_block_hash(forged))
+    result = verify_parallel(path, workers=2, min_range_bytes=20_000)
+    assert result == verify_range(path)
+    assert result["status"] == "TAMPERED" and result["at_block"] == boundary + 1
@@ -0,0 +1,174 @@
+"""
+audit_writer: concurrent log_decision calls (threads or processes) produce one
+unforked hash chain, group commit honours the fsync policy (an idle 'interval'
+writer still syncs its tail), restarts continue the chain, and a bad event
+fails alone without stopping the writer.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import audit_writer
+from app.services.audit_index import AuditIndex
+from app.services.audit_segments import SegmentStore
+from app.services.audit_verifier import verify_range
+from app.services.audit_writer import GENESIS_HASH, AuditWriter
+from app.services.observability import ObservabilityEngine
+
+
+def verify_chain(path):
+    """Same check as /audit/verify-chain; returns the number of blocks."""
+    expected = GENESIS_HASH
+    blocks = 0
+    with open(path) as f:
+        for line in f:
+            block = json.loads(line)
+            assert block["previous_hash"] == expected, f"fork at block {blocks}"
+            content = (f"{expected}{block['session_id']}{block['event_type']}{block['input_hash']}{block['output_hash']}"
+                       f"{block['session_prev_hash']}")
+            expected = hashlib.sha256(content.encode()).hexdigest()
+            assert block["current_hash"] == expected
+            blocks += 1
+    return blocks
+
+
+def test_chain_never_forks_under_concurrency(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    engine = ObservabilityEngine(audit_file=path, writer=AuditWriter(path, fsync="never", max_batch=64))
+    threads, per_thread = 16, 250
+    futures = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(t):
+        barrier.wait()
+        for i in range(per_thread):
+            futures[t].append(engine.log_decision(
+                session_id=f"s{t}", event_type="MESSAGE_ANALYSIS", actor="test", decision="d",
+                reasoning="r", confidence=0.5, input_data=f"in-{t}-{i}", output_data=f"out-{t}-{i}"))
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    assert engine.flush(timeout=30)
+
+    assert verify_chain(path) == threads * per_thread
+    hashes = {f.result().current_hash for fs in futures for f in fs}
+    assert len(hashes) == threads * per_thread
+    assert engine.last_hash == json.loads(open(path).readlines()[-1])["current_hash"]
+    assert engine.writer.stats["batches"] < threads * per_thread   # events were group-committed
+    # per-thread submission order is preserved in the chain
+    with open(path) as f:
+        order = [json.loads(line)["input_hash"] for line in f if '"s3"' in line]
+    assert order == [hashlib.sha256(f"in-3-{i}".encode()).hexdigest() for i in range(per_thread)]
+    engine.writer.close()
+
+
+def test_fsync_policy(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(audit_writer.os, "fsync", lambda fd: calls.append(fd))
+    for policy in ("never", "batch"):
+        calls.clear()
+        writer = AuditWriter(str(tmp_path / f"{policy}.jsonl"), fsync=policy)
+        for i in range(50):
+            writer.submit("s", "E", "a", "d", "r", 1.0, i, i)
+        assert writer.flush(timeout=10)
+        batches = writer.stats["batches"]
+        writer.close()
+        if policy == "never":
+            assert calls == []
+        else:
+            assert 1 <= len(calls) == batches <= 50
+
+    # 'interval': the last write before a quiet period is still synced within the interval
+    calls.clear()
+    writer = AuditWriter(str(tmp_path / "interval.jsonl"), fsync="interval", fsync_interval_ms=200)
+    writer.submit("s", "E", "a", "d", "r", 1.0, 0, 0).result(10)       # first batch: due at once
+    writer.submit("s", "E", "a", "d", "r", 1.0, 1, 1).result(10)       # within the interval: deferred
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 2 and not writer._unsynced
+    writer.close()
+
+
+def test_restart_continues_chain_and_drops_torn_tail(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    first = AuditWriter(path, fsync="never")
+    committed = first.submit("s1", "E", "a", "d", "r", 1.0, "x", "y").result(timeout=10)
+    first.close()
+    with open(path, "a") as f:
+        f.write('{"timestamp": "2026-01-01T00:00:00Z", "session_id": "s1", "event_ty')   # crash mid-write
+
+    second = AuditWriter(path, fsync="never")
+    assert second.last_hash == committed.current_hash
+    log = second.submit("s2", "E", "a", "d", "r", 1.0, "x", "y").result(timeout=10)
+    second.close()
+    assert log.previous_hash == committed.current_hash
+    assert verify_chain(path) == 2
+
+
+class Unprintable:
+    def __str__(self):
+        raise RuntimeError("no str")
+
+
+def test_bad_event_fails_alone_and_writer_keeps_running(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.jsonl")
+    writer = AuditWriter(path, fsync="never")
+    surrogate = writer.submit("s1", "E", "a", "d", "r", 1.0, "hello \ud800 pay me", "y")
+    bad = writer.submit("s1", "E", "a", "d", "r", 1.0, Unprintable(), "y")
+    good = writer.submit("s1", "E", "a", "d", "r", 1.0, "x", "y")
+    assert surrogate.result(timeout=10).input_hash == \
+        hashlib.sha256("hello \ud800 pay me".encode("utf-8", "surrogatepass")).hexdigest()
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=10)
+    assert good.result(timeout=10).previous_hash == surrogate.result().current_hash
+
+    # A failure outside any one event (here: catching up with the trail) fails the batch, not the thread
+    monkeypatch.setattr(writer, "_catch_up", lambda: (_ for _ in ()).throw(OSError("disk gone")))
+    with pytest.raises(OSError):
+        writer.submit("s2", "E", "a", "d", "r", 1.0, "x", "y").result(timeout=10)
+    monkeypatch.undo()
+    assert writer.submit("s2", "E", "a", "d", "r", 1.0, "x", "y").result(timeout=10)
+    assert writer.status() == "active" and writer.pending() == 0
+    writer.close()
+    assert verify_chain(path) == 3
+
+
+def write_from_process(path, worker, events):
+    store = SegmentStore(path, max_bytes=30_000)
+    writer = AuditWriter(path, fsync="never", max_batch=16, index=AuditIndex(path, store=store), segments=store)
+    for i in range(events):
+        writer.submit(f"p{worker}", "E", "a", "d", "r", 1.0, f"{worker}-{i}", i)
+    writer.close()
+
+
+@pytest.mark.skipif(audit_writer.fcntl is None, reason="needs flock")
+def test_processes_share_one_chain(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=write_from_process, args=(path, w, 400)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(120)
+    assert all(p.exitcode == 0 for p in procs)
+
+    result = verify_range(path)
+    assert result["status"] == "VERIFIED" and result["blocks"] == 1600
+    assert SegmentStore(path).headers()                                   # seals happened across writers
+    index = AuditIndex(path, read_only=True)
+    assert index.count() == 1600
+    assert index.session_blocks("p2", limit=1000)["total"] == 400
+    assert [b["input_hash"] for b in index.session_blocks("p2", limit=1000)["blocks"]] == \
+           [hashlib.sha256(f"2-{i}".encode()).hexdigest() for i in range(400)]
@@ -0,0 +1,48 @@
+"""
+Vectorized ScamClassifier.predict_batch must return exactly what the scalar
+predict() returns for every message.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.fusion import ScamClassifier
+import test_detection_battery as battery
+
+EDGE_CASES = [
+    "",
+    "hi",
+    "send otp",
+    "Pay to raju@oksbi now",
+    "IFSC SBIN0001234 account 123456789012",
+    "work from home and don't tell anyone",
+    "three friends coming home for dinner",
+    "Congratulations! You WON the lucky draw, claim prize fee 500",
+    "upi://pay?pa=x@ybl",
+]
+
+
+def _corpus():
+    return (battery.OBVIOUS_SCAMS + battery.SUBTLE_SCAMS + battery.NON_SCAMS
+            + battery.MULTILINGUAL + EDGE_CASES)
+
+
+def test_predict_batch_matches_scalar():
+    clf = ScamClassifier()
+    texts = _corpus()
+    assert clf.predict_batch(texts) == [clf.predict(t) for t in texts]
+
+
+def test_predict_proba_batch_matches_scalar():
+    clf = ScamClassifier()
+    texts = _corpus()
+    batch = clf.predict_proba_batch(texts)
+    assert batch.tolist() == [clf.predict_proba(t) for t in texts]
+
+
+def test_empty_batch():
+    clf = ScamClassifier()
+    assert clf.predict_batch([]) == []
+    assert len(clf.predict_proba_batch([])) == 0
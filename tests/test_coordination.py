@@ -0,0 +1,54 @@
+"""
+Streaming coordination detector: O(1) window counts, expiry, one alert per
+threshold crossing (re-armed after the window drains) and bounded memory.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.coordination import CoordinationDetector, turn_fingerprints
+
+T0 = 1_700_000_000.0
+
+
+def test_counts_other_sessions_and_expires():
+    det = CoordinationDetector(window_minutes=10, bucket_seconds=30, alert_sessions=99)
+    det.observe("s1", ["upi_ids:a@ybl"], now=T0)
+    det.observe("s2", ["upi_ids:a@ybl"], now=T0 + 60)
+    det.observe("s1", ["upi_ids:a@ybl"], now=T0 + 300)
+    assert det.count_other_sessions("upi_ids:a@ybl", "s1", now=T0 + 300) == 1
+    assert det.count_other_sessions("upi_ids:a@ybl", "s3", now=T0 + 300) == 2
+    # s2 was last seen at T0+60, expires ~10 min later; s1's refresh keeps it live
+    assert det.count_other_sessions("upi_ids:a@ybl", "s3", now=T0 + 700) == 1
+    result = det.check_coordination("upi_ids:a@ybl", exclude_session="s3", now=T0 + 700)
+    assert [s["session_id"] for s in result["active_sessions"]] == ["s1"]
+    assert det.count_other_sessions("upi_ids:a@ybl", now=T0 + 3600) == 0
+    assert det.stats()["fingerprints"] == 0  # drained windows are dropped
+
+
+def test_alert_published_once_per_crossing():
+    det = CoordinationDetector(window_minutes=5, bucket_seconds=60, alert_sessions=3)
+    seen = []
+    det.subscribe(seen.append)
+    for i, sid in enumerate(["s1", "s2", "s2", "s3", "s4"]):
+        det.observe(sid, ["voice:SCAMMER_7"], now=T0 + i)
+    assert len(seen) == 1
+    assert seen[0]["sessions"] == ["s1", "s2", "s3"] and seen[0]["session_id"] == "s3"
+    # after the window drains, a new burst alerts again
+    for i, sid in enumerate(["s5", "s6", "s7"]):
+        det.observe(sid, ["voice:SCAMMER_7"], now=T0 + 1000 + i)
+    assert len(seen) == 2
+
+
+def test_memory_is_bounded():
+    det = CoordinationDetector(alert_sessions=99, max_fingerprints=100)
+    for i in range(1000):
+        det.observe("s", [f"phone_numbers:+9198765{i:05d}"], now=T0)
+    assert det.stats()["fingerprints"] == 100 and det.stats()["evicted"] == 900
+
+
+def test_turn_fingerprints_canonicalizes_identifiers():
+    fps = turn_fingerprints({"upi_ids": ["Scam@YBL", "bad"], "phone_numbers": ["98765 43210"]},
+                            "KNOWN THREAT: session-42")
+    assert fps == ["upi_ids:scam@ybl", "phone_numbers:+919876543210", "voice:session-42"]
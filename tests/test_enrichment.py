@@ -0,0 +1,93 @@
+"""
+Enrichment service: per-turn dedupe, TTL cache, in-flight coalescing across
+concurrent sessions, bulk batching and no caching of failed remote lookups.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.enrichment import EnrichmentService, TTLCache
+
+
+class CountingClient:
+    """Stand-in for GovernmentAPIClient that records every bulk call."""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.requests_sent = 0
+
+    async def npci_upi_lookup_many(self, upi_ids):
+        self.calls.append(("npci", list(upi_ids)))
+        self.requests_sent += 1
+        await asyncio.sleep(self.delay)
+        return {} if self.fail else {u: {"bank": "SBI"} for u in upi_ids}
+
+    async def trai_dnd_check_many(self, phones):
+        self.calls.append(("trai", list(phones)))
+        self.requests_sent += 1
+        await asyncio.sleep(self.delay)
+        return {} if self.fail else {p: {"status": "DND_ACTIVE"} for p in phones}
+
+
+def test_dedupes_and_caches_across_turns():
+    client = CountingClient()
+    service = EnrichmentService(client=client, ttl=60)
+
+    async def run():
+        first = await service.enrich({"upi_ids": ["a@ybl", "a@ybl", "b@ybl"], "phone_numbers": ["+919876500000"]})
+        second = await service.enrich({"upi_ids": ["a@ybl"], "phone_numbers": ["+919876500000"]})
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert set(first["upi_ids"]) == {"a@ybl", "b@ybl"}
+    assert first["upi_ids"]["a@ybl"]["npci"] == {"bank": "SBI"}
+    assert "operator" in first["phone_numbers"]["+919876500000"]
+    assert second["upi_ids"]["a@ybl"] == first["upi_ids"]["a@ybl"]
+    assert client.calls == [("npci", ["a@ybl", "b@ybl"]), ("trai", ["+919876500000"])]
+
+
+def test_concurrent_sessions_share_inflight_lookups():
+    client = CountingClient(delay=0.05)
+    service = EnrichmentService(client=client)
+
+    async def run():
+        return await asyncio.gather(*(service.enrich_bulk("upi_ids", ["x@ybl", "y@ybl"]) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert all(r["x@ybl"]["npci"] == {"bank": "SBI"} for r in results)
+    assert client.requests_sent == 1
+
+
+def test_bulk_lookups_are_batched():
+    client = CountingClient()
+    service = EnrichmentService(client=client, batch_size=10, max_concurrency=3)
+    values = [f"u{i}@ybl" for i in range(35)]
+    out = asyncio.run(service.enrich_bulk("upi_ids", values))
+    assert len(out) == 35
+    assert sorted(len(batch) for _, batch in client.calls) == [5, 10, 10, 10]
+
+
+def test_failed_remote_lookups_are_not_cached():
+    client = CountingClient(fail=True)
+    service = EnrichmentService(client=client)
+    out = asyncio.run(service.enrich_bulk("upi_ids", ["z@ybl"]))
+    assert "npci" not in out["z@ybl"] and "status" in out["z@ybl"]
+    asyncio.run(service.enrich_bulk("upi_ids", ["z@ybl"]))
+    assert client.requests_sent == 2
+
+
+def test_ttl_cache_expiry_and_lru():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.put(("k", "a"), 1)
+    cache.put(("k", "b"), 2)
+    cache.get(("k", "a"))
+    cache.put(("k", "c"), 3)
+    assert cache.get(("k", "b")) is None  # least recently used evicted
+    assert cache.get(("k", "a")) == 1
+    time.sleep(0.06)
+    assert cache.get(("k", "a")) is None
@@ -0,0 +1,140 @@
+"""
+evidence_export: a bundle holds each session's conversation, ledger blocks,
+evidence rows, canary hits and static artifacts (and nothing of other
+sessions); the manifest hashes match the members, every block's Merkle proof
+checks against the signed head; sendfile and chunked output agree; the API
+streams a case (the session's syndicate cluster) behind the API key.
+"""
+import functools
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.security import InvalidAPIKeyError
+from app.routers import audit as audit_router
+from app.services.audit_index import AuditIndex
+from app.services.audit_writer import AuditWriter
+from app.services.evidence_export import EvidenceBundle
+from app.services.identity_graph import identity_graph
+from app.services.ledger import AUDIT, Ledger
+from app.services.merkle import MerkleLedger, leaf_hash, verify_inclusion, verify_signed_root
+
+
+def make_case(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    ledger = Ledger(path, AuditWriter(path, fsync="never", index=AuditIndex(path)))
+    merkle = MerkleLedger(ledger.index, signing_key_path=str(tmp_path / "key.pem"))
+    for sid in ("s1", "s2", "s10"):
+        ledger.append(AUDIT, sid, "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, f"hi from {sid}", "reply")
+        ledger.append_evidence(sid, "STRATEGIC_ENGAGEMENT", {"upi_ids": [f"{sid}@ybl"]})
+    ledger.append(AUDIT, "s1", "CANARY_TRIGGERED", "Scammer", "Viewed Payment Proof", "pixel", 1.0,
+                  "proof_111", "Image Served")
+    ledger.flush()
+
+    db = tmp_path / "scam_database.json"
+    db.write_text(json.dumps({sid: {"history": [{"sender": "scammer", "text": f"pay now {sid}"}]}
+                              for sid in ("s1", "s2", "s10")}))
+    static = tmp_path / "static"
+    (static / "evidence").mkdir(parents=True)
+    files = {"FIR_Draft_s1_12.pdf": b"%PDF fir", "NCRP_Report_s1_3.json": b"{}", "evidence/fail_s1.png": b"png",
+             "proof_proof_111.png": os.urandom(3 * 1024 * 1024), "proof_proof_222.png": b"other canary",
+             "FIR_Draft_s10_1.pdf": b"%PDF s10", "FIR_Draft_s2_1.pdf": b"%PDF s2", "voice_default_x.mp3": b"mp3"}
+    for name, data in files.items():
+        (static / name).write_bytes(data)
+    kwargs = dict(ledger=ledger, merkle=merkle, db_file=str(db), static_dir=str(static))
+    return ledger, merkle, files, kwargs
+
+
+def read_bundle(data):
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        members = {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+    return members, json.loads(members.pop("MANIFEST.json"))
+
+
+def test_bundle_contents_hashes_and_proofs(tmp_path):
+    ledger, merkle, files, kwargs = make_case(tmp_path)
+    out = tmp_path / "bundle.tar"
+    with open(out, "wb") as f:
+        manifest = EvidenceBundle(["s1"], **kwargs).write_to(f)
+    members, stored = read_bundle(out.read_bytes())
+    assert stored == manifest
+
+    base = "sessions/s1/"
+    assert sorted(members) == sorted(base + n for n in (
+        "conversation.json", "audit_blocks.jsonl", "evidence_chain.jsonl", "canary_hits.jsonl",
+        "merkle_proofs.jsonl", "artifacts/FIR_Draft_s1_12.pdf", "artifacts/NCRP_Report_s1_3.json",
+        "artifacts/evidence/fail_s1.png", "artifacts/proof_proof_111.png"))
+    assert members[base + "artifacts/proof_proof_111.png"] == files["proof_proof_111.png"]
+    assert json.loads(members[base + "conversation.json"])["history"][0]["text"] == "pay now s1"
+    for m in manifest["members"]:
+        assert m["size"] == len(members[m["name"]])
+        assert m["sha256"] == hashlib.sha256(members[m["name"]]).hexdigest()
+
+    session = manifest["sessions"]["s1"]
+    assert session["verification"]["status"] == "VERIFIED"
+    assert (session["blocks"], session["canary_hits"], session["proofs"], session["artifacts"]) == (3, 1, 3, 4)
+    blocks = [json.loads(line) for line in members[base + "audit_blocks.jsonl"].splitlines()]
+    assert {b["session_id"] for b in blocks} == {"s1"}
+    assert json.loads(members[base + "evidence_chain.jsonl"])["content"] == {"upi_ids": ["s1@ybl"]}
+
+    head = manifest["tree_head"]
+    assert verify_signed_root(head["signed_root"], head["public_key"])
+    root = bytes.fromhex(head["signed_root"]["root_hash"])
+    for line in members[base + "merkle_proofs.jsonl"].splitlines():
+        proof = json.loads(line)
+        assert verify_inclusion(leaf_hash(proof["current_hash"]), proof["leaf_index"], proof["tree_size"],
+                                [bytes.fromhex(h) for h in proof["audit_path"]], root)
+    ledger.close()
+
+
+def test_chunked_stream_matches_sendfile_output(tmp_path):
+    ledger, merkle, files, kwargs = make_case(tmp_path)
+    bundle = EvidenceBundle(["s1", "s2"], **kwargs)
+    chunks = list(bundle.chunks())
+    assert max(len(c) for c in chunks) <= 1 << 20
+    streamed, manifest = read_bundle(b"".join(chunks))
+
+    buffer = io.BytesIO()                                     # no fileno: the plain copy path
+    bundle.write_to(buffer)
+    written, _ = read_bundle(buffer.getvalue())
+    with open(tmp_path / "b.tar", "wb") as f:
+        bundle.write_to(f)
+    sent, _ = read_bundle((tmp_path / "b.tar").read_bytes())
+    assert streamed == written == sent
+    assert "sessions/s2/artifacts/FIR_Draft_s2_1.pdf" in streamed
+    assert not any("s10" in name for name in streamed)
+    ledger.close()
+
+
+def test_export_api_streams_a_case(tmp_path, monkeypatch):
+    ledger, merkle, files, kwargs = make_case(tmp_path)
+    identity_graph.link("s1", {"upi_ids": ["export-ring@ybl"]})
+    identity_graph.link("s2", {"upi_ids": ["export-ring@ybl"]})
+    monkeypatch.setattr(audit_router, "EvidenceBundle", functools.partial(EvidenceBundle, **kwargs))
+    app = FastAPI()
+    app.include_router(audit_router.router)
+    app.add_exception_handler(InvalidAPIKeyError,
+                              lambda request, exc: JSONResponse(status_code=403, content={"error": "Invalid API key"}))
+    client = TestClient(app)
+    headers = {"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY}
+
+    assert client.get("/audit/export/s1").status_code == 403
+    response = client.get("/audit/export/s1", params={"case": True}, headers=headers)
+    assert response.status_code == 200 and response.headers["content-type"] == "application/x-tar"
+    assert "case_s1" in response.headers["content-disposition"]
+    members, manifest = read_bundle(response.content)
+    assert manifest["case_id"] == "s1" and sorted(manifest["sessions"]) == ["s1", "s2"]
+
+    _, manifest = read_bundle(client.get("/audit/export/s2", headers=headers).content)
+    assert list(manifest["sessions"]) == ["s2"] and manifest["case_id"] is None
+    ledger.close()
@@ -0,0 +1,64 @@
+"""
+Fraud registry: normalized O(1) lookups over the compiled mmapped index, no Bloom
+false negatives, and hot reload that swaps snapshots when a source list changes.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fraud_registry import FraudRegistry, _CompiledList, hash_entries
+
+
+def _write(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_lookups_are_normalized(tmp_path):
+    _write(tmp_path / "upis.txt", ["# comment", "Lottery_Tax_88@SBI"])
+    _write(tmp_path / "phones.txt", ["+91 98765 43210"])
+    _write(tmp_path / "urls.txt", ["https://www.bit.ly/bank-kyc-update/", "evil.in/login#frag"])
+    registry = FraudRegistry(str(tmp_path))
+
+    assert registry.is_fraud_upi("lottery_tax_88@sbi")
+    assert not registry.is_fraud_upi("lottery_tax_89@sbi")
+    assert registry.is_fraud_phone("9876543210")
+    assert registry.is_fraud_phone("+919876543210")
+    assert registry.is_fraud_url("bit.ly/bank-kyc-update")
+    assert registry.is_fraud_url("http://evil.in/login#frag")
+    assert not registry.is_fraud_url("bit.ly/other")
+    assert registry.stats() == {"upis": 1, "phones": 1, "urls": 2}
+
+
+def test_missing_and_empty_lists(tmp_path):
+    _write(tmp_path / "upis.txt", ["# nothing yet"])
+    registry = FraudRegistry(str(tmp_path))
+    assert not registry.is_fraud_upi("a@ybl")
+    assert not registry.is_fraud_phone("9876543210")
+
+
+def test_index_has_no_false_negatives():
+    values = [f"user{i}@ybl" for i in range(20000)]
+    compiled = _CompiledList.build(hash_entries(values))
+    assert all(compiled.contains_key(int(k)) for k in hash_entries(values))
+    misses = sum(compiled.contains_key(int(k)) for k in hash_entries(f"other{i}@ybl" for i in range(20000)))
+    assert misses == 0
+
+
+def test_hot_reload_swaps_snapshot(tmp_path):
+    _write(tmp_path / "upis.txt", ["old@ybl"])
+    registry = FraudRegistry(str(tmp_path))
+    assert registry.is_fraud_upi("old@ybl")
+
+    _write(tmp_path / "upis.txt", ["old@ybl", "new@ybl"])
+    os.utime(tmp_path / "upis.txt", ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+    registry.maybe_reload(force=True)
+    deadline = time.time() + 10
+    while not registry.is_fraud_upi("new@ybl") and time.time() < deadline:
+        time.sleep(0.05)
+    assert registry.is_fraud_upi("new@ybl")
+    assert registry.is_fraud_upi("old@ybl")
+    # Only the current generation is kept on disk.
+    assert len([p for p in os.listdir(registry.compiled_dir) if p.startswith("upis-")]) == 3
@@ -0,0 +1,73 @@
+"""
+Identity graph: incremental union-find clustering of sessions that share
+identifiers, cluster queries, bootstrap from scam_database.json and the API.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.security import InvalidAPIKeyError
+from app.routers import syndicate
+from app.services.identity_graph import IdentityGraph, identity_graph
+
+
+def test_sessions_merge_through_shared_identifiers():
+    g = IdentityGraph()
+    assert g.link("s1", {"upi_ids": ["raju@sbi"]}) == 1
+    assert g.link("s2", {"phone_numbers": ["+919876543210"]}) == 1
+    assert g.link("s3", {"upi_ids": ["raju@sbi"], "phone_numbers": ["+919876543210"]}) == 3
+    g.link("s4", {"bank_accounts": ["123456789012"]})
+    assert g.cluster_size("s1") == 3 and g.cluster_size("s4") == 1 and g.cluster_size("nope") == 0
+    assert g.same_cluster("session:s1", "phone_numbers:+919876543210")
+
+    cluster = g.cluster("upi_ids:raju@sbi")
+    assert sorted(cluster["sessions"]) == ["s1", "s2", "s3"]
+    assert cluster["identifiers"] == {"upi_ids": ["raju@sbi"], "phone_numbers": ["+919876543210"]}
+    assert [c["session_count"] for c in g.clusters()] == [3]
+    assert [c["session_count"] for c in g.clusters(min_sessions=1)] == [3, 1]
+
+
+def test_voice_fingerprint_links_sessions():
+    g = IdentityGraph()
+    g.link("a", {}, fingerprint="voice:spk1")
+    g.link("b", {"upi_ids": ["x@ybl"]}, fingerprint="voice:spk1")
+    assert g.cluster_size("a") == 2
+
+
+def test_bootstrap_canonicalizes_legacy_records():
+    g = IdentityGraph()
+    n = g.bootstrap({
+        "old": {"extracted": {"upi": ["Raju@SBI"], "phone_numbers": ["98765 43210"]}},
+        "new": {"extracted_data": {"upi_ids": ["raju@sbi"]}},
+        "other": {"extracted_data": {"phone_numbers": ["+919876543210"]}},
+    })
+    assert n == 3 and g.cluster_size("old") == 3
+
+
+def test_syndicate_api_requires_key_and_returns_clusters():
+    identity_graph.link("api_s1", {"upi_ids": ["api-ring@ybl"]})
+    identity_graph.link("api_s2", {"upi_ids": ["api-ring@ybl"]})
+    app = FastAPI()
+    app.include_router(syndicate.router)
+    app.add_exception_handler(InvalidAPIKeyError,
+                              lambda request, exc: JSONResponse(status_code=403, content={"error": "Invalid API key"}))
+    client = TestClient(app)
+    headers = {"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY}
+
+    assert client.get("/syndicate/session/api_s1").status_code == 403
+    body = client.get("/syndicate/session/api_s1", headers=headers).json()
+    assert sorted(body["sessions"]) == ["api_s1", "api_s2"]
+    assert client.get("/syndicate/identifier/upi_ids/api-ring@ybl", headers=headers).json()["session_count"] == 2
+    assert client.get("/syndicate/identifier/upi_ids/API-Ring@YBL ", headers=headers).json()["session_count"] == 2
+    identity_graph.link("api_s3", {"phone_numbers": ["+919812312399"]})
+    assert client.get("/syndicate/identifier/phone_numbers/98123 12399", headers=headers).status_code == 200
+    assert client.get("/syndicate/identifier/upi_ids/not-an-upi", headers=headers).status_code == 400
+    assert client.get("/syndicate/identifier/emails/x", headers=headers).status_code == 400
+    assert client.get("/syndicate/session/missing", headers=headers).status_code == 404
+    assert client.get("/syndicate/clusters", headers=headers).json()["stats"]["multi_session_clusters"] >= 1
@@ -0,0 +1,68 @@
+"""
+Incremental per-session intel accumulator: canonical values, dedupe, enrichment
+kept separately, first-seen turn (one numbering for the API and the agent
+graph), and round-trip through persisted state.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intel_accumulator import SessionIntel, IntelStore, current_turn
+
+
+def test_add_many_returns_only_new_canonical_values():
+    intel = SessionIntel()
+    new = intel.add_many({"upi_ids": ["Raju@SBI "], "phone_numbers": ["9888776655"]}, turn=1)
+    assert new["upi_ids"] == ["raju@sbi"]
+    assert new["phone_numbers"] == ["+919888776655"]
+
+    again = intel.add_many({"upi_ids": ["raju@sbi"], "phone_numbers": ["+91 98887 76655"]}, turn=3)
+    assert again == {}
+    assert intel.values("upi_ids") == ["raju@sbi"]
+    assert intel.get("upi_ids", "raju@sbi").first_seen_turn == 1
+
+
+def test_invalid_items_are_dropped():
+    intel = SessionIntel()
+    intel.add_many({"phone_numbers": ["1234567890"], "ifsc_codes": ["sbin0001234"], "urls": ["bit.ly/x"]}, turn=1)
+    assert intel.values("phone_numbers") == []
+    assert intel.values("ifsc_codes") == ["SBIN0001234"]
+    assert intel.values("urls") == ["https://bit.ly/x"]
+
+
+def test_enrichment_is_stored_separately():
+    intel = SessionIntel()
+    intel.add_many({"upi_ids": ["9876543210@ybl"]}, turn=1)
+    intel.enrich("upi_ids", "9876543210@ybl", {"status": "FRAUD_REGISTERED", "risk_score": 95})
+    assert intel.values("upi_ids") == ["9876543210@ybl"]
+    assert intel.enrichment()["upi_ids"]["9876543210@ybl"]["risk_score"] == 95
+
+
+def test_round_trip_and_legacy_enriched_strings():
+    intel = SessionIntel()
+    intel.add_many({"upi_ids": ["a1@ybl"], "bank_accounts": ["123456789012"]}, turn=3)
+    intel.enrich("upi_ids", "a1@ybl", {"status": "VERIFIED"})
+
+    restored = SessionIntel.from_state({
+        "intel_ledger": intel.to_dict(),
+        "extracted_data": {"upi_ids": ["a1@ybl [Status: VERIFIED, Risk: 0%]", "b2@paytm [Status: VERIFIED, Risk: 0%]"]},
+    })
+    assert restored.values("upi_ids") == ["a1@ybl", "b2@paytm"]
+    assert restored.get("upi_ids", "a1@ybl").first_seen_turn == 3
+    assert restored.get("upi_ids", "a1@ybl").enrichment == {"status": "VERIFIED"}
+    assert restored.values("bank_accounts") == ["123456789012"]
+
+
+def test_store_is_bounded():
+    store = IntelStore(max_sessions=2)
+    a = store.get("a")
+    store.get("b")
+    store.get("c")
+    assert store.get("a") is not a
+
+
+def test_current_turn_counts_from_one():
+    assert current_turn([]) == 1
+    assert current_turn(["Scammer: hi", "You: haan ji"]) == 2
+    assert current_turn(["Scammer: hi", "You: haan ji", "Scammer: otp bhejo"]) == 2   # reply still pending
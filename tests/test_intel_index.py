@@ -0,0 +1,91 @@
+"""
+Cross-session intel index: write-time postings, keyset pagination, prefix /
+suffix search, backfill from scam_database.json and the query API.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.security import InvalidAPIKeyError
+from app.services.intel_accumulator import SessionIntel
+from app.services.intel_index import IntelIndex
+
+
+def test_postings_are_first_sightings_and_paginate(tmp_path):
+    index = IntelIndex(str(tmp_path / "idx.db"))
+    for i in range(5):
+        intel = SessionIntel()
+        new = intel.add_many({"upi_ids": ["Raju@SBI"]}, turn=i)
+        assert index.add_session_items(f"s{i}", intel, new) == 1
+    assert index.add_postings([("upi_ids", "raju@sbi", "s0", 9, 0.0)]) == 0  # repeat ignored
+
+    page = index.lookup("upi_ids", "raju@sbi", limit=2)
+    assert page["session_count"] == 5
+    assert [s["session_id"] for s in page["sessions"]] == ["s0", "s1"]
+    assert page["sessions"][1]["first_seen_turn"] == 1
+    seen = [s["session_id"] for s in page["sessions"]]
+    while page["next_cursor"]:
+        page = index.lookup("upi_ids", "raju@sbi", cursor=page["next_cursor"], limit=2)
+        seen += [s["session_id"] for s in page["sessions"]]
+    assert seen == ["s0", "s1", "s2", "s3", "s4"]
+    assert index.lookup("upi_ids", "nobody@ybl")["sessions"] == []
+
+
+def test_prefix_and_suffix_search(tmp_path):
+    index = IntelIndex(str(tmp_path / "idx.db"))
+    index.add_postings([
+        ("bank_accounts", "123456781234", "a", 0, 1.0),
+        ("bank_accounts", "999900001234", "b", 0, 2.0),
+        ("bank_accounts", "999900005678", "b", 0, 2.0),
+        ("bank_accounts", "123456781234", "c", 1, 3.0),
+    ])
+    by_suffix = index.search("bank_accounts", suffix="1234")
+    assert {r["value"]: r["session_count"] for r in by_suffix["results"]} == {"123456781234": 2, "999900001234": 1}
+    assert [r["value"] for r in index.search("bank_accounts", prefix="9999")["results"]] == \
+        ["999900001234", "999900005678"]
+    both = index.search("bank_accounts", prefix="9999", suffix="1234")["results"]
+    assert [r["value"] for r in both] == ["999900001234"]
+    first = index.search("bank_accounts", suffix="1234", limit=1)
+    rest = index.search("bank_accounts", suffix="1234", cursor=first["next_cursor"], limit=1)
+    assert len(first["results"]) == len(rest["results"]) == 1 and rest["next_cursor"] is None
+    assert first["results"][0]["value"] != rest["results"][0]["value"]
+
+
+def test_backfill_reads_legacy_and_current_records(tmp_path):
+    index = IntelIndex(str(tmp_path / "idx.db"))
+    added = index.backfill({
+        "old": {"extracted": {"upi": ["raju@sbi"], "bank": ["123456789012"]}, "timestamp": 100.0},
+        "new": {"extracted_data": {"upi_ids": ["raju@sbi"], "phone_numbers": ["+919876543210"]},
+                "updated_at": 200.0},
+    })
+    assert added == 4
+    assert index.lookup("upi_ids", "raju@sbi")["session_count"] == 2
+    assert index.lookup("bank_accounts", "123456789012")["sessions"][0]["timestamp"] == 100.0
+    assert index.backfill({"new": {"extracted_data": {"upi_ids": ["raju@sbi"]}}}) == 0
+
+
+def test_intel_api(monkeypatch, tmp_path):
+    from app.routers import intel as intel_router
+
+    index = IntelIndex(str(tmp_path / "idx.db"))
+    index.add_postings([("phone_numbers", "+919876543210", "s1", 2, 5.0)])
+    monkeypatch.setattr(intel_router, "intel_index", index)
+    app = FastAPI()
+    app.include_router(intel_router.router)
+    app.add_exception_handler(InvalidAPIKeyError,
+                              lambda request, exc: JSONResponse(status_code=403, content={"error": "Invalid API key"}))
+    client = TestClient(app)
+    headers = {"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY}
+
+    assert client.get("/intel/identifier/phone_numbers/9876543210").status_code == 403
+    body = client.get("/intel/identifier/phone_numbers/98765 43210", headers=headers).json()
+    assert body["value"] == "+919876543210" and body["sessions"][0]["session_id"] == "s1"
+    assert client.get("/intel/search?kind=phone_numbers&suffix=3210", headers=headers).json()["results"][0][
+        "session_count"] == 1
+    assert client.get("/intel/search?kind=emails", headers=headers).status_code == 400
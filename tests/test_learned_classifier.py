@@ -0,0 +1,68 @@
+"""
+Learned classifier artifact: training separates the classes, the .npz round-trips,
+batch scoring matches the scalar path and serving never imports sklearn.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.learned_classifier import LearnedScamClassifier, tokenize
+
+SCAMS = [
+    "Pay 5000 to raju@oksbi now or face arrest",
+    "Your KYC expired, share OTP to unblock account",
+    "Congratulations you won lottery, pay processing fee",
+    "Click https://bit.ly/refund to claim refund",
+]
+SAFE = [
+    "Hi, how are you today?",
+    "When will my order arrive?",
+    "See you at dinner tonight",
+    "Thanks for your help",
+]
+TYPES = ["phishing", "phishing", "lottery", "phishing", None, None, None, None]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LearnedScamClassifier.fit(SCAMS + SAFE, [1] * 4 + [0] * 4, TYPES)
+
+
+def test_tokenize_uses_shape_tokens():
+    assert tokenize("Pay to Raju@OKSBI or call 9876543210, https://x.in/a") == [
+        "pay", "to", "<upi>", "or", "call", "<phone>", "<url>"
+    ]
+
+
+def test_training_separates_classes(model):
+    assert all(model.predict_proba(t) >= 0.5 for t in SCAMS)
+    assert all(model.predict_proba(t) < 0.5 for t in SAFE)
+    assert model.predict("Congratulations you won lottery, pay processing fee")["scam_type"] == "lottery"
+    assert model.predict("See you at dinner tonight")["scam_type"] == "safe"
+
+
+def test_artifact_round_trip(model, tmp_path):
+    path = str(tmp_path / "clf.npz")
+    model.save(path)
+    loaded = LearnedScamClassifier.load(path)
+    for text in SCAMS + SAFE:
+        # Weights are stored as float16.
+        assert loaded.predict_proba(text) == pytest.approx(model.predict_proba(text), abs=1e-2)
+        assert loaded.predict(text)["scam_type"] == model.predict(text)["scam_type"]
+
+
+def test_batch_matches_scalar(model):
+    texts = SCAMS + SAFE + ["", "unseen words only"]
+    batch = model.predict_proba_batch(texts)
+    assert batch.tolist() == pytest.approx([model.predict_proba(t) for t in texts])
+    assert [r["scam_type"] for r in model.predict_batch(texts)] == [model.predict(t)["scam_type"] for t in texts]
+
+
+def test_serving_does_not_import_sklearn(model, tmp_path):
+    path = str(tmp_path / "clf.npz")
+    model.save(path)
+    LearnedScamClassifier.load(path).predict("Pay now")
+    assert "sklearn" not in sys.modules
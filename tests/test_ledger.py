@@ -0,0 +1,222 @@
+"""
+ledger: audit decisions and judicial evidence share one chain; both old APIs
+are views over it; evidence content, timestamp and metadata are covered by
+the chain; sessions carry their own sub-chain and verify independently; the
+legacy SQLite evidence chain migrates idempotently.
+"""
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.routers import audit as audit_router
+from app.services.audit_index import AuditIndex
+from app.services.audit_verifier import verify_range
+from app.services.audit_writer import (GENESIS_HASH, LEGACY_EVIDENCE_OUTPUT_HASH, AuditWriter, record_hash,
+                                      stored_block_hash)
+from app.services.evidence_chain import JudicialEvidenceChain
+from app.services.ledger import AUDIT, EVIDENCE, Ledger
+from app.services.observability import ObservabilityEngine
+from scripts.migrate_evidence_ledger import LEGACY_GENESIS, legacy_hash, migrate
+
+
+def make_ledger(path):
+    return Ledger(str(path), AuditWriter(str(path), fsync="never"))
+
+
+def test_audit_and_evidence_share_one_chain(tmp_path):
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    engine = ObservabilityEngine(ledger=ledger)
+    evidence = JudicialEvidenceChain(ledger)
+
+    engine.log_decision("s1", "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, "in", "out")
+    h = evidence.log_evidence("s1", "STRATEGIC_ENGAGEMENT", {"upi": "x@ybl", "turn": 1})
+    engine.log_decision("s2", "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, "in2", "out2")
+    evidence.log_evidence("s1", "STRATEGIC_ENGAGEMENT", {"upi": "y@ybl", "turn": 2})
+    ledger.close()
+
+    blocks = [json.loads(line) for line in open(ledger.audit_file)]
+    assert [b["kind"] for b in blocks] == [AUDIT, EVIDENCE, AUDIT, EVIDENCE]
+    assert blocks[1]["current_hash"] == h and blocks[2]["previous_hash"] == h
+    assert verify_range(ledger.audit_file)["status"] == "VERIFIED"
+    assert ledger.verify()["status"] == "VERIFIED"
+
+    chain = evidence.get_chain_for_session("s1")
+    assert [c["id"] for c in chain] == [2, 4]
+    assert chain[0]["content"] == {"upi": "x@ybl", "turn": 1} and chain[0]["data_hash"] == h
+    assert evidence.verify_chain_integrity("s1") == (True, "Chain intact (2 entries verified)")
+    assert evidence.verify_chain_integrity()[0] is True
+    assert len(ledger.session_blocks("s1")) == 3 and evidence.get_chain_for_session("s2") == []
+
+
+def test_log_evidence_many_is_contiguous(tmp_path):
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    evidence = JudicialEvidenceChain(ledger)
+    ObservabilityEngine(ledger=ledger).log_decision("s0", "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, "i", "o")
+    hashes = evidence.log_evidence_many([("s1", "STRATEGIC_ENGAGEMENT", {"turn": i}) for i in range(50)])
+    try:
+        evidence.log_evidence_many([("s1", "STRATEGIC_ENGAGEMENT", {}), ("", "STRATEGIC_ENGAGEMENT", {})])
+        assert False, "a record without session_id must reject the whole batch"
+    except ValueError:
+        pass
+    ledger.close()
+
+    chain = evidence.get_chain_for_session("s1")
+    assert [c["data_hash"] for c in chain] == hashes
+    assert [c["id"] for c in chain] == list(range(2, 52))
+    assert ledger.writer.stats["events"] == 51 and ledger.verify()["status"] == "VERIFIED"
+
+
+def test_evidence_content_tampering_is_detected(tmp_path):
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    evidence = JudicialEvidenceChain(ledger)
+    evidence.log_evidence("s1", "STRATEGIC_ENGAGEMENT", {"amount": 500})
+    evidence.log_evidence("s1", "STRATEGIC_ENGAGEMENT", {"amount": 700})
+    ledger.close()
+
+    lines = open(ledger.audit_file).read().splitlines()
+    block = json.loads(lines[0])
+    block["metadata"]["content"]["amount"] = 5
+    lines[0] = json.dumps(block)
+    with open(ledger.audit_file, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    result = verify_range(ledger.audit_file)
+    assert result["status"] == "CONTENT_MISMATCH" and result["at_block"] == 1
+    reopened = Ledger(ledger.audit_file, AuditWriter(ledger.audit_file, fsync="never"))
+    ok, message = JudicialEvidenceChain(reopened).verify_chain_integrity("s1")
+    whole_ok, whole_message = JudicialEvidenceChain(reopened).verify_chain_integrity()
+    reopened.close()
+    assert not ok and "block 1" in message
+    assert not whole_ok and whole_message == "Tampering detected at block 1 (content_mismatch)"
+
+
+def test_evidence_timestamp_and_metadata_are_covered(tmp_path):
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    ledger.append_evidence("s1", "STRATEGIC_ENGAGEMENT", {"amount": 500}, {"source": "upi"}).result()
+    ledger.close()
+    original = open(ledger.audit_file).read().splitlines()[0]
+    assert json.loads(original)["output_hash"] == record_hash(json.loads(original))
+
+    edits = {"timestamp": lambda b: b.update(timestamp="2020-01-01T00:00:00Z"),
+             "metadata": lambda b: b["metadata"].update(source="cash"),
+             "actor": lambda b: b.update(actor="Investigator")}
+    for field, edit in edits.items():
+        block = json.loads(original)
+        edit(block)
+        with open(ledger.audit_file, "w") as f:
+            f.write(json.dumps(block) + "\n")
+        result = verify_range(ledger.audit_file)
+        assert result["status"] == "CONTENT_MISMATCH" and result["at_block"] == 1, field
+
+    # Blocks written before output_hash covered the record still verify
+    legacy = json.loads(original)
+    legacy["output_hash"] = LEGACY_EVIDENCE_OUTPUT_HASH
+    legacy["current_hash"] = stored_block_hash(legacy)
+    with open(ledger.audit_file, "w") as f:
+        f.write(json.dumps(legacy) + "\n")
+    assert verify_range(ledger.audit_file)["status"] == "VERIFIED"
+
+
+def test_log_evidence_waits_a_bounded_time(tmp_path, monkeypatch):
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    evidence = JudicialEvidenceChain(ledger, timeout=0.01)
+    monkeypatch.setattr(ledger.writer, "_wait_committed", lambda seq, timeout: False)  # commit never acknowledged
+    for call in (lambda: evidence.log_evidence("s1", "STRATEGIC_ENGAGEMENT", {"turn": 1}),
+                 lambda: evidence.log_evidence_many([("s1", "STRATEGIC_ENGAGEMENT", {"turn": 2})])):
+        try:
+            call()
+            assert False, "an unacknowledged commit must time out"
+        except TimeoutError:
+            pass
+    monkeypatch.undo()
+    ledger.close()
+
+
+def test_sessions_verify_on_their_own_sub_chain(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.jsonl")
+    ledger = Ledger(path, AuditWriter(path, fsync="never", index=AuditIndex(path)))
+    engine, evidence = ObservabilityEngine(ledger=ledger), JudicialEvidenceChain(ledger)
+    for turn in range(3):
+        engine.log_decision("s1", "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, f"in{turn}", "out")
+        evidence.log_evidence("s2", "STRATEGIC_ENGAGEMENT", {"turn": turn})
+    ledger.close()
+
+    blocks = [json.loads(line) for line in open(path)]
+    assert blocks[0]["session_prev_hash"] == blocks[1]["session_prev_hash"] == GENESIS_HASH
+    assert blocks[2]["session_prev_hash"] == blocks[0]["current_hash"]
+    assert blocks[5]["session_prev_hash"] == blocks[3]["current_hash"]
+    result = ledger.verify_session("s2")
+    assert result["status"] == "VERIFIED" and result["kinds"] == {"AUDIT": 0, "EVIDENCE": 3}
+    assert result["session_head"] == blocks[5]["current_hash"]
+    assert evidence.verify_chain_integrity("s2") == (True, "Chain intact (3 entries verified)")
+
+    # Restarted writers continue each session's sub-chain: from the index, or by scanning the trail
+    for writer in (AuditWriter(path, fsync="never", index=AuditIndex(path)), AuditWriter(path, fsync="never")):
+        restarted = Ledger(path, writer)
+        last = restarted.session_blocks("s1")[-1]["current_hash"]
+        log = restarted.append("AUDIT", "s1", "MESSAGE_ANALYSIS", "agent", "STALL", "r", 0.9, "x", "y").result()
+        restarted.close()
+        assert log.session_prev_hash == last
+    assert ledger.verify_session("s1")["blocks_checked"] == 5
+
+    # Re-pointing a block's session link (and re-signing it) is caught per session without a full scan
+    lines = open(path).read().splitlines()
+    forged = json.loads(lines[2])
+    forged["session_prev_hash"] = "a" * 64
+    forged["current_hash"] = stored_block_hash(forged)
+    lines[2] = json.dumps(forged)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    reader = Ledger(path, AuditWriter(path, fsync="never"))
+    result = reader.verify_session("s1")
+    assert result["status"] == "SESSION_LINK_BROKEN" and result["at_block"] == 3
+    assert reader.verify_session("s2")["status"] == "VERIFIED"
+    assert verify_range(path)["status"] == "TAMPERED"
+
+    app = FastAPI()
+    app.include_router(audit_router.router)
+    monkeypatch.setattr(audit_router, "ledger", reader)
+    client = TestClient(app, headers={"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY})
+    assert client.get("/audit/session/s1/verify").json()["status"] == "SESSION_LINK_BROKEN"
+    reader.close()
+
+
+def test_legacy_evidence_migration(tmp_path):
+    db = str(tmp_path / "evidence_ledger.db")
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE evidence_chain (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, "
+                     "timestamp TEXT, event_type TEXT, content_json TEXT, prev_hash TEXT, data_hash TEXT)")
+        prev = LEGACY_GENESIS
+        for i in range(5):
+            row = (f"s{i % 2}", f"2026-01-0{i + 1}T00:00:00Z", "STRATEGIC_ENGAGEMENT", json.dumps({"turn": i}))
+            data_hash = legacy_hash(prev, row[1], row[0], row[2], row[3])
+            conn.execute("INSERT INTO evidence_chain (session_id, timestamp, event_type, content_json, prev_hash, "
+                         "data_hash) VALUES (?, ?, ?, ?, ?, ?)", (*row, prev, data_hash))
+            prev = data_hash
+
+    ledger = make_ledger(tmp_path / "audit.jsonl")
+    assert migrate(db, ledger) == (5, 0)
+    assert migrate(db, ledger) == (0, 5)
+    chain = JudicialEvidenceChain(ledger).get_chain_for_session("s0")
+    assert [c["content"]["turn"] for c in chain] == [0, 2, 4]
+    assert ledger.session_blocks("s1")[0]["metadata"]["legacy"]["id"] == 2
+    ledger.close()
+    assert ledger.verify()["status"] == "VERIFIED"
+
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE evidence_chain SET content_json = '{}' WHERE id = 3")
+    other = make_ledger(tmp_path / "other.jsonl")
+    try:
+        migrate(db, other)
+        assert False, "tampered legacy chain must not migrate"
+    except ValueError as e:
+        assert "entry ID 3" in str(e)
+    finally:
+        other.close()
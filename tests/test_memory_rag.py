@@ -0,0 +1,71 @@
+"""
+memory_rag: MinHash-LSH recall, O(1) dedupe, append-only log replay, legacy
+JSON import and no FIFO cap.
+"""
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import memory_rag
+from app.services.memory_rag import MemoryIndex
+
+VOCAB = [f"w{i}" for i in range(5000)]
+
+
+def random_text(rng, n=12):
+    return " ".join(rng.sample(VOCAB, n))
+
+
+def test_small_store_matches_exact_jaccard_semantics(tmp_path):
+    index = MemoryIndex(str(tmp_path / "mem.jsonl"), legacy_path=None)
+    assert index.recall("anything") == ""
+    assert index.add("your kyc is expiring update now", "which branch sir?", "KYC_FRAUD")
+    assert not index.add("your kyc is expiring update now", "which branch sir?", "KYC_FRAUD")
+    index.add("police case registered against you", "which police station?", "DIGITAL_ARREST")
+    assert index.recall("kyc expiring update now please", "KYC_FRAUD") == "which branch sir?"
+    # same-type items are preferred when that type exists
+    assert index.recall("kyc expiring update now please", "DIGITAL_ARREST") == ""
+    assert index.recall("kyc expiring update now please", "UNKNOWN_TYPE") == "which branch sir?"
+    assert index.recall("completely unrelated words") == ""
+
+
+def test_lsh_recall_beyond_exact_scan_limit_and_log_replay(tmp_path):
+    rng = random.Random(0)
+    path = str(tmp_path / "mem.jsonl")
+    index = MemoryIndex(path, legacy_path=None)
+    texts = [random_text(rng) for _ in range(5000)]
+    for i, text in enumerate(texts):
+        index.add(text, f"reply-{i}", "T")
+    assert len(index) == 5000  # no FIFO cap
+
+    hits = 0
+    for i in rng.sample(range(5000), 200):
+        words = texts[i].split()
+        query = " ".join(words[:10] + ["extra1", "extra2"])   # Jaccard 10/14 ≈ 0.71
+        hits += index.recall(query) == f"reply-{i}"
+    assert hits >= 195
+
+    reloaded = MemoryIndex(path, legacy_path=None)
+    assert not reloaded.loaded and reloaded.load() == 5000 and reloaded.loaded
+    assert reloaded.recall(texts[42]) == "reply-42"
+    assert not reloaded.add(texts[42], "reply-42", "T")
+    with open(path) as f:
+        assert sum(1 for _ in f) == 5000
+
+
+def test_legacy_json_store_is_imported(tmp_path):
+    legacy = tmp_path / "memory_store.json"
+    legacy.write_text(json.dumps([{"id": "x", "scam_text": "send otp now", "reply": "otp kya hota hai?", "type": "T"}]))
+    index = MemoryIndex(str(tmp_path / "mem.jsonl"), legacy_path=str(legacy))
+    assert index.recall("send otp now") == "otp kya hota hai?"
+    assert (tmp_path / "mem.jsonl").exists()
+
+
+def test_recall_past_experience_scam_type_is_optional(monkeypatch, tmp_path):
+    monkeypatch.setattr(memory_rag, "memory_index", MemoryIndex(str(tmp_path / "mem.jsonl"), legacy_path=None))
+    memory_rag.learn_interaction("refund pending click link", "kaunsa link?", "REFUND")
+    assert memory_rag.recall_past_experience("refund pending click link") == "kaunsa link?"
+    assert memory_rag.recall_past_experience("refund pending click link", "REFUND") == "kaunsa link?"
@@ -0,0 +1,133 @@
+"""
+merkle: the audit Merkle tree matches the RFC 6962 definition, inclusion and
+consistency proofs verify (and fail when altered), the persisted levels survive
+restarts and torn writes, and the /audit/merkle endpoints serve signed roots.
+"""
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.security import InvalidAPIKeyError
+from app.routers import audit as audit_router
+from app.services.audit_index import AuditIndex
+from app.services.audit_writer import AuditWriter, block_hash
+from app.services.merkle import (MerkleLedger, leaf_hash, node_hash, verify_consistency, verify_inclusion,
+                                 verify_signed_root)
+
+
+def write_blocks(path, n, start=0, index=None):
+    writer = AuditWriter(path, fsync="never", index=index)
+    for i in range(start, start + n):
+        writer.submit(f"s{i % 5}", "CANARY_TRIGGERED" if i % 9 == 0 else "MESSAGE_ANALYSIS",
+                      "test", "d", "r", 0.5, f"in{i}", f"out{i}")
+    writer.close()
+
+
+def reference_root(leaves):
+    """MTH from RFC 6962 §2.1, straight from the definition."""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+def make_ledger(tmp_path, n):
+    path = str(tmp_path / "audit.jsonl")
+    index = AuditIndex(path)
+    write_blocks(path, n, index=index)
+    return MerkleLedger(index, signing_key_path=str(tmp_path / "key.pem")), index
+
+
+def test_proofs_match_rfc6962(tmp_path):
+    ledger, index = make_ledger(tmp_path, 37)
+    leaves = [leaf_hash(b["current_hash"]) for b in index.iter_blocks()]
+    for size in range(1, 38):
+        root = ledger.root(size)
+        assert root == reference_root(leaves[:size])
+        for block in range(1, size + 1):
+            proof = ledger.inclusion_proof(block, size)
+            path = [bytes.fromhex(h) for h in proof["audit_path"]]
+            assert verify_inclusion(leaves[block - 1], block - 1, size, path, root)
+            assert len(path) <= size.bit_length()
+            if path:
+                forged = [bytes(32)] + path[1:]
+                assert not verify_inclusion(leaves[block - 1], block - 1, size, forged, root)
+        for first in range(1, size + 1):
+            c = ledger.consistency_proof(first, size)
+            proof = [bytes.fromhex(h) for h in c["proof"]]
+            assert verify_consistency(first, size, ledger.root(first), root, proof)
+            if proof:
+                assert not verify_consistency(first, size, ledger.root(first), root, [bytes(32)] + proof[1:])
+
+
+def test_persistence_catch_up_and_rebuild(tmp_path):
+    ledger, index = make_ledger(tmp_path, 100)
+    root_100 = ledger.root()
+    write_blocks(index.audit_file, 28, start=100, index=index)
+
+    reopened = MerkleLedger(index, signing_key_path=str(tmp_path / "key.pem"))
+    assert reopened.root(100) == root_100 and reopened.size() == 128
+    assert reopened.sync() == 0
+
+    level_path = os.path.join(reopened.directory, "level-03.bin")
+    os.truncate(level_path, os.path.getsize(level_path) - 40)          # torn append at an upper level
+    recovered = MerkleLedger(index, signing_key_path=str(tmp_path / "key.pem"))
+    assert recovered.root() == reopened.root()
+
+    path = index.audit_file
+    for suffix in ("", ".idx", ".sessions"):
+        os.remove(path + suffix)
+    fresh = AuditIndex(path)
+    write_blocks(path, 10, start=500, index=fresh)                      # a different trail under the old tree
+    rebuilt = MerkleLedger(fresh, signing_key_path=str(tmp_path / "key.pem"))
+    assert rebuilt.root() == reference_root([leaf_hash(b["current_hash"]) for b in fresh.iter_blocks()])
+    assert rebuilt.size() == 10
+
+
+def test_merkle_endpoints(tmp_path, monkeypatch):
+    ledger, index = make_ledger(tmp_path, 60)
+    monkeypatch.setattr(audit_router, "merkle_ledger", ledger)
+    monkeypatch.setattr(audit_router, "audit_index", index)
+    app = FastAPI()
+    app.include_router(audit_router.router)
+    app.add_exception_handler(InvalidAPIKeyError,
+                              lambda request, exc: JSONResponse(status_code=403, content={"error": "Invalid API key"}))
+    client = TestClient(app, headers={"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY})
+    assert TestClient(app).get("/audit/merkle/proof/5").status_code == 403    # proofs carry the block record
+
+    body = client.get("/audit/merkle/root").json()
+    first, public_key = body["signed_root"], body["public_key"]
+    assert first["tree_size"] == 60 and verify_signed_root(first, public_key)
+    assert not verify_signed_root({**first, "tree_size": 59}, public_key)
+
+    write_blocks(index.audit_file, 40, start=60, index=index)
+    proof = client.get("/audit/merkle/proof/95").json()                 # newer than the signed root
+    second = proof["signed_root"]
+    assert second["tree_size"] == 100 and verify_signed_root(second, public_key)
+
+    # A court holding only the record recomputes its block hash, then the path to the signed root
+    r = proof["record"]
+    recomputed = block_hash(r["previous_hash"], r["session_id"], r["event_type"], r["input_hash"], r["output_hash"],
+                            r["kind"], r["session_prev_hash"])
+    assert recomputed == r["current_hash"]
+    assert verify_inclusion(leaf_hash(recomputed), 94, 100, [bytes.fromhex(h) for h in proof["audit_path"]],
+                            bytes.fromhex(second["root_hash"]))
+
+    roots = client.get("/audit/merkle/roots").json()["roots"]
+    assert [x["tree_size"] for x in roots] == [60, 100]
+    c = client.get("/audit/merkle/consistency", params={"first": 60, "second": 100}).json()
+    assert verify_consistency(60, 100, bytes.fromhex(first["root_hash"]), bytes.fromhex(second["root_hash"]),
+                              [bytes.fromhex(h) for h in c["proof"]])
+    assert client.get("/audit/merkle/proof/101").status_code == 400
+    assert client.get("/audit/merkle/consistency", params={"first": 101}).status_code == 400
+    assert hashlib.sha256(b"").digest() == MerkleLedger(AuditIndex(str(tmp_path / "none.jsonl")),
+                                                        signing_key_path=str(tmp_path / "key.pem")).root()
@@ -0,0 +1,162 @@
+"""
+metrics: histogram buckets are cumulative in the exposition and agree with
+_sum/_count; concurrent recording from many threads loses nothing; LLM calls
+record latency, fallbacks and timeouts per provider/model; /metrics serves
+the Prometheus text format and /health reports live component status (an
+unconfigured provider does not degrade it); a session-lock timeout counts as
+a failed /analyze. Global metrics are compared between scrapes, never absolute.
+"""
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import SETTINGS
+from app.core.llm import DualBrainLLM
+from app.services.audit_writer import AuditWriter
+from app.services.ledger import Ledger
+from app.services.metrics import MetricsRegistry, metrics
+
+
+def samples(text):
+    """{'name{labels}': value} for every sample line."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+def deltas(before, after):
+    """Change of every sample between two scrapes (samples first seen in `after` start from 0)."""
+    return {key: value - before.get(key, 0.0) for key, value in after.items()}
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    h = registry.histogram("t_seconds", "Test latency.", ["stage"], buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 2.0, 3.0):
+        h.labels("swarm").observe(v)
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    s = samples(text)
+    assert s['t_seconds_bucket{stage="swarm",le="0.1"}'] == 2           # le is inclusive
+    assert s['t_seconds_bucket{stage="swarm",le="1.0"}'] == 3
+    assert s['t_seconds_bucket{stage="swarm",le="+Inf"}'] == 5 == s['t_seconds_count{stage="swarm"}']
+    assert s['t_seconds_sum{stage="swarm"}'] == pytest.approx(5.65)
+    with pytest.raises(ValueError):
+        h.labels("a", "b")
+
+
+def test_concurrent_recording_loses_nothing():
+    registry = MetricsRegistry()
+    h = registry.histogram("c_seconds", "Concurrent.")
+    c = registry.counter("c_total", "Concurrent.", ["kind"])
+
+    def work():
+        for i in range(20_000):
+            h.observe(i % 7 / 1000)
+            c.labels("x").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    s = samples(registry.render())
+    assert s["c_seconds_count"] == s['c_seconds_bucket{le="+Inf"}'] == 160_000
+    assert s['c_total{kind="x"}'] == 160_000
+
+
+class FakeModel:
+    def __init__(self, error=None, delay=0.0):
+        self.error, self.delay = error, delay
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return "reply"
+
+
+class ReadTimeout(Exception):
+    pass
+
+
+def test_llm_latency_fallbacks_and_timeouts():
+    before = samples(metrics.render())
+    llm = DualBrainLLM("test-primary", "test-fallback")
+    llm._primary, llm._fallback = FakeModel(error=ReadTimeout("slow")), FakeModel()
+    assert asyncio.run(llm.ainvoke("hi")) == "reply"
+
+    llm._primary = FakeModel(delay=5)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(llm.ainvoke("hi"), 0.05))  # deadline cancels the call
+
+    delta = deltas(before, samples(metrics.render()))
+    assert delta['vigil_llm_request_seconds_count{provider="groq",model="test-primary",outcome="timeout"}'] == 2
+    assert delta['vigil_llm_request_seconds_count{provider="gemini",model="test-fallback",outcome="ok"}'] == 1
+    assert delta['vigil_llm_timeouts_total{provider="groq",model="test-primary"}'] == 2
+    assert delta['vigil_llm_fallbacks_total{model="test-primary"}'] == 1
+
+
+def test_metrics_and_health_endpoints(tmp_path, monkeypatch):
+    from app import main
+    from app.services.fast_cache import fast_cache
+
+    path = str(tmp_path / "audit.jsonl")
+    monkeypatch.setattr(main, "ledger", Ledger(path, AuditWriter(path, fsync="never")))
+    monkeypatch.setattr(main.shutil, "disk_usage", lambda p: (100 << 30, 50 << 30, 50 << 30))
+    client = TestClient(main.app)
+    before = samples(client.get("/metrics").text)
+
+    fast_cache.get_cached_reply("hello")
+    fast_cache.get_cached_reply("send your otp now")
+    main.observability.track_performance(42.0, True)
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for family in ("vigil_analyze_seconds", "vigil_stage_seconds", "vigil_llm_request_seconds",
+                   "vigil_cache_lookups_total", "vigil_event_loop_lag_seconds"):
+        assert f"# TYPE {family} " in text
+    delta = deltas(before, samples(text))
+    assert delta['vigil_analyze_seconds_bucket{outcome="ok",le="0.05"}'] == 1
+    assert delta['vigil_cache_lookups_total{cache="reflex",result="hit"}'] == 1
+    assert delta['vigil_cache_lookups_total{cache="reflex",result="miss"}'] == 1
+    assert 'vigil_cache_hit_ratio{cache="reflex"}' in text
+
+    # Unconfigured providers are reported but do not degrade; a failing one does
+    monkeypatch.setattr(main.SETTINGS, "GROQ_API_KEY", "")
+    monkeypatch.setattr(main.SETTINGS, "GEMINI_API_KEY", "")
+    health = client.get("/health").json()
+    assert health["llm_providers"] == {"groq": "not_configured", "gemini": "not_configured"}
+    assert health["status"] == "ready" and health["services"]["evidence_ledger"] == "idle"
+    assert health["services"]["state_manager"] in ("persistent", "read_only")
+    monkeypatch.setattr(main.SETTINGS, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(main, "llm_status", lambda provider: False)
+    health = client.get("/health").json()
+    assert health["llm_providers"]["groq"] == "failing" and health["status"] == "degraded"
+    main.ledger.close()
+
+
+def test_session_lock_timeout_is_recorded_as_failure():
+    from app import main
+
+    lock = main._get_session_lock("metrics-lock-test")
+    asyncio.run(lock.acquire())                       # held by an earlier request that never finishes
+    client = TestClient(main.app)
+    before = samples(client.get("/metrics").text)
+    response = client.post("/analyze", json={"session_id": "metrics-lock-test", "message_text": "hello"},
+                           headers={"X-API-KEY": SETTINGS.VIBHISHAN_API_KEY})
+    lock.release()
+    assert response.status_code == 200
+    delta = deltas(before, samples(client.get("/metrics").text))
+    assert delta['vigil_analyze_seconds_count{outcome="error"}'] == 1
+    assert delta.get('vigil_analyze_seconds_count{outcome="ok"}', 0) == 0
+    assert delta['vigil_pipeline_fallbacks_total{stage="session_lock",reason="timeout"}'] == 1
@@ -0,0 +1,118 @@
+"""
+semantic_memory: deterministic local embedder, IVF recall against exact search,
+incremental add/delete, snapshot + log persistence (written after a cold load and
+periodically, not only at exit) and memory_rag log import.
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.semantic_memory import FLAT_LIMIT, HashedNgramEmbedder, SemanticMemory
+
+SYLLABLES = ["ka", "ri", "mo", "su", "te", "na", "lo", "pi", "ve", "du", "sh", "ya", "go", "re", "bu"]
+
+
+def random_text(rng, words=10):
+    return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(words))
+
+
+def test_embedder_is_deterministic_and_tolerates_typos():
+    a, b = HashedNgramEmbedder(), HashedNgramEmbedder()
+    texts = ["your SBI account will be blocked, update KYC now",
+             "ur sbi acount will b blocked updte kyc now",
+             "congratulations you won the lottery, pay the fee"]
+    va, vb = a.embed(texts), b.embed(texts)
+    assert np.array_equal(va, vb)
+    assert np.allclose(np.linalg.norm(va, axis=1), 1.0, atol=1e-5)
+    assert va[0] @ va[1] > 0.5 > va[0] @ va[2]
+    assert np.array_equal(a.embed(texts[1:2])[0], va[1])   # batch == single
+    assert not a.embed([""]).any()
+
+
+def test_small_store_add_search_delete(tmp_path):
+    memory = SemanticMemory(str(tmp_path / "sem"))
+    assert memory.search("anything") == []
+    key = memory.add("your kyc is expiring, update now", "which branch sir?", "KYC_FRAUD")
+    assert key and memory.add("your kyc is expiring, update now", "which branch sir?", "KYC_FRAUD") is None
+    memory.add("police case registered against your aadhaar", "which police station?", "DIGITAL_ARREST")
+
+    hits = memory.search("ur kyc expiring pls updte", k=2)
+    assert hits[0]["reply"] == "which branch sir?" and hits[0]["score"] > hits[1]["score"]
+    assert memory.search("ur kyc expiring pls updte", scam_type="DIGITAL_ARREST")[0]["type"] == "DIGITAL_ARREST"
+
+    assert memory.delete(key) and not memory.delete(key)
+    assert all(h["id"] != key for h in memory.search("your kyc is expiring, update now", k=5))
+    assert len(memory) == 1
+
+
+def test_ivf_recall_matches_exact_search_and_survives_reload(tmp_path):
+    rng = random.Random(0)
+    n = FLAT_LIMIT * 2
+    texts = [random_text(rng) for _ in range(n)]
+    memory = SemanticMemory(str(tmp_path / "sem"))
+    memory.add_many([{"scam_text": t, "reply": f"r{i}", "type": "T"} for i, t in enumerate(texts[:n // 2])])
+    for i in range(n // 2, n):                     # incremental adds cross the training threshold
+        memory.add(texts[i], f"r{i}", "T")
+    assert memory.stats()["lists"] > 1
+
+    exact = memory.embedder.embed(texts)
+    queries = rng.sample(range(n), 100)
+    hits = 0
+    for i in queries:
+        query = " ".join(texts[i].split()[:8])
+        expected = int(np.argmax(exact @ memory.embedder.embed([query])[0]))
+        hits += memory.search(query, k=1)[0]["reply"] == f"r{expected}"
+    assert hits >= 90
+
+    removed = memory.search(texts[7], k=1)[0]["id"]
+    memory.delete(removed)
+    memory.save()
+    memory.add("late addition after the snapshot", "late", "T")
+
+    reloaded = SemanticMemory(str(tmp_path / "sem"))
+    assert len(reloaded) == n
+    assert reloaded.stats()["lists"] == memory.stats()["lists"]
+    assert reloaded.search(texts[7], k=1)[0]["id"] != removed
+    assert reloaded.search("late addition after the snapshot", k=1)[0]["reply"] == "late"
+    assert reloaded.search(texts[11], k=1)[0]["reply"] == "r11"
+
+
+def test_imports_memory_rag_log_once(tmp_path):
+    log = tmp_path / "memory_store.jsonl"
+    log.write_text(json.dumps({"id": "x", "scam_text": "send otp now", "reply": "otp kya hota hai?", "type": "T"}) + "\n")
+    memory = SemanticMemory(str(tmp_path / "sem"), import_path=str(log))
+    assert memory.search("send the otp now")[0]["reply"] == "otp kya hota hai?"
+    assert len(SemanticMemory(str(tmp_path / "sem"), import_path=str(log))) == 1
+
+
+def test_cold_load_and_periodic_job_persist_the_snapshot(tmp_path):
+    directory = str(tmp_path / "sem")
+    memory = SemanticMemory(directory)
+    memory.add_many([{"scam_text": f"pay the fee {i} now", "reply": f"r{i}", "type": "T"} for i in range(50)])
+    assert not os.path.exists(memory.snapshot_path)           # killed before exit: no snapshot yet
+
+    restarted = SemanticMemory(directory)
+    assert not restarted.loaded and restarted.load() == 50 and restarted.loaded
+    assert os.path.exists(restarted.snapshot_path)           # the re-embedding is not repeated next time
+
+    again = SemanticMemory(directory)
+    embedded = []
+    embed = again.embedder.embed
+    again.embedder.embed = lambda texts: embedded.extend(texts) or embed(texts)
+    assert again.load() == 50 and embedded == []
+
+    again.add("late addition", "late", "T")
+
+    async def run_briefly():
+        job = asyncio.create_task(again.run_forever(0.01))
+        await asyncio.sleep(0.2)
+        job.cancel()
+
+    asyncio.run(run_briefly())
+    assert again._snapshot_rows == 51
@@ -0,0 +1,69 @@
+"""
+Syndicate scoring: label propagation seeded from fraud-registry identifiers,
+distance decay, incremental recompute and registry reloads.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.identity_graph import IdentityGraph
+from app.services.syndicate_scoring import SyndicateScorer
+
+
+class SetRegistry:
+    """Stand-in for FraudRegistry: a fixed set of (kind, value) entries."""
+
+    def __init__(self, entries):
+        self.entries = set(entries)
+        self.signature = {"v": 1}
+        self.lookups = 0
+
+    def contains(self, kind, value):
+        self.lookups += 1
+        return (kind, value) in self.entries
+
+
+def build():
+    g = IdentityGraph()
+    g.link("direct", {"upi_ids": ["bad@ybl", "clean1@ybl"]})
+    g.link("one_hop", {"upi_ids": ["clean1@ybl"], "phone_numbers": ["+919000000001"]})
+    g.link("two_hop", {"phone_numbers": ["+919000000001"]})
+    g.link("isolated", {"upi_ids": ["other@ybl"]})
+    return g
+
+
+def test_scores_decay_with_distance_from_seeds():
+    g = build()
+    scorer = SyndicateScorer(graph=g, registry=SetRegistry({("upis", "bad@ybl")}))
+    run = scorer.recompute()
+    assert run["seeds"] == 1 and run["iterations"] > 0
+    direct, one, two = scorer.score("direct"), scorer.score("one_hop"), scorer.score("two_hop")
+    assert 1.0 > direct > one > two > 0.0
+    assert scorer.score("isolated") == 0.0 and scorer.score("unknown") == 0.0
+
+
+def test_incremental_recompute_only_checks_new_nodes():
+    g = build()
+    registry = SetRegistry({("upis", "bad@ybl")})
+    scorer = SyndicateScorer(graph=g, registry=registry)
+    scorer.recompute()
+    first = registry.lookups
+    assert scorer.recompute() is scorer.last_run and registry.lookups == first  # nothing changed
+
+    g.link("late", {"upi_ids": ["other@ybl", "bad@ybl"]})
+    scorer.recompute()
+    assert registry.lookups == first  # no new upi/phone/url nodes, only a new session
+    assert scorer.score("late") > 0 and scorer.score("isolated") > 0
+
+
+def test_registry_reload_reseeds_everything():
+    g = build()
+    registry = SetRegistry(set())
+    scorer = SyndicateScorer(graph=g, registry=registry)
+    scorer.recompute()
+    assert scorer.score("isolated") == 0.0
+    registry.entries = {("upis", "other@ybl")}
+    registry.signature = {"v": 2}
+    scorer.recompute()
+    assert scorer.score("isolated") > 0.5 and scorer.score("direct") == 0.0
@@ -0,0 +1,75 @@
+"""
+Scammer taxonomy store: profile updates, batched writes visible before flush,
+indexed coordination window and one-time import of the legacy JSON file.
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.taxonomy import ScammerTaxonomy
+
+
+def make(tmp_path, **kw):
+    return ScammerTaxonomy(db_path=str(tmp_path / "taxonomy.db"), legacy_json=None, **kw)
+
+
+def test_update_and_get_profile_survive_flush_and_reopen(tmp_path):
+    tax = make(tmp_path, batch_size=1000)
+    tax.update_profile("+919876543210", {"scam_score": 0.7, "scam_type": "KYC_FRAUD"})
+    tax.update_profile("+919876543210", {"scam_score": 0.4, "scam_type": "KYC_FRAUD"})
+    tax.update_profile("+919876543210", {"scam_score": 0.9, "scam_type": "DIGITAL_ARREST"})
+    profile = tax.get_profile("+919876543210")  # served from the write buffer
+    assert profile["encounters"] == 3
+    assert profile["risk_score"] == 0.9
+    assert profile["scam_types"] == ["KYC_FRAUD", "DIGITAL_ARREST"]
+    tax.flush()
+
+    reopened = make(tmp_path)
+    assert reopened.get_profile("+919876543210") == profile
+    assert reopened.get_profile("unknown") is None
+    assert len(reopened) == 1
+
+
+def test_check_coordination_window_and_exclusion(tmp_path):
+    tax = make(tmp_path, batch_size=2)
+    for i in range(3):
+        tax.update_profile(f"id{i}", {"scam_score": 0.8, "fingerprint": "fp-1", "session_id": f"s{i}"})
+    tax.update_profile("other", {"scam_score": 0.8, "fingerprint": "fp-2", "session_id": "s9"})
+    # one profile is stale: outside the 10-minute window
+    stale = dict(tax.get_profile("id0"), last_seen=(datetime.now() - timedelta(minutes=30)).isoformat())
+    tax._pending["id0"] = stale
+
+    result = tax.check_coordination("fp-1", window_minutes=10, exclude_session="s2")
+    assert result["coordinated"] is True
+    assert [s["session_id"] for s in result["active_sessions"]] == ["s1"]
+    tax.flush()
+    assert tax.check_coordination("fp-1", exclude_session="s2")["count_other_sessions"] == 1
+    assert tax.check_coordination("fp-3")["coordinated"] is False
+    assert tax.check_coordination("") == {"coordinated": False, "count": 0, "sessions": []}
+
+
+def test_fingerprint_change_in_buffer_overrides_stored_row(tmp_path):
+    tax = make(tmp_path)
+    tax.update_profile("id", {"fingerprint": "fp-old", "session_id": "s1"})
+    tax.flush()
+    tax.update_profile("id", {"fingerprint": "fp-new", "session_id": "s1"})
+    assert tax.check_coordination("fp-old")["count_other_sessions"] == 0
+    assert tax.check_coordination("fp-new")["count_other_sessions"] == 1
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "scammer_taxonomy.json"
+    legacy.write_text(json.dumps({"a@ybl": {
+        "first_seen": "2025-01-01T10:00:00", "risk_score": 0.6, "scam_types": ["UPI_FRAUD"],
+        "encounters": 4, "fingerprint": None, "last_seen": "2025-01-02T10:00:00", "last_session_id": "s1",
+    }}))
+    db = str(tmp_path / "taxonomy.db")
+    tax = ScammerTaxonomy(db_path=db, legacy_json=str(legacy))
+    assert tax.get_profile("a@ybl")["encounters"] == 4
+    tax.update_profile("a@ybl", {"scam_score": 0.1})
+    tax.flush()
+    again = ScammerTaxonomy(db_path=db, legacy_json=str(legacy))
+    assert again.get_profile("a@ybl")["encounters"] == 5
@@ -0,0 +1,64 @@
+"""
+URL reputation: canonicalization, registered domains, suffix-trie rules
+(exact-or-subdomain vs strict wildcard), shortener unwrapping and the hub verdict.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.url_reputation import DomainTrie, URLReputationEngine, canonicalize_url, registered_domain
+
+
+def test_canonicalize_url():
+    c = canonicalize_url("WWW.Example.COM:443/Path?a=1#frag).")
+    assert c.url == "https://www.example.com/Path?a=1"
+    assert c.host == "www.example.com"
+    assert canonicalize_url("http://1.2.3.4:8080/x").is_ip
+    assert canonicalize_url("https://") is None
+    assert registered_domain("login.sbi.co.in") == "sbi.co.in"
+    assert registered_domain("a.b.evil.top") == "evil.top"
+
+
+def test_trie_rules():
+    trie = DomainTrie()
+    trie.add("evil.com")
+    trie.add("*.co.in.net", 0.9)
+    trie.add("top", 0.4)
+    assert trie.match("evil.com") == 1.0
+    assert trie.match("a.b.evil.com") == 1.0
+    assert trie.match("notevil.com") == 0.0
+    assert trie.match("x.co.in.net") == 0.9
+    assert trie.match("co.in.net") == 0.0
+    assert trie.match("anything.top") == 0.4
+
+
+def test_engine_unwraps_shorteners(tmp_path):
+    (tmp_path / "bad_domains.txt").write_text("# rules\nphish.top\n", encoding="utf-8")
+    (tmp_path / "shorteners.json").write_text(json.dumps({"bit.ly/abc": "https://login.phish.top/kyc"}), encoding="utf-8")
+    engine = URLReputationEngine(str(tmp_path))
+
+    verdict = engine.check("https://bit.ly/abc")
+    assert verdict.status == "MALICIOUS"
+    assert verdict.expanded_from == "https://bit.ly/abc"
+    assert verdict.registered_domain == "phish.top"
+
+    unknown_short = engine.check("bit.ly/zzz")
+    assert unknown_short.status == "SUSPICIOUS"
+    assert "unresolved_shortener" in unknown_short.reasons
+
+    assert engine.check("https://www.hdfcbank.com/login").status == "UNKNOWN"
+    assert engine.check("https://hdfc-kyc-login.in").status == "MALICIOUS"
+
+
+def test_hub_verify_url_combines_registry_and_reputation():
+    from app.services.intelligence_hub import intelligence_hub
+
+    registered = intelligence_hub.verify_url("https://t.me/amazon_hr_jobs_india")
+    assert registered["status"] == "FRAUD_REGISTERED"
+    assert registered["confidence"] == 1.0
+
+    wildcard = intelligence_hub.verify_url("https://secure.onlinesbi-retail.co.in.net/refund")
+    assert wildcard["risk_score"] >= 80
+    assert intelligence_hub.verify_url("https://www.google.com")["status"] == "UNKNOWN"